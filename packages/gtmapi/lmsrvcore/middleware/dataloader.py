@@ -1,9 +1,11 @@
 from lmsrvlabbook.dataloader.labbook import LabBookLoader
 from lmsrvlabbook.dataloader.dataset import DatasetLoader
+from lmsrvlabbook.dataloader.activity import ActivityDetailLoader
 
 
 class DataloaderMiddleware(object):
-    """Middleware to insert an instance of the LabBookLoader and DatasetLoader dataloaders into the request context"""
+    """Middleware to insert an instance of the LabBookLoader, DatasetLoader and ActivityDetailLoader dataloaders into the
+    request context"""
     def resolve(self, next, root, info, **args):
         if hasattr(info.context, "labbook_loader"):
             if not info.context.labbook_loader:
@@ -17,4 +19,12 @@ class DataloaderMiddleware(object):
         else:
             info.context.dataset_loader = DatasetLoader()
 
+        if hasattr(info.context, "activity_detail_loader"):
+            if not info.context.activity_detail_loader:
+                info.context.activity_detail_loader = ActivityDetailLoader(info.context.labbook_loader,
+                                                                           info.context.dataset_loader)
+        else:
+            info.context.activity_detail_loader = ActivityDetailLoader(info.context.labbook_loader,
+                                                                       info.context.dataset_loader)
+
         return next(root, info, **args)
@@ -17,6 +17,7 @@ from gtmcore.activity.utils import ImmutableDict, TextData, DetailRecordList, Im
 
 from lmsrvlabbook.api.objects.dataset import Dataset
 from gtmcore.dataset.manifest import Manifest
+from gtmcore.dataset.manifest.verify import VerificationMode, DEFAULT_SAMPLE_CONFIDENCE
 from gtmcore.dispatcher import Dispatcher, jobs
 
 # Temporary hardcoding of Gigantum Dataset type. Can be removed with #1328
@@ -467,22 +468,37 @@ class WriteDatasetReadme(graphene.relay.ClientIDMutation):
 
 class VerifyDataset(graphene.ClientIDMutation):
     """Verify the contents of a dataset, returning a job key. The 'modified_keys' value in the metadata indicates
-    which files have changed, once the job is complete."""
+    which files have changed. It is updated as files are verified ('num_verified' of 'num_files'), and is final once
+    the job is complete."""
 
     class Input:
         dataset_owner = graphene.String(required=True)
         dataset_name = graphene.String(required=True)
         labbook_owner = graphene.String(required=False, description="Optional arg if dataset is linked")
         labbook_name = graphene.String(required=False, description="Optional arg if dataset is linked")
+        mode = graphene.String(required=False,
+                               description="Optional files to verify: 'full' (default), 'sample' for a random sample "
+                                           "or 'since_last_verified' for files changed since they were verified")
+        confidence = graphene.Float(required=False,
+                                    description="Optional probability of a sample detecting modified files, "
+                                                "between 0 and 1 (default 0.95)")
 
     background_job_key = graphene.String()
 
     @classmethod
     def mutate_and_get_payload(cls, root, info, dataset_owner, dataset_name, labbook_owner=None, labbook_name=None,
-                               client_mutation_id=None):
+                               mode=None, confidence=None, client_mutation_id=None):
         logged_in_user = get_logged_in_username()
 
-        # Schedule Job to clear file cache if dataset is no longer in use
+        try:
+            verification_mode = VerificationMode(mode or VerificationMode.FULL.value)
+        except ValueError:
+            raise ValueError(f"Unsupported verification mode: {mode}")
+        if confidence is None:
+            confidence = DEFAULT_SAMPLE_CONFIDENCE
+        elif not 0 < confidence < 1:
+            raise ValueError("Confidence must be between 0 and 1")
+
         job_metadata = {'method': 'verify_dataset_contents'}
         job_kwargs = {
             'logged_in_username': logged_in_user,
@@ -491,7 +507,9 @@ class VerifyDataset(graphene.ClientIDMutation):
             'dataset_owner': dataset_owner,
             'dataset_name': dataset_name,
             'labbook_owner': labbook_owner,
-            'labbook_name': labbook_name
+            'labbook_name': labbook_name,
+            'mode': verification_mode.value,
+            'confidence': confidence
         }
 
         dispatcher = Dispatcher()
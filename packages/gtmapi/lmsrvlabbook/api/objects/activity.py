@@ -1,5 +1,6 @@
 import graphene
 from graphene.types import datetime
+from promise import Promise
 
 from gtmcore.logging import LMLogger
 from gtmcore.activity import ActivityStore, ActivityDetailRecord, ActivityDetailType, ActivityType, ActivityAction
@@ -50,37 +51,38 @@ class ActivityDetailObject(graphene.ObjectType):
     # A list of tags for the entire record
     tags = graphene.List(graphene.String)
 
-    def _get_loader(self, info):
-        if self._repository_type is None:
-            raise ValueError("`_repository_type` must be set to resolve loader instance")
+    def _load_detail_record(self, info, load_data: bool = True) -> Promise:
+        """Private method to load a detail record if it has not been previously loaded and set
 
-        if self._repository_type == 'dataset':
-            return info.context.dataset_loader
-        elif self._repository_type == 'labbook':
-            return info.context.labbook_loader
-        else:
-            raise ValueError(f"Unsupported repository_type: {self._repository_type }")
+        Records are loaded through the request's ActivityDetailLoader, so all detail records resolved in a query are
+        read from the detail db in a single batch. If `load_data` is False only the record's metadata is loaded.
+        """
+        if self._detail_record and (not load_data or self._detail_record.is_loaded):
+            return Promise.resolve(self._set_detail_record(self._detail_record))
 
-    def _load_detail_record(self, info):
-        """Private method to load a detail record if it has not been previously loaded and set"""
-        if not self._detail_record:
-            # Load record from database
-            if not self.key:
-                raise ValueError("Must set `key` on object creation to resolve detail record")
+        # Load record from database
+        if not self.key:
+            raise ValueError("Must set `key` on object creation to resolve detail record")
 
-            # Load store instance
-            lb = self._get_loader(info).load(f"{get_logged_in_username()}&{self.owner}&{self.name}").get()
-            store = ActivityStore(lb)
-
-            # Retrieve record
-            self._detail_record: ActivityDetailRecord = store.get_detail_record(self.key)
+        if self._repository_type is None:
+            raise ValueError("`_repository_type` must be set to resolve loader instance")
 
-        # Set class properties
-        self.type = ActivityDetailTypeEnum.get(self._detail_record.type.value).value
-        self.show = self._detail_record.show
-        self.tags = self._detail_record.tags
-        self.importance = self._detail_record.importance
-        self.action = ActivityActionTypeEnum.get(self._detail_record.action.value).value
+        loader_key = f"{self._repository_type}&{get_logged_in_username()}&{self.owner}&{self.name}&{self.key}"
+        if not load_data:
+            loader_key = f"{loader_key}&metadata"
+        return info.context.activity_detail_loader.load(loader_key).then(self._set_detail_record)
+
+    def _set_detail_record(self, detail_record: ActivityDetailRecord) -> ActivityDetailRecord:
+        """Private method to set class properties from a loaded detail record"""
+        if not (self._detail_record and self._detail_record.is_loaded):
+            # Don't replace a record that has its data with a metadata only record
+            self._detail_record = detail_record
+        self.type = ActivityDetailTypeEnum.get(detail_record.type.value).value
+        self.show = detail_record.show
+        self.tags = detail_record.tags
+        self.importance = detail_record.importance
+        self.action = ActivityActionTypeEnum.get(detail_record.action.value).value
+        return detail_record
 
     @classmethod
     def get_node(cls, info, id):
@@ -104,42 +106,41 @@ class ActivityDetailObject(graphene.ObjectType):
     def resolve_type(self, info):
         """Resolve the type field"""
         if self.type is None:
-            self._load_detail_record(info)
+            return self._load_detail_record(info, load_data=False).then(lambda _: self.type)
         return self.type
 
     def resolve_action(self, info):
         """Resolve the action field"""
         if self.action is None:
-            self._load_detail_record(info)
+            return self._load_detail_record(info, load_data=False).then(lambda _: self.action)
         return self.action
 
     def resolve_show(self, info):
         """Resolve the show field"""
         if self.show is None:
-            self._load_detail_record(info)
+            return self._load_detail_record(info, load_data=False).then(lambda _: self.show)
         return self.show
 
     def resolve_importance(self, info):
         """Resolve the importance field"""
         if self.importance is None:
-            self._load_detail_record(info)
+            return self._load_detail_record(info, load_data=False).then(lambda _: self.importance)
         return self.importance
 
     def resolve_tags(self, info):
         """Resolve the tags field"""
         if self.tags is None:
-            self._load_detail_record(info)
+            return self._load_detail_record(info, load_data=False).then(lambda _: self.tags)
         return self.tags
 
     def resolve_data(self, info):
         """Resolve the data field"""
-        if self.data is None:
-            self._load_detail_record(info)
-
-        # JSONify for transport via web
-        data_dict = self._detail_record.jsonify_data()
+        def jsonify(detail_record: ActivityDetailRecord):
+            # JSONify for transport via web
+            data_dict = detail_record.jsonify_data()
+            return [(x, data_dict[x]) for x in data_dict]
 
-        return [(x, data_dict[x]) for x in data_dict]
+        return self._load_detail_record(info).then(jsonify)
 
 
 class ActivityRecordObject(graphene.ObjectType):
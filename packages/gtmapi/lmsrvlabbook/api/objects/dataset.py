@@ -11,6 +11,7 @@ from lmsrvcore.api.interfaces import GitRepository
 from lmsrvcore.utilities import configure_git_credentials
 
 from gtmcore.dataset.manifest import Manifest
+from gtmcore.dataset.manifest.verify import ContentVerifier
 from gtmcore.workflows.gitlab import GitLabManager, ProjectPermissions, GitLabException
 from gtmcore.inventory.inventory import InventoryManager
 from gtmcore.logging import LMLogger
@@ -80,8 +81,8 @@ class Dataset(graphene.ObjectType):
     # Connection to Activity Entries
     activity_records = graphene.relay.ConnectionField(ActivityConnection)
 
-    # List of all files and directories within the section
-    all_files = graphene.relay.ConnectionField(DatasetFileConnection)
+    # List of all files and directories within the section, optionally only the direct children of `directory`
+    all_files = graphene.relay.ConnectionField(DatasetFileConnection, directory=graphene.String())
 
     # Access a detail record directly, which is useful when fetching detail items
     detail_record = graphene.Field(ActivityDetailObject, key=graphene.String())
@@ -101,7 +102,7 @@ class Dataset(graphene.ObjectType):
     # List of DatasetConfigurationParameter objects with the current configuration (excluding default config)
     backend_configuration = graphene.List(DatasetConfigurationParameter)
 
-    # List of file keys for files that don't match hash values.
+    # List of file keys for files that didn't match hash values when last verified (with the verifyDataset mutation).
     # Managed datasets should always return 0 files.
     # Unmanaged datasets may return files, which indicates they most likely changed in the backend and the dataset
     # must be "updated" to include the new hashes as a new version
@@ -370,14 +371,17 @@ class Dataset(graphene.ObjectType):
         """Helper method to populate the DatasetFileConnection"""
         manifest = Manifest(dataset, get_logged_in_username())
 
-        if "after" in kwargs:
-            after_index = int(base64.b64decode(kwargs["after"]))
-        else:
-            after_index = 0
+        # Cursors are the file's key, so pages are stable while files are added or removed
+        after = base64.b64decode(kwargs["after"]).decode("UTF-8") if kwargs.get("after") else None
+        first = kwargs.get("first")
+        if first is None:
+            first = max(manifest.count(), 1)
 
-        # Generate naive cursors
-        edges, indexes = manifest.list(first=kwargs.get("first"), after_index=after_index)
-        cursors = [base64.b64encode("{}".format(x).encode("UTF-8")).decode("UTF-8") for x in indexes]
+        # Fetch one extra item to determine if there is another page
+        edges = manifest.list_page(first=first + 1, after=after, directory=kwargs.get("directory"))
+        has_next_page = len(edges) > first
+        edges = edges[:first]
+        cursors = [base64.b64encode(edge['key'].encode("UTF-8")).decode("UTF-8") for edge in edges]
 
         edge_objs = []
         for edge, cursor in zip(edges, cursors):
@@ -387,21 +391,13 @@ class Dataset(graphene.ObjectType):
                            "_file_info": edge}
             edge_objs.append(DatasetFileConnection.Edge(node=DatasetFile(**create_data), cursor=cursor))
 
-        has_previous_page = False
-        has_next_page = len(edges) > 0
         start_cursor = None
         end_cursor = None
         if cursors:
             start_cursor = cursors[0]
             end_cursor = cursors[-1]
-            if indexes[-1] == len(manifest.manifest) - 1:
-                has_next_page = False
-
-        if kwargs.get("after"):
-            if int(base64.b64decode(kwargs["after"])) > 0:
-                has_previous_page = True
 
-        page_info = graphene.relay.PageInfo(has_next_page=has_next_page, has_previous_page=has_previous_page,
+        page_info = graphene.relay.PageInfo(has_next_page=has_next_page, has_previous_page=after is not None,
                                             start_cursor=start_cursor, end_cursor=end_cursor)
 
         return DatasetFileConnection(edges=edge_objs, page_info=page_info)
@@ -496,9 +492,11 @@ class Dataset(graphene.ObjectType):
             lambda dataset: self.helper_resolve_backend_configuration(dataset))
 
     def resolve_content_hash_mismatches(self, info):
-        """Field to look up any content hash mismatches. Note this can be slow for big datasets!"""
-        return info.context.dataset_loader.load(f"{get_logged_in_username()}&{self.owner}&{self.name}").then(
-            lambda dataset: dataset.backend.verify_contents(dataset, logger.info))
+        """Field to look up the content hash mismatches found by the last verification. Files are hashed by the
+        verify_dataset_contents background job, not while resolving this field."""
+        username = get_logged_in_username()
+        return info.context.dataset_loader.load(f"{username}&{self.owner}&{self.name}").then(
+            lambda dataset: ContentVerifier(Manifest(dataset, username)).recorded_mismatches())
 
     def helper_resolve_commits_ahead_behind(self, dataset) -> None:
         """Helper to get the commits ahead and behind for a dataset. This is done together so only 1 fetch will
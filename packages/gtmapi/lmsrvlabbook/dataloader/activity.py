@@ -0,0 +1,55 @@
+from typing import Dict, List, Tuple
+
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from gtmcore.activity import ActivityStore
+
+
+class ActivityDetailLoader(DataLoader):
+    """Dataloader for gtmcore.activity.ActivityDetailRecord instances
+
+    All detail records requested while resolving a query are loaded together, with a single batched read of the
+    activity detail db for each repository.
+
+    The key for this object is (labbook|dataset)&username&owner&repository_name&detail_key, with `&metadata` appended
+    to load only the record's metadata and not its data
+    """
+    def __init__(self, labbook_loader: DataLoader, dataset_loader: DataLoader, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Repository instances are loaded through the request's existing loaders, so they are shared with other fields
+        self.labbook_loader = labbook_loader
+        self.dataset_loader = dataset_loader
+
+    def _load_repository(self, repository_type: str, repository_key: str):
+        if repository_type == 'labbook':
+            return self.labbook_loader.load(repository_key).get()
+        elif repository_type == 'dataset':
+            return self.dataset_loader.load(repository_key).get()
+        else:
+            raise ValueError(f"Unsupported repository type: {repository_type}")
+
+    def batch_load_fn(self, keys: List[str]):
+        """Method to load detail records based on a list of unique keys
+
+        Args:
+            keys(list(str)): Unique key to identify the detail record
+
+        Returns:
+
+        """
+        # Group the detail keys by repository, and whether the data is needed
+        repositories: Dict[Tuple[str, str, bool], List[str]] = dict()
+        for key in keys:
+            repository_type, username, owner_name, repository_name, detail_key, *options = key.split('&')
+            repository = (repository_type, f"{username}&{owner_name}&{repository_name}", 'metadata' not in options)
+            repositories.setdefault(repository, list()).append(detail_key)
+
+        records = dict()
+        for (repository_type, repository_key, load_data), detail_keys in repositories.items():
+            store = ActivityStore(self._load_repository(repository_type, repository_key))
+            for record in store.get_detail_records(detail_keys, load_data=load_data):
+                suffix = "" if load_data else "&metadata"
+                records[f"{repository_type}&{repository_key}&{record.key}{suffix}"] = record
+
+        return Promise.resolve([records[key] for key in keys])
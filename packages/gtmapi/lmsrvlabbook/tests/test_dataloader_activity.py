@@ -0,0 +1,62 @@
+import pytest
+from lmsrvlabbook.tests.fixtures import fixture_working_dir
+
+from promise import Promise
+from lmsrvlabbook.dataloader.activity import ActivityDetailLoader
+from lmsrvlabbook.dataloader.dataset import DatasetLoader
+from lmsrvlabbook.dataloader.labbook import LabBookLoader
+from gtmcore.activity import ActivityStore, ActivityDetailRecord, ActivityDetailType
+from gtmcore.activity.utils import ImmutableList, TextData
+from gtmcore.inventory.inventory import InventoryManager
+
+
+class TestDataloaderActivity(object):
+
+    def test_load_many(self, fixture_working_dir):
+        """Test loading detail records from several repositories in one batch"""
+        im = InventoryManager()
+        lb = im.create_labbook("default", "default", "labbook1", description="my first labbook1")
+        ds = im.create_dataset("default", "default", "dataset1", storage_type="gigantum_object_v1",
+                               description="a dataset")
+
+        lb_store = ActivityStore(lb)
+        lb_records = [lb_store.put_detail_record(ActivityDetailRecord(ActivityDetailType.CODE, show=True, importance=i,
+                                                                      data=TextData('plain', f'labbook {i}')))
+                      for i in range(2)]
+        ds_store = ActivityStore(ds)
+        ds_record = ds_store.put_detail_record(ActivityDetailRecord(ActivityDetailType.DATASET, show=False,
+                                                                    importance=200,
+                                                                    data=TextData('plain', 'dataset')))
+
+        loader = ActivityDetailLoader(LabBookLoader(), DatasetLoader())
+        keys = [f"labbook&default&default&labbook1&{lb_records[1].key}",
+                f"dataset&default&default&dataset1&{ds_record.key}",
+                f"labbook&default&default&labbook1&{lb_records[0].key}"]
+        promise1 = loader.load_many(keys)
+        assert isinstance(promise1, Promise)
+
+        records = promise1.get()
+        assert [r.key for r in records] == [lb_records[1].key, ds_record.key, lb_records[0].key]
+        assert records[0].data == {'text/plain': 'labbook 1'}
+        assert records[1].importance == 200
+        assert records[1].show is False
+        assert records[2].data == {'text/plain': 'labbook 0'}
+
+    def test_load_metadata(self, fixture_working_dir):
+        """Test loading only the metadata of detail records, alongside a full record"""
+        im = InventoryManager()
+        lb = im.create_labbook("default", "default", "labbook1", description="my first labbook1")
+
+        store = ActivityStore(lb)
+        record = store.put_detail_record(ActivityDetailRecord(ActivityDetailType.CODE, show=True, importance=10,
+                                                              tags=ImmutableList(['tag1']),
+                                                              data=TextData('plain', 'some code')))
+
+        loader = ActivityDetailLoader(LabBookLoader(), DatasetLoader())
+        keys = [f"labbook&default&default&labbook1&{record.key}&metadata",
+                f"labbook&default&default&labbook1&{record.key}"]
+        metadata, full = loader.load_many(keys).get()
+        assert metadata.key == full.key == record.key
+        assert metadata.tags == full.tags == ['tag1']
+        assert metadata.is_loaded is False
+        assert full.data == {'text/plain': 'some code'}
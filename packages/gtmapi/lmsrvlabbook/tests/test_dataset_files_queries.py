@@ -86,7 +86,7 @@ class TestDatasetFilesQueries(object):
                          id
                          name
                          description
-                         allFiles(first: 1, after: "MQ==") {
+                         allFiles(first: 1, after: "b3RoZXJfZGlyL3Rlc3Q0LnR4dA==") {
                            edges{
                                node {
                                  key
@@ -114,7 +114,7 @@ class TestDatasetFilesQueries(object):
                          id
                          name
                          description
-                         allFiles(first: 100, after: "MQ==") {
+                         allFiles(first: 100, after: "b3RoZXJfZGlyL3Rlc3Q0LnR4dA==") {
                            edges{
                                node {
                                  key
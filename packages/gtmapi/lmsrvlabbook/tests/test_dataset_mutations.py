@@ -754,6 +754,28 @@ class TestDatasetMutations(object):
         assert "errors" not in result
         assert "rq:job" in result['data']['verifyDataset']['backgroundJobKey']
 
+        query = """
+                    mutation myMutation{
+                      verifyDataset(input: {datasetOwner: "default", datasetName: "adataset", mode: "sample",
+                                            confidence: 0.99}) {
+                          backgroundJobKey
+                      }
+                    }
+                """
+        result = fixture_working_dir_dataset_tests[2].execute(query)
+        assert "errors" not in result
+        assert "rq:job" in result['data']['verifyDataset']['backgroundJobKey']
+
+        query = """
+                    mutation myMutation{
+                      verifyDataset(input: {datasetOwner: "default", datasetName: "adataset", mode: "partial"}) {
+                          backgroundJobKey
+                      }
+                    }
+                """
+        result = fixture_working_dir_dataset_tests[2].execute(query)
+        assert "Unsupported verification mode" in result['errors'][0]['message']
+
     def test_update_dataset_link(self, fixture_working_dir, snapshot):
         im = InventoryManager()
         lb = im.create_labbook('default', 'default', 'test-lb', 'testing dataset links')
@@ -17,6 +17,7 @@ import rest_routes
 from lmsrvcore.utilities.migrate import migrate_work_dir_structure_v2
 from gtmcore.dispatcher import Dispatcher
 from gtmcore.dispatcher.jobs import update_environment_repositories
+from gtmcore.dispatcher.dataset_jobs import collect_dataset_file_caches
 from gtmcore.configuration import Configuration
 from gtmcore.logging import LMLogger
 from gtmcore.auth.identity import AuthenticationError, get_identity_manager_class
@@ -210,6 +211,12 @@ def post_save_hook(os_path, model, contents_manager, **kwargs):
     # Run job to update Base images in the background
     d.dispatch_task(update_environment_repositories, persist=True)
 
+    # Periodically garbage collect the dataset file caches
+    cache_gc_interval = config.config['datasets'].get('cache_gc_interval')
+    if cache_gc_interval:
+        d.schedule_task(collect_dataset_file_caches, repeat=None, interval=cache_gc_interval,
+                        job_id='collect_dataset_file_caches')
+
 
 # Set auth error handler
 @app.errorhandler(AuthenticationError)
@@ -2,11 +2,60 @@ import os
 import json
 import base64
 import hashlib
-from typing import Optional, Tuple
+import mmap
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
 from gtmcore.logging import LMLogger
 
 logger = LMLogger.get_logger()
 
+# Max number of rolled log files kept memory mapped by `ActivityDetailDB.get_many()`, across all repositories
+MAX_CACHED_LOG_MAPS = 32
+
+
+class _LogMapCache(object):
+    """Least recently used cache of read-only memory maps of rolled log files
+
+    Rolled log files are never written again, so a map stays valid for as long as the file's size, modification time
+    and inode are unchanged. These are checked on every lookup, so a log file that has been replaced (e.g. by a git
+    checkout) is mapped again.
+    """
+    def __init__(self, max_maps: int) -> None:
+        self.max_maps = max_maps
+        self._maps: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> mmap.mmap:
+        """Method to get a map of a file, mapping it if it is not cached or has changed
+
+        Args:
+            path: absolute path to the log file
+
+        Returns:
+            mmap.mmap
+        """
+        file_info = os.stat(path)
+        stat = (file_info.st_size, file_info.st_mtime_ns, file_info.st_ino)
+        with self._lock:
+            cached = self._maps.get(path)
+            if cached and cached[0] == stat:
+                self._maps.move_to_end(path)
+                return cached[1]
+
+            with open(path, 'rb') as fh:
+                log_map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            if cached:
+                # Readers holding the old map keep it alive until they are done
+                del self._maps[path]
+            self._maps[path] = (stat, log_map)
+            while len(self._maps) > self.max_maps:
+                self._maps.popitem(last=False)
+            return log_map
+
+
+_log_map_cache = _LogMapCache(MAX_CACHED_LOG_MAPS)
+
 
 class ActivityDetailDB(object):
     """Git-compliant file based representation of key values used to store Activity Detail Records
@@ -161,29 +210,32 @@ class ActivityDetailDB(object):
         else:
             return fp
         
-    def put(self, value: bytes) -> str:
+    def put(self, value: Union[bytes, List[bytes]]) -> str:
         """Put a value into the log file and return a key to access it
 
         Args:
-            value(bytes): Activity detail object serialized to bytes
+            value(bytes): Activity detail object serialized to bytes, or a list of bytes that are written one after the
+                          other as a single record
 
         Returns:
             detail_key(str): key used to access and identify the object
         """
-        if type(value) != bytes:
+        chunks = value if type(value) == list else [value]
+        if any(type(chunk) != bytes for chunk in chunks):
             raise ValueError("DetailDB record value must be of type `bytes`")
 
         fh = self._open_for_append_and_rotate()
         try:
             # get this file offset
             offset = fh.tell()
-            length = len(value)
+            length = sum(len(chunk) for chunk in chunks)
 
             detail_header = self._generate_detail_header(offset, length)
 
             # append the record to the active log
             fh.write(detail_header)
-            fh.write(value)
+            for chunk in chunks:
+                fh.write(chunk)
 
         finally:
             fh.close()
@@ -192,11 +244,12 @@ class ActivityDetailDB(object):
 
         return detail_key
 
-    def get(self, detail_key: str) -> bytes:
+    def get(self, detail_key: str, max_bytes: Optional[int] = None) -> bytes:
         """Return the detail record data.
 
         Args:
             detail_key: key used to lookup the file, offset, and length
+            max_bytes: Optional limit on the number of bytes to read from the start of the record
 
         Returns:
             bytes
@@ -209,11 +262,61 @@ class ActivityDetailDB(object):
 
         basename, detail_header = self._parse_detail_key(detail_key)
         file_number, offset, length = self._parse_detail_header(detail_header)
+        if max_bytes is not None:
+            length = min(length, max_bytes)
 
         with open(os.path.abspath(os.path.join(self.root_path, basename + '_' + str(file_number))), "br") as fh:
             fh.seek(offset)
             value = fh.read(length + 20)  # plus the header length
 
         return value[20:]
+
+    def get_many(self, detail_keys: List[str], max_bytes: Optional[int] = None) -> List[bytes]:
+        """Return the data for multiple detail records.
+
+        Keys are grouped by log file and read in offset order. Rolled log files are read through a cached memory map,
+        so loading many records does not open a file per record. The active log file of this checkout can still be
+        appended to, so it is mapped once per call instead of being cached.
+
+        Args:
+            detail_keys: keys used to lookup the file, offset, and length of each record
+            max_bytes: Optional limit on the number of bytes to read from the start of each record
+
+        Returns:
+            list of bytes, in the same order as `detail_keys`
+        """
+        records: Dict[str, List[Tuple[int, int, int]]] = dict()
+        for idx, detail_key in enumerate(detail_keys):
+            if not detail_key:
+                raise ValueError("A key must be provided to load a record from the DetailDB")
+
+            if type(detail_key) != str:
+                raise ValueError("DetailDB key must be of type `str`")
+
+            basename, detail_header = self._parse_detail_key(detail_key)
+            file_number, offset, length = self._parse_detail_header(detail_header)
+            if max_bytes is not None:
+                length = min(length, max_bytes)
+            records.setdefault(f"{basename}_{file_number}", list()).append((offset, length, idx))
+
+        active_log = f"{self.basename}_{self.file_number}" if records else None
+        result: List[bytes] = [b''] * len(detail_keys)
+        for log_name, entries in records.items():
+            log_path = os.path.abspath(os.path.join(self.root_path, log_name))
+            if log_name == active_log:
+                with open(log_path, 'rb') as fh:
+                    log_map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                log_map = _log_map_cache.get(log_path)
+
+            try:
+                for offset, length, idx in sorted(entries):
+                    # Skip the record header
+                    result[idx] = log_map[offset + 20:offset + 20 + length]
+            finally:
+                if log_name == active_log:
+                    log_map.close()
+
+        return result
     
 
@@ -0,0 +1,306 @@
+import datetime
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from git.exc import GitCommandError
+
+from gtmcore.activity.records import ActivityRecord, ActivityType
+from gtmcore.logging import LMLogger
+
+logger = LMLogger.get_logger()
+
+# Activity record commit messages follow a special structure
+NOTE_REGEX = re.compile(r"(?s)_GTM_ACTIVITY_START_.*?_GTM_ACTIVITY_END_")
+
+# Tuple of (log string, commit hash, commit datetime, username, email), the format used by ActivityStore
+LogRecord = Tuple[str, str, datetime.datetime, str, str]
+
+
+class ActivityIndex(object):
+    """Class to manage a persistent index of the activity records in a repository's git log
+
+    The index is a SQLite database in the repository's git directory, so it is never committed or synced. For each
+    branch it holds every activity record reachable from the commit the index was last updated at, in git log order,
+    along with the record's type, tags and log string (which includes the detail record keys). Records are appended as
+    they are created. If the branch has moved in any other way (e.g. a sync, merge, reset or checkout) new linear
+    history is appended from git, and anything else causes the branch's index to be rebuilt from the git log the next
+    time it is read.
+    """
+    def __init__(self, repository) -> None:
+        """Constructor
+
+        Args:
+            repository(gtmcore.inventory.repository.Repository): A Repository instance
+        """
+        self.repository = repository
+        self.index_file = os.path.join(repository.git.repo.git_dir, 'gigantum', 'activity_index.db')
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn:
+            return self._conn
+
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError as err:
+            # The index can always be rebuilt from the git log
+            logger.warning(f"Activity index {self.index_file} is invalid and will be reset: {err}")
+            os.remove(self.index_file)
+            self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        # Transactions are managed explicitly, see `_transaction()`
+        conn = sqlite3.connect(self.index_file, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS branch (ref TEXT PRIMARY KEY, head TEXT NOT NULL, "
+                     "next_position INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS record (ref TEXT NOT NULL, position INTEGER NOT NULL, "
+                     "commit_hash TEXT NOT NULL, committed_on TEXT NOT NULL, username TEXT, email TEXT, "
+                     "activity_type INTEGER NOT NULL, log_str TEXT NOT NULL, PRIMARY KEY (ref, position))")
+        conn.execute("CREATE INDEX IF NOT EXISTS record_commit ON record (ref, commit_hash)")
+        conn.execute("CREATE INDEX IF NOT EXISTS record_type ON record (ref, activity_type, position)")
+        conn.execute("CREATE TABLE IF NOT EXISTS tag (ref TEXT NOT NULL, position INTEGER NOT NULL, "
+                     "tag TEXT NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tag_position ON tag (ref, tag, position)")
+        return conn
+
+    def close(self) -> None:
+        """Method to close the database connection
+
+        Returns:
+            None
+        """
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Context manager for a write transaction, which takes the database write lock up front so concurrent
+        processes updating the same branch wait for each other instead of failing"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _current_head(self) -> Optional[Tuple[str, str]]:
+        """Method to get the branch (or HEAD if detached) and commit the index needs to reflect
+
+        Returns:
+            (ref, commit hash) tuple, or None if the repository has no commits
+        """
+        repo = self.repository.git.repo
+        try:
+            head = repo.head.commit.hexsha
+        except ValueError:
+            return None
+        ref = 'HEAD' if repo.head.is_detached else repo.active_branch.name
+        return ref, head
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, ref: str, position: int, commit: str, committed_on: datetime.datetime,
+                username: str, email: str, message: str) -> None:
+        """Method to add a commit to the index, if it is an activity record"""
+        m = NOTE_REGEX.match(message)
+        if not m:
+            return
+
+        log_str = m.group(0)
+        record = ActivityRecord.from_log_str(log_str, commit, committed_on)
+        conn.execute("INSERT INTO record (ref, position, commit_hash, committed_on, username, email, activity_type, "
+                     "log_str) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (ref, position, commit, committed_on.isoformat(), username, email, record.type.value, log_str))
+        if record.tags:
+            conn.executemany("INSERT INTO tag (ref, position, tag) VALUES (?, ?, ?)",
+                             [(ref, position, tag) for tag in set(record.tags)])
+
+    def _rebuild(self, ref: str, head: str) -> None:
+        """Method to replace the index of a branch by reading its entire git log"""
+        entries = self.repository.git.log(path_info=head)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM record WHERE ref = ?", (ref,))
+            conn.execute("DELETE FROM tag WHERE ref = ?", (ref,))
+            # The log is newest first, and positions increase with newer records
+            for position, entry in zip(range(len(entries), 0, -1), entries):
+                self._insert(conn, ref, position, entry['commit'], entry['committed_on'], entry['author']['name'],
+                             entry['author']['email'], entry['message'])
+            conn.execute("INSERT OR REPLACE INTO branch (ref, head, next_position) VALUES (?, ?, ?)",
+                         (ref, head, len(entries) + 1))
+
+    def _append_linear_history(self, ref: str, indexed_head: str, head: str) -> bool:
+        """Method to append the commits between the indexed commit and the current commit, if they are a linear
+        continuation of the indexed history. Anything else (merges, resets, rewritten history) could change the order
+        of the existing records in the git log, so isn't handled here.
+
+        Returns:
+            True if the index was updated
+        """
+        try:
+            commits = list(self.repository.git.repo.iter_commits(f"{indexed_head}..{head}"))
+        except GitCommandError:
+            # The indexed commit no longer exists
+            return False
+
+        expected = head
+        for c in commits:
+            if c.hexsha != expected or len(c.parents) != 1:
+                return False
+            expected = c.parents[0].hexsha
+        if expected != indexed_head:
+            return False
+
+        with self._transaction() as conn:
+            row = conn.execute("SELECT head, next_position FROM branch WHERE ref = ?", (ref,)).fetchone()
+            if row is None or row[0] != indexed_head:
+                # Updated by another process in the meantime
+                return row is not None and row[0] == head
+
+            position = row[1]
+            for c in reversed(commits):
+                self._insert(conn, ref, position, c.hexsha, c.committed_datetime, c.author.name, c.author.email,
+                             c.message)
+                position += 1
+            conn.execute("UPDATE branch SET head = ?, next_position = ? WHERE ref = ?", (head, position, ref))
+        return True
+
+    def _sync(self) -> Optional[str]:
+        """Method to bring the index of the current branch up to date with the git log
+
+        Returns:
+            the current branch, or None if the repository has no commits
+        """
+        current = self._current_head()
+        if current is None:
+            return None
+        ref, head = current
+
+        row = self._connect().execute("SELECT head FROM branch WHERE ref = ?", (ref,)).fetchone()
+        if row and row[0] == head:
+            return ref
+
+        if row is None or not self._append_linear_history(ref, row[0], head):
+            logger.info(f"Rebuilding activity index for {ref} in {self.repository.root_dir}")
+            self._rebuild(ref, head)
+        return ref
+
+    def add_commit(self, commit) -> None:
+        """Method to append a new commit to the index. Called with each activity record commit, so the index stays up to
+        date without reading the git log. If the commit does not directly follow the indexed history, the index is left
+        to update the next time it is read.
+
+        Args:
+            commit(git.Commit): The commit that was just created
+
+        Returns:
+            None
+        """
+        current = self._current_head()
+        if current is None or current[1] != commit.hexsha or len(commit.parents) != 1:
+            return
+        ref = current[0]
+
+        with self._transaction() as conn:
+            row = conn.execute("SELECT head, next_position FROM branch WHERE ref = ?", (ref,)).fetchone()
+            if row is None or row[0] != commit.parents[0].hexsha:
+                return
+
+            self._insert(conn, ref, row[1], commit.hexsha, commit.committed_datetime, commit.author.name,
+                         commit.author.email, commit.message)
+            conn.execute("UPDATE branch SET head = ?, next_position = ? WHERE ref = ?",
+                         (commit.hexsha, row[1] + 1, ref))
+
+    @staticmethod
+    def _filter_clause(ref: str, activity_type: Optional[ActivityType], tag: Optional[str]) -> Tuple[str, list]:
+        clause = ""
+        params: list = list()
+        if activity_type is not None:
+            clause = f"{clause} AND activity_type = ?"
+            params.append(activity_type.value)
+        if tag is not None:
+            clause = f"{clause} AND position IN (SELECT position FROM tag WHERE ref = ? AND tag = ?)"
+            params.extend([ref, tag])
+        return clause, params
+
+    def log_records(self, after: Optional[str] = None, first: Optional[int] = None,
+                    activity_type: Optional[ActivityType] = None,
+                    tag: Optional[str] = None) -> Optional[List[LogRecord]]:
+        """Method to get a page of activity records for the current branch, newest first
+
+        Args:
+            after: Optional commit hash of the activity record to page after. It is not included in the result
+            first: Optional number of records to get
+            activity_type: Optional type of record to filter on
+            tag: Optional tag to filter on
+
+        Returns:
+            list of (log string, commit hash, commit datetime, username, email) tuples, or None if `after` is not an
+            activity record in the current branch
+        """
+        ref = self._sync()
+        if ref is None:
+            return None if after else list()
+
+        conn = self._connect()
+        position_clause = ""
+        params: list = [ref]
+        if after:
+            row = conn.execute("SELECT position FROM record WHERE ref = ? AND commit_hash = ?",
+                               (ref, after)).fetchone()
+            if row is None:
+                return None
+            position_clause = " AND position < ?"
+            params.append(row[0])
+
+        filter_clause, filter_params = self._filter_clause(ref, activity_type, tag)
+        params.extend(filter_params)
+        params.append(first if first is not None else -1)
+
+        rows = conn.execute(f"SELECT log_str, commit_hash, committed_on, username, email FROM record "
+                            f"WHERE ref = ?{position_clause}{filter_clause} ORDER BY position DESC LIMIT ?",
+                            params).fetchall()
+        return [(r[0], r[1], datetime.datetime.fromisoformat(r[2]), r[3], r[4]) for r in rows]
+
+    def log_record(self, commit: str) -> Optional[LogRecord]:
+        """Method to get a single activity record from the current branch
+
+        Args:
+            commit: Commit hash of the activity record
+
+        Returns:
+            (log string, commit hash, commit datetime, username, email) tuple, or None if not in the current branch
+        """
+        ref = self._sync()
+        if ref is None:
+            return None
+
+        r = self._connect().execute("SELECT log_str, commit_hash, committed_on, username, email FROM record "
+                                    "WHERE ref = ? AND commit_hash = ?", (ref, commit)).fetchone()
+        return (r[0], r[1], datetime.datetime.fromisoformat(r[2]), r[3], r[4]) if r else None
+
+    def count(self, activity_type: Optional[ActivityType] = None, tag: Optional[str] = None) -> int:
+        """Method to count the activity records in the current branch
+
+        Args:
+            activity_type: Optional type of record to filter on
+            tag: Optional tag to filter on
+
+        Returns:
+            int
+        """
+        ref = self._sync()
+        if ref is None:
+            return 0
+
+        filter_clause, filter_params = self._filter_clause(ref, activity_type, tag)
+        params = [ref] + filter_params
+        return self._connect().execute(f"SELECT COUNT(*) FROM record WHERE ref = ?{filter_clause}",
+                                       params).fetchone()[0]
@@ -5,6 +5,7 @@ import redis
 
 from gtmcore.activity import ActivityRecord, ActivityStore, ActivityType
 from gtmcore.activity.processors.processor import ActivityProcessor, ExecutionData
+from gtmcore.activity.serializers.image import NORMALIZED_IMAGE_TYPES, image_pipeline
 from gtmcore.container import container_for_context
 from gtmcore.inventory.inventory  import InventoryManager
 from gtmcore.gitlib.git import GitAuthor
@@ -102,6 +103,22 @@ class ActivityMonitor(metaclass=abc.ABCMeta):
 
         return record
 
+    @staticmethod
+    def start_image_processing(result_data: Dict[str, Any]) -> None:
+        """Method to start normalizing the images in a result in the background, as soon as the result is received,
+        so they are ready when the activity record is stored. This blocks if too many images are already waiting to be
+        processed.
+
+        Args:
+            result_data(dict): A dictionary of MIME types to the data of a result
+
+        Returns:
+            None
+        """
+        for mime_type in result_data:
+            if mime_type in NORMALIZED_IMAGE_TYPES:
+                image_pipeline.submit(result_data[mime_type])
+
     def process(self, activity_type: ActivityType, data: List[ExecutionData],
                 metadata: Dict[str, Any]) -> ActivityRecord:
         """Method to update the result ActivityRecord object based on code and result data
@@ -230,6 +230,7 @@ class JupyterLabNotebookMonitor(ActivityMonitor):
                                                                               msg['content']['execution_count']))
 
             self.current_cell.result.append({'data': msg['content']['data'], 'metadata': msg['content']['metadata']})
+            self.start_image_processing(msg['content']['data'])
 
         elif msg['msg_type'] == 'stream':
             # A message containing plaintext output of a cell execution has been received
@@ -239,6 +240,7 @@ class JupyterLabNotebookMonitor(ActivityMonitor):
         elif msg['msg_type'] == 'display_data':
             # A message containing rich output of a cell execution has been received
             self.current_cell.result.append({'data': msg['content']['data'], 'metadata': {'source': 'display_data'}})
+            self.start_image_processing(msg['content']['data'])
 
         elif msg['msg_type'] == 'error':
             # An error occurred, so don't save this cell by resetting the current cell attribute.
@@ -501,6 +501,7 @@ class RStudioServerMonitor(ActivityMonitor):
                 logger.error(f'RStudioServerMonitor found graphic from rogue execution context for {doc_name}.')
 
             self.active_execution.result.append({'data': {'image/png': exchange.response}})
+            self.start_image_processing({'image/png': exchange.response})
         elif exchange.path.startswith("/graphics/"):
             # This is from a script/console execution and looks like this (pretty sure a UUID):
             # /graphics/ce4c938e-15f3-4da8-b193-0e3bdae0cf7d.png
@@ -513,6 +514,7 @@ class RStudioServerMonitor(ActivityMonitor):
                 # Again, we don't let graphics override the document context...
                 logger.error(f'found graphic from console during chunk execution')
             self.active_execution.result.append({'data': {'image/png': exchange.response}})
+            self.start_image_processing({'image/png': exchange.response})
         else:
             logger.error(f'Got image from unknown path {exchange.path}')
 
@@ -3,6 +3,7 @@ from typing import (Any, Dict, List)
 
 from gtmcore.logging import LMLogger
 from gtmcore.activity.processors.processor import ActivityProcessor, ExecutionData
+from gtmcore.activity.serializers.image import image_content_hash
 from gtmcore.activity import ActivityRecord, ActivityDetailType, ActivityDetailRecord, ActivityAction
 from gtmcore.activity.utils import ImmutableDict, ImmutableList, TextData
 
@@ -165,12 +166,18 @@ class JupyterLabImageExtractorProcessor(ActivityProcessor):
 
         # If a supported image exists in the result, grab it and create a detail record
         result_cnt = 0
+        image_hashes = set()
         for cell in data:
             for result_entry in reversed(cell.result):
                 if 'data' in result_entry:
                     for mime_type in result_entry['data']:
                         if mime_type in supported_image_types:
-                            # You got an image
+                            # You got an image. Only the first copy of an image displayed more than once is kept
+                            image_hash = image_content_hash(result_entry['data'][mime_type])
+                            if image_hash in image_hashes:
+                                continue
+                            image_hashes.add(image_hash)
+
                             adr_img = ActivityDetailRecord(ActivityDetailType.RESULT,
                                                            show=True,
                                                            action=ActivityAction.CREATE,
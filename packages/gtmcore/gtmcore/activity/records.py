@@ -1,12 +1,13 @@
 import json
 from contextlib import contextmanager
 from enum import Enum
-from typing import (Any, List, Tuple, Optional, Dict, overload)
+from typing import (Any, List, Tuple, Optional, Dict, Union, overload)
 import base64
 import blosc
 import copy
 import operator
 import datetime
+import struct
 from dataclasses import field, dataclass
 
 from gtmcore.activity.utils import ImmutableDict, ImmutableList, SortedImmutableList, DetailRecordList
@@ -69,6 +70,15 @@ class ActivityAction(Enum):
     EXECUTE = 4
 
 
+# Binary detail record format. A fixed header holds the format version, detail type, action, show flag, importance,
+# length of the tags section and number of data sections. It is followed by the tags as a UTF-8 JSON list, and then each
+# data section: the length of the MIME type and of the payload, the MIME type, and the serialized (and optionally
+# compressed) payload
+DETAIL_RECORD_VERSION = 1
+DETAIL_RECORD_HEADER = struct.Struct('<BBBBiIH')
+DETAIL_SECTION_HEADER = struct.Struct('<HQ')
+
+
 class ActivityDetailRecordEncoder(json.JSONEncoder):
     """Custom JSON encoder to encoded binary data as base64 when serializing to json"""
     def default(self, obj):
@@ -263,7 +273,8 @@ class ActivityDetailRecord(object):
         return json.dumps(dict_data, cls=ActivityDetailRecordEncoder, separators=(',', ':')).encode('utf-8')
 
     @staticmethod
-    def from_bytes(byte_array: bytes, decompress: bool=True, key: Optional[str] = None) -> 'ActivityDetailRecord':
+    def from_bytes(byte_array: bytes, decompress: bool=True, key: Optional[str] = None,
+                   load_data: bool=True) -> 'ActivityDetailRecord':
         """Method to create ActivityDetailRecord from byte array (typically stored in the detail db)
 
         Returns:
@@ -272,6 +283,8 @@ class ActivityDetailRecord(object):
         serializer_obj = Serializer()
 
         obj_dict = json.loads(byte_array.decode('utf-8'))
+        if not load_data:
+            obj_dict['d'] = dict()
 
         # Base64 decode detail data
         for mime_type in obj_dict['d']:
@@ -298,6 +311,97 @@ class ActivityDetailRecord(object):
 
         return new_instance
 
+    def to_binary(self, compress: bool=True) -> List[bytes]:
+        """Method to serialize to the binary format for storage in the activity detail db
+
+        Payloads are stored as raw bytes rather than base64 encoded in JSON, and are returned as separate chunks so
+        they can be written out without being copied into a single buffer.
+
+        Args:
+            compress(bool): Flag indicating if the data should be compressed
+
+        Returns:
+            list of bytes, which concatenated are the serialized record
+        """
+        tags = json.dumps(list(self.tags), separators=(',', ':')).encode('utf-8')
+        chunks = [DETAIL_RECORD_HEADER.pack(DETAIL_RECORD_VERSION, self.type.value, self.action.value, int(self.show),
+                                            self.importance, len(tags), len(self.data)), tags]
+
+        serializer_obj = Serializer()
+        for mime_type in self.data:
+            payload = serializer_obj.serialize(mime_type, self.data[mime_type])
+            if compress:
+                payload = blosc.compress(payload, typesize=8, cname='blosclz', shuffle=blosc.SHUFFLE)
+
+            mime_bytes = mime_type.encode('utf-8')
+            chunks.extend([DETAIL_SECTION_HEADER.pack(len(mime_bytes), len(payload)), mime_bytes, payload])
+
+        return chunks
+
+    @staticmethod
+    def binary_metadata_size(buffer: Union[bytes, memoryview]) -> Optional[int]:
+        """Method to get the number of bytes at the start of a binary record needed to load its metadata (everything
+        but the data)
+
+        Args:
+            buffer(bytes): The start of the serialized record
+
+        Returns:
+            number of bytes, or None if the buffer is too short to tell
+        """
+        if len(buffer) < DETAIL_RECORD_HEADER.size:
+            return None
+        tags_length = DETAIL_RECORD_HEADER.unpack_from(buffer)[5]
+        return DETAIL_RECORD_HEADER.size + tags_length
+
+    @staticmethod
+    def from_binary(buffer: Union[bytes, memoryview], decompress: bool=True, key: Optional[str] = None,
+                    load_data: bool=True) -> 'ActivityDetailRecord':
+        """Method to create ActivityDetailRecord from a record in the binary format
+
+        Args:
+            buffer(bytes): The serialized record. If `load_data` is False, only the metadata is required
+            decompress(bool): Flag indicating if the data is compressed
+            key(str): Key of the record in the activity detail db
+            load_data(bool): Flag indicating if the data should be loaded. If False, the payloads are not read
+
+        Returns:
+            ActivityDetailRecord
+        """
+        view = memoryview(buffer)
+        version, type_value, action_value, show, importance, tags_length, num_sections = \
+            DETAIL_RECORD_HEADER.unpack_from(view)
+        if version != DETAIL_RECORD_VERSION:
+            raise ValueError(f"Unsupported activity detail record version: {version}")
+
+        offset = DETAIL_RECORD_HEADER.size
+        tags = json.loads(bytes(view[offset:offset + tags_length]).decode('utf-8'))
+        offset += tags_length
+
+        data = dict()
+        if load_data:
+            serializer_obj = Serializer()
+            for _ in range(num_sections):
+                mime_length, payload_length = DETAIL_SECTION_HEADER.unpack_from(view, offset)
+                offset += DETAIL_SECTION_HEADER.size
+                mime_type = bytes(view[offset:offset + mime_length]).decode('utf-8')
+                offset += mime_length
+                payload = view[offset:offset + payload_length]
+                offset += payload_length
+
+                if len(payload) != payload_length:
+                    raise ValueError("Activity detail record is truncated")
+                data[mime_type] = serializer_obj.deserialize(mime_type, blosc.decompress(payload) if decompress
+                                                             else payload.tobytes())
+
+        return ActivityDetailRecord(detail_type=ActivityDetailType(type_value),
+                                    key=key,
+                                    show=bool(show),
+                                    importance=importance,
+                                    tags=ImmutableList(tags),
+                                    action=ActivityAction(action_value),
+                                    data=ImmutableDict(data))
+
     def to_json(self) -> str:
         """Method to convert to a single dictionary of data, that will serialize to JSON
 
@@ -1,14 +1,153 @@
 from gtmcore.activity.serializers.mime import MimeSerializer
-from typing import Any
+from typing import Any, Optional
 import base64
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from hashlib import blake2b
 from PIL import Image
 import io
 
+# Image types that are normalized (resized and re-encoded as JPEG) before they are stored
+NORMALIZED_IMAGE_TYPES = ['image/png', 'image/jpg', 'image/jpeg', 'image/bmp']
+
+
+def image_content_hash(data: Any) -> str:
+    """Function to compute the hash used to identify identical images
+
+    Args:
+        data: base64 encoded image, as a str or bytes
+
+    Returns:
+        str
+    """
+    return blake2b(data.encode('utf-8') if isinstance(data, str) else data, digest_size=20).hexdigest()
+
+
+def normalize_image(data: Any) -> bytes:
+    """Function to decode a base64 encoded image, shrink it to fit in 1024x1024, and encode it as a JPEG
+
+    Args:
+        data: base64 encoded image, as a str or bytes
+
+    Returns:
+        bytes
+    """
+    # b64decode accepts bytes or an ascii string
+    data_bytes = base64.b64decode(data)
+
+    # Load into image
+    image_obj = Image.open(io.BytesIO(data_bytes))
+
+    # Resize if needed
+    image_obj.thumbnail((1024, 1024))
+
+    image_bytes = io.BytesIO()
+    if image_obj.mode == "RGBA":
+        # Discard alpha if needed (convert("RGB") as used below would not work properly)
+        image_obj.load()
+
+        rgb_img = Image.new("RGB", image_obj.size, (255, 255, 255))
+        rgb_img.paste(image_obj, mask=image_obj.split()[3])
+
+        # Serialize to bytes, encoded as jpeg
+        rgb_img.save(image_bytes, format='JPEG', quality=90, optimize=True)
+    elif image_obj.mode != "RGB":
+        #
+        # Might not always work, but we try
+        image_obj.convert("RGB").save(image_bytes, format="JPEG", quality=90, optimize=True)
+    else:
+        # Serialize to bytes, encoded as jpeg
+        image_obj.save(image_bytes, format='JPEG', quality=90, optimize=True)
+
+    return image_bytes.getvalue()
+
+
+class ImagePipeline(object):
+    """Class to normalize images in a bounded pool of worker threads
+
+    Activity monitors submit images as soon as they arrive from the kernel, so they are encoded while the monitor keeps
+    consuming messages, and the serializer only waits on images that are still being encoded when the record is stored.
+    Submitting blocks while `max_pending` images are already queued or being encoded, so a burst of figures slows the
+    monitor down instead of growing the queue without limit. Results are kept by content hash, so an identical image is
+    only encoded once.
+    """
+    def __init__(self, num_workers: int, max_pending: int, max_results: int) -> None:
+        self.num_workers = num_workers
+        self.max_pending = max_pending
+        self.max_results = max_results
+
+        self._pid: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._results: OrderedDict = OrderedDict()
+
+    def _reset_after_fork(self) -> None:
+        """Method to start from scratch in a forked process, since the worker threads are not copied. Must hold the
+        lock when calling."""
+        self._pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._results = OrderedDict()
+
+    def submit(self, data: Any) -> Future:
+        """Method to start normalizing an image in the background
+
+        Args:
+            data: base64 encoded image, as a str or bytes
+
+        Returns:
+            Future for the normalized image bytes
+        """
+        key = image_content_hash(data)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+
+            future = self._results.get(key)
+            if future:
+                self._results.move_to_end(key)
+                return future
+            slots = self._slots
+
+        # Back-pressure: wait for a worker to finish if too many images are pending
+        slots.acquire()
+        with self._lock:
+            future = self._results.get(key)
+            if future:
+                # Submitted by another thread while waiting
+                slots.release()
+                return future
+
+            future = self._executor.submit(normalize_image, data)  # type: ignore
+            future.add_done_callback(lambda _: slots.release())
+            self._results[key] = future
+            while len(self._results) > self.max_results:
+                # Anything still holding an evicted future can wait on it as usual
+                self._results.popitem(last=False)
+            return future
+
+    def normalize(self, data: Any) -> bytes:
+        """Method to get a normalized image, waiting for it to be encoded if needed
+
+        Args:
+            data: base64 encoded image, as a str or bytes
+
+        Returns:
+            bytes
+        """
+        return self.submit(data).result()
+
+
+image_pipeline = ImagePipeline(num_workers=min(4, os.cpu_count() or 1), max_pending=16, max_results=64)
+
 
 class Base64ImageSerializer(MimeSerializer):
     """Class for serializing base64 encoded images"""
     def __init__(self, mime_type):
-        if mime_type in ['image/png', 'image/jpg', 'image/jpeg', 'image/bmp']:
+        if mime_type in NORMALIZED_IMAGE_TYPES:
             self.mime_type = mime_type
         else:
             raise ValueError(f"Unsupported mime type: {mime_type}")
@@ -22,34 +161,8 @@ class Base64ImageSerializer(MimeSerializer):
             return f"data:image/jpeg;base64,{data}"
 
     def serialize(self, data: Any) -> bytes:
-        # b64decode accepts bytes or an ascii string
-        data_bytes = base64.b64decode(data)
-
-        # Load into image
-        image_obj = Image.open(io.BytesIO(data_bytes))
-
-        # Resize if needed
-        image_obj.thumbnail((1024, 1024))
-
-        image_bytes = io.BytesIO()
-        if image_obj.mode == "RGBA":
-            # Discard alpha if needed (convert("RGB") as used below would not work properly)
-            image_obj.load()
-
-            rgb_img = Image.new("RGB", image_obj.size, (255, 255, 255))
-            rgb_img.paste(image_obj, mask=image_obj.split()[3])
-
-            # Serialize to bytes, encoded as jpeg
-            rgb_img.save(image_bytes, format='JPEG', quality=90, optimize=True)
-        elif image_obj.mode != "RGB":
-            #
-            # Might not always work, but we try
-            image_obj.convert("RGB").save(image_bytes, format="JPEG", quality=90, optimize=True)
-        else:
-            # Serialize to bytes, encoded as jpeg
-            image_obj.save(image_bytes, format='JPEG', quality=90, optimize=True)
-
-        return image_bytes.getvalue()
+        # Images are normalized in the image pipeline, which has usually already been given this image by the monitor
+        return image_pipeline.normalize(data)
 
     def deserialize(self, data: bytes) -> str:
         # Decode the bytes from store to base64 encoded image string
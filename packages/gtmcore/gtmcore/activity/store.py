@@ -1,15 +1,20 @@
-import re
 import uuid
 import datetime
-from typing import (Any, Dict, List, Tuple, Optional)
+import sqlite3
+from typing import (Any, Dict, List, Tuple, Optional, cast)
 
 from gtmcore.activity.detaildb import ActivityDetailDB
-from gtmcore.activity.records import ActivityDetailRecord, ActivityRecord
+from gtmcore.activity.index import ActivityIndex, NOTE_REGEX
+from gtmcore.activity.records import ActivityDetailRecord, ActivityRecord, ActivityType
 from gtmcore.activity.utils import DetailRecordList
 from gtmcore.logging import LMLogger
 
 logger = LMLogger.get_logger()
 
+# Number of bytes read from the start of each detail record when only its metadata is being loaded. Enough for the
+# metadata of all but records with very long lists of tags, which are read in full
+DETAIL_METADATA_READ_SIZE = 1024
+
 
 class ActivityStore(object):
     """The ActivityStore class provides a centralized interface to activity data stored in both the git log and db.
@@ -19,6 +24,9 @@ class ActivityStore(object):
 
     The ActivityStore class stores ActivityRecords in the git log and ActivityDetailRecords in the database after
     proper serialization. The linked commit indiciate which git record the ActivityRecord is annotating
+
+    ActivityRecords are read through an ActivityIndex of the git log, falling back to reading the git log directly if
+    the index can't be used.
     """
 
     def __init__(self, repository) -> None:
@@ -36,8 +44,10 @@ class ActivityStore(object):
         self.detaildb = ActivityDetailDB(repository.root_dir, repository.checkout_id,
                                          logfile_limit=repository.client_config.config['detaildb']['logfile_limit'])
 
+        self.index = ActivityIndex(repository)
+
         # Note record commit messages follow a special structure
-        self.note_regex = re.compile(r"(?s)_GTM_ACTIVITY_START_.*?_GTM_ACTIVITY_END_")
+        self.note_regex = NOTE_REGEX
 
         # Params used during detail object serialization
         if self.repository.client_config.config['detaildb']['options']['compress']:
@@ -47,6 +57,10 @@ class ActivityStore(object):
             self.compress_details = False
             self.compress_min_bytes = 0
 
+        # Write detail records in the binary format. Records in the JSON format are always readable, but older clients
+        # can't read binary records, so this is opt-in
+        self.binary_details: bool = self.repository.client_config.config['detaildb']['options'].get('binary', False)
+
     def _validate_tags(self, tags: List[str]) -> List[str]:
         """Method to clean and validate tags
 
@@ -174,6 +188,11 @@ class ActivityStore(object):
         # Commit changes and update record
         commit = self.repository.git.commit(record.log_str)
 
+        try:
+            self.index.add_commit(commit)
+        except sqlite3.Error as err:
+            logger.warning(f"Failed to add ActivityRecord {commit.hexsha} to the activity index: {err}")
+
         record = record.update(
             # Commit changes and update record
             commit=commit.hexsha,
@@ -195,6 +214,15 @@ class ActivityStore(object):
         Returns:
             ActivityRecord
         """
+        try:
+            log_record = self.index.log_record(commit)
+        except sqlite3.Error as err:
+            logger.warning(f"Failed to read the activity index, reading the git log instead: {err}")
+            log_record = None
+        if log_record:
+            return ActivityRecord.from_log_str(log_record[0], log_record[1], log_record[2],
+                                               username=log_record[3], email=log_record[4])
+
         entry = self.repository.git.log_entry(commit)
         m = self.note_regex.match(entry["message"])
         if m:
@@ -204,41 +232,91 @@ class ActivityStore(object):
         else:
             raise ValueError("Activity data not found in commit {}".format(commit))
 
-    def get_activity_records(self, after: Optional[str]=None,
-                             first: Optional[int]=None) -> List[Optional[ActivityRecord]]:
+    def get_activity_records(self, after: Optional[str]=None, first: Optional[int]=None,
+                             activity_type: Optional[ActivityType]=None,
+                             tag: Optional[str]=None) -> List[Optional[ActivityRecord]]:
         """Method to get a list of activity records, with forward paging supported
 
         Args:
             after(str): Commit hash to page after
             first(int): Number of records to get
+            activity_type(ActivityType): Optional type of record to filter on
+            tag(str): Optional tag to filter on
 
         Returns:
             List[ActivityRecord]
         """
-        # Get data from the git log
-        log_data = self._get_log_records(after=after, first=first)
+        if first is not None and first < 1:
+            raise ValueError("`first` must be greater than or equal to 1, or None")
+
+        try:
+            log_data = self.index.log_records(after=after, first=first, activity_type=activity_type, tag=tag)
+        except sqlite3.Error as err:
+            logger.warning(f"Failed to read the activity index, reading the git log instead: {err}")
+            log_data = None
+
+        if log_data is None:
+            log_data = self._get_git_log_records(after=after, first=first, activity_type=activity_type, tag=tag)
+
+        return [ActivityRecord.from_log_str(x[0], x[1], x[2], username=x[3], email=x[4]) for x in log_data]
+
+    def _get_git_log_records(self, after: Optional[str]=None, first: Optional[int]=None,
+                             activity_type: Optional[ActivityType]=None,
+                             tag: Optional[str]=None) -> List[Tuple[str, str, datetime.datetime, str, str]]:
+        """Method to get a page of ACTIVITY records by reading the git log, when the activity index can't be used
+
+        Returns:
+            list: List of tuples of the format (log string, commit hash, commit datetime, username, email)
+        """
+        filtered = activity_type is not None or tag is not None
+
+        # Filtering needs every record to be read
+        log_data = self._get_log_records(after=after, first=None if filtered else first)
         if log_data:
             if after:
                 # If the "after" record is included. Remove it due to standards on how relay paging works
                 log_data = log_data[1:]
 
+            if filtered:
+                log_data = [x for x in log_data if self._matches_filter(x[0], activity_type, tag)]
+
             # If first value provided, check for the right amount of data
             if first:
                 if len(log_data) > first:
                     # Need to prune due to padding sent into self._get_log_records()
                     log_data = log_data[:first]
 
-        if log_data:
-            return [ActivityRecord.from_log_str(x[0], x[1], x[2], username=x[3], email=x[4]) for x in log_data]
-        else:
-            return []
+        return log_data
+
+    @staticmethod
+    def _matches_filter(log_str: str, activity_type: Optional[ActivityType], tag: Optional[str]) -> bool:
+        record = ActivityRecord.from_log_str(log_str, "", datetime.datetime.now())
+        if activity_type is not None and record.type != activity_type:
+            return False
+        return tag is None or tag in record.tags
+
+    def count_activity_records(self, activity_type: Optional[ActivityType]=None, tag: Optional[str]=None) -> int:
+        """Method to count the activity records in the current branch
+
+        Args:
+            activity_type(ActivityType): Optional type of record to filter on
+            tag(str): Optional tag to filter on
+
+        Returns:
+            int
+        """
+        try:
+            return self.index.count(activity_type=activity_type, tag=tag)
+        except sqlite3.Error as err:
+            logger.warning(f"Failed to read the activity index, reading the git log instead: {err}")
+            return len([x for x in self._get_log_records() if self._matches_filter(x[0], activity_type, tag)])
 
-    def _encode_write_options(self, compress: bool = False) -> bytes:
+    def _encode_write_options(self, compress: bool = False, binary: bool = False) -> bytes:
         """Method to encode any options for writing details to a byte
 
         bit option
         0   compress/decompress data on storage
-        1   reserved
+        1   record is in the binary format instead of JSON
         2   reserved
         3   reserved
         4   reserved
@@ -249,7 +327,7 @@ class ActivityStore(object):
         Returns:
             bytes
         """
-        return compress.to_bytes(1, byteorder='little')
+        return (int(compress) | int(binary) << 1).to_bytes(1, byteorder='little')
 
     @staticmethod
     def _decode_write_options(option_byte: bytes) -> dict:
@@ -261,7 +339,7 @@ class ActivityStore(object):
         Returns:
             dict
         """
-        return {"compress": bool(option_byte[0])}
+        return {"compress": bool(option_byte[0] & 1), "binary": bool(option_byte[0] & 2)}
 
     def put_detail_record(self, detail_obj: ActivityDetailRecord) -> ActivityDetailRecord:
         """Method to write a detail record to the activity detail db
@@ -278,31 +356,75 @@ class ActivityStore(object):
             if detail_obj.data_size >= self.compress_min_bytes:
                 compress = True
 
-        bytes_record = detail_obj.to_bytes(compress)
-
-        # Write record and store key
-        key = self.detaildb.put(self._encode_write_options(compress=compress) + bytes_record)
+        options = self._encode_write_options(compress=compress, binary=self.binary_details)
+        if self.binary_details:
+            # Payload chunks are written as they are, without joining them into a single buffer
+            key = self.detaildb.put([options] + detail_obj.to_binary(compress))
+        else:
+            key = self.detaildb.put(options + detail_obj.to_bytes(compress))
 
         logger.debug(f"Successfully wrote ActivityDetailRecord {key}")
         return detail_obj.update(key = key)
 
-    def get_detail_record(self, detail_key: str) -> ActivityDetailRecord:
+    def _decode_detail_record(self, detail_key: str, detail_bytes: bytes, load_data: bool) -> ActivityDetailRecord:
+        """Method to create a detail record from the bytes stored in the activity detail db"""
+        # Remove header
+        options = self._decode_write_options(detail_bytes[:1])
+
+        # Create object
+        if options['binary']:
+            return ActivityDetailRecord.from_binary(memoryview(detail_bytes)[1:], decompress=options['compress'],
+                                                    key=detail_key, load_data=load_data)
+        else:
+            return ActivityDetailRecord.from_bytes(detail_bytes[1:], decompress=options['compress'], key=detail_key,
+                                                   load_data=load_data)
+
+    def get_detail_record(self, detail_key: str, load_data: bool = True) -> ActivityDetailRecord:
         """Method to fetch a detail entry from the activity detail db
 
             Args:
                 detail_key : the key returned from the activity detail DB when storing.
+                load_data : if False, only the record's metadata is loaded and its data is not read or decompressed
 
             Returns:
                  ActivityDetailRecord
         """
-        # Get value from key-value store
-        detail_bytes = self.detaildb.get(detail_key)
+        return self.get_detail_records([detail_key], load_data=load_data)[0]
 
-        # Remove header
-        options = self._decode_write_options(detail_bytes[:1])
+    def get_detail_records(self, detail_keys: List[str], load_data: bool = True) -> List[ActivityDetailRecord]:
+        """Method to fetch multiple detail entries from the activity detail db in a single batch
 
-        # Create object
-        record = ActivityDetailRecord.from_bytes(detail_bytes[1:],
-                                                 decompress=options['compress'],
-                                                 key=detail_key)
-        return record
+            Args:
+                detail_keys : the keys returned from the activity detail DB when storing.
+                load_data : if False, only the records' metadata is loaded and their data is not read or decompressed
+
+            Returns:
+                 list of ActivityDetailRecord, in the same order as `detail_keys`
+        """
+        if load_data:
+            return [self._decode_detail_record(detail_key, detail_bytes, load_data)
+                    for detail_key, detail_bytes in zip(detail_keys, self.detaildb.get_many(detail_keys))]
+
+        # Read just the start of each record. Binary records keep their metadata ahead of the data, but records in the
+        # JSON format (or with metadata that didn't fit) have to be read in full
+        records: List[Optional[ActivityDetailRecord]] = list()
+        full_read_keys = list()
+        for detail_key, detail_bytes in zip(detail_keys,
+                                            self.detaildb.get_many(detail_keys, max_bytes=DETAIL_METADATA_READ_SIZE)):
+            metadata_size = None
+            if self._decode_write_options(detail_bytes[:1])['binary']:
+                metadata_size = ActivityDetailRecord.binary_metadata_size(memoryview(detail_bytes)[1:])
+
+            if metadata_size is not None and metadata_size < len(detail_bytes):
+                records.append(self._decode_detail_record(detail_key, detail_bytes, load_data))
+            else:
+                records.append(None)
+                full_read_keys.append(detail_key)
+
+        if full_read_keys:
+            full_records = iter([self._decode_detail_record(detail_key, detail_bytes, load_data)
+                                 for detail_key, detail_bytes in zip(full_read_keys,
+                                                                     self.detaildb.get_many(full_read_keys))])
+            records = [r if r is not None else next(full_records) for r in records]
+
+        return cast(List[ActivityDetailRecord], records)
@@ -1,6 +1,7 @@
 import pytest
 import json
 from gtmcore.activity.records import ActivityDetailRecord, ActivityDetailType, ActivityAction
+from gtmcore.activity.utils import ImmutableList
 
 
 class TestActivityDetailRecord(object):
@@ -132,6 +133,38 @@ class TestActivityDetailRecord(object):
         assert adr2.tags == []
         assert adr2.data == {"text/plain": "this is some data"}
 
+    def test_to_binary_from_binary(self):
+        """Test converting to and from the binary format"""
+        adr = ActivityDetailRecord(ActivityDetailType.CODE_EXECUTED,
+                                   key="my_key3",
+                                   show=False,
+                                   importance=225,
+                                   action=ActivityAction.CREATE,
+                                   tags=ImmutableList(["tag1", "tag2"]),
+                                   data={"text/plain": "this is some data" * 100,
+                                         "text/markdown": "# this is some data"})
+
+        for compress in [False, True]:
+            byte_array = b"".join(adr.to_binary(compress=compress))
+            assert len(byte_array) < len(adr.to_bytes(compress=compress))
+
+            adr2 = ActivityDetailRecord.from_binary(byte_array, decompress=compress, key="my_key3")
+            assert adr2 == adr
+
+        # Only the metadata is needed to load a record without its data
+        metadata_size = ActivityDetailRecord.binary_metadata_size(byte_array)
+        assert ActivityDetailRecord.binary_metadata_size(byte_array[:10]) is None
+        adr3 = ActivityDetailRecord.from_binary(byte_array[:metadata_size], decompress=True, load_data=False)
+        assert adr3.type == ActivityDetailType.CODE_EXECUTED
+        assert adr3.action == ActivityAction.CREATE
+        assert adr3.show is False
+        assert adr3.importance == 225
+        assert adr3.tags == ["tag1", "tag2"]
+        assert adr3.is_loaded is False
+
+        with pytest.raises(ValueError):
+            ActivityDetailRecord.from_binary(byte_array[:-1], decompress=True)
+
     def test_compression(self):
         """Test compression on large objects"""
         adr = ActivityDetailRecord(ActivityDetailType.INPUT_DATA, key="my_ke3", show=True, importance=125)
@@ -84,6 +84,40 @@ class TestActivityStore:
 
         wo_decoded = store._decode_write_options(wo)
         assert wo_decoded['compress'] is False
+        assert wo_decoded['binary'] is False
+
+        wo = store._encode_write_options(compress=True, binary=True)
+        assert wo == b'\x03'
+
+        wo_decoded = store._decode_write_options(wo)
+        assert wo_decoded['compress'] is True
+        assert wo_decoded['binary'] is True
+
+    def test_get_detail_records_formats(self, mock_config_with_activitystore):
+        """Test loading detail records in the binary and JSON formats, with and without their data"""
+        store = mock_config_with_activitystore[0]
+        adr = ActivityDetailRecord(ActivityDetailType.RESULT, show=False, importance=10, action=ActivityAction.EXECUTE,
+                                   tags=ImmutableList(['tag1']), data={'text/plain': 'this is some data' * 1000})
+
+        assert store.binary_details is False
+        store.binary_details = True
+        binary_record = store.put_detail_record(adr)
+        store.binary_details = False
+        json_record = store.put_detail_record(adr)
+        long_tags_record = store.put_detail_record(adr.update(tags=ImmutableList([f'tag{i}' * 20 for i in range(20)])))
+
+        keys = [binary_record.key, json_record.key, long_tags_record.key]
+        loaded = store.get_detail_records(keys)
+        assert [r.data for r in loaded] == [adr.data] * 3
+
+        metadata = store.get_detail_records(keys, load_data=False)
+        assert [r.key for r in metadata] == keys
+        assert [r.is_loaded for r in metadata] == [False] * 3
+        assert [r.tags for r in metadata[:2]] == [['tag1'], ['tag1']]
+        assert len(metadata[2].tags) == 20
+        assert metadata[0].action == ActivityAction.EXECUTE
+        assert metadata[0].importance == 10
+        assert metadata[0].show is False
 
     def test_put_get_detail_record(self, mock_config_with_activitystore):
         """Test to test storing and retrieving data from the activity detail db"""
@@ -122,6 +156,19 @@ class TestActivityStore:
         assert adr2.is_loaded == adr2_loaded.is_loaded is True
         assert adr2.data == adr2_loaded.data
 
+    def test_get_detail_records(self, mock_config_with_activitystore):
+        """Test loading multiple detail records in a single batch"""
+        store = mock_config_with_activitystore[0]
+        records = [store.put_detail_record(ActivityDetailRecord(ActivityDetailType.CODE, show=True, importance=i,
+                                                                data={'text/plain': f'record {i}'}))
+                   for i in range(3)]
+
+        loaded = store.get_detail_records([records[2].key, records[0].key, records[1].key])
+        assert [r.key for r in loaded] == [records[2].key, records[0].key, records[1].key]
+        assert [r.importance for r in loaded] == [2, 0, 1]
+        assert loaded[0].data == {'text/plain': 'record 2'}
+        assert all(r.is_loaded for r in loaded)
+
     def test_put_get_detail_record_with_tags(self, mock_config_with_activitystore):
         """Test to test storing and retrieving data from the activity detail db"""
         # Create test values
@@ -563,6 +610,64 @@ class TestActivityStore:
         assert activity_records[0].linked_commit == record2.linked_commit
         assert activity_records[0].message == record2.message
 
+    def test_filter_and_count_activity_records(self, mock_config_with_activitystore):
+        """Method to test filtering and counting activity records through the activity index"""
+        store, lb = mock_config_with_activitystore
+        records = list()
+        for cnt in range(6):
+            linked_commit = helper_create_labbook_change(lb, cnt)
+            ar = ActivityRecord(ActivityType.CODE if cnt % 2 == 0 else ActivityType.INPUT_DATA,
+                                show=True,
+                                message=f"record {cnt}",
+                                importance=50,
+                                tags=ImmutableList(['even'] if cnt % 2 == 0 else ['odd']),
+                                linked_commit=linked_commit.hexsha)
+            records.append(store.create_activity_record(ar))
+
+        num_records = store.count_activity_records()
+        assert num_records == len(store.get_activity_records()) == len(store._get_git_log_records())
+        assert store.count_activity_records(tag='odd') == 3
+        assert store.count_activity_records(activity_type=ActivityType.CODE, tag='odd') == 0
+
+        activity_records = store.get_activity_records(tag='even', first=2)
+        assert [r.commit for r in activity_records] == [records[4].commit, records[2].commit]
+        activity_records = store.get_activity_records(tag='even', after=activity_records[-1].commit)
+        assert [r.commit for r in activity_records] == [records[0].commit]
+
+        activity_records = store.get_activity_records(activity_type=ActivityType.INPUT_DATA, after=records[5].commit)
+        assert [r.message for r in activity_records] == ["record 3", "record 1"]
+        assert [(r.commit, r.message, r.timestamp) for r in activity_records] == \
+               [(r[1], r[0].split("**\n")[1][4:], r[2])
+                for r in store._get_git_log_records(activity_type=ActivityType.INPUT_DATA, after=records[5].commit)]
+
+        with pytest.raises(ValueError):
+            store.get_activity_records(first=0)
+
+    def test_activity_index_follows_branch_changes(self, mock_config_with_activitystore):
+        """Method to test the activity index stays consistent with the git log when it is changed outside the store"""
+        store, lb = mock_config_with_activitystore
+        for cnt in range(3):
+            store.create_activity_record(ActivityRecord(ActivityType.CODE, show=True, message=f"record {cnt}",
+                                                        importance=50))
+        num_records = store.count_activity_records()
+
+        # Commits made without the store are picked up
+        other_store = ActivityStore(lb)
+        other_store.create_activity_record(ActivityRecord(ActivityType.CODE, show=True, message="other", importance=50))
+        helper_create_labbook_change(lb)
+        assert store.count_activity_records() == num_records + 1
+        assert store.get_activity_records(first=1)[0].message == "other"
+
+        # As are resets and branch changes
+        lb.git.repo.git.reset('--hard', 'HEAD~3')
+        assert store.count_activity_records() == num_records - 1
+        assert store.get_activity_records(first=1)[0].message == "record 1"
+
+        lb.git.repo.git.checkout('-b', 'test-branch', 'HEAD~1')
+        store.create_activity_record(ActivityRecord(ActivityType.CODE, show=True, message="branch", importance=50))
+        assert [r.message for r in store.get_activity_records(first=2)] == ["branch", "record 0"]
+        assert [r.commit for r in store.get_activity_records()] == [r[1] for r in store._get_git_log_records()]
+
     def test_malformed_detail_record(self, mock_config_with_activitystore):
         """Test for Issue #936 (prevent malformed detail record from borking activities)"""
         adr1 = ActivityDetailRecord(ActivityDetailType.CODE,
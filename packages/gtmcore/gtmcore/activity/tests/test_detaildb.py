@@ -142,6 +142,17 @@ class TestDetailDB(object):
         return_val = mock_config_with_detaildb[0].get(detail_key)
         assert return_val == my_val
 
+    def test_put_get_chunks(self, mock_config_with_detaildb):
+        """Test putting a record written in chunks and getting the start of it"""
+        detail_key = mock_config_with_detaildb[0].put([b'thisisa', b'streamof', b'stuff'])
+        assert mock_config_with_detaildb[0].get(detail_key) == b'thisisastreamofstuff'
+        assert mock_config_with_detaildb[0].get(detail_key, max_bytes=7) == b'thisisa'
+        assert mock_config_with_detaildb[0].get_many([detail_key], max_bytes=15) == [b'thisisastreamof']
+        assert mock_config_with_detaildb[0].get(detail_key, max_bytes=1000) == b'thisisastreamofstuff'
+
+        with pytest.raises(ValueError):
+            mock_config_with_detaildb[0].put([b'abyte', "astringvalue"])
+
     def test_put_get_errors(self, mock_config_with_detaildb):
         """Test putting and getting a record with validation errors"""
 
@@ -156,3 +167,26 @@ class TestDetailDB(object):
 
         with pytest.raises(ValueError):
             detail_key = mock_config_with_detaildb[0].get(b"abytekey")
+
+    def test_get_many(self, mock_labbook):
+        """Test getting many records across rolled and active log files"""
+        db = ActivityDetailDB(mock_labbook[2].root_dir, mock_labbook[2].checkout_id, logfile_limit=100)
+
+        values = [f"record {i}".encode() * 10 for i in range(6)]
+        keys = [db.put(v) for v in values]
+        assert db.file_number > 0
+
+        # Records come back in the order requested, regardless of file and offset
+        order = [4, 0, 5, 2, 1, 3, 0]
+        assert db.get_many([keys[i] for i in order]) == [values[i] for i in order]
+        assert db.get_many(keys) == [db.get(k) for k in keys]
+        assert db.get_many([]) == []
+
+        # The active log file is still read correctly after it has been appended to
+        values.append(b"another record")
+        keys.append(db.put(values[-1]))
+        assert db.get_many(keys) == values
+
+        with pytest.raises(ValueError):
+            db.get_many([keys[0], ""])
+
@@ -8,7 +8,8 @@ from gtmcore.activity.monitors.monitor_jupyterlab import JupyterLabNotebookMonit
     JupyterLabPlaintextProcessor, JupyterLabImageExtractorProcessor
 from gtmcore.activity.processors.core import ActivityShowBasicProcessor, GenericFileChangeProcessor, \
     ActivityDetailLimitProcessor, ActivityDetailProgressProcessor
-from gtmcore.activity import ActivityStore, ActivityType, ActivityDetailType
+from gtmcore.activity import ActivityStore, ActivityType, ActivityDetailType, ActivityRecord
+from gtmcore.activity.processors.processor import ExecutionData
 
 
 class TestJupyterLabNotebookMonitor(object):
@@ -812,3 +813,20 @@ class TestJupyterLabNotebookMonitor(object):
         assert record.detail_objects[4].show is False
         assert record.detail_objects[4].type.value == ActivityDetailType.CODE_EXECUTED.value
         assert record.detail_objects[4].importance == 254
+
+
+class TestJupyterLabImageExtractorProcessor(object):
+    def test_duplicate_images(self):
+        """Test that an image displayed more than once in a record is only stored once"""
+        example_png = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5/hPwAIAgL/4d1j8wAAAABJRU5ErkJggg=="
+        cell1 = ExecutionData()
+        cell1.result.append({'data': {'image/png': example_png}, 'metadata': {'source': 'display_data'}})
+        cell1.result.append({'data': {'image/png': example_png, 'text/plain': 'figure'}, 'metadata': {}})
+        cell2 = ExecutionData()
+        cell2.result.append({'data': {'image/gif': "R0lGODlhAQABAAAAACw="}, 'metadata': {}})
+        cell2.result.append({'data': {'image/png': example_png}, 'metadata': {}})
+
+        record = JupyterLabImageExtractorProcessor().process(ActivityRecord(ActivityType.CODE), [cell1, cell2], {},
+                                                             {'path': 'test.ipynb'})
+        assert record.num_detail_objects == 2
+        assert [list(d.data.keys()) for d in record.detail_objects] == [['image/png'], ['image/gif']]
@@ -1,8 +1,21 @@
 import pytest
+import base64
+import io
+import threading
+from PIL import Image
+
 from gtmcore.activity.serializers import Serializer
+from gtmcore.activity.serializers.image import ImagePipeline, normalize_image
 from gtmcore.activity.serializers.text import PlainSerializer
 
 
+def helper_create_png(size, color) -> str:
+    """Helper to create a base64 encoded png"""
+    image_bytes = io.BytesIO()
+    Image.new("RGBA", size, color).save(image_bytes, format='PNG')
+    return base64.b64encode(image_bytes.getvalue()).decode("utf-8")
+
+
 class TestSerializer(object):
 
     def test_constructor(self):
@@ -70,3 +83,42 @@ class TestSerializer(object):
 
         test_str_2 = s.jsonify('image/png', test_str)
         assert test_str_2 == f"data:image/jpeg;base64,{test_str}"
+
+    def test_image_pipeline(self):
+        """Test normalizing images in the image pipeline"""
+        pipeline = ImagePipeline(num_workers=2, max_pending=4, max_results=2)
+        image1 = helper_create_png((2048, 1024), (255, 0, 0, 255))
+        image2 = helper_create_png((10, 10), (0, 255, 0, 128))
+
+        future1 = pipeline.submit(image1)
+        # Identical images are only normalized once
+        assert pipeline.submit(image1) is future1
+        assert pipeline.normalize(image1) == future1.result() == normalize_image(image1)
+        assert Image.open(io.BytesIO(future1.result())).size == (1024, 512)
+        assert Image.open(io.BytesIO(pipeline.normalize(image2))).format == "JPEG"
+
+        # Results are kept for a limited number of images
+        pipeline.submit(helper_create_png((10, 10), (0, 0, 255, 255)))
+        assert pipeline.submit(image1) is not future1
+
+        with pytest.raises(Exception):
+            pipeline.normalize("bm90IGFuIGltYWdl")
+
+    def test_image_pipeline_back_pressure(self, monkeypatch):
+        """Test submitting images blocks while too many are pending"""
+        release = threading.Event()
+        monkeypatch.setattr('gtmcore.activity.serializers.image.normalize_image',
+                            lambda data: release.wait(10) and data.encode())
+        pipeline = ImagePipeline(num_workers=1, max_pending=2, max_results=10)
+        futures = [pipeline.submit("image1"), pipeline.submit("image2")]
+
+        submitted = threading.Event()
+        submit_thread = threading.Thread(target=lambda: pipeline.submit("image3") and submitted.set())
+        submit_thread.start()
+        assert submitted.wait(0.5) is False
+
+        release.set()
+        assert submitted.wait(10) is True
+        submit_thread.join()
+        assert [f.result() for f in futures] == [b"image1", b"image2"]
+        assert pipeline.normalize("image3") == b"image3"
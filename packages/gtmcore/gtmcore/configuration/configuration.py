@@ -142,6 +142,30 @@ class Configuration:
         """
         return os.path.join(self.app_workdir, '.labmanager', 'upload')
 
+    @property
+    def upload_journal_dir(self) -> str:
+        """Return the location to write journals for multipart uploads. Unlike `upload_dir`, this is not cleared when
+        the client starts, so interrupted uploads can be resumed.
+
+        """
+        return os.path.join(self.app_workdir, '.labmanager', 'upload-journal')
+
+    @property
+    def object_pool_dir(self) -> str:
+        """Return the location of the object pool shared by all dataset file caches. It must be within the workdir so
+        objects can be hard linked into the file caches.
+
+        """
+        return os.path.join(self.app_workdir, '.labmanager', 'objects')
+
+    @property
+    def download_dir(self) -> str:
+        """Return the location to write temporary data for downloads. It should be within the workdir so completed
+        files can be moved into the dataset file cache without copying.
+
+        """
+        return os.path.join(self.app_workdir, '.labmanager', 'download')
+
     @property
     def download_cpu_limit(self) -> int:
         """Return the max number of CPUs to use (i.e. concurrent jobs) when downloading dataset files
@@ -4,6 +4,7 @@ from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from gtmcore.dataset import Dataset
+    from gtmcore.dataset.cache.pool import SharedObjectPool
 
 
 class CacheManager(metaclass=abc.ABCMeta):
@@ -43,6 +44,15 @@ class CacheManager(metaclass=abc.ABCMeta):
         """
         raise NotImplemented
 
+    @property
+    def object_pool(self) -> Optional['SharedObjectPool']:
+        """The host-wide object pool this cache shares objects with, if enabled
+
+        Returns:
+            SharedObjectPool, or None if objects are not shared
+        """
+        return None
+
     def initialize(self) -> None:
         """Method to configure a file cache for use. this can include creating/provisioning resources or just loading
         things
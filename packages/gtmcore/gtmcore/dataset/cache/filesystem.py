@@ -1,7 +1,9 @@
 import os
 import pathlib
+from typing import Optional
 
 from gtmcore.dataset.cache.cache import CacheManager
+from gtmcore.dataset.cache.pool import SharedObjectPool
 from gtmcore.configuration import Configuration
 
 
@@ -25,15 +27,69 @@ class HostFilesystemCache(CacheManager):
         Returns:
             str
         """
-        server_id = Configuration().get_current_server_id()
         if not self.username:
             raise ValueError("Host Filesystem Object Cache requires logged in username to be set.")
         if not self.dataset.namespace:
             raise ValueError("Host Filesystem Object Cache requires the Dataset namespace to be set.")
 
-        return os.path.join(os.path.expanduser(self.dataset.client_config.app_workdir),
-                            '.labmanager', 'datasets', server_id,
-                            self.username, self.dataset.namespace, self.dataset.name)
+        return os.path.join(self.user_cache_dir(self.dataset.client_config, self.username),
+                            self.dataset.namespace, self.dataset.name)
+
+    @property
+    def object_pool(self) -> Optional[SharedObjectPool]:
+        """The host-wide object pool this cache shares objects with, enabled with `datasets.shared_object_pool`
+
+        Only managed datasets share objects. Unmanaged datasets link to files the user may edit in place, which would
+        change the object in every dataset sharing it.
+
+        Returns:
+            SharedObjectPool, or None if objects are not shared
+        """
+        if not self.dataset.is_managed():
+            return None
+        return self.get_object_pool(self.dataset.client_config)
+
+    @staticmethod
+    def get_object_pool(config: Configuration) -> Optional[SharedObjectPool]:
+        """Method to get the host-wide object pool, if enabled
+
+        Args:
+            config: Configuration for the client
+
+        Returns:
+            SharedObjectPool, or None if objects are not shared
+        """
+        if not config.config.get('datasets', {}).get('shared_object_pool'):
+            return None
+        return SharedObjectPool(os.path.expanduser(config.object_pool_dir))
+
+    @staticmethod
+    def server_cache_dir(config: Configuration) -> str:
+        """The directory containing the file caches of all users for the current server (as `<username>/`)
+
+        Args:
+            config: Configuration for the client
+
+        Returns:
+            str
+        """
+        server_id = Configuration().get_current_server_id()
+        if not server_id:
+            raise ValueError("Host Filesystem Object Cache requires a server to be configured.")
+        return os.path.join(os.path.expanduser(config.app_workdir), '.labmanager', 'datasets', server_id)
+
+    @staticmethod
+    def user_cache_dir(config: Configuration, username: str) -> str:
+        """The directory containing the file caches of all of a user's datasets (as `<namespace>/<name>`)
+
+        Args:
+            config: Configuration for the client
+            username: Username of the user
+
+        Returns:
+            str
+        """
+        return os.path.join(HostFilesystemCache.server_cache_dir(config), username)
 
     def initialize(self):
         """Method to configure a file cache for use.
@@ -0,0 +1,358 @@
+import os
+import re
+import shutil
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
+
+from gtmcore.dataset.cache.pool import SharedObjectPool
+from gtmcore.dataset.manifest.file import ManifestFileCache
+from gtmcore.dataset.manifest.hash import SmartHash
+from gtmcore.logging import LMLogger
+
+if TYPE_CHECKING:
+    from gtmcore.dataset import Dataset
+
+logger = LMLogger.get_logger()
+
+# Objects and revision directories modified more recently than this many seconds are never collected, so files that
+# are being ingested or linked while the collector runs are left alone
+GC_GRACE_PERIOD = 3600
+
+# Revision directories are named with the full commit hash
+REVISION_DIR_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+
+# Result of collecting a dataset object cache
+GCResult = NamedTuple('GCResult', [('objects_removed', int), ('bytes_reclaimed', int), ('revisions_removed', int)])
+
+# An object that could be evicted from the cache to free space
+EvictionCandidate = NamedTuple('EvictionCandidate', [('last_access', float), ('num_bytes', int), ('object_id', str)])
+
+
+class ObjectCacheCollector(object):
+    """Class to garbage collect a dataset's object cache
+
+    An object is referenced if it is in the manifest at any branch, tag, or remote ref of any checkout of the dataset
+    (the dataset itself and copies linked into projects all share one cache), in the uncommitted manifest changes of
+    a checkout, or waiting to be pushed. Unreferenced objects are deleted, along with revision directories that are
+    no longer checked out anywhere.
+
+    Referenced objects that can be downloaded from the dataset's remote again can also be evicted to free space. The
+    links to evicted objects are removed from the revision directories (and from their fast hash indexes), so the
+    files show up as not downloaded instead of deleted.
+
+    Objects shared with other datasets through the host-wide object pool are released from the pool once this cache
+    no longer references them, if no other dataset does either.
+
+    A cache without any checkouts is only collected if the dataset is known to be deleted, since a dataset that
+    failed to load would otherwise have all of its objects (including unpublished data) removed.
+
+    """
+    def __init__(self, cache_root: str, checkouts: List['Dataset'], username: str,
+                 grace_period: int = GC_GRACE_PERIOD, pool: Optional[SharedObjectPool] = None,
+                 dataset_deleted: bool = False) -> None:
+        """
+
+        Args:
+            cache_root: absolute path to the dataset's object cache
+            checkouts: every checkout of the dataset that uses the cache
+            username: username of the user that owns the cache
+            grace_period: seconds an object or revision directory must be untouched before it can be removed
+            pool: the host-wide object pool the cache shares objects with, if enabled
+            dataset_deleted: flag indicating the dataset has no checkouts left, so the whole cache is unreferenced
+        """
+        self.cache_root = cache_root
+        self.checkouts = checkouts
+        self.username = username
+        self.grace_period = grace_period
+        self.pool = pool
+        self.dataset_deleted = dataset_deleted
+
+        self.object_dir = os.path.join(self.cache_root, 'objects')
+
+    @property
+    def head_revisions(self) -> Set[str]:
+        """The revisions currently checked out, whose revision directories must be kept
+
+        Returns:
+            set
+        """
+        return {ds.git.repo.head.commit.hexsha for ds in self.checkouts}
+
+    @staticmethod
+    def _ref_revisions(dataset: 'Dataset') -> Set[str]:
+        """Method to get the revisions of all branches, tags, and remote refs of a checkout
+
+        Args:
+            dataset: a checkout of the dataset
+
+        Returns:
+            set
+        """
+        revisions = set()
+        for ref in dataset.git.repo.refs:
+            try:
+                revisions.add(ref.commit.hexsha)
+            except ValueError as err:
+                # Refs that don't point to a commit (e.g. a remote's symbolic HEAD without a target) are skipped
+                logger.warning(f"Skipping ref {ref.path} in {dataset.root_dir} while collecting object cache: {err}")
+        return revisions
+
+    @staticmethod
+    def _manifest_object_ids(manifest_data: OrderedDict) -> Set[str]:
+        """Method to get the objects referenced by manifest data. Directories don't have objects.
+
+        Args:
+            manifest_data: manifest data
+
+        Returns:
+            set
+        """
+        return {entry['h'] for key, entry in manifest_data.items() if key[-1] != '/' and entry.get('h')}
+
+    def _push_object_ids(self) -> Set[str]:
+        """Method to get all objects that are waiting to be pushed, in any branch
+
+        Returns:
+            set
+        """
+        object_ids = set()
+        push_dir = os.path.join(self.object_dir, '.push')
+        if os.path.isdir(push_dir):
+            for push_file in os.listdir(push_dir):
+                with open(os.path.join(push_dir, push_file), 'rt') as pf:
+                    for line in pf:
+                        line = line.strip()
+                        if line:
+                            _, object_path = line.split(',')
+                            object_ids.add(os.path.basename(object_path))
+        return object_ids
+
+    def referenced_objects(self) -> Set[str]:
+        """Method to get the set of objects referenced by any checkout or branch of the dataset
+
+        Returns:
+            set
+        """
+        object_ids = self._push_object_ids()
+        loaded_revisions: Set[str] = set()
+        for ds in self.checkouts:
+            # The files on disk include uncommitted changes from this checkout
+            manifest_data, _ = ManifestFileCache(ds, self.username)._load_manifest_files()
+            object_ids.update(self._manifest_object_ids(manifest_data))
+
+            for revision in self._ref_revisions(ds) - loaded_revisions:
+                object_ids.update(self._manifest_object_ids(ManifestFileCache.load_revision(ds, revision)))
+                loaded_revisions.add(revision)
+
+        return object_ids
+
+    def _is_recent(self, stat_result: os.stat_result) -> bool:
+        """Method to check if a file was changed or linked within the grace period"""
+        return time.time() - max(stat_result.st_mtime, stat_result.st_ctime) < self.grace_period
+
+    def _list_objects(self) -> List[Tuple[str, str, os.stat_result]]:
+        """Method to list all objects in the cache
+
+        Returns:
+            list of (object id, absolute path, stat result)
+        """
+        objects: List[Tuple[str, str, os.stat_result]] = list()
+        if not os.path.isdir(self.object_dir):
+            return objects
+
+        for level1 in os.scandir(self.object_dir):
+            if not level1.is_dir() or level1.name.startswith('.'):
+                continue
+            for level2 in os.scandir(level1.path):
+                if not level2.is_dir():
+                    continue
+                for obj in os.scandir(level2.path):
+                    if obj.is_file(follow_symlinks=False):
+                        objects.append((obj.name, obj.path, obj.stat(follow_symlinks=False)))
+        return objects
+
+    def _list_revisions(self) -> List[str]:
+        """Method to list the revision directories in the cache
+
+        Returns:
+            list
+        """
+        if not os.path.isdir(self.cache_root):
+            return list()
+        return sorted([d for d in os.listdir(self.cache_root) if REVISION_DIR_PATTERN.match(d)
+                       and os.path.isdir(os.path.join(self.cache_root, d))])
+
+    def _remove_stale_revisions(self) -> int:
+        """Method to remove revision directories that are not checked out by any checkout of the dataset. They are
+        recreated by linking the manifest if the revision is checked out again.
+
+        Returns:
+            number of revision directories removed
+        """
+        head_revisions = self.head_revisions
+        num_removed = 0
+        for revision in self._list_revisions():
+            revision_dir = os.path.join(self.cache_root, revision)
+            if revision in head_revisions or self._is_recent(os.stat(revision_dir)):
+                continue
+            shutil.rmtree(revision_dir)
+            num_removed += 1
+        return num_removed
+
+    @staticmethod
+    def _remove_empty_dirs(object_path: str) -> None:
+        """Method to remove the object subdirectories that contained an object, if they are now empty"""
+        level2_dir = os.path.dirname(object_path)
+        for directory in [level2_dir, os.path.dirname(level2_dir)]:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                return
+
+    def collect(self) -> GCResult:
+        """Method to delete unreferenced objects and revision directories
+
+        Returns:
+            GCResult
+        """
+        if not self.checkouts and not self.dataset_deleted:
+            logger.warning(f"Skipping object cache {self.cache_root}: no checkouts of the dataset were loaded, but "
+                           f"the dataset is not known to be deleted")
+            return GCResult(objects_removed=0, bytes_reclaimed=0, revisions_removed=0)
+
+        revisions_removed = self._remove_stale_revisions()
+        referenced = self.referenced_objects()
+
+        objects_removed = 0
+        bytes_reclaimed = 0
+        for object_id, object_path, stat_result in self._list_objects():
+            if object_id in referenced or self._is_recent(stat_result):
+                continue
+
+            os.remove(object_path)
+            self._remove_empty_dirs(object_path)
+            objects_removed += 1
+            if stat_result.st_nlink == 1:
+                bytes_reclaimed += stat_result.st_size
+            elif self.pool:
+                # Space is only freed if no other dataset shares the object. If the object is still linked elsewhere
+                # (e.g. a local data directory) no space is freed at all.
+                bytes_reclaimed += self.pool.release(object_id)
+
+        logger.info(f"Collected object cache {self.cache_root}: removed {objects_removed} objects and "
+                    f"{revisions_removed} revision directories, reclaimed {bytes_reclaimed} bytes")
+        return GCResult(objects_removed=objects_removed, bytes_reclaimed=bytes_reclaimed,
+                        revisions_removed=revisions_removed)
+
+    def cache_size(self) -> int:
+        """Method to get the total size of all objects in the cache
+
+        Returns:
+            int
+        """
+        return sum([stat_result.st_size for _, _, stat_result in self._list_objects()])
+
+    @property
+    def can_evict(self) -> bool:
+        """Property indicating if objects in this cache can be downloaded again after they are evicted
+
+        Returns:
+            bool
+        """
+        if not self.checkouts:
+            return False
+        ds = self.checkouts[0]
+        if ds.backend.is_managed:
+            # Managed datasets can only be pulled from their remote, once they have been published
+            return ds.remote is not None
+        return True
+
+    def _revision_links(self) -> Dict[Tuple[int, int], List[Tuple[str, str]]]:
+        """Method to find every file in the revision directories, keyed by inode
+
+        Returns:
+            dict of (device, inode) -> list of (revision, relative path)
+        """
+        links: Dict[Tuple[int, int], List[Tuple[str, str]]] = dict()
+        for revision in self._list_revisions():
+            revision_dir = os.path.join(self.cache_root, revision)
+            for root, _, files in os.walk(revision_dir):
+                for filename in files:
+                    abs_path = os.path.join(root, filename)
+                    if root == revision_dir and filename.startswith('.smarthash'):
+                        continue
+                    stat_result = os.stat(abs_path, follow_symlinks=False)
+                    links.setdefault((stat_result.st_dev, stat_result.st_ino), list()).append(
+                        (revision, os.path.relpath(abs_path, revision_dir)))
+        return links
+
+    def eviction_candidates(self) -> List[EvictionCandidate]:
+        """Method to list the objects that can be evicted to free space. Objects waiting to be pushed and objects that
+        are also linked outside the cache (so evicting them wouldn't free any space) are never evicted.
+
+        Returns:
+            list of EvictionCandidate, least recently accessed first
+        """
+        if not self.can_evict:
+            return list()
+
+        pending_push = self._push_object_ids()
+        links = self._revision_links()
+        candidates = list()
+        for object_id, _, stat_result in self._list_objects():
+            if object_id in pending_push:
+                continue
+            num_links = 1 + len(links.get((stat_result.st_dev, stat_result.st_ino), []))
+            if self.pool and os.path.exists(self.pool.object_path(object_id)) and \
+                    os.path.samestat(stat_result, os.stat(self.pool.object_path(object_id))):
+                # The pool's link is removed once nothing else references the object
+                num_links += 1
+            if stat_result.st_nlink != num_links:
+                continue
+            candidates.append(EvictionCandidate(last_access=stat_result.st_atime, num_bytes=stat_result.st_size,
+                                                object_id=object_id))
+        return sorted(candidates)
+
+    def evict(self, object_ids: Set[str]) -> int:
+        """Method to remove objects and every link to them in the revision directories
+
+        Args:
+            object_ids: objects to evict
+
+        Returns:
+            number of bytes freed
+        """
+        evicted_inodes: Dict[Tuple[int, int], int] = dict()
+        for object_id, object_path, stat_result in self._list_objects():
+            if object_id in object_ids:
+                evicted_inodes[(stat_result.st_dev, stat_result.st_ino)] = stat_result.st_size
+                os.remove(object_path)
+                self._remove_empty_dirs(object_path)
+
+        # Remove the links in each revision directory, and drop them from its fast hash index, so the files are
+        # reported as not downloaded instead of deleted
+        removed_paths: Dict[str, List[str]] = dict()
+        for inode, revision_paths in self._revision_links().items():
+            if inode in evicted_inodes:
+                for revision, relative_path in revision_paths:
+                    os.remove(os.path.join(self.cache_root, revision, relative_path))
+                    removed_paths.setdefault(revision, list()).append(relative_path)
+
+        if self.pool:
+            for object_id in object_ids:
+                self.pool.release(object_id)
+
+        root_dir = self.checkouts[0].root_dir if self.checkouts else self.cache_root
+        for revision, relative_paths in removed_paths.items():
+            hasher = SmartHash(root_dir, self.cache_root, revision)
+            try:
+                hasher.delete_fast_hashes(relative_paths)
+                parents = {f"{os.path.dirname(p)}/" for p in relative_paths if os.path.dirname(p)}
+                indexed_parents = hasher.fast_hash_data.get_records_for_paths(sorted(parents))
+                hasher.fast_hash(sorted(indexed_parents.keys()))
+            finally:
+                hasher.fast_hash_data.close()
+
+        return sum(evicted_inodes.values())
@@ -0,0 +1,162 @@
+import os
+from typing import Optional, Tuple
+
+from gtmcore.logging import LMLogger
+
+logger = LMLogger.get_logger()
+
+
+class SharedObjectPool(object):
+    """A host-wide pool of dataset objects, shared by the file caches of every dataset on the host
+
+    The pool holds one canonical copy of each object (at `<pool root>/<level1>/<level2>/<content hash>`, the same
+    layout as a dataset's object directory). Dataset object caches hard link to the pool, so identical files in
+    several datasets are only stored and downloaded once.
+
+    The pool doesn't keep any state of its own. An object's link count is its reference count: every link other than
+    the pool's is a dataset object or a file in a revision directory. Objects only referenced by the pool can be
+    removed safely at any time, since removing the pool's link never affects the other links.
+
+    Note: Because all links share one inode, writing to a file in place changes it in every dataset. Objects are
+    expected to be immutable, as they are within a single dataset.
+
+    """
+    def __init__(self, pool_root: str) -> None:
+        """
+
+        Args:
+            pool_root: absolute path to the pool. Must be on the same filesystem as the dataset file caches
+        """
+        self.pool_root = pool_root
+
+    def object_path(self, hash_str: str) -> str:
+        """Method to get the path to an object in the pool
+
+        Args:
+            hash_str: content hash of the object
+
+        Returns:
+            str
+        """
+        return os.path.join(self.pool_root, hash_str[0:8], hash_str[8:16], hash_str)
+
+    def refcount(self, hash_str: str) -> int:
+        """Method to get the number of links to an object outside the pool
+
+        Args:
+            hash_str: content hash of the object
+
+        Returns:
+            int, or 0 if the object is not in the pool
+        """
+        try:
+            return os.stat(self.object_path(hash_str)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def link(self, hash_str: str, destination: str, num_bytes: Optional[int] = None) -> bool:
+        """Method to link an object from the pool into a dataset's object cache
+
+        Args:
+            hash_str: content hash of the object
+            destination: absolute path to link the object to. Must not exist
+            num_bytes: Optional expected size of the object, checked as a safeguard against modified objects
+
+        Returns:
+            True if the object was linked, False if it isn't available in the pool
+        """
+        pool_path = self.object_path(hash_str)
+        try:
+            if num_bytes is not None and os.stat(pool_path).st_size != num_bytes:
+                logger.warning(f"Object {hash_str} in the shared object pool has an unexpected size. Not linking.")
+                return False
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.link(pool_path, destination)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as err:
+            # e.g. the pool is on another filesystem or links aren't permitted
+            logger.warning(f"Failed to link {hash_str} from the shared object pool: {err}")
+            return False
+
+    def add(self, hash_str: str, source: str) -> None:
+        """Method to add an object to the pool by linking it, if the pool doesn't have it yet
+
+        Args:
+            hash_str: content hash of the object
+            source: absolute path to the object in a dataset's object cache
+
+        Returns:
+            None
+        """
+        pool_path = self.object_path(hash_str)
+        try:
+            os.makedirs(os.path.dirname(pool_path), exist_ok=True)
+            os.link(source, pool_path)
+        except FileExistsError:
+            pass
+        except OSError as err:
+            logger.warning(f"Failed to add {hash_str} to the shared object pool: {err}")
+
+    def _remove_unreferenced(self, hash_str: str) -> Optional[int]:
+        """Method to remove an object from the pool if no dataset references it anymore
+
+        Args:
+            hash_str: content hash of the object
+
+        Returns:
+            size of the removed object, or None if it was not removed
+        """
+        pool_path = self.object_path(hash_str)
+        try:
+            stat_result = os.stat(pool_path)
+            if stat_result.st_nlink != 1:
+                return None
+            os.remove(pool_path)
+        except FileNotFoundError:
+            return None
+
+        for directory in [os.path.dirname(pool_path), os.path.dirname(os.path.dirname(pool_path))]:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+        return stat_result.st_size
+
+    def release(self, hash_str: str) -> int:
+        """Method to remove an object from the pool if no dataset references it anymore
+
+        Args:
+            hash_str: content hash of the object
+
+        Returns:
+            number of bytes freed
+        """
+        return self._remove_unreferenced(hash_str) or 0
+
+    def collect(self) -> Tuple[int, int]:
+        """Method to remove every object that no dataset references anymore
+
+        Returns:
+            (number of objects removed, number of bytes freed)
+        """
+        objects_removed = 0
+        bytes_freed = 0
+        if not os.path.isdir(self.pool_root):
+            return objects_removed, bytes_freed
+
+        for level1 in os.scandir(self.pool_root):
+            if not level1.is_dir():
+                continue
+            for level2 in os.scandir(level1.path):
+                if not level2.is_dir():
+                    continue
+                for obj in os.scandir(level2.path):
+                    if obj.is_file(follow_symlinks=False):
+                        num_bytes = self._remove_unreferenced(obj.name)
+                        if num_bytes is not None:
+                            objects_removed += 1
+                            bytes_freed += num_bytes
+
+        return objects_removed, bytes_freed
@@ -68,6 +68,12 @@ class BackgroundDownloadJob:
 
         return failure_keys
 
+    def get_in_progress_keys(self) -> List[str]:
+        """Get the keys the underlying call to `pull_objects` was downloading when it last updated its status"""
+        if self._job_status and self._job_status.meta.get('in_progress_keys'):
+            return self._job_status.meta['in_progress_keys'].split(',')
+        return list()
+
     def refresh_status(self) -> bool:
         """Method to query the dispatcher for the job's state. If the job failed, self.failure_count will increment.
         The method also returns self.is_complete after the status update is complete
@@ -1,5 +1,5 @@
 import os
-from typing import List, Callable, Optional, Tuple
+from typing import Dict, List, Callable, Optional, Set, Tuple
 import subprocess
 import glob
 from natsort import natsorted
@@ -10,6 +10,8 @@ from gtmcore.dataset.dataset import Dataset
 from gtmcore.dataset.manifest import Manifest
 from gtmcore.dataset.storage.backend import UnmanagedStorageBackend, ManagedStorageBackend
 from gtmcore.dataset.io import PushObject, PushResult, PullResult, PullObject
+from gtmcore.dataset.io.scheduler import pack_batches, split_chunks
+from gtmcore.dataset.io.pack import PackCatalog, PACK_DIR_NAME, is_pack_path, write_pack
 
 from gtmcore.logging import LMLogger
 
@@ -23,13 +25,13 @@ class IOManager(object):
         self.dataset = dataset
         self.manifest = manifest
 
-        self.push_dir = os.path.join(self.manifest.cache_mgr.cache_root, 'objects', '.push')
+        self.push_dir = self.manifest.push_queue.push_dir
 
         # Property to keep status state if needed when appending messages
         self._status_msg = ""
 
-    def _commit_in_branch(self, commit_hash: str) -> bool:
-        """Method to check if a commit is in the current branch, ignoring the last commit.
+    def _revisions_in_branch(self) -> Set[str]:
+        """Method to get the commits in the current branch, ignoring the last commit, with a single git call.
 
         This is used for the purpose of only pushing objects that are part of the current branch. We ignore the last
         commit because objects to push are stored in a file named with the revision at which the files were written.
@@ -37,58 +39,45 @@ class IOManager(object):
         committed and then an activity record is created with another commit). The last commit can be used in a
         different branch where objects were written, but can't contain any objects to push in the current branch.
 
-        Args:
-            commit_hash(str): Commit hash to check if in branch
-
         Returns:
-            bool
+            set of commit hashes
         """
         try:
-            subprocess.run(['git', 'merge-base', '--is-ancestor', commit_hash, 'HEAD~1'], check=True,
-                           cwd=self.dataset.root_dir)
-            return True
+            result = subprocess.run(['git', 'rev-list', 'HEAD~1'], check=True, stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, cwd=self.dataset.root_dir)
         except subprocess.CalledProcessError:
-            return False
+            # There is no commit before HEAD, so nothing can be in the branch
+            return set()
+        return set(result.stdout.decode().split())
 
-    def objects_to_push(self, remove_duplicates: bool = False) -> List[PushObject]:
-        """Return a list of named tuples of all objects that need to be pushed
+    def _queued_objects(self, remove_duplicates: bool = False) -> List[Tuple[PushObject, int]]:
+        """Method to load the objects that need to be pushed in the current branch, with their sizes
+
+        Args:
+            remove_duplicates: If True, only include the first object with a given content hash
 
         Returns:
-            List[namedtuple]
+            list of (PushObject, size in bytes), sorted by dataset path
         """
-        objects = list()
-        if os.path.exists(self.push_dir):
-            push_files = [f for f in os.listdir(self.push_dir) if os.path.isfile(os.path.join(self.push_dir, f))]
-
-            if push_files:
-                object_ids: List[str] = list()
-                for pf in push_files:
-                    if os.path.basename(pf) == '.DS_Store':
-                        continue
-
-                    if not self._commit_in_branch(pf):
-                        continue
+        push_queue = self.manifest.push_queue
+        if not push_queue.revisions():
+            return list()
 
-                    with open(os.path.join(self.push_dir, pf), 'rt') as pfh:
-                        lines = pfh.readlines()
-                        lines = sorted(lines)
-                        for line in lines:
-                            line = line.strip()
-                            dataset_path, object_path = line.split(',')
-                            _, object_id = object_path.rsplit('/', 1)
+        queued = push_queue.queued_objects(revisions=self._revisions_in_branch(),
+                                           remove_duplicates=remove_duplicates)
+        return natsorted(queued, key=lambda x: x[0].dataset_path)
 
-                            # Handle de-duplicating objects if the backend supports it
-                            if remove_duplicates is True:
-                                if object_id in object_ids:
-                                    continue
-
-                                object_ids.append(object_id)
-
-                            objects.append(PushObject(dataset_path=dataset_path, object_path=object_path, revision=pf))
+    def objects_to_push(self, remove_duplicates: bool = False) -> List[PushObject]:
+        """Return a list of named tuples of all objects that need to be pushed
 
-            objects = natsorted(objects, key=attrgetter('dataset_path'))
+        Args:
+            remove_duplicates: If True, only include the first object with a given content hash (if the backend
+                               supports de-duplicating objects)
 
-        return objects
+        Returns:
+            List[namedtuple]
+        """
+        return [obj for obj, _ in self._queued_objects(remove_duplicates)]
 
     def num_objects_to_push(self, remove_duplicates: bool = False) -> int:
         """Helper to get the total number of objects to push
@@ -98,6 +87,60 @@ class IOManager(object):
         """
         return len(self.objects_to_push(remove_duplicates))
 
+    def pack_objects_to_push(self) -> int:
+        """Method to bundle the small objects waiting to be pushed into pack files, if the storage backend supports it
+
+        Each pack replaces its objects in the push queue, and is recorded in the PackCatalog, which is committed to the
+        dataset so readers can find the objects. This should run before the dataset repository is pushed.
+
+        Returns:
+            number of objects packed
+        """
+        backend = self.dataset.backend
+        if not isinstance(backend, ManagedStorageBackend):
+            return 0
+        settings = backend.object_pack_settings(self.dataset)
+        if not settings:
+            return 0
+
+        catalog = PackCatalog(self.dataset.root_dir)
+        already_packed = catalog.packed_objects()
+
+        # Queued objects grouped by object id, since several files can have the same contents
+        candidates: Dict[str, List[PushObject]] = dict()
+        sizes: Dict[str, int] = dict()
+        for obj, num_bytes in self._queued_objects():
+            object_id = os.path.basename(obj.object_path)
+            if num_bytes > settings.max_object_size or object_id in already_packed or \
+                    is_pack_path(obj.object_path) or not os.path.isfile(obj.object_path):
+                continue
+            candidates.setdefault(object_id, list()).append(obj)
+            sizes[object_id] = num_bytes
+
+        object_ids = list(candidates.keys())
+        chunks = [c for c in split_chunks(object_ids, [sizes[i] for i in object_ids],
+                                          max_chunk_cost=settings.pack_size, per_object_cost=0) if len(c) > 1]
+        if not chunks:
+            return 0
+
+        # Packs are queued at the current revision, which is in the branch once the catalog is committed
+        revision = self.manifest.dataset_revision
+        pack_dir = os.path.join(self.manifest.cache_mgr.cache_root, 'objects', PACK_DIR_NAME)
+        num_packed = 0
+        for chunk in chunks:
+            pack_path = write_pack(pack_dir, [candidates[object_id][0].object_path for object_id in chunk])
+            catalog_file = catalog.add(os.path.basename(pack_path), chunk)
+            self.dataset.git.add(catalog_file)
+
+            self.manifest.push_queue.remove([obj for object_id in chunk for obj in candidates[object_id]])
+            self.manifest.push_queue.add([(pack_path, os.path.relpath(catalog_file, self.dataset.root_dir))],
+                                         revision)
+            num_packed += len(chunk)
+
+        self.dataset.git.commit(f"Packed {num_packed} objects into {len(chunks)} pack file(s) for upload")
+        logger.info(f"Packed {num_packed} objects in {str(self.dataset)} into {len(chunks)} pack file(s)")
+        return num_packed
+
     def push_objects(self, objs: List[PushObject], progress_update_fn: Callable) -> PushResult:
         """Method to push the provided objects
 
@@ -143,6 +186,42 @@ class IOManager(object):
 
         return result
 
+    def _link_from_object_pool(self, objs: List[PullObject],
+                               progress_update_fn: Callable) -> Tuple[List[PullObject], List[PullObject]]:
+        """Method to link objects that are already in the host-wide object pool into the dataset's object cache
+
+        Args:
+            objs: objects to pull
+            progress_update_fn: A callable with arg "completed_bytes" (int), called with the size of linked objects
+
+        Returns:
+            (objects linked from the pool, objects that still need to be pulled)
+        """
+        pool = self.manifest.cache_mgr.object_pool
+        if not pool:
+            return [], objs
+
+        linked = list()
+        remaining = list()
+        entries = self.manifest.get_entries([obj.dataset_path for obj in objs])
+        for obj, entry in zip(objs, entries):
+            if entry is None:
+                # Removed from the manifest since the objects were listed, so there is nothing to link
+                remaining.append(obj)
+                continue
+
+            object_id = os.path.basename(obj.object_path)
+            num_bytes = int(entry['b'])
+            if not os.path.exists(obj.object_path) and pool.link(object_id, obj.object_path, num_bytes=num_bytes):
+                progress_update_fn(num_bytes)
+                linked.append(obj)
+            else:
+                remaining.append(obj)
+
+        if linked:
+            logger.info(f"Linked {len(linked)} of {len(objs)} objects in {str(self.dataset)} from the shared pool")
+        return linked, remaining
+
     def pull_objects(self, keys: List[str], progress_update_fn: Callable, link_revision: bool = True) -> PullResult:
         """Method to pull a single object
 
@@ -162,10 +241,24 @@ class IOManager(object):
         """
         objs: List[PullObject] = self._gen_pull_objects(keys)
 
+        # Objects that another dataset on this host already has are linked from the shared pool instead
+        pooled_objs, objs = self._link_from_object_pool(objs, progress_update_fn)
+
         # Pull the object
-        self.dataset.backend.prepare_pull(self.dataset, objs)
-        result = self.dataset.backend.pull_objects(self.dataset, objs, progress_update_fn)
-        self.dataset.backend.finalize_pull(self.dataset)
+        if objs:
+            self.dataset.backend.prepare_pull(self.dataset, objs)
+            result = self.dataset.backend.pull_objects(self.dataset, objs, progress_update_fn)
+            self.dataset.backend.finalize_pull(self.dataset)
+        else:
+            result = PullResult(success=[], failure=[], message="Linked all objects from the shared object pool")
+
+        pool = self.manifest.cache_mgr.object_pool
+        if pool:
+            for obj in result.success:
+                if os.path.isfile(obj.object_path):
+                    pool.add(os.path.basename(obj.object_path), obj.object_path)
+        if pooled_objs:
+            result = PullResult(success=pooled_objs + result.success, failure=result.failure, message=result.message)
 
         # Relink the revision
         if link_revision:
@@ -181,8 +274,9 @@ class IOManager(object):
         Returns:
             list
         """
+        pool = self.manifest.cache_mgr.object_pool
         keys_to_pull = list()
-        for key in self.manifest.manifest:
+        for key, entry in self.manifest.manifest.items():
             # If dir, skip
             if key[-1] == os.path.sep:
                 continue
@@ -192,9 +286,9 @@ class IOManager(object):
             if os.path.exists(revision_path):
                 continue
 
-            # Check if file exists in object cache and simply needs to be linked
+            # Check if file exists in object cache (or the shared object pool) and simply needs to be linked
             obj_path = self.manifest.dataset_to_object_path(key)
-            if os.path.isfile(obj_path):
+            if os.path.isfile(obj_path) or (pool and pool.link(entry['h'], obj_path, num_bytes=int(entry['b']))):
                 os.link(obj_path, revision_path)
                 continue
 
@@ -220,23 +314,61 @@ class IOManager(object):
         if pull_all:
             keys = self._get_pull_all_keys()
 
+        if not keys:
+            return [], 0, 0
+
+        # Build batches of similar cost, accounting for both file size and the fixed overhead of each file
         num_cores = self.dataset.client_config.download_cpu_limit
-        key_batches: List[List] = [list() for _ in range(num_cores)]
-        size_sums = [0 for _ in range(num_cores)]
+        groups, group_sizes = self._group_keys_for_pull(keys)
+        group_batches, batch_bytes = pack_batches(groups, group_sizes, num_cores)
+        key_batches = [[key for group in batch for key in group] for batch in group_batches]
+
+        return key_batches, sum(batch_bytes), len(keys)
 
-        # Build batches by dividing keys across batches by file size
-        if keys:
-            for key in keys:
-                data = self.manifest.get(key)
-                index = size_sums.index(min(size_sums))
-                key_batches[index].append(key)
-                file_size = int(data['size'])
-                size_sums[index] += file_size
+    def _group_keys_for_pull(self, keys: List[str]) -> Tuple[List[List[str]], List[int]]:
+        """Method to group keys whose objects are stored in the same pack file, since each pack is downloaded by a
+        single request and should not be split between download workers
 
-        # Prune Jobs back if there are lots of cores but not lots of work
-        key_batches = [x for x in key_batches if x != []]
+        Args:
+            keys: relative file paths
 
-        return key_batches, sum(size_sums), (len(keys) if keys else 0)
+        Returns:
+            list of groups of keys (in the order of their first key), and the total size in bytes of each group
+        """
+        entries = self.manifest.get_entries(keys)
+        catalog = PackCatalog(self.dataset.root_dir).packed_objects()
+
+        groups: List[List[str]] = list()
+        group_sizes: List[int] = list()
+        pack_groups: Dict[str, int] = dict()
+        for key, entry in zip(keys, entries):
+            if entry is None:
+                raise ValueError(f"{key} not found in Dataset manifest.")
+
+            pack_id = catalog.get(entry['h'])
+            if pack_id is not None and pack_id in pack_groups:
+                groups[pack_groups[pack_id]].append(key)
+                group_sizes[pack_groups[pack_id]] += int(entry['b'])
+            else:
+                if pack_id is not None:
+                    pack_groups[pack_id] = len(groups)
+                groups.append([key])
+                group_sizes.append(int(entry['b']))
+
+        return groups, group_sizes
+
+    def split_pull_batch(self, keys: List[str]) -> List[List[str]]:
+        """Method to split a batch of keys into chunks that download workers can claim (or steal) one at a time.
+        Keys stored in the same pack file are kept in the same chunk.
+
+        Args:
+            keys: relative file paths
+
+        Returns:
+            list of chunks of keys
+        """
+        groups, group_sizes = self._group_keys_for_pull(keys)
+        return [[key for group in chunk for key in group] for chunk in split_chunks(groups, group_sizes)]
 
     def compute_push_batches(self) -> Tuple[List[List[PushObject]], int, int]:
         """Method to compute object push batches that attempt to spread io across available cores
@@ -245,20 +377,12 @@ class IOManager(object):
             list, int, int, int
         """
         num_cores = self.dataset.client_config.upload_cpu_limit
-        obj_batches: List[List] = [list() for _ in range(num_cores)]
-        size_sums = [0 for _ in range(num_cores)]
 
         should_dedup = self.dataset.backend.client_should_dedup_on_push  # type: ignore
-        objs: List[PushObject] = self.objects_to_push(remove_duplicates=should_dedup)
-
-        # Build batches by dividing keys across batches by file size
-        for obj in objs:
-            index = size_sums.index(min(size_sums))
-            obj_batches[index].append(obj)
-            file_size = os.path.getsize(obj.object_path)
-            size_sums[index] += file_size
+        objs = self._queued_objects(remove_duplicates=should_dedup)
 
-        # Prune Jobs back if there are lots of cores but not lots of work
-        obj_batches = [x for x in obj_batches if x != []]
+        # Build batches of similar cost, accounting for both file size and the fixed overhead of each file
+        obj_batches, batch_bytes = pack_batches([obj for obj, _ in objs], [num_bytes for _, num_bytes in objs],
+                                                num_cores)
 
-        return obj_batches, sum(size_sums), len(objs)
+        return obj_batches, sum(batch_bytes), len(objs)
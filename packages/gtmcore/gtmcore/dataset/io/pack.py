@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import struct
+import uuid
+from hashlib import blake2b
+from typing import Dict, List, NamedTuple, Tuple
+
+# Pack files start with this magic number, followed by the length of the JSON index as an unsigned 64-bit big-endian
+# integer, the index, and then the contents of each object back to back
+PACK_MAGIC = b'GTMPACK1'
+PACK_HEADER = struct.Struct('>8sQ')
+
+# Name of the directory in the object cache (and download directory) that holds pack files
+PACK_DIR_NAME = '.packs'
+
+# Named tuple for a backend's object packing settings. Objects up to `max_object_size` bytes are bundled into packs of
+# up to `pack_size` bytes
+PackSettings = NamedTuple('PackSettings', [('max_object_size', int), ('pack_size', int)])
+
+
+def is_pack_path(object_path: str) -> bool:
+    """Function to check if an object path is a pack file, rather than an object in the file cache
+
+    Args:
+        object_path: absolute path to the object
+
+    Returns:
+        bool
+    """
+    return os.path.basename(os.path.dirname(object_path)) == PACK_DIR_NAME
+
+
+def write_pack(pack_dir: str, object_paths: List[str]) -> str:
+    """Function to write a list of objects to a new pack file
+
+    Args:
+        pack_dir: directory to write the pack file in
+        object_paths: absolute paths to the objects to pack. The file name of each is its object id
+
+    Returns:
+        absolute path to the pack file, which is named with the pack id
+    """
+    # Packs are stored and transferred like any other object, so the pack id is the hash of the pack file's contents
+    # Index entries are (object id, offset from the start of the object data, size in bytes)
+    index: List[Tuple[str, int, int]] = list()
+    offset = 0
+    for object_path in object_paths:
+        num_bytes = os.path.getsize(object_path)
+        index.append((os.path.basename(object_path), offset, num_bytes))
+        offset += num_bytes
+    index_bytes = json.dumps({'objects': index}).encode('utf-8')
+
+    os.makedirs(pack_dir, exist_ok=True)
+    tmp_path = os.path.join(pack_dir, f".{uuid.uuid4().hex}.tmp")
+    h = blake2b()
+    try:
+        with open(tmp_path, 'wb') as pf:
+            for data in (PACK_HEADER.pack(PACK_MAGIC, len(index_bytes)), index_bytes):
+                h.update(data)
+                pf.write(data)
+
+            for object_path, (_, _, num_bytes) in zip(object_paths, index):
+                with open(object_path, 'rb') as of:
+                    data = of.read()
+                if len(data) != num_bytes:
+                    raise IOError(f"Object {object_path} changed while it was being packed")
+                h.update(data)
+                pf.write(data)
+
+        pack_path = os.path.join(pack_dir, h.hexdigest())
+        os.replace(tmp_path, pack_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return pack_path
+
+
+def read_pack_index(pack_path: str) -> Dict[str, Tuple[int, int]]:
+    """Function to read the index of a pack file
+
+    Args:
+        pack_path: absolute path to the pack file
+
+    Returns:
+        dict of object ids to the (offset, size in bytes) of the object in the pack file
+    """
+    with open(pack_path, 'rb') as pf:
+        magic, index_length = PACK_HEADER.unpack(pf.read(PACK_HEADER.size))
+        if magic != PACK_MAGIC:
+            raise IOError(f"{pack_path} is not a pack file")
+        index = json.loads(pf.read(index_length).decode('utf-8'))
+
+    data_offset = PACK_HEADER.size + index_length
+    return {object_id: (data_offset + offset, num_bytes) for object_id, offset, num_bytes in index['objects']}
+
+
+def unpack(pack_path: str, destinations: Dict[str, str]) -> None:
+    """Function to extract objects from a pack file. The contents of each object are verified against its object id
+    before it is moved into place.
+
+    Args:
+        pack_path: absolute path to the pack file
+        destinations: dict of object ids to extract to the absolute path to write each to
+
+    Returns:
+        None
+    """
+    index = read_pack_index(pack_path)
+    with open(pack_path, 'rb') as pf:
+        for object_id, destination in destinations.items():
+            if object_id not in index:
+                raise IOError(f"Object {object_id} is not in pack {os.path.basename(pack_path)}")
+
+            offset, num_bytes = index[object_id]
+            pf.seek(offset)
+            data = pf.read(num_bytes)
+            if len(data) != num_bytes or blake2b(data).hexdigest() != object_id:
+                raise IOError(f"Object {object_id} in pack {os.path.basename(pack_path)} is corrupt")
+
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            tmp_path = f"{destination}.unpack"
+            with open(tmp_path, 'wb') as of:
+                of.write(data)
+            shutil.move(tmp_path, destination)
+
+
+class PackCatalog(object):
+    """Class to manage the record of which objects of a dataset are stored in pack files
+
+    The catalog is kept in the dataset repository, as one file per pack in `.gigantum/packs` named with the pack id and
+    listing the ids of the objects in the pack. Objects not in the catalog are stored individually.
+    """
+    def __init__(self, dataset_root: str) -> None:
+        self.catalog_dir = os.path.join(dataset_root, '.gigantum', 'packs')
+
+    def packed_objects(self) -> Dict[str, str]:
+        """Method to load the catalog
+
+        Returns:
+            dict of object ids to the id of the pack containing the object
+        """
+        result: Dict[str, str] = dict()
+        if not os.path.isdir(self.catalog_dir):
+            return result
+
+        for pack_id in os.listdir(self.catalog_dir):
+            with open(os.path.join(self.catalog_dir, pack_id), 'rt') as cf:
+                for line in cf:
+                    object_id = line.strip()
+                    if object_id:
+                        result[object_id] = pack_id
+        return result
+
+    def add(self, pack_id: str, object_ids: List[str]) -> str:
+        """Method to record the objects in a new pack
+
+        Args:
+            pack_id: id of the pack
+            object_ids: ids of the objects in the pack
+
+        Returns:
+            absolute path to the catalog file for the pack
+        """
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        catalog_file = os.path.join(self.catalog_dir, pack_id)
+        with open(catalog_file, 'wt') as cf:
+            cf.write("".join([f"{object_id}\n" for object_id in sorted(object_ids)]))
+        return catalog_file
@@ -0,0 +1,248 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from gtmcore.dataset.io import PushObject
+from gtmcore.logging import LMLogger
+
+logger = LMLogger.get_logger()
+
+# Files written by other tools that can end up in the push directory and are not push files
+IGNORED_PUSH_FILES = {'.DS_Store'}
+
+
+class PushQueue(object):
+    """Class to manage the objects in a dataset's file cache that are waiting to be pushed to the storage backend
+
+    Objects to push are appended to a file in `objects/.push` named with the revision at which the files were written.
+    These files remain the record of what needs to be pushed, and clearing the queue is done by removing them. Every
+    object queued through this class is also recorded, with its size, in a SQLite index in the file cache, along with
+    the stat of the push file after the write. When a push file no longer matches its indexed stat (e.g. it was
+    written by an older client or removed and re-created), it is parsed again and its records replaced.
+    """
+    def __init__(self, cache_root: str) -> None:
+        self.push_dir = os.path.join(cache_root, 'objects', '.push')
+        self.index_file = os.path.join(cache_root, '.push_index')
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # Objects are queued from several ingest threads at once
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn:
+            return self._conn
+
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError as err:
+            # The index can be rebuilt from the push files
+            logger.warning(f"Push queue index {self.index_file} is invalid and will be reset: {err}")
+            os.remove(self.index_file)
+            self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        conn = sqlite3.connect(self.index_file, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS push_file (revision TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                     "mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS queued (revision TEXT NOT NULL, dataset_path TEXT NOT NULL, "
+                     "object_path TEXT NOT NULL, num_bytes INTEGER NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS queued_revision ON queued (revision)")
+        conn.commit()
+        return conn
+
+    def close(self) -> None:
+        """Method to close the database connection
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _file_stat(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            file_info = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return file_info.st_size, file_info.st_mtime_ns, file_info.st_ino
+
+    def revisions(self) -> List[str]:
+        """Method to list the revisions that have objects waiting to be pushed
+
+        Returns:
+            sorted list of revisions
+        """
+        if not os.path.isdir(self.push_dir):
+            return list()
+        return sorted([f for f in os.listdir(self.push_dir)
+                       if f not in IGNORED_PUSH_FILES and os.path.isfile(os.path.join(self.push_dir, f))])
+
+    def add(self, objects: List[Tuple[str, str]], revision: str) -> None:
+        """Method to queue a list of objects for push with a single write
+
+        Args:
+            objects: list of (object path, relative file path) tuples
+            revision: revision of the dataset the objects were written at
+
+        Returns:
+            None
+        """
+        records = [(revision, rel_path, obj, os.path.getsize(obj) if os.path.isfile(obj) else 0)
+                   for obj, rel_path in objects]
+        push_file = os.path.join(self.push_dir, revision)
+
+        with self._lock:
+            os.makedirs(self.push_dir, exist_ok=True)
+            indexed_stat = self._indexed_stat(revision)
+            stat_before = self._file_stat(push_file)
+            with open(push_file, 'at') as fh:
+                fh.write("".join([f"{rel_path},{obj}\n" for obj, rel_path in objects]))
+
+            conn = self._connect()
+            if indexed_stat != stat_before:
+                # The push file was changed outside of the queue, so index it from scratch
+                self._reindex(conn, revision)
+                return
+
+            stat = os.stat(push_file)
+            with conn:
+                conn.executemany("INSERT INTO queued (revision, dataset_path, object_path, num_bytes) "
+                                 "VALUES (?, ?, ?, ?)", records)
+                self._set_indexed_stat(conn, revision, (stat.st_size, stat.st_mtime_ns, stat.st_ino))
+
+    def remove(self, objects: List[PushObject]) -> None:
+        """Method to remove objects from the queue, rewriting the push files they were queued in
+
+        Args:
+            objects: list of PushObjects to remove
+
+        Returns:
+            None
+        """
+        removed: Dict[str, Set[Tuple[str, str]]] = dict()
+        for obj in objects:
+            removed.setdefault(obj.revision, set()).add((obj.dataset_path, obj.object_path))
+
+        with self._lock:
+            conn = self._connect()
+            for revision, entries in removed.items():
+                push_file = os.path.join(self.push_dir, revision)
+                if not os.path.isfile(push_file):
+                    continue
+
+                with open(push_file, 'rt') as fh:
+                    lines = [line for line in fh if line.strip() and tuple(line.strip().split(',')) not in entries]
+
+                if lines:
+                    # Written outside the push directory so a partial write is never read as a push file
+                    tmp_file = os.path.join(os.path.dirname(self.index_file), f".push_{revision}.tmp")
+                    with open(tmp_file, 'wt') as fh:
+                        fh.write("".join(lines))
+                    os.replace(tmp_file, push_file)
+                    self._reindex(conn, revision)
+                else:
+                    os.remove(push_file)
+                    with conn:
+                        conn.execute("DELETE FROM push_file WHERE revision = ?", (revision,))
+                        conn.execute("DELETE FROM queued WHERE revision = ?", (revision,))
+
+    def _indexed_stat(self, revision: str) -> Optional[Tuple[int, int, int]]:
+        row = self._connect().execute("SELECT size, mtime_ns, inode FROM push_file WHERE revision = ?",
+                                      (revision,)).fetchone()
+        return (row[0], row[1], row[2]) if row else None
+
+    @staticmethod
+    def _set_indexed_stat(conn: sqlite3.Connection, revision: str, stat: Tuple[int, int, int]) -> None:
+        conn.execute("INSERT OR REPLACE INTO push_file (revision, size, mtime_ns, inode) VALUES (?, ?, ?, ?)",
+                     (revision, *stat))
+
+    def _reindex(self, conn: sqlite3.Connection, revision: str) -> None:
+        """Method to replace the records for a revision by parsing its push file"""
+        push_file = os.path.join(self.push_dir, revision)
+        stat = os.stat(push_file)
+        records = list()
+        with open(push_file, 'rt') as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                dataset_path, object_path = line.split(',')
+                num_bytes = os.path.getsize(object_path) if os.path.isfile(object_path) else 0
+                records.append((revision, dataset_path, object_path, num_bytes))
+
+        with conn:
+            conn.execute("DELETE FROM queued WHERE revision = ?", (revision,))
+            conn.executemany("INSERT INTO queued (revision, dataset_path, object_path, num_bytes) "
+                             "VALUES (?, ?, ?, ?)", records)
+            self._set_indexed_stat(conn, revision, (stat.st_size, stat.st_mtime_ns, stat.st_ino))
+
+    def _sync(self, revisions: List[str]) -> None:
+        """Method to bring the index up to date with the push files that exist"""
+        conn = self._connect()
+        indexed = {row[0]: (row[1], row[2], row[3])
+                   for row in conn.execute("SELECT revision, size, mtime_ns, inode FROM push_file")}
+
+        for revision in revisions:
+            if indexed.get(revision) != self._file_stat(os.path.join(self.push_dir, revision)):
+                self._reindex(conn, revision)
+
+        removed = [(r,) for r in set(indexed.keys()) - set(revisions)]
+        with conn:
+            conn.executemany("DELETE FROM push_file WHERE revision = ?", removed)
+            # Also drops records of push files that were never indexed
+            conn.execute("DELETE FROM queued WHERE revision NOT IN (SELECT revision FROM push_file)")
+
+    def queued_objects(self, revisions: Optional[Set[str]] = None,
+                       remove_duplicates: bool = False) -> List[Tuple[PushObject, int]]:
+        """Method to load queued objects and their sizes
+
+        Args:
+            revisions: Optional set of revisions to load objects for. If omitted all queued objects are loaded
+            remove_duplicates: If True, only the first object with a given object id (content hash) is returned
+
+        Returns:
+            list of (PushObject, size in bytes), ordered by revision and then dataset path
+        """
+        with self._lock:
+            push_revisions = self.revisions()
+            self._sync(push_revisions)
+            rows = self._connect().execute("SELECT revision, dataset_path, object_path, num_bytes FROM queued "
+                                           "ORDER BY revision, dataset_path, object_path").fetchall()
+
+        result: List[Tuple[PushObject, int]] = list()
+        object_ids: Set[str] = set()
+        for revision, dataset_path, object_path, num_bytes in rows:
+            if revisions is not None and revision not in revisions:
+                continue
+
+            if remove_duplicates:
+                object_id = object_path.rsplit('/', 1)[-1]
+                if object_id in object_ids:
+                    continue
+                object_ids.add(object_id)
+
+            result.append((PushObject(dataset_path=dataset_path, object_path=object_path, revision=revision),
+                           num_bytes))
+        return result
+
+    def clear(self) -> None:
+        """Method to remove all objects from the queue
+
+        Returns:
+            None
+        """
+        with self._lock:
+            for revision in self.revisions():
+                os.remove(os.path.join(self.push_dir, revision))
+
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM push_file")
+                conn.execute("DELETE FROM queued")
@@ -0,0 +1,167 @@
+import heapq
+import json
+from typing import List, Optional, Sequence, Tuple, TypeVar, cast
+
+import redis
+
+T = TypeVar('T')
+
+# Fixed cost of transferring an object, expressed in bytes, so a batch of many small objects (each requiring its own
+# requests to the object service and storage) isn't considered cheaper than it is
+DEFAULT_PER_OBJECT_COST_BYTES = 1024 * 1024
+
+# Maximum cost of a chunk of work that download workers claim (or steal) at a time
+MAX_CHUNK_COST_BYTES = 256 * 1024 * 1024
+
+# Work queues are removed once a download completes, this only cleans up after a download job that died
+WORK_QUEUE_TTL_SECONDS = 60 * 60 * 24
+
+
+def object_cost(num_bytes: int, per_object_cost: int = DEFAULT_PER_OBJECT_COST_BYTES) -> int:
+    """Function to compute the cost of transferring an object
+
+    Args:
+        num_bytes: size of the object
+        per_object_cost: fixed cost of each object, in bytes
+
+    Returns:
+        int
+    """
+    return num_bytes + per_object_cost
+
+
+def pack_batches(items: Sequence[T], sizes: Sequence[int], num_batches: int,
+                 per_object_cost: int = DEFAULT_PER_OBJECT_COST_BYTES) -> Tuple[List[List[T]], List[int]]:
+    """Function to divide items into batches of similar cost, where an item's cost is its size plus a fixed per object
+    cost
+
+    Items are assigned largest first to the batch with the lowest cost so far (longest processing time scheduling),
+    using a heap so each assignment is O(log num_batches). Items keep their input order within a batch, and batches
+    are ordered by their first item. Empty batches are not returned.
+
+    Args:
+        items: items to divide
+        sizes: size of each item in bytes
+        num_batches: maximum number of batches
+        per_object_cost: fixed cost of each item, in bytes
+
+    Returns:
+        tuple of the batches and the total size in bytes of each batch
+    """
+    num_batches = max(1, min(num_batches, len(items)))
+    assignments: List[List[int]] = [list() for _ in range(num_batches)]
+    batch_bytes = [0] * num_batches
+
+    heap = [(0, idx) for idx in range(num_batches)]
+    for item_idx in sorted(range(len(items)), key=lambda i: sizes[i], reverse=True):
+        cost, batch_idx = heapq.heappop(heap)
+        assignments[batch_idx].append(item_idx)
+        batch_bytes[batch_idx] += sizes[item_idx]
+        heapq.heappush(heap, (cost + object_cost(sizes[item_idx], per_object_cost), batch_idx))
+
+    ordered = sorted([(sorted(a), b) for a, b in zip(assignments, batch_bytes) if a], key=lambda x: x[0][0])
+    return [[items[i] for i in a] for a, _ in ordered], [b for _, b in ordered]
+
+
+def split_chunks(items: Sequence[T], sizes: Sequence[int], max_chunk_cost: int = MAX_CHUNK_COST_BYTES,
+                 per_object_cost: int = DEFAULT_PER_OBJECT_COST_BYTES) -> List[List[T]]:
+    """Function to split a batch into consecutive chunks of at most `max_chunk_cost` (or a single item)
+
+    Args:
+        items: items to split
+        sizes: size of each item in bytes
+        max_chunk_cost: maximum cost of a chunk, in bytes
+        per_object_cost: fixed cost of each item, in bytes
+
+    Returns:
+        list of chunks
+    """
+    chunks: List[List[T]] = list()
+    current: List[T] = list()
+    current_cost = 0
+    for item, num_bytes in zip(items, sizes):
+        cost = object_cost(num_bytes, per_object_cost)
+        if current and current_cost + cost > max_chunk_cost:
+            chunks.append(current)
+            current = list()
+            current_cost = 0
+        current.append(item)
+        current_cost += cost
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class WorkStealingQueue(object):
+    """Class to share chunks of keys between a fixed set of workers running in separate processes
+
+    Each worker has its own list of chunks in redis. A worker takes chunks from the head of its own list and, once it
+    is empty, steals from the tail of the other workers' lists, so a worker that finishes early keeps helping instead of
+    going idle. Redis list operations are atomic, so each chunk is claimed by exactly one worker.
+    """
+    def __init__(self, queue_id: str, num_workers: int, redis_conn: Optional[redis.Redis] = None) -> None:
+        self.queue_id = queue_id
+        self.num_workers = num_workers
+        # Same database as the job dispatcher
+        self._redis = redis_conn or redis.Redis(db=13)
+
+    def _list_key(self, worker_index: int) -> str:
+        return f"DATASET-WORK-QUEUE|{self.queue_id}|{worker_index}"
+
+    def fill(self, worker_chunks: List[List[List[str]]]) -> None:
+        """Method to add each worker's chunks to its list
+
+        Args:
+            worker_chunks: for each worker, a list of chunks of keys
+
+        Returns:
+            None
+        """
+        pipeline = self._redis.pipeline()
+        for worker_index, chunks in enumerate(worker_chunks):
+            if chunks:
+                key = self._list_key(worker_index)
+                pipeline.rpush(key, *[json.dumps(c) for c in chunks])
+                pipeline.expire(key, WORK_QUEUE_TTL_SECONDS)
+        pipeline.execute()
+
+    def next_chunk(self, worker_index: int) -> Optional[List[str]]:
+        """Method to claim the next chunk for a worker, stealing from another worker if its own list is empty
+
+        Args:
+            worker_index: index of the worker claiming a chunk
+
+        Returns:
+            list of keys, or None if all the work has been claimed
+        """
+        # Without a count, pops return a single value (or None), never a list
+        data = cast(Optional[bytes], self._redis.lpop(self._list_key(worker_index)))
+        if data is None:
+            for offset in range(1, self.num_workers):
+                data = cast(Optional[bytes],
+                            self._redis.rpop(self._list_key((worker_index + offset) % self.num_workers)))
+                if data is not None:
+                    break
+
+        return json.loads(data.decode()) if data is not None else None
+
+    def remaining_keys(self) -> List[str]:
+        """Method to get the keys that were never claimed (e.g. because every worker failed)
+
+        Returns:
+            list
+        """
+        keys: List[str] = list()
+        for worker_index in range(self.num_workers):
+            for data in self._redis.lrange(self._list_key(worker_index), 0, -1):
+                keys.extend(json.loads(data))
+        return keys
+
+    def delete(self) -> None:
+        """Method to remove the queue
+
+        Returns:
+            None
+        """
+        self._redis.delete(*[self._list_key(i) for i in range(self.num_workers)])
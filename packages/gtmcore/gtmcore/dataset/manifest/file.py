@@ -1,12 +1,14 @@
-from typing import List, Dict, Optional, NamedTuple, TYPE_CHECKING
+from typing import List, Dict, Optional, NamedTuple, Tuple, TYPE_CHECKING, cast
 import pickle
 import os
+import time
 from enum import Enum
 from collections import OrderedDict
+from hashlib import blake2b
+from bisect import bisect_left, bisect_right
 import json
 import redis
 import glob
-import copy
 
 from gtmcore.logging import LMLogger
 
@@ -16,6 +18,22 @@ if TYPE_CHECKING:
 
 logger = LMLogger.get_logger()
 
+# Number of seconds manifest data stays in the redis cache after it was last used
+MANIFEST_CACHE_TTL = 3600
+
+# Extra seconds shard data outlives the cache marker, so the marker always expires first
+MANIFEST_SHARD_TTL_GRACE = 300
+
+# Number of items written to redis per command when populating the cache
+CACHE_WRITE_CHUNK_SIZE = 10000
+
+# A shard file is compacted once it holds this many more records than there are entries in the shard
+COMPACTION_MIN_RECORDS = 1000
+
+# Field in the manifest cache marker hash indicating the format version of the cached data
+CACHE_VERSION_FIELD = "__version__"
+CACHE_VERSION = "3"
+
 
 class PersistTaskType(Enum):
     """Enumeration of persist tasks"""
@@ -25,23 +43,42 @@ class PersistTaskType(Enum):
 
 
 # NamedTuple to capture tasks to be done to persist manifest changes to disk
-PersistTask = NamedTuple('PersistTask', [('relative_path', str), ('task', PersistTaskType), ('manifest_file', str)])
+PersistTask = NamedTuple('PersistTask', [('relative_path', str), ('task', PersistTaskType)])
 
 
-class ManifestJSONEncoder(json.JSONEncoder):
-    """A custom json encoder to output json files that will be moderately compatible with git"""
-    def encode(self, o):
-        if isinstance(o, OrderedDict):
-            output = [f'"{x}":{json.dumps(o[x], separators=(",", ":"))}' for x in o]
-            return "{\n" + ",\n".join(output) + "\n}"
+def get_shard_id(relative_path: str) -> str:
+    """Function to get the shard a manifest entry is stored in
 
-        else:
-            return json.dumps(o)
+    Entries are sharded by their parent directory, so all items in a directory are stored (and cached) together.
+
+    Args:
+        relative_path: relative path to the file or directory in the dataset
+
+    Returns:
+        str
+    """
+    parent_dir = os.path.dirname(relative_path.rstrip('/'))
+    return blake2b(parent_dir.encode('utf-8'), digest_size=1).hexdigest()
 
 
 class ManifestFileCache(object):
     """Class to provide a caching layer on top of a collection of Dataset manifest files
 
+    Each checkout context writes to its own directory of manifest files, `manifest/manifest-<checkout id>/`, which
+    contains one append-only segment file per shard (`<shard id>.jsonl`). Every line is a JSON record of an added,
+    updated, or deleted (`"d": 1`) entry with the time `t` it was written. When loading, the newest record for a path
+    wins, so changes from different checkouts merge without conflicts. Segment files are compacted once they hold
+    many superseded records.
+
+    Legacy manifest files (`manifest0` and `manifest-<checkout id>.json`) are still loaded, but are never modified.
+    Changes to entries in them are written to the current checkout's segment files.
+
+    The merged manifest is cached in redis db 1 as one hash per shard (path -> JSON entry), a sorted set of all paths
+    (for ordered, paged listing), and a marker hash at `manifest_cache_key` that records the cached shards and the
+    number of records in each of this checkout's segment files. Persisting only writes the changed entries to the
+    files and the cache. Point lookups, counts, and pages of keys are read directly from the cache without loading
+    the full manifest into memory.
+
     Note: The checkout context of the underlying dataset CANNOT change while this class is instantiated. If it does,
     you need to reload the Dataset instance and reload the Manifest instance, or run Manifest.force_reload().
 
@@ -57,6 +94,9 @@ class ManifestFileCache(object):
         self._current_checkout_id = self.dataset.checkout_id
         self._persist_queue: List[PersistTask] = list()
 
+        # Flag indicating the cache expiration has been refreshed by this instance
+        self._cache_touched = False
+
         # TODO: Support ignoring files
         # self.ignored = self._load_ignored()
 
@@ -75,10 +115,11 @@ class ManifestFileCache(object):
 
     @property
     def manifest_cache_key(self) -> str:
-        """Property to get the manifest cache key for this dataset instance
+        """Property to get the manifest cache key for this dataset instance. This key stores a marker hash indicating
+        the manifest is cached. Shard data is stored in keys prefixed with this key.
 
         Returns:
-            redis.StrictRedis
+            str
         """
         key = f"DATASET-MANIFEST-CACHE|{self._current_checkout_id}"
 
@@ -87,6 +128,62 @@ class ManifestFileCache(object):
 
         return key
 
+    def _shard_cache_key(self, shard_id: str) -> str:
+        """Method to get the cache key for a shard's hash
+
+        Args:
+            shard_id: the shard id
+
+        Returns:
+            str
+        """
+        return f"{self.manifest_cache_key}|{shard_id}"
+
+    @property
+    def _all_shard_cache_keys(self) -> List[str]:
+        """Property to get the cache keys for all possible shards"""
+        return [self._shard_cache_key(f"{x:02x}") for x in range(256)]
+
+    @property
+    def _keys_cache_key(self) -> str:
+        """Property to get the cache key for the sorted set of all paths in the manifest"""
+        return f"{self.manifest_cache_key}|keys"
+
+    def _touch_cache(self, pipe) -> None:
+        """Method to refresh the expiration of all cache keys for this manifest. Shard data and the key index always
+        outlive the marker, so a valid marker means all data is present.
+
+        Args:
+            pipe: redis pipeline to add the commands to
+
+        Returns:
+            None
+        """
+        pipe.expire(self.manifest_cache_key, MANIFEST_CACHE_TTL)
+        for key in [self._keys_cache_key, *self._all_shard_cache_keys]:
+            pipe.expire(key, MANIFEST_CACHE_TTL + MANIFEST_SHARD_TTL_GRACE)
+
+    @property
+    def checkout_manifest_name(self) -> str:
+        """Property to get the name of the manifest directory for the current checkout context
+
+        Returns:
+            str
+        """
+        _, checkout_id = self._current_checkout_id.rsplit('-', 1)
+        return f'manifest-{checkout_id}'
+
+    def _segment_file(self, shard_id: str) -> str:
+        """Method to get the absolute path to the current checkout's segment file for a shard
+
+        Args:
+            shard_id: the shard id
+
+        Returns:
+            str
+        """
+        return os.path.join(self.dataset.root_dir, 'manifest', self.checkout_manifest_name, f"{shard_id}.jsonl")
+
     def _load_legacy_manifest(self) -> OrderedDict:
         """Method to load the manifest file
 
@@ -102,18 +199,9 @@ class ManifestFileCache(object):
         else:
             return OrderedDict()
 
-    def _write_legacy_manifest(self, data: Dict) -> None:
-        """Method to write the manifest file if you've deleted or updated a value in the legacy file
-
-        Returns:
-            dict
-        """
-        with open(self._legacy_manifest_file, 'wb') as mf:
-            pickle.dump(data, mf, pickle.HIGHEST_PROTOCOL)
-
     @staticmethod
     def _load_manifest_file(filename: str) -> OrderedDict:
-        """Method to load a single manifest file
+        """Method to load a single (legacy) manifest file
 
         Returns:
             OrderedDict
@@ -128,22 +216,212 @@ class ManifestFileCache(object):
         else:
             return OrderedDict()
 
-    def _write_manifest_file(self, checkout_id: str, data: OrderedDict) -> None:
-        """Method to write a manifest file to disk
+    @staticmethod
+    def _load_segment_file(filename: str) -> List[dict]:
+        """Method to load the records in a segment file, in the order they were written
+
+        Returns:
+            list
+        """
+        records = list()
+        with open(filename, 'rt') as sf:
+            for line in sf:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+    @staticmethod
+    def _encode_record(relative_path: str, entry: Optional[dict], timestamp: float) -> str:
+        """Method to encode a single segment file record
+
+        Args:
+            relative_path: relative path to the file
+            entry: manifest data for the file, or None if deleted
+            timestamp: time the change was made
+
+        Returns:
+            str
+        """
+        if entry is None:
+            record = OrderedDict([('p', relative_path), ('d', 1), ('t', timestamp)])
+        else:
+            record = OrderedDict([('p', relative_path), ('h', entry['h']), ('m', entry['m']), ('b', entry['b']),
+                                  ('t', timestamp)])
+        return json.dumps(record, separators=(',', ':'))
+
+    @staticmethod
+    def _encode_entry(entry: dict) -> str:
+        """Method to encode a manifest entry for the cache"""
+        return json.dumps(entry, separators=(',', ':'))
+
+    @staticmethod
+    def _decode_entry(entry_bytes: bytes) -> OrderedDict:
+        """Method to decode a manifest entry from the cache"""
+        return json.loads(entry_bytes.decode(), object_pairs_hook=OrderedDict)
+
+    @staticmethod
+    def _merge_manifest_data(legacy_manifests: List[OrderedDict],
+                             segments: List[Tuple[str, List[dict]]]) -> OrderedDict:
+        """Method to merge legacy manifest data and segment file records into a single manifest
+
+        Args:
+            legacy_manifests: data from legacy manifest files, in the order they should be applied
+            segments: (manifest directory name, records) for each segment file
+
+        Returns:
+            OrderedDict of manifest data sorted by path
+        """
+        merged: Dict[str, Tuple[float, Optional[dict]]] = dict()
+
+        # Legacy files are older than any record in a segment file
+        for legacy_data in legacy_manifests:
+            for key, entry in legacy_data.items():
+                merged[key] = (-1.0, entry)
+
+        for manifest_name, records in segments:
+            for record in records:
+                key = record['p']
+                current = merged.get(key)
+                if current is not None and current[0] > record['t']:
+                    continue
+
+                if record.get('d'):
+                    merged[key] = (record['t'], None)
+                else:
+                    merged[key] = (record['t'], OrderedDict([('h', record['h']), ('m', record['m']),
+                                                             ('b', record['b']), ('fn', manifest_name)]))
+
+        manifest_data = OrderedDict()
+        for key in sorted(merged.keys()):
+            entry = merged[key][1]
+            if entry is not None:
+                manifest_data[key] = entry
+
+        return manifest_data
+
+    def _load_manifest_files(self) -> Tuple[OrderedDict, Dict[str, int]]:
+        """Method to load all manifest data from the legacy manifest files and the segment files of all checkouts
+
+        Returns:
+            (OrderedDict of manifest data sorted by path, dict of shard id -> records in this checkout's segment file)
+        """
+        legacy_manifests = [self._load_manifest_file(f) for f in
+                            sorted(glob.glob(os.path.join(self.dataset.root_dir, 'manifest', 'manifest-*.json')))]
+        legacy_manifests.append(self._load_legacy_manifest())
+
+        record_counts: Dict[str, int] = dict()
+        segments: List[Tuple[str, List[dict]]] = list()
+        for manifest_dir in sorted(glob.glob(os.path.join(self.dataset.root_dir, 'manifest', 'manifest-*/'))):
+            manifest_name = os.path.basename(manifest_dir.rstrip('/'))
+            for segment_file in sorted(glob.glob(os.path.join(manifest_dir, '*.jsonl'))):
+                records = self._load_segment_file(segment_file)
+                if manifest_name == self.checkout_manifest_name:
+                    record_counts[os.path.basename(segment_file)[:-6]] = len(records)
+                segments.append((manifest_name, records))
+
+        return self._merge_manifest_data(legacy_manifests, segments), record_counts
+
+    @classmethod
+    def load_revision(cls, dataset: 'Dataset', revision: str) -> OrderedDict:
+        """Method to load the manifest data committed at a revision, reading the manifest files directly from git
+        without checking the revision out or using the cache
+
+        Args:
+            dataset: the dataset
+            revision: commit hash or ref to load the manifest at
+
+        Returns:
+            OrderedDict of manifest data sorted by path
+        """
+        try:
+            manifest_tree = dataset.git.repo.commit(revision).tree / 'manifest'
+        except KeyError:
+            # No manifest was committed at this revision
+            return OrderedDict()
+
+        legacy_files: Dict[str, OrderedDict] = dict()
+        legacy_pickle = OrderedDict()
+        segments: List[Tuple[str, List[dict]]] = list()
+        for item in sorted(manifest_tree.traverse(), key=lambda x: x.path):
+            if item.type != 'blob':
+                continue
+
+            relative_path = os.path.relpath(item.path, 'manifest')
+            manifest_name, _, filename = relative_path.partition('/')
+            data = item.data_stream.read()
+            if relative_path == 'manifest0':
+                legacy_pickle = pickle.loads(data)
+            elif not filename and manifest_name.startswith('manifest-') and manifest_name.endswith('.json'):
+                legacy_files[manifest_name] = json.loads(data.decode(), object_pairs_hook=OrderedDict)
+            elif filename.endswith('.jsonl') and manifest_name.startswith('manifest-'):
+                records = [json.loads(line) for line in data.decode().splitlines() if line.strip()]
+                segments.append((manifest_name, records))
+
+        legacy_manifests = [legacy_files[name] for name in sorted(legacy_files.keys())]
+        legacy_manifests.append(legacy_pickle)
+        return cls._merge_manifest_data(legacy_manifests, segments)
+
+    def _cache_manifest_data(self, manifest_data: OrderedDict, record_counts: Dict[str, int]) -> None:
+        """Method to write all manifest data to the cache
 
         Args:
-            checkout_id: the checkout id for the manifest file to write
-            data: an OrderedDict containing data to write
+            manifest_data: all manifest data
+            record_counts: dict of shard id -> records in this checkout's segment file
 
         Returns:
             None
         """
-        # Remove the reverse file index before persisting to disk
-        [data[key].pop('fn', None) for key in data]
+        shards: Dict[str, Dict[str, str]] = dict()
+        for key, entry in manifest_data.items():
+            shards.setdefault(get_shard_id(key), dict())[key] = self._encode_entry(entry)
+
+        marker: Dict[str, str] = {CACHE_VERSION_FIELD: CACHE_VERSION}
+        for shard_id in set(shards.keys()).union(record_counts.keys()):
+            marker[shard_id] = str(record_counts.get(shard_id, 0))
+
+        pipe = self.redis_client.pipeline()
+        pipe.delete(self.manifest_cache_key, self._keys_cache_key, *self._all_shard_cache_keys)
+        for shard_id, shard_data in shards.items():
+            shard_items = list(shard_data.items())
+            for idx in range(0, len(shard_items), CACHE_WRITE_CHUNK_SIZE):
+                pipe.hmset(self._shard_cache_key(shard_id), dict(shard_items[idx:idx + CACHE_WRITE_CHUNK_SIZE]))
+        keys = list(manifest_data.keys())
+        for idx in range(0, len(keys), CACHE_WRITE_CHUNK_SIZE):
+            pipe.zadd(self._keys_cache_key, {key: 0 for key in keys[idx:idx + CACHE_WRITE_CHUNK_SIZE]})
+        # Set the marker last, so the cache is only used once fully populated
+        pipe.hmset(self.manifest_cache_key, dict(marker.items()))
+        self._touch_cache(pipe)
+        pipe.execute()
+        self._cache_touched = True
+
+    def _load_cached_manifest_data(self) -> Optional[OrderedDict]:
+        """Method to load all manifest data from the cache
+
+        Returns:
+            OrderedDict of manifest data sorted by path, or None if not cached
+        """
+        marker = cast(Dict[bytes, bytes], self.redis_client.hgetall(self.manifest_cache_key))
+        if marker.get(CACHE_VERSION_FIELD.encode()) != CACHE_VERSION.encode():
+            return None
+
+        shard_keys = [self._shard_cache_key(x.decode()) for x in marker.keys()
+                      if x.decode() != CACHE_VERSION_FIELD]
+        pipe = self.redis_client.pipeline()
+        for shard_key in shard_keys:
+            pipe.hgetall(shard_key)
+        self._touch_cache(pipe)
+        results = pipe.execute()
+        self._cache_touched = True
+
+        unsorted_data = dict()
+        for shard_data in results[:len(shard_keys)]:
+            unsorted_data.update(shard_data)
 
-        # Pop off just the unique checkout ID
-        with open(os.path.join(self.dataset.root_dir, 'manifest', f'manifest-{checkout_id}.json'), 'wt') as mf:
-            json.dump(data, mf, cls=ManifestJSONEncoder)
+        manifest_data = OrderedDict()
+        for key in sorted(unsorted_data.keys()):
+            manifest_data[key.decode()] = self._decode_entry(unsorted_data[key])
+        return manifest_data
 
     def _load_manifest_data(self) -> OrderedDict:
         """Method to load all manifest data, either from the memory cache or from all the manifest files
@@ -151,26 +429,11 @@ class ManifestFileCache(object):
         Returns:
             OrderedDict
         """
-        manifest_data = OrderedDict()
-        cache_bytes = self.redis_client.get(self.manifest_cache_key)
-        if cache_bytes:
-            # Load from cache
-            manifest_data = json.loads(cache_bytes.decode(),
-                                       object_pairs_hook=OrderedDict)
-            self.redis_client.expire(self.manifest_cache_key, 3600)
-        else:
-            # Load from files
-            for manifest_file in glob.glob(os.path.join(self.dataset.root_dir, 'manifest', 'manifest-*')):
-                manifest_data.update(self._load_manifest_file(manifest_file))
-
-            # Check for legacy manifest and load if needed
-            if os.path.exists(self._legacy_manifest_file):
-                manifest_data.update(self._load_legacy_manifest())
-
-            # Cache manifest data
-            if manifest_data:
-                self.redis_client.set(self.manifest_cache_key, json.dumps(manifest_data, separators=(',', ':')))
-                self.redis_client.expire(self.manifest_cache_key, 3600)
+        manifest_data = self._load_cached_manifest_data()
+        if manifest_data is None:
+            # Load from files and cache
+            manifest_data, record_counts = self._load_manifest_files()
+            self._cache_manifest_data(manifest_data, record_counts)
 
         return manifest_data
 
@@ -182,62 +445,250 @@ class ManifestFileCache(object):
         Returns:
             None
         """
-        if self.redis_client.exists(self.manifest_cache_key):
-            self.redis_client.delete(self.manifest_cache_key)
+        self.redis_client.delete(self.manifest_cache_key, self._keys_cache_key, *self._all_shard_cache_keys)
 
         self._manifest = OrderedDict()
+        self._cache_touched = False
+
+    def _compact_segment_file(self, shard_id: str) -> int:
+        """Method to rewrite a segment file, keeping only the latest record for each path
+
+        Returns:
+            number of records in the compacted file
+        """
+        segment_file = self._segment_file(shard_id)
+        latest: Dict[str, dict] = OrderedDict()
+        for record in self._load_segment_file(segment_file):
+            latest.pop(record['p'], None)
+            latest[record['p']] = record
+
+        tmp_file = f"{segment_file}.tmp"
+        with open(tmp_file, 'wt') as sf:
+            for record in latest.values():
+                sf.write(json.dumps(record, separators=(',', ':')) + "\n")
+        os.replace(tmp_file, segment_file)
+
+        logger.info(f"Compacted manifest segment {segment_file} to {len(latest)} records")
+        return len(latest)
 
     def persist(self) -> None:
-        """Method to persist changes to the manifest to the cache and any associated manifest file
+        """Method to persist changes to the manifest to the cache and the current checkout's segment files
 
         Returns:
             None
         """
         try:
-            # Repack tasks by manifest file
-            file_groups: Dict[str, List[PersistTask]] = dict()
+            # Repack final state of changed entries by shard
+            shard_changes: Dict[str, Dict[str, Optional[dict]]] = dict()
             for task in self._persist_queue:
-                if task.manifest_file in file_groups:
-                    file_groups[task.manifest_file].append(task)
-                else:
-                    file_groups[task.manifest_file] = [task]
-
-            # Update manifest files
-            for manifest_file in file_groups:
-                if manifest_file == "manifest0":
-                    data = self._load_legacy_manifest()
-                    for task in file_groups[manifest_file]:
-                        if task.task == PersistTaskType.DELETE:
-                            del data[task.relative_path]
-                        else:
-                            data[task.relative_path] = self._manifest[task.relative_path]
-
-                    self._write_legacy_manifest(data)
-                else:
-                    full_manifest_file_path = os.path.join(self.dataset.root_dir, 'manifest', manifest_file)
-                    data = self._load_manifest_file(full_manifest_file_path)
-                    for task in file_groups[manifest_file]:
-                        if task.task == PersistTaskType.DELETE:
-                            del data[task.relative_path]
-                        else:
-                            data[task.relative_path] = copy.deepcopy(self._manifest[task.relative_path])
-                    checkout_id = manifest_file[9:-5]  # strips off manifest- and .json from file name to get id
-                    self._write_manifest_file(checkout_id, data)
-
-            # Persist to cache
-            self.redis_client.set(self.manifest_cache_key, json.dumps(self._manifest, separators=(',', ':')))
-            self.redis_client.expire(self.manifest_cache_key, 3600)
+                shard_changes.setdefault(get_shard_id(task.relative_path),
+                                         dict())[task.relative_path] = self._manifest.get(task.relative_path)
+
+            if not shard_changes:
+                return
+
+            # Append changes to segment files
+            timestamp = time.time()
+            os.makedirs(os.path.dirname(self._segment_file('00')), exist_ok=True)
+            for shard_id, changes in shard_changes.items():
+                with open(self._segment_file(shard_id), 'at') as sf:
+                    sf.write("".join([self._encode_record(key, entry, timestamp) + "\n"
+                                      for key, entry in changes.items()]))
+
+            # Update the cache, if it is populated. Otherwise it will be loaded from the files on next use.
+            if self.redis_client.hget(self.manifest_cache_key, CACHE_VERSION_FIELD) is None:
+                return
+
+            pipe = self.redis_client.pipeline()
+            for shard_id, changes in shard_changes.items():
+                shard_key = self._shard_cache_key(shard_id)
+                updated = {key: self._encode_entry(entry) for key, entry in changes.items() if entry is not None}
+                deleted = [key for key, entry in changes.items() if entry is None]
+                if updated:
+                    pipe.hmset(shard_key, dict(updated.items()))
+                    pipe.zadd(self._keys_cache_key, {key: 0 for key in updated})
+                if deleted:
+                    pipe.hdel(shard_key, *deleted)
+                    pipe.zrem(self._keys_cache_key, *deleted)
+                pipe.hincrby(self.manifest_cache_key, shard_id, len(changes))
+            self._touch_cache(pipe)
+            pipe.execute()
+
+            # Compact segment files that have built up superseded records
+            pipe = self.redis_client.pipeline()
+            for shard_id in shard_changes:
+                pipe.hget(self.manifest_cache_key, shard_id)
+                pipe.hlen(self._shard_cache_key(shard_id))
+            shard_stats = pipe.execute()
+            for shard_id, num_records, num_entries in zip(shard_changes.keys(), shard_stats[0::2],
+                                                          shard_stats[1::2]):
+                if int(num_records) > 2 * num_entries + COMPACTION_MIN_RECORDS:
+                    num_records = self._compact_segment_file(shard_id)
+                    self.redis_client.hset(self.manifest_cache_key, shard_id, num_records)
 
         except Exception as err:
             logger.error("An error occurred while trying to persist manifest data to disk.")
             logger.exception(err)
 
             # Clear data so it all reloads from disk
-            self._manifest = OrderedDict()
+            self.evict()
             raise IOError("An error occurred while trying to persist manifest data to disk. Refresh and try again")
         finally:
             self._persist_queue = list()
 
+    def _ensure_cached(self) -> None:
+        """Method to make sure the manifest is in the cache (loading it from the files if not), so partial reads can
+        be served directly from the cache
+
+        Returns:
+            None
+        """
+        if self._cache_touched:
+            return
+
+        pipe = self.redis_client.pipeline()
+        pipe.hget(self.manifest_cache_key, CACHE_VERSION_FIELD)
+        self._touch_cache(pipe)
+        cached_version = pipe.execute()[0]
+        if cached_version != CACHE_VERSION.encode():
+            # Loading from the files also populates the cache
+            self._manifest = self._load_manifest_data()
+
+        self._cache_touched = True
+
+    def get_entry(self, relative_path: str) -> Optional[OrderedDict]:
+        """Method to get the manifest data for a single path, without loading the full manifest
+
+        Args:
+            relative_path: relative path to the file
+
+        Returns:
+            OrderedDict or None if not in the manifest
+        """
+        return self.get_entries([relative_path])[0]
+
+    def get_entries(self, relative_paths: List[str]) -> List[Optional[OrderedDict]]:
+        """Method to get the manifest data for a list of paths in a single round trip, without loading the full
+        manifest
+
+        Args:
+            relative_paths: relative paths to the files
+
+        Returns:
+            list of OrderedDict (or None if not in the manifest), in the same order as `relative_paths`
+        """
+        if not self._manifest:
+            self._ensure_cached()
+        if self._manifest:
+            return [self._manifest.get(p) for p in relative_paths]
+
+        pipe = self.redis_client.pipeline()
+        for relative_path in relative_paths:
+            pipe.hget(self._shard_cache_key(get_shard_id(relative_path)), relative_path)
+        return [self._decode_entry(x) if x is not None else None for x in pipe.execute()]
+
+    def count(self) -> int:
+        """Method to get the number of entries in the manifest, without loading the full manifest
+
+        Returns:
+            int
+        """
+        if not self._manifest:
+            self._ensure_cached()
+        if self._manifest:
+            return len(self._manifest)
+
+        return self.redis_client.zcard(self._keys_cache_key)
+
+    def list_keys(self, start: int, end: Optional[int] = None) -> List[str]:
+        """Method to get a range of paths from the manifest, ordered by path, without loading the full manifest
+
+        Args:
+            start: index of the first path to return
+            end: index after the last path to return, or None for all remaining paths
+
+        Returns:
+            list
+        """
+        if self._persist_queue:
+            # Unpersisted changes are only in memory
+            return sorted(self._manifest.keys())[start:end]
+
+        if end is not None and end <= start:
+            return list()
+        self._ensure_cached()
+        stop = end - 1 if end is not None else -1
+        keys = cast(List[bytes], self.redis_client.zrange(self._keys_cache_key, start, stop))
+        return [x.decode() for x in keys]
+
+    def _list_key_range(self, lower: Optional[str], inclusive: bool, upper: Optional[str], num: int) -> List[str]:
+        """Method to get up to `num` paths from the manifest that sort between `lower` and `upper`, ordered by path
+
+        Args:
+            lower: lower bound, or None to start at the first path
+            inclusive: if True, `lower` itself is included in the range
+            upper: exclusive upper bound, or None to continue to the last path
+            num: max number of paths to return
+
+        Returns:
+            list
+        """
+        if self._persist_queue:
+            # Unpersisted changes are only in memory
+            keys = sorted(self._manifest.keys())
+            if lower is None:
+                start = 0
+            else:
+                start = bisect_left(keys, lower) if inclusive else bisect_right(keys, lower)
+            end = bisect_left(keys, upper) if upper is not None else len(keys)
+            return keys[start:min(end, start + num)]
+
+        self._ensure_cached()
+        min_value = '-' if lower is None else f"{'[' if inclusive else '('}{lower}"
+        max_value = '+' if upper is None else f"({upper}"
+        keys = cast(List[bytes], self.redis_client.zrangebylex(self._keys_cache_key, min_value, max_value, 0, num))
+        return [x.decode() for x in keys]
+
+    def list_keys_after(self, after: Optional[str], num: int, directory: Optional[str] = None) -> List[str]:
+        """Method to get a page of paths from the manifest, ordered by path, starting after the path `after`. Since
+        the cursor is a path and not a position, pages stay stable while files are added or removed.
+
+        Args:
+            after: path to start after, or None to start at the beginning
+            num: max number of paths to return
+            directory: Optional directory (with a trailing slash, or '' for the root) to only list the direct
+                       children of
+
+        Returns:
+            list
+        """
+        lower, inclusive, upper = after, False, None
+        if directory:
+            # '0' is the character after '/', so this bounds the range to everything in `directory`
+            upper = directory[:-1] + '0'
+            if lower is None or lower < directory:
+                lower = directory
+
+        keys: List[str] = list()
+        while len(keys) < num:
+            requested = num - len(keys)
+            batch = self._list_key_range(lower, inclusive, upper, requested)
+            for key in batch:
+                if directory is not None:
+                    child = key[len(directory):]
+                    sep = child.find('/')
+                    if 0 <= sep < len(child) - 1:
+                        # Nested below a subdirectory, so skip past the rest of that subdirectory
+                        lower, inclusive = directory + child[:sep] + '0', True
+                        break
+                keys.append(key)
+            else:
+                if len(batch) < requested:
+                    break
+                lower, inclusive = batch[-1], False
+
+        return keys
+
     def get_manifest(self) -> OrderedDict:
         """Method to get the current manifest
 
@@ -267,22 +718,18 @@ class ManifestFileCache(object):
         # Make sure manifest is loaded
         self.get_manifest()
 
-        _, checkout_id = self._current_checkout_id.rsplit('-', 1)
         if relative_path in self._manifest:
             task_type = PersistTaskType.UPDATE
-            manifest_file = self._manifest[relative_path]['fn']
         else:
             task_type = PersistTaskType.ADD
-            manifest_file = f'manifest-{checkout_id}.json'
 
         self._manifest[relative_path] = OrderedDict([('h', content_hash),
                                                      ('m', modified_on),
                                                      ('b', num_bytes),
-                                                     ('fn', manifest_file)])
+                                                     ('fn', self.checkout_manifest_name)])
 
         self._persist_queue.append(PersistTask(relative_path=relative_path,
-                                               task=task_type,
-                                               manifest_file=manifest_file))
+                                               task=task_type))
 
     def remove(self, relative_path: str) -> None:
         """Method to remove a file from the manifest
@@ -299,10 +746,7 @@ class ManifestFileCache(object):
         # Make sure manifest is loaded
         self.get_manifest()
 
-        manifest_file = self._manifest[relative_path]['fn']
         del self._manifest[relative_path]
 
         self._persist_queue.append(PersistTask(relative_path=relative_path,
-                                               task=PersistTaskType.DELETE,
-                                               manifest_file=manifest_file))
-
+                                               task=PersistTaskType.DELETE))
@@ -1,51 +1,378 @@
 from hashlib import blake2b
-import aiofiles
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 
-from typing import List, Optional
+from collections.abc import Mapping
+from typing import AsyncIterator, List, Optional, Dict, Tuple, Iterator
 import pickle
+import sqlite3
 import os
 from gtmcore.logging import LMLogger
+from gtmcore.dataset.manifest.eventloop import get_event_loop
 
 logger = LMLogger.get_logger()
 
+# Files larger than this are hashed in their own task so a single big file doesn't hold up a batch of small files
+LARGE_FILE_BYTES = 64 * 1024 * 1024
+
+# Maximum number of bytes and files grouped into a single task submitted to the hashing process pool
+MAX_BATCH_BYTES = 256 * 1024 * 1024
+MAX_BATCH_FILES = 1000
+
+# Size of the reusable read buffer used when streaming file contents into the hash function
+READ_BUFFER_BYTES = 4 * 1024 * 1024
+
+# Max number of paths bound to a single query (SQLite limits the number of host parameters to 999 by default)
+MAX_QUERY_PARAMS = 900
+
+
+def _hash_file(abs_path: str, buffer: memoryview) -> Optional[str]:
+    """Function to compute the blake2b hash of a single file, reading into a pre-allocated buffer
+
+    Args:
+        abs_path: Absolute path to the file or directory
+        buffer: Reusable buffer to read file contents into
+
+    Returns:
+        str
+    """
+    h = blake2b()
+    try:
+        if os.path.isfile(abs_path):
+            with open(abs_path, 'rb', buffering=0) as fh:
+                num_bytes = fh.readinto(buffer)
+                while num_bytes:
+                    h.update(buffer[:num_bytes])
+                    num_bytes = fh.readinto(buffer)
+        elif os.path.isdir(abs_path):
+            # If a directory, just hash the path as an alternative
+            h.update(abs_path.encode('utf-8'))
+        else:
+            return None
+    except Exception as err:
+        logger.exception(err)
+        return None
 
-class SmartHash(object):
-    """Class to handle file hashing that is operationally optimized for Gigantum"""
+    return h.hexdigest()
 
-    def __init__(self, root_dir: str, file_cache_root: str, current_revision: str) -> None:
-        self.root_dir = root_dir
-        self.file_cache_root = file_cache_root
-        self.current_revision = current_revision
 
-        self.fast_hash_data = self._load_fast_hash_file()
+def _hash_file_batch(abs_paths: List[str], buffer_size: int = READ_BUFFER_BYTES) -> List[Optional[str]]:
+    """Function to hash a batch of files. This runs inside a hashing worker process, so it must be a module level
+    function that can be pickled.
 
-        self.hashing_block_size = 65536
+    Args:
+        abs_paths: List of absolute paths to hash
+        buffer_size: Size of the read buffer in bytes
 
-    @property
-    def fast_hash_file(self):
-        hash_file_dir = os.path.join(self.file_cache_root, self.current_revision)
-        return os.path.join(hash_file_dir, ".smarthash")
+    Returns:
+        list
+    """
+    buffer = memoryview(bytearray(buffer_size))
+    return [_hash_file(p, buffer) for p in abs_paths]
+
+
+def format_fast_hash(relative_path: str, num_bytes: int, mtime_ns: int) -> str:
+    """Function to format a fast hash record as a string
+
+    Note, the delimiter `||` is used as it's unlikely to be in a path. Hash structure:
+
+    relative file path || size in bytes || mtime
+
+    Args:
+        relative_path: relative path to the file in the dataset
+        num_bytes: size of the file in bytes
+        mtime_ns: modified time of the file in nanoseconds
+
+    Returns:
+        str
+    """
+    return f"{relative_path}||{num_bytes}||{mtime_ns / 1e9}"
 
-    def _load_fast_hash_file(self) -> dict:
-        """Method to load the cached fast hash file
+
+class FastHashIndex(Mapping):
+    """Class to store fast hash records of (path, size in bytes, mtime in ns) in a SQLite database
+
+    Records are added, updated and removed in place, so an update only touches the changed rows instead of
+    rewriting the entire index. The index is read through the Mapping interface (path -> fast hash string) or in
+    bulk via get_records(). The database file is only created on the first write.
+
+    Legacy index files, which were a pickled dict of fast hash strings, are migrated the first time they are opened.
+    """
+    SQLITE_HEADER = b"SQLite format 3\x00"
+
+    def __init__(self, index_file: str) -> None:
+        self.index_file = index_file
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self, create: bool) -> Optional[sqlite3.Connection]:
+        """Method to get a connection to the index database
+
+        Args:
+            create: If True, create the database if it doesn't exist yet
 
         Returns:
-            dict
+            sqlite3.Connection or None if the index doesn't exist and `create` is False
         """
-        if os.path.exists(self.fast_hash_file):
-            with open(self.fast_hash_file, 'rb') as mf:
-                return pickle.load(mf)
+        if self._conn:
+            return self._conn
+
+        if not os.path.exists(self.index_file):
+            if not create:
+                return None
+            legacy_data: Dict[str, str] = dict()
         else:
-            return dict()
+            legacy_data = self._load_legacy_index()
+
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError as err:
+            # The index is only a cache of file metadata, so if it is corrupt start over and it will be rebuilt
+            logger.warning(f"Fast hash index {self.index_file} is invalid and will be reset: {err}")
+            os.remove(self.index_file)
+            self._conn = self._open()
+
+        if legacy_data:
+            self._migrate_legacy_index(legacy_data)
+
+        return self._conn
 
-    def _save_fast_hash_file(self) -> None:
-        """Method to save the cached fast hash file
+    def _open(self) -> sqlite3.Connection:
+        """Method to open the database and create the schema if needed
+
+        Returns:
+            sqlite3.Connection
+        """
+        conn = sqlite3.connect(self.index_file, timeout=30)
+        # Journal in memory so no extra files are written into the revision directory
+        conn.execute("PRAGMA journal_mode=MEMORY")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("CREATE TABLE IF NOT EXISTS fast_hash (path_id INTEGER PRIMARY KEY, "
+                     "path TEXT NOT NULL UNIQUE, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL)")
+        conn.commit()
+        return conn
+
+    def _load_legacy_index(self) -> Dict[str, str]:
+        """Method to load a legacy (pickled dict) index file, removing it so it can be replaced by the database
 
         Returns:
             dict
         """
-        with open(self.fast_hash_file, 'wb') as mf:
-            pickle.dump(self.fast_hash_data, mf, pickle.HIGHEST_PROTOCOL)
+        with open(self.index_file, 'rb') as fh:
+            if fh.read(len(self.SQLITE_HEADER)) == self.SQLITE_HEADER:
+                return dict()
+            fh.seek(0)
+            try:
+                data = pickle.load(fh)
+            except Exception as err:
+                logger.warning(f"Failed to load legacy fast hash index {self.index_file}: {err}")
+                data = dict()
+
+        os.remove(self.index_file)
+        return data
+
+    def _migrate_legacy_index(self, legacy_data: Dict[str, str]) -> None:
+        """Method to convert legacy fast hash strings to records
+
+        Legacy records stored mtime as a float, which can't be converted to nanoseconds exactly. If the file
+        still matches the legacy record, the current stat result is stored so the file isn't flagged as modified.
+
+        Args:
+            legacy_data: dict of relative path -> fast hash string
+
+        Returns:
+            None
+        """
+        root_dir = os.path.dirname(self.index_file)
+        records = list()
+        for relative_path, fast_hash_str in legacy_data.items():
+            _, num_bytes, mtime = fast_hash_str.rsplit("||", 2)
+            try:
+                file_info = os.stat(os.path.join(root_dir, relative_path))
+                if f"{relative_path}||{file_info.st_size}||{file_info.st_mtime}" == fast_hash_str:
+                    records.append((relative_path, file_info.st_size, file_info.st_mtime_ns))
+                    continue
+            except OSError:
+                pass
+            records.append((relative_path, int(num_bytes), int(float(mtime) * 1e9)))
+
+        self.put_records(records)
+        logger.info(f"Migrated {len(records)} records from legacy fast hash index {self.index_file}")
+
+    def close(self) -> None:
+        """Method to close the database connection
+
+        Returns:
+            None
+        """
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def __getitem__(self, relative_path: str) -> str:
+        record = self.get_record(relative_path)
+        if record is None:
+            raise KeyError(relative_path)
+        return format_fast_hash(relative_path, record[0], record[1])
+
+    def __contains__(self, relative_path: object) -> bool:
+        return self.get_record(str(relative_path)) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        conn = self._connect(create=False)
+        if conn:
+            for row in conn.execute("SELECT path FROM fast_hash ORDER BY path_id"):
+                yield row[0]
+
+    def __len__(self) -> int:
+        conn = self._connect(create=False)
+        if not conn:
+            return 0
+        return conn.execute("SELECT COUNT(*) FROM fast_hash").fetchone()[0]
+
+    def get_record(self, relative_path: str) -> Optional[Tuple[int, int]]:
+        """Method to get the (size, mtime_ns) record for a single path
+
+        Args:
+            relative_path: relative path to the file in the dataset
+
+        Returns:
+            tuple or None if not in the index
+        """
+        conn = self._connect(create=False)
+        if not conn:
+            return None
+        row = conn.execute("SELECT size, mtime_ns FROM fast_hash WHERE path = ?", (relative_path,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def get_records(self, prefix: Optional[str] = None, children_only: bool = False,
+                    directories_only: bool = False) -> Dict[str, Tuple[int, int]]:
+        """Method to load records from the index in a single query
+
+        Args:
+            prefix: Optional directory (with a trailing slash, or '' for the root) to load records from
+            children_only: If True, only load the direct children of `prefix` instead of the whole subtree
+            directories_only: If True, only load records for directories
+
+        Returns:
+            dict of relative path -> (size, mtime_ns)
+        """
+        conn = self._connect(create=False)
+        if not conn:
+            return dict()
+
+        query = "SELECT path, size, mtime_ns FROM fast_hash"
+        conditions: List[str] = list()
+        params: List = list()
+        if prefix:
+            # Range scan on the path index. '0' is the character after '/', so this matches everything in `prefix`
+            conditions.append("path > ? AND path < ?")
+            params.extend([prefix, prefix[:-1] + '0'])
+        if children_only:
+            offset = len(prefix) + 1 if prefix else 1
+            conditions.append("instr(rtrim(substr(path, ?), '/'), '/') = 0")
+            params.append(offset)
+        if directories_only:
+            conditions.append("path LIKE '%/'")
+        if conditions:
+            query = f"{query} WHERE {' AND '.join(conditions)}"
+
+        return {row[0]: (row[1], row[2]) for row in conn.execute(query, params)}
+
+    def get_records_for_paths(self, relative_paths: List[str]) -> Dict[str, Tuple[int, int]]:
+        """Method to load the records for a list of paths, using as few queries as possible
+
+        Args:
+            relative_paths: relative paths to the files in the dataset
+
+        Returns:
+            dict of relative path -> (size, mtime_ns), for the paths that are in the index
+        """
+        conn = self._connect(create=False)
+        if not conn:
+            return dict()
+
+        result: Dict[str, Tuple[int, int]] = dict()
+        for idx in range(0, len(relative_paths), MAX_QUERY_PARAMS):
+            chunk = relative_paths[idx:idx + MAX_QUERY_PARAMS]
+            query = f"SELECT path, size, mtime_ns FROM fast_hash WHERE path IN ({','.join('?' * len(chunk))})"
+            result.update({row[0]: (row[1], row[2]) for row in conn.execute(query, chunk)})
+        return result
+
+    def put_records(self, records: List[Tuple[str, int, int]]) -> None:
+        """Method to add or update records in a single transaction
+
+        Args:
+            records: list of (relative path, size, mtime_ns) tuples
+
+        Returns:
+            None
+        """
+        conn = self._connect(create=True)
+        if conn is None:
+            raise IOError(f"Failed to create fast hash index {self.index_file}")
+        with conn:
+            # Update in place first (keeping path_id stable), then insert anything new
+            conn.executemany("UPDATE fast_hash SET size = ?, mtime_ns = ? WHERE path = ?",
+                             [(r[1], r[2], r[0]) for r in records])
+            conn.executemany("INSERT OR IGNORE INTO fast_hash (path, size, mtime_ns) VALUES (?, ?, ?)", records)
+
+    def delete_records(self, paths: List[str]) -> None:
+        """Method to remove records in a single transaction
+
+        Args:
+            paths: list of relative paths to remove
+
+        Returns:
+            None
+        """
+        conn = self._connect(create=False)
+        if not conn:
+            return
+        with conn:
+            conn.executemany("DELETE FROM fast_hash WHERE path = ?", [(p,) for p in paths])
+
+    def clear(self) -> None:
+        """Method to remove all records from the index
+
+        Returns:
+            None
+        """
+        conn = self._connect(create=False)
+        if not conn:
+            return
+        with conn:
+            conn.execute("DELETE FROM fast_hash")
+
+
+class SmartHash(object):
+    """Class to handle file hashing that is operationally optimized for Gigantum"""
+
+    def __init__(self, root_dir: str, file_cache_root: str, current_revision: str, num_workers: int = 1) -> None:
+        self.root_dir = root_dir
+        self.file_cache_root = file_cache_root
+        self._current_revision = current_revision
+
+        # Number of processes to use when computing content hashes
+        self.num_workers = num_workers
+
+        self.fast_hash_data = FastHashIndex(self.fast_hash_file)
+
+    @property
+    def current_revision(self) -> str:
+        return self._current_revision
+
+    @current_revision.setter
+    def current_revision(self, value: str) -> None:
+        """Setting the revision switches to the fast hash index stored in that revision's directory"""
+        if value != self._current_revision:
+            self._current_revision = value
+            self.fast_hash_data.close()
+            self.fast_hash_data = FastHashIndex(self.fast_hash_file)
+
+    @property
+    def fast_hash_file(self):
+        hash_file_dir = os.path.join(self.file_cache_root, self.current_revision)
+        return os.path.join(hash_file_dir, ".smarthash")
 
     def get_abs_path(self, relative_path: str) -> str:
         """Method to generate the absolute path to the file
@@ -81,7 +408,7 @@ class SmartHash(object):
         Returns:
 
         """
-        return self._compute_fast_hash(path) != self.fast_hash_data.get(path)
+        return self._stat_file(path) != self.fast_hash_data.get_record(path)
 
     def get_deleted_files(self, file_list: List[str]) -> list:
         """Method to list files that have previously been in the fast hash (exist locally) and have been removed
@@ -92,7 +419,8 @@ class SmartHash(object):
         Returns:
 
         """
-        return sorted(list(set(self.fast_hash_data.keys()).difference(file_list)))
+        file_set = set(file_list)
+        return sorted([p for p in self.fast_hash_data if p not in file_set])
 
     def delete_fast_hashes(self, file_list: List[str]) -> None:
         """Method to remove fast hashes from the stored hash file
@@ -103,10 +431,30 @@ class SmartHash(object):
         Returns:
 
         """
-        for f in file_list:
-            del self.fast_hash_data[f]
+        self.fast_hash_data.delete_records(file_list)
+
+    def clear_fast_hashes(self) -> None:
+        """Method to remove all fast hashes from the stored hash file
 
-        self._save_fast_hash_file()
+        Returns:
+            None
+        """
+        self.fast_hash_data.clear()
+
+    def _stat_file(self, relative_path: str) -> Optional[Tuple[int, int]]:
+        """Method to get the (size, mtime_ns) of a file, or None if it doesn't exist
+
+        Args:
+            relative_path:
+
+        Returns:
+            tuple
+        """
+        try:
+            file_info = os.stat(self.get_abs_path(relative_path))
+        except FileNotFoundError:
+            return None
+        return file_info.st_size, file_info.st_mtime_ns
 
     def _compute_fast_hash(self, relative_path: str) -> Optional[str]:
         """
@@ -121,12 +469,10 @@ class SmartHash(object):
         Returns:
             str
         """
-        abs_path = self.get_abs_path(relative_path)
-        fast_hash_val = None
-        if os.path.exists(abs_path):
-            file_info = os.stat(abs_path)
-            fast_hash_val = f"{relative_path}||{file_info.st_size}||{file_info.st_mtime}"
-        return fast_hash_val
+        record = self._stat_file(relative_path)
+        if record is None:
+            return None
+        return format_fast_hash(relative_path, record[0], record[1])
 
     def fast_hash(self, path_list: list, save: bool = True) -> List[Optional[str]]:
         """
@@ -144,57 +490,97 @@ class SmartHash(object):
         """
         fast_hash_result: List[Optional[str]] = list()
         if len(path_list) > 0:
-            fast_hash_result = [self._compute_fast_hash(x) for x in path_list]
+            records = [self._stat_file(x) for x in path_list]
+            fast_hash_result = [format_fast_hash(p, r[0], r[1]) if r else None for p, r in zip(path_list, records)]
 
             if save:
-                for p, h in zip(path_list, fast_hash_result):
-                    if h:
-                        self.fast_hash_data[p] = h
-
-                self._save_fast_hash_file()
+                self.fast_hash_data.put_records([(p, r[0], r[1]) for p, r in zip(path_list, records) if r])
 
         return fast_hash_result
 
-    async def compute_file_hash(self, path: str, blocksize: int = 4096) -> Optional[str]:
-        """Method to compute the black2b hash for the provided file
+    def _batch_paths(self, abs_paths: List[str]) -> List[List[int]]:
+        """Method to group files into batches of work for the hashing workers. Large files get their own batch, and
+        small files are grouped until a batch is either MAX_BATCH_BYTES or MAX_BATCH_FILES in size.
 
         Args:
-            path: Relative path to the file
-            blocksize: Blocksize to use when reading the file and computing the hash
+            abs_paths: List of absolute paths to hash
 
         Returns:
-            str
+            list of lists of indexes into `abs_paths`
         """
-        h = blake2b()
-        try:
-            abs_path = self.get_abs_path(path)
-            if os.path.isfile(abs_path):
-                async with aiofiles.open(abs_path, 'rb') as fh:
-                    chunk = await fh.read(blocksize)
-                    while chunk:
-                        h.update(chunk)
-                        chunk = await fh.read(blocksize)
-            elif os.path.isdir(abs_path):
-                # If a directory, just hash the path as an alternative
-                h.update(abs_path.encode('utf-8'))
-            else:
-                return None
-        except Exception as err:
-            logger.exception(err)
-            return None
+        batches: List[List[int]] = list()
+        current_batch: List[int] = list()
+        current_bytes = 0
+        for idx, abs_path in enumerate(abs_paths):
+            try:
+                num_bytes = os.path.getsize(abs_path)
+            except OSError:
+                # Missing files are handled (and return None) in the worker
+                num_bytes = 0
+
+            if num_bytes >= LARGE_FILE_BYTES:
+                batches.append([idx])
+                continue
+
+            current_batch.append(idx)
+            current_bytes += num_bytes
+            if current_bytes >= MAX_BATCH_BYTES or len(current_batch) >= MAX_BATCH_FILES:
+                batches.append(current_batch)
+                current_batch = list()
+                current_bytes = 0
+
+        if current_batch:
+            batches.append(current_batch)
+
+        return batches
+
+    async def hash_batches(self, path_list: List[str]) -> AsyncIterator[Tuple[List[int], List[Optional[str]]]]:
+        """Method to compute the blake2b hash of a file's contents, yielding results as each batch completes.
+
+        Files are grouped into batches and hashed in a pool of `self.num_workers` processes. Batches are yielded in
+        the order they complete, so callers can start processing results while hashing continues.
 
-        return h.hexdigest()
+        Args:
+            path_list: List of relative paths to hash
+
+        Returns:
+            async iterator of (indexes into `path_list`, hashes) for each batch
+        """
+        abs_paths = [self.get_abs_path(p) for p in path_list]
+        batches = self._batch_paths(abs_paths)
+        if not batches:
+            return
+
+        loop = get_event_loop()
+        num_workers = min(self.num_workers, len(batches))
+        if num_workers > 1:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                async def hash_batch(batch: List[int]) -> Tuple[List[int], List[Optional[str]]]:
+                    return batch, await loop.run_in_executor(executor, _hash_file_batch,
+                                                             [abs_paths[i] for i in batch])
+
+                for next_result in asyncio.as_completed([hash_batch(b) for b in batches]):
+                    yield await next_result
+        else:
+            # Not enough work (or cores) to justify worker processes. Hash off the event loop in a thread.
+            for batch in batches:
+                yield batch, await loop.run_in_executor(None, _hash_file_batch, [abs_paths[i] for i in batch])
 
     async def hash(self, path_list: List[str]) -> List[Optional[str]]:
         """Method to compute the blake2b hash of a file's contents.
 
+        Files are grouped into batches and hashed in a pool of `self.num_workers` processes. Results are returned
+        in the same order as `path_list`.
+
         Args:
-            path_list:
+            path_list: List of relative paths to hash
 
         Returns:
             list
         """
-        hash_result_list: List[Optional[str]] = [await self.compute_file_hash(path,
-                                                 self.hashing_block_size) for path in path_list]
+        hash_result_list: List[Optional[str]] = [None] * len(path_list)
+        async for batch, batch_result in self.hash_batches(path_list):
+            for idx, hash_str in zip(batch, batch_result):
+                hash_result_list[idx] = hash_str
 
         return hash_result_list
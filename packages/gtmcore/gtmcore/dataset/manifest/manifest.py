@@ -1,4 +1,4 @@
-from typing import Callable, List, Dict, Any, Tuple, Optional, TYPE_CHECKING
+from typing import Callable, List, Dict, Any, Set, Tuple, Optional, TYPE_CHECKING
 import pickle
 from typing import List, Dict, Any, Tuple, Optional
 
@@ -19,6 +19,7 @@ from gtmcore.dataset.manifest.hash import SmartHash
 from gtmcore.dataset.manifest.file import ManifestFileCache
 from gtmcore.dataset.cache import get_cache_manager_class, CacheManager
 from gtmcore.dataset.manifest.eventloop import get_event_loop
+from gtmcore.dataset.io.push_queue import PushQueue
 from gtmcore.logging import LMLogger
 
 if TYPE_CHECKING:
@@ -26,6 +27,12 @@ if TYPE_CHECKING:
 
 logger = LMLogger.get_logger()
 
+# Number of hashed batches that can wait for the object cache ingest stage before hashing is paused
+INGEST_QUEUE_BATCHES = 8
+
+# Number of concurrent workers moving hashed files into the object cache
+INGEST_WORKERS = 4
+
 
 class FileChangeType(Enum):
     """Enumeration representing types of file changes"""
@@ -49,10 +56,17 @@ class Manifest(object):
         self.cache_mgr: CacheManager = cache_mgr_class(self.dataset, logged_in_username)
 
         self.hasher = SmartHash(dataset.root_dir, self.cache_mgr.cache_root,
-                                self.dataset.git.repo.head.commit.hexsha)
+                                self.dataset.git.repo.head.commit.hexsha,
+                                num_workers=self.get_num_hashing_cpus())
 
         self._manifest_io = ManifestFileCache(dataset, logged_in_username)
 
+        # Objects waiting to be pushed to the storage backend
+        self.push_queue = PushQueue(self.cache_mgr.cache_root)
+
+        # Object cache subdirectories that are known to exist, to avoid re-creating them for every object
+        self._object_dirs: Set[str] = set()
+
         # TODO: Support ignoring files
         # self.ignore_file = os.path.join(dataset.root_dir, ".gigantumignore")
         # self.ignored = self._load_ignored()
@@ -103,10 +117,10 @@ class Manifest(object):
         return object_id[0:8], object_id[8:16]
 
     def get_num_hashing_cpus(self) -> int:
-        """
+        """Method to get the number of CPUs to use when hashing file contents, set via `datasets.hash_cpu_limit`
 
         Returns:
-
+            int
         """
         config_val = self.dataset.client_config.config['datasets']['hash_cpu_limit']
         if config_val == 'auto':
@@ -126,7 +140,7 @@ class Manifest(object):
         Returns:
             str
         """
-        data: Optional[dict] = self.manifest.get(dataset_path)
+        data: Optional[dict] = self._manifest_io.get_entry(dataset_path)
         if not data:
             raise ValueError(f"{dataset_path} not found in Dataset manifest.")
 
@@ -163,12 +177,19 @@ class Manifest(object):
         if not os.path.exists(obj):
             raise ValueError("Object does not exist. Failed to add to push queue.")
 
-        push_dir = os.path.join(self.cache_mgr.cache_root, 'objects', '.push')
-        if not os.path.exists(push_dir):
-            os.makedirs(push_dir)
+        self._queue_many_to_push([(obj, rel_path)], revision)
+
+    def _queue_many_to_push(self, objects: List[Tuple[str, str]], revision: str) -> None:
+        """Method to queue a list of objects for push to remote storage backend with a single write
 
-        with open(os.path.join(push_dir, revision), 'at') as fh:
-            fh.write(f"{rel_path},{obj}\n")
+        Args:
+            objects: list of (object path, relative file path) tuples
+            revision: revision of the dataset the objects exist in
+
+        Returns:
+            None
+        """
+        self.push_queue.add(objects, revision)
 
     def get_change_type(self, path) -> FileChangeType:
         """Helper method to get the type of change from the manifest/fast hash
@@ -193,65 +214,140 @@ class Manifest(object):
                 result = FileChangeType.CREATED
         return result
 
-    def status(self) -> StatusResult:
+    @staticmethod
+    def _parent_dir(relative_path: str) -> str:
+        """Helper method to get the parent directory of a relative path (with a trailing slash, or '' for the root)
+
+        Args:
+            relative_path: relative path to a file or directory (directories have a trailing slash)
+
+        Returns:
+            str
+        """
+        parent, sep, _ = relative_path.rstrip('/').rpartition('/')
+        return f"{parent}{sep}"
+
+    def status(self, changed_dirs_only: bool = False) -> StatusResult:
         """Method to compute the changes (create, modified, delete) of a dataset, comparing local state to the
         manifest and fast hash
 
+        The revision directory is walked with os.scandir, reusing the stat result of each entry, and every entry is
+        classified against fast hash records loaded from the index in bulk.
+
+        If `changed_dirs_only` is True, directories whose mtime matches the fast hash index are not listed, since
+        no files can have been added, removed, or renamed in them. This makes status on a large, unchanged dataset
+        only cost a stat per directory, but will NOT detect files that have been modified in place.
+
+        Args:
+            changed_dirs_only: If True, only list directories that have changed since the fast hash index was updated
+
         Returns:
             StatusResult
         """
-        # TODO: think about how to send batches to get_change_type
-        status: Dict[str, List] = {"created": [], "modified": [], "deleted": []}
-        all_files = list()
+        created: List[str] = list()
+        modified: List[str] = list()
+        seen: set = set()
         revision_directory = os.path.join(self.cache_mgr.cache_root, self.dataset_revision)
-
-        for root, dirs, files in os.walk(revision_directory):
-            _, folder = root.split(revision_directory)
-            if len(folder) > 0:
-                if folder[0] == os.path.sep:
-                    folder = folder[1:]
-
-            for d in dirs:
-                # TODO: Check for ignored
-                rel_path = os.path.join(folder, d) + os.path.sep  # All folders are represented with a trailing slash
-                all_files.append(rel_path)
-                change = self.get_change_type(rel_path)
-                if change == FileChangeType.NOCHANGE:
-                    continue
-                elif change == FileChangeType.MODIFIED:
-                    # Don't record directory modifications
-                    pass
-                elif change == FileChangeType.CREATED:
-                    status['created'].append(rel_path)
-                else:
-                    raise ValueError(f"Invalid Change type: {change}")
-
-            for file in files:
-                # TODO: Check for ignored
-                if file in ['.smarthash', '.DS_STORE', '.DS_Store']:
+        manifest = self.manifest
+        index = self.hasher.fast_hash_data
+
+        if changed_dirs_only:
+            # Only load records for directories up front. File records are loaded per listed directory.
+            fast_hashes = index.get_records(directories_only=True)
+            skipped_dirs: set = set()
+            known_subdirs: Dict[str, List[str]] = dict()
+            for dir_path in fast_hashes:
+                known_subdirs.setdefault(self._parent_dir(dir_path), list()).append(dir_path)
+        else:
+            fast_hashes = index.get_records()
+
+        dirs_to_list = ['']
+        dirs_to_check: List[str] = list()
+        while dirs_to_list or dirs_to_check:
+            if dirs_to_check:
+                # Directory is unchanged. Skip listing it, but check its subdirectories
+                folder = dirs_to_check.pop()
+                subdirs = known_subdirs.get(folder, list())
+                subdir_stats = list()
+                for subdir in subdirs:
+                    try:
+                        subdir_stats.append(os.stat(os.path.join(revision_directory, subdir)))
+                    except OSError:
+                        break
+                if len(subdir_stats) != len(subdirs):
+                    # A known subdirectory is missing (e.g. low resolution mtimes), so fully list this directory
+                    dirs_to_list.append(folder)
                     continue
 
-                rel_path = os.path.join(folder, file)
-                all_files.append(rel_path)
-                change = self.get_change_type(rel_path)
-                if change == FileChangeType.NOCHANGE:
-                    continue
-                elif change == FileChangeType.MODIFIED:
-                    status['modified'].append(rel_path)
-                elif change == FileChangeType.CREATED:
-                    status['created'].append(rel_path)
-                else:
-                    raise ValueError(f"Invalid Change type: {change}")
-
-        # De-dup and sort
-        status['created'] = list(set(status['created']))
-        status['modified'] = list(set(status['modified']))
-        status['modified'] = natsorted(status['modified'])
-        status['created'] = natsorted(status['created'])
-
-        all_files = list(set(all_files))
-        return StatusResult(created=status.get('created'), modified=status.get('modified'),
-                            deleted=self.hasher.get_deleted_files(all_files))
+                skipped_dirs.add(folder)
+                for subdir, subdir_stat in zip(subdirs, subdir_stats):
+                    seen.add(subdir)
+                    if fast_hashes.get(subdir) == (subdir_stat.st_size, subdir_stat.st_mtime_ns):
+                        dirs_to_check.append(subdir)
+                    else:
+                        dirs_to_list.append(subdir)
+                continue
+
+            folder = dirs_to_list.pop()
+            if changed_dirs_only:
+                fast_hashes.update(index.get_records(prefix=folder, children_only=True))
+
+            try:
+                entries = os.scandir(os.path.join(revision_directory, folder))
+            except FileNotFoundError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    # TODO: Check for ignored
+                    is_dir = entry.is_dir()
+                    if not is_dir and entry.name in ['.smarthash', '.DS_STORE', '.DS_Store']:
+                        continue
+
+                    # All folders are represented with a trailing slash
+                    rel_path = f"{folder}{entry.name}/" if is_dir else f"{folder}{entry.name}"
+                    seen.add(rel_path)
+
+                    try:
+                        entry_stat = entry.stat()
+                        current = (entry_stat.st_size, entry_stat.st_mtime_ns)
+                    except OSError:
+                        # Broken link or the file was removed during the walk
+                        current = None
+
+                    cached = fast_hashes.get(rel_path)
+                    if is_dir:
+                        if cached is None and rel_path not in manifest:
+                            created.append(rel_path)
+                        # Don't record directory modifications
+
+                        if not entry.is_symlink():
+                            if changed_dirs_only and cached is not None and cached == current:
+                                dirs_to_check.append(rel_path)
+                            else:
+                                dirs_to_list.append(rel_path)
+                    else:
+                        if cached is not None:
+                            if cached != current:
+                                modified.append(rel_path)
+                        elif rel_path in manifest:
+                            # No fast hash, but exists in manifest. User just edited a file that hasn't been pulled
+                            modified.append(rel_path)
+                        else:
+                            # No fast hash, not in manifest.
+                            created.append(rel_path)
+
+        if changed_dirs_only:
+            deleted_dirs = [p for p in fast_hashes if p[-1] == '/' and p not in seen
+                            and self._parent_dir(p) not in skipped_dirs]
+            for deleted_dir in deleted_dirs:
+                # Everything that was in a removed directory has been deleted too
+                fast_hashes.update(index.get_records(prefix=deleted_dir))
+            deleted = [p for p in fast_hashes if p not in seen and self._parent_dir(p) not in skipped_dirs]
+        else:
+            deleted = [p for p in fast_hashes if p not in seen]
+
+        return StatusResult(created=natsorted(created), modified=natsorted(modified), deleted=sorted(deleted))
 
     @staticmethod
     def _blocking_move_and_link(source, destination):
@@ -276,55 +372,129 @@ class Manifest(object):
         except PermissionError:
             os.symlink(destination, source)
 
-    async def _move_to_object_cache(self, relative_path, hash_str):
-        """Method to move a file to the object cache
+    def _ensure_object_dir(self, hash_str: str) -> str:
+        """Method to get the object cache directory for a content hash, creating it the first time it is used
 
         Args:
-            relative_path: relative path to the file
             hash_str: content hash of the file
 
         Returns:
-
+            str
         """
-        source = os.path.join(self.cache_mgr.cache_root, self.dataset_revision, relative_path)
-        if os.path.isfile(source):
-            level1, level2 = self._get_object_subdirs(hash_str)
+        level1, level2 = self._get_object_subdirs(hash_str)
+        object_dir = os.path.join(self.cache_mgr.cache_root, 'objects', level1, level2)
+        if object_dir not in self._object_dirs:
+            os.makedirs(object_dir, exist_ok=True)
+            self._object_dirs.add(object_dir)
+        return object_dir
 
-            os.makedirs(os.path.join(self.cache_mgr.cache_root, 'objects', level1), exist_ok=True)
-            os.makedirs(os.path.join(self.cache_mgr.cache_root, 'objects', level1, level2), exist_ok=True)
+    def _move_batch_to_object_cache(self, files: List[Tuple[str, Optional[str]]], revision: str) -> None:
+        """Blocking method to move a batch of hashed files to the object cache, link them back into the revision
+        directory, and queue the new objects for push
 
-            destination = os.path.join(self.cache_mgr.cache_root, 'objects', level1, level2, hash_str)
+        Args:
+            files: list of (relative path, content hash) tuples
+            revision: revision of the dataset the files exist in
 
-            # Move file to new object
-            loop = get_event_loop()
-            await loop.run_in_executor(None, self._blocking_move_and_link, source, destination)
+        Returns:
+            None
+        """
+        revision_dir = os.path.join(self.cache_mgr.cache_root, revision)
+        pool = self.cache_mgr.object_pool
+        to_push = list()
+        for relative_path, hash_str in files:
+            source = os.path.join(revision_dir, relative_path)
+            if hash_str is None or not os.path.isfile(source):
+                continue
+
+            destination = os.path.join(self._ensure_object_dir(hash_str), hash_str)
+            if pool and not os.path.isfile(destination):
+                # If another dataset on this host already has the object, share it instead of storing another copy
+                pool.link(hash_str, destination, num_bytes=os.path.getsize(source))
+            self._blocking_move_and_link(source, destination)
+            if pool:
+                pool.add(hash_str, destination)
+            to_push.append((destination, relative_path))
+
+        if to_push:
+            self._queue_many_to_push(to_push, revision)
+
+    async def _hash_and_ingest(self, update_files: List[str],
+                               progress_callback: Optional[Callable[[str, int, int], None]]) -> List[Optional[str]]:
+        """Method to hash files and move them into the object cache as a pipeline. Each batch of hashed files is
+        passed to a bounded pool of ingest workers as soon as it completes, so hashing and moving files overlap.
 
-            # Queue new object for push
-            self.queue_to_push(destination, relative_path, self.dataset_revision)
-        else:
-            destination = source
+        Args:
+            update_files: relative paths of the files to process
+            progress_callback: Optional callback, called with (stage, completed, total) as files complete the
+                               'hash' and 'ingest' stages
 
-        return destination
+        Returns:
+            list of content hashes, in the same order as `update_files`
+        """
+        loop = get_event_loop()
+        revision = self.dataset_revision
+        total = len(update_files)
+        hash_result: List[Optional[str]] = [None] * total
+        progress = {'hash': 0, 'ingest': 0}
+        errors: List[Exception] = list()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_BATCHES)
+
+        def report(stage: str, num_files: int) -> None:
+            progress[stage] += num_files
+            if progress_callback:
+                progress_callback(stage, progress[stage], total)
+
+        async def ingest_worker() -> None:
+            while True:
+                files = await queue.get()
+                if files is None:
+                    return
+                if errors:
+                    # Keep draining the queue so hashing is not blocked, but stop moving files
+                    continue
+                try:
+                    await loop.run_in_executor(None, self._move_batch_to_object_cache, files, revision)
+                except Exception as err:
+                    errors.append(err)
+                    continue
+                report('ingest', len(files))
 
-    def hash_files(self, update_files: List[str]) -> Tuple[List[Optional[str]], List[Optional[str]]]:
-        """Method to run the update process on the manifest based on change status (optionally computing changes if
-        status is not set)
+        workers = [asyncio.ensure_future(ingest_worker()) for _ in range(INGEST_WORKERS)]
+        try:
+            async for batch, batch_result in self.hasher.hash_batches(update_files):
+                files = list()
+                for idx, hash_str in zip(batch, batch_result):
+                    hash_result[idx] = hash_str
+                    files.append((update_files[idx], hash_str))
+                report('hash', len(files))
+                await queue.put(files)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+        if errors:
+            raise errors[0]
+
+        return hash_result
+
+    def hash_files(self, update_files: List[str],
+                   progress_callback: Optional[Callable[[str, int, int], None]] = None) \
+            -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """Method to hash files, move them into the object cache (linking them back into the revision directory),
+        and update their fast hashes
 
         Args:
-            update_files: The current change status of the dataset, of omitted, it will be computed
+            update_files: relative paths of the files to process
+            progress_callback: Optional callback, called with (stage, completed, total) as files complete the
+                               'hash' and 'ingest' stages
 
         Returns:
-            StatusResult
+            tuple of content hashes and fast hashes, in the same order as `update_files`
         """
-        # Hash Files
         loop = get_event_loop()
-        hash_task = asyncio.ensure_future(self.hasher.hash(update_files))
-        loop.run_until_complete(asyncio.gather(hash_task))
-
-        # Move files into object cache and link back to the revision directory
-        hash_result = hash_task.result()
-        tasks = [asyncio.ensure_future(self._move_to_object_cache(f, h)) for f, h in zip(update_files, hash_result)]
-        loop.run_until_complete(asyncio.gather(*tasks))
+        hash_result = loop.run_until_complete(self._hash_and_ingest(update_files, progress_callback))
 
         # Update fast hash after objects have been moved/relinked
         fast_hash_result = self.hasher.fast_hash(update_files, save=True)
@@ -367,23 +537,50 @@ class Manifest(object):
 
         return status
 
-    def _file_info(self, key, item) -> Dict[str, Any]:
+    def _file_info(self, key, item, is_local: Optional[bool] = None) -> Dict[str, Any]:
         """Method to populate file info (e.g. size, mtime, etc.) using data from the manifest
 
         Args:
             key: relative path to the file
             item: data from the manifest
+            is_local: Optional flag indicating if the file is present in the revision directory. Checked if omitted
 
         Returns:
             dict
         """
         abs_path = os.path.join(self.cache_mgr.cache_root, self.dataset_revision, key)
+        if is_local is None:
+            is_local = os.path.exists(abs_path)
         return {'key': key,
                 'size': item.get('b'),
-                'is_local': os.path.exists(abs_path),
+                'is_local': is_local,
                 'is_dir': True if abs_path[-1] == "/" else False,
                 'modified_at': float(item.get('m'))}
 
+    def _file_info_list(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """Method to populate file info for a list of files, loading their manifest data and local state in batches
+
+        Files that are not in the fast hash index have not been materialized in the revision directory, so only files
+        that are in the index are checked on disk (they may have been removed outside of the client).
+
+        Args:
+            keys: relative paths to the files
+
+        Returns:
+            list
+        """
+        entries = self._manifest_io.get_entries(keys)
+        indexed = self.hasher.fast_hash_data.get_records_for_paths(keys)
+        revision_dir = os.path.join(self.cache_mgr.cache_root, self.dataset_revision)
+
+        result = list()
+        for key, item in zip(keys, entries):
+            if item is None:
+                continue
+            is_local = key in indexed and os.path.exists(os.path.join(revision_dir, key))
+            result.append(self._file_info(key, item, is_local))
+        return result
+
     def gen_file_info(self, key) -> Dict[str, Any]:
         """Method to generate file info (e.g. size, mtime, etc.)
 
@@ -411,9 +608,29 @@ class Manifest(object):
 
         Returns:
         """
-        item = self.manifest.get(dataset_path)
+        item = self._manifest_io.get_entry(dataset_path)
         return self._file_info(dataset_path, item)
 
+    def get_entries(self, dataset_paths: List[str]) -> List[Optional[OrderedDict]]:
+        """Method to get the raw manifest entries (hash, size, etc.) for a list of files in a single lookup, without
+        loading the full manifest
+
+        Args:
+            dataset_paths: Relative paths to the objects within the dataset
+
+        Returns:
+            list of entries (or None if not in the manifest), in the same order as `dataset_paths`
+        """
+        return self._manifest_io.get_entries(dataset_paths)
+
+    def count(self) -> int:
+        """Method to get the number of files and directories in the manifest, without loading the full manifest
+
+        Returns:
+            int
+        """
+        return self._manifest_io.count()
+
     def list(self, first: int = None, after_index: int = 0) -> Tuple[List[Dict[str, Any]], List[int]]:
         """
 
@@ -437,18 +654,36 @@ class Manifest(object):
         if after_index != 0:
             after_index = after_index + 1
 
-        if first is not None:
-            end = min(first + after_index, len(self.manifest))
-        else:
-            end = len(self.manifest)
-
-        data = list(self.manifest.items())
-        for idx in range(after_index, end):
-            result.append(self._file_info(data[idx][0], data[idx][1]))
+        end = first + after_index if first is not None else None
+        keys = self._manifest_io.list_keys(after_index, end)
+        for idx, info in enumerate(self._file_info_list(keys), start=after_index):
+            result.append(info)
             indexes.append(idx)
 
         return result, indexes
 
+    def list_page(self, first: int, after: Optional[str] = None,
+                  directory: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Method to get a page of file info, ordered by path. Pages are addressed by the last path of the previous
+        page, so the cost of a page only depends on its size.
+
+        Args:
+            first: max number of files to return
+            after: path to start after, or None to start at the beginning
+            directory: Optional directory (with a trailing slash, or '' for the root) to only list the direct
+                       children of
+
+        Returns:
+            list
+        """
+        if first <= 0:
+            raise ValueError("`first` must be greater than 0")
+        if directory and directory[-1] != '/':
+            directory = directory + '/'
+
+        keys = self._manifest_io.list_keys_after(after, first, directory)
+        return self._file_info_list(keys)
+
     def delete(self, path_list: List[str]) -> None:
         """Method to delete a list of files/folders from the dataset
 
@@ -548,7 +783,7 @@ class Manifest(object):
 
             # create dir
             os.makedirs(new_directory_path)
-            self.update()
+            status = self.update()
             if relative_path not in self.manifest:
                 raise ValueError("Failed to add directory to manifest")
 
@@ -576,29 +811,54 @@ class Manifest(object):
             ars.create_activity_record(ar)
 
             # Relink after the commit
-            self.link_revision()
-            if os.path.isdir(os.path.join(self.cache_mgr.cache_root, previous_revision)):
+            self.link_revision(previous_revision=previous_revision, status=status)
+            if previous_revision != self.dataset_revision and \
+                    os.path.isdir(os.path.join(self.cache_mgr.cache_root, previous_revision)):
                 shutil.rmtree(os.path.join(self.cache_mgr.cache_root, previous_revision))
 
             return self.gen_file_info(relative_path)
 
-    def link_revision(self) -> None:
+    def link_revision(self, previous_revision: Optional[str] = None, status: Optional[StatusResult] = None) -> None:
         """Method to link all the objects in the cache to the current revision directory, so that all files are
         accessible with the correct file names.
 
+        If `previous_revision` and the `status` of the changes since that revision are provided, the previous
+        revision's directory (including its fast hash index) is carried forward by renaming it, and only the changed
+        entries are relinked. Otherwise every entry in the manifest is linked and the fast hash index is rebuilt.
+
         Note: This update the current revision in the hashing class
 
+        Args:
+            previous_revision: revision the changes in `status` were made in
+            status: changes between `previous_revision` and the current revision
+
         Returns:
             None
         """
         current_revision = self.dataset_revision
-        self.hasher.current_revision = current_revision
-
         revision_directory = os.path.join(self.cache_mgr.cache_root, current_revision)
 
+        if previous_revision and status is not None:
+            previous_directory = os.path.join(self.cache_mgr.cache_root, previous_revision)
+            if previous_revision != current_revision and os.path.isdir(previous_directory) \
+                    and not os.path.exists(revision_directory):
+                # The index is stored in the revision directory, so close it before moving the directory
+                self.hasher.fast_hash_data.close()
+                os.rename(previous_directory, revision_directory)
+                previous_revision = current_revision
+
+            if previous_revision == current_revision and os.path.isdir(revision_directory):
+                self.hasher.current_revision = current_revision
+                self._link_changes(revision_directory, status)
+                return
+
+        self.hasher.current_revision = current_revision
+
         if not os.path.exists(revision_directory):
             os.makedirs(revision_directory)
 
+        # Directories that are known to exist, to avoid checking them for every file
+        existing_dirs: Set[str] = {revision_directory}
         for f in self.manifest:
             hash_str = self.manifest[f].get('h')
             level1, level2 = self._get_object_subdirs(hash_str)
@@ -606,15 +866,17 @@ class Manifest(object):
             target = os.path.join(revision_directory, f)
             if target[-1] == os.path.sep:
                 # Create directory from manifest
-                if not os.path.exists(target):
-                    os.makedirs(target)
+                if target[:-1] not in existing_dirs:
+                    os.makedirs(target, exist_ok=True)
+                    existing_dirs.add(target[:-1])
             else:
                 # Link file
                 source = os.path.join(self.cache_mgr.cache_root, 'objects', level1, level2, hash_str)
 
                 target_dir = os.path.dirname(target)
-                if not os.path.exists(target_dir):
-                    os.makedirs(target_dir)
+                if target_dir not in existing_dirs:
+                    os.makedirs(target_dir, exist_ok=True)
+                    existing_dirs.add(target_dir)
 
                 # Link if not already linked
                 if not os.path.exists(target):
@@ -627,9 +889,58 @@ class Manifest(object):
                         continue
 
         # Completely re-compute the fast hash index
-        self.hasher.fast_hash_data = dict()
+        self.hasher.clear_fast_hashes()
         self.hasher.fast_hash(list(self.manifest.keys()))
 
+    def _link_changes(self, revision_directory: str, status: StatusResult) -> None:
+        """Method to apply a set of changes to a revision directory that otherwise matches the manifest, and update
+        the fast hash index for the changed entries and the directories that contain them
+
+        Args:
+            revision_directory: absolute path to the revision directory
+            status: the changes to apply
+
+        Returns:
+            None
+        """
+        for relative_path in status.deleted:
+            target = os.path.join(revision_directory, relative_path)
+            if os.path.isdir(target) and not os.path.islink(target):
+                shutil.rmtree(target)
+            elif os.path.lexists(target):
+                os.remove(target)
+
+        # Only entries that made it into the manifest are linked (e.g. files that failed to hash are skipped)
+        changed = status.created + status.modified
+        entries = {p: item for p, item in zip(changed, self._manifest_io.get_entries(changed)) if item}
+        for relative_path, item in entries.items():
+            if relative_path[-1] == os.path.sep:
+                os.makedirs(os.path.join(revision_directory, relative_path), exist_ok=True)
+                continue
+
+            level1, level2 = self._get_object_subdirs(item['h'])
+            source = os.path.join(self.cache_mgr.cache_root, 'objects', level1, level2, item['h'])
+            target = os.path.join(revision_directory, relative_path)
+            try:
+                if os.path.exists(target):
+                    if not os.path.exists(source) or os.path.samefile(source, target):
+                        continue
+                    os.remove(target)
+                elif not os.path.exists(source):
+                    # Only try to link if the source object has been materialized
+                    continue
+
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.link(source, target)
+            except Exception as err:
+                logger.exception(err)
+
+        # Linking and removing entries changes the mtime of their parent directories
+        parents = sorted({self._parent_dir(p) for p in changed + status.deleted} - {''} - set(entries.keys()))
+        parents = [p for p, item in zip(parents, self._manifest_io.get_entries(parents)) if item]
+        self.hasher.delete_fast_hashes(status.deleted)
+        self.hasher.fast_hash(sorted(list(entries.keys()) + parents))
+
     def create_update_activity_record(self, status: StatusResult, upload: bool = False, extra_msg: str = None) -> None:
         """
 
@@ -726,9 +1037,10 @@ class Manifest(object):
         # Update manifest
         self.create_update_activity_record(status, upload=upload, extra_msg=extra_msg)
 
-        # Re-link new revision
-        self.link_revision()
-        if os.path.isdir(os.path.join(self.cache_mgr.cache_root, previous_revision)):
+        # Re-link new revision, carrying the previous revision's directory forward
+        self.link_revision(previous_revision=previous_revision, status=status)
+        if previous_revision != self.dataset_revision and \
+                os.path.isdir(os.path.join(self.cache_mgr.cache_root, previous_revision)):
             shutil.rmtree(os.path.join(self.cache_mgr.cache_root, previous_revision))
 
     def force_reload(self) -> None:
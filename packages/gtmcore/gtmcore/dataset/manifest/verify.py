@@ -0,0 +1,217 @@
+import math
+import os
+import random
+import sqlite3
+import time
+from enum import Enum
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+from gtmcore.dataset.manifest.eventloop import get_event_loop
+from gtmcore.logging import LMLogger
+
+if TYPE_CHECKING:
+    from gtmcore.dataset.manifest.manifest import Manifest
+
+logger = LMLogger.get_logger()
+
+# Default probability of a sample containing at least one modified file, if `DEFAULT_SAMPLE_TOLERANCE` or more of
+# the files have been modified
+DEFAULT_SAMPLE_CONFIDENCE = 0.95
+DEFAULT_SAMPLE_TOLERANCE = 0.01
+
+
+class VerificationMode(Enum):
+    """Which locally available files to hash when verifying the contents of a dataset"""
+    # Every file
+    FULL = 'full'
+    # A random sample of files, sized to detect modified files with a given confidence
+    SAMPLE = 'sample'
+    # Files not verified since they were last modified, or since the manifest changed
+    INCREMENTAL = 'since_last_verified'
+
+
+# Progress of a verification, reported after each batch of files is hashed
+VerificationProgress = NamedTuple('VerificationProgress', [('num_verified', int), ('num_files', int),
+                                                           ('modified_keys', List[str])])
+
+# When a file was last verified, the manifest hash it was checked against and if it matched
+VerificationRecord = NamedTuple('VerificationRecord', [('hash', str), ('verified_ns', int), ('modified', bool)])
+
+
+def sample_size(num_files: int, confidence: float = DEFAULT_SAMPLE_CONFIDENCE,
+                tolerance: float = DEFAULT_SAMPLE_TOLERANCE) -> int:
+    """Function to compute how many files to sample so that, if at least a `tolerance` fraction of the files have been
+    modified, the sample contains a modified file with probability `confidence`
+
+    Sampling with replacement is assumed, which slightly overestimates the sample size for small datasets:
+        (1 - tolerance) ^ n <= 1 - confidence  =>  n = ln(1 - confidence) / ln(1 - tolerance)
+
+    Args:
+        num_files: number of files to sample from
+        confidence: probability of detecting modifications, between 0 and 1
+        tolerance: fraction of modified files that must be detected, between 0 and 1
+
+    Returns:
+        int
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("Sample confidence must be between 0 and 1")
+    if not 0 < tolerance < 1:
+        raise ValueError("Sample tolerance must be between 0 and 1")
+    return min(num_files, int(math.ceil(math.log(1 - confidence) / math.log(1 - tolerance))))
+
+
+class VerificationIndex(object):
+    """Class to store when each file of a dataset was last verified in a SQLite database in the file cache
+
+    A record is only valid while the manifest hash of its file is unchanged, so updating a file invalidates it.
+    """
+    def __init__(self, index_file: str) -> None:
+        self.index_file = index_file
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn:
+            return self._conn
+
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError as err:
+            # Losing the records only means files are verified again
+            logger.warning(f"Verification index {self.index_file} is invalid and will be reset: {err}")
+            os.remove(self.index_file)
+            self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        conn = sqlite3.connect(self.index_file, timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS verified (path TEXT PRIMARY KEY, hash TEXT NOT NULL, "
+                     "verified_ns INTEGER NOT NULL, modified INTEGER NOT NULL)")
+        conn.commit()
+        return conn
+
+    def close(self) -> None:
+        """Method to close the database connection
+
+        Returns:
+            None
+        """
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def get_records(self) -> Dict[str, VerificationRecord]:
+        """Method to load all records
+
+        Returns:
+            dict of relative path -> VerificationRecord
+        """
+        rows = self._connect().execute("SELECT path, hash, verified_ns, modified FROM verified")
+        return {row[0]: VerificationRecord(row[1], row[2], bool(row[3])) for row in rows}
+
+    def put_records(self, records: List[Tuple[str, VerificationRecord]]) -> None:
+        """Method to add or update records in a single transaction
+
+        Args:
+            records: list of (relative path, VerificationRecord)
+
+        Returns:
+            None
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO verified (path, hash, verified_ns, modified) VALUES (?, ?, ?, ?)",
+                             [(p, r.hash, r.verified_ns, int(r.modified)) for p, r in records])
+
+
+class ContentVerifier(object):
+    """Class to verify that locally available files still match the hashes in the manifest"""
+    def __init__(self, manifest: 'Manifest') -> None:
+        self.manifest = manifest
+        self.index = VerificationIndex(os.path.join(manifest.cache_mgr.cache_root, '.verification'))
+
+    def _local_keys(self) -> List[str]:
+        """Method to get the files in the manifest that exist locally"""
+        revision_dir = self.manifest.current_revision_dir
+        return [key for key in self.manifest.manifest
+                if key[-1] != '/' and os.path.isfile(os.path.join(revision_dir, key))]
+
+    def _is_verified(self, key: str, record: Optional[VerificationRecord]) -> bool:
+        """Method to check if a file is unchanged since it was last verified and found to match the manifest"""
+        if record is None or record.modified or record.hash != self.manifest.manifest[key].get('h'):
+            return False
+        try:
+            mtime_ns = os.stat(os.path.join(self.manifest.current_revision_dir, key)).st_mtime_ns
+        except OSError:
+            return False
+        return mtime_ns < record.verified_ns
+
+    def select_keys(self, mode: VerificationMode, confidence: float = DEFAULT_SAMPLE_CONFIDENCE,
+                    tolerance: float = DEFAULT_SAMPLE_TOLERANCE) -> List[str]:
+        """Method to select the files to hash
+
+        Args:
+            mode: which files to select
+            confidence: for VerificationMode.SAMPLE, the probability of detecting modifications
+            tolerance: for VerificationMode.SAMPLE, the fraction of modified files that must be detected
+
+        Returns:
+            list of relative paths
+        """
+        keys = self._local_keys()
+        if mode == VerificationMode.SAMPLE:
+            return sorted(random.sample(keys, sample_size(len(keys), confidence, tolerance)))
+        elif mode == VerificationMode.INCREMENTAL:
+            records = self.index.get_records()
+            return [key for key in keys if not self._is_verified(key, records.get(key))]
+        return keys
+
+    def verify(self, keys: List[str],
+               progress_update_fn: Optional[Callable[[VerificationProgress], None]] = None) -> List[str]:
+        """Method to hash files and compare them to the manifest, recording when each file was verified
+
+        Args:
+            keys: relative paths of the files to verify
+            progress_update_fn: Optional callable, called with a VerificationProgress after each batch of files
+
+        Returns:
+            sorted list of relative paths of the files that have been modified
+        """
+        modified_keys: List[str] = list()
+        num_verified = 0
+        # Files modified while being hashed are verified again next time, since their mtime is newer
+        started_ns = time.time_ns()
+
+        async def hash_keys() -> None:
+            nonlocal num_verified
+            async for batch, hashes in self.manifest.hasher.hash_batches(keys):
+                records = list()
+                for idx, new_hash in zip(batch, hashes):
+                    key = keys[idx]
+                    expected_hash = self.manifest.manifest[key].get('h')
+                    modified = new_hash != expected_hash
+                    if modified:
+                        modified_keys.append(key)
+                    records.append((key, VerificationRecord(expected_hash, started_ns, modified)))
+                self.index.put_records(records)
+
+                num_verified += len(batch)
+                if progress_update_fn:
+                    progress_update_fn(VerificationProgress(num_verified, len(keys), sorted(modified_keys)))
+
+        get_event_loop().run_until_complete(hash_keys())
+        self.index.close()
+        return sorted(modified_keys)
+
+    def recorded_mismatches(self) -> List[str]:
+        """Method to get the files found to be modified by previous verifications, without hashing anything
+
+        Returns:
+            sorted list of relative paths
+        """
+        records = self.index.get_records()
+        self.index.close()
+        return sorted([key for key, record in records.items()
+                       if record.modified and key in self.manifest.manifest
+                       and record.hash == self.manifest.manifest[key].get('h')])
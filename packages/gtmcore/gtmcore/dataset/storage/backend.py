@@ -8,8 +8,11 @@ import shutil
 import copy
 
 from gtmcore.dataset.io import PushResult, PushObject, PullObject, PullResult
+from gtmcore.dataset.io.pack import PackSettings
 from gtmcore.dataset.manifest.manifest import Manifest, StatusResult
 from gtmcore.dataset.manifest.eventloop import get_event_loop
+from gtmcore.dataset.manifest.verify import ContentVerifier, VerificationMode, VerificationProgress, \
+    DEFAULT_SAMPLE_CONFIDENCE, DEFAULT_SAMPLE_TOLERANCE
 
 
 class StorageBackend(metaclass=abc.ABCMeta):
@@ -213,12 +216,21 @@ class StorageBackend(metaclass=abc.ABCMeta):
         loop.run_until_complete(asyncio.gather(hash_task))
         return hash_task.result()
 
-    def verify_contents(self, dataset, status_update_fn: Callable) -> List[str]:
-        """Method to verify the hashes of all local files and indicate if they have changed
+    def verify_contents(self, dataset, status_update_fn: Callable,
+                        mode: VerificationMode = VerificationMode.FULL,
+                        confidence: float = DEFAULT_SAMPLE_CONFIDENCE,
+                        tolerance: float = DEFAULT_SAMPLE_TOLERANCE,
+                        progress_update_fn: Optional[Callable[[VerificationProgress], None]] = None) -> List[str]:
+        """Method to verify the hashes of local files and indicate if they have changed
 
         Args:
             dataset: Dataset object
             status_update_fn: A callable, accepting a string for logging/providing status to the UI
+            mode: which files to verify: all of them, a random sample, or those not verified since they last changed
+            confidence: for VerificationMode.SAMPLE, the probability of detecting modifications if at least a
+                        `tolerance` fraction of files have been modified
+            tolerance: for VerificationMode.SAMPLE, the fraction of modified files that must be detected
+            progress_update_fn: Optional callable, called with a VerificationProgress after each batch of files
 
         Returns:
             list
@@ -227,25 +239,18 @@ class StorageBackend(metaclass=abc.ABCMeta):
             raise ValueError("Dataset storage backend requires current logged in username to verify contents")
 
         m = Manifest(dataset, self.configuration.get('username'))
-        keys_to_verify = list()
-        for item in m.manifest:
-            if os.path.isfile(os.path.join(m.cache_mgr.cache_root, m.dataset_revision, item)):
-                # File exists locally
-                keys_to_verify.append(item)
+        verifier = ContentVerifier(m)
+        keys_to_verify = verifier.select_keys(mode, confidence, tolerance)
 
         # re-hash files
         status_update_fn(f"Validating contents of {len(keys_to_verify)} files. Please wait.")
-        updated_hashes = self.hash_file_key_list(dataset, keys_to_verify)
-
-        modified_items = list()
-        for key, new_hash in zip(keys_to_verify, updated_hashes):
-            item = m.manifest.get(key)
-            if item:
-                if new_hash != item.get('h'):
-                    modified_items.append(key)
+        modified_items = verifier.verify(keys_to_verify, progress_update_fn)
 
         if modified_items:
             status_update_fn(f"Integrity check complete. {len(modified_items)} files have been modified.")
+        elif mode == VerificationMode.SAMPLE:
+            status_update_fn(f"Integrity check complete. No files in a sample of {len(keys_to_verify)} have been "
+                             f"modified.")
         else:
             status_update_fn(f"Integrity check complete. No files have been modified.")
 
@@ -267,6 +272,18 @@ class ManagedStorageBackend(StorageBackend):
         """
         raise NotImplemented
 
+    def object_pack_settings(self, dataset) -> Optional[PackSettings]:
+        """Method to get the settings used to bundle small objects into pack files before they are pushed, if the
+        backend supports it and it is enabled
+
+        Args:
+            dataset: The dataset instance
+
+        Returns:
+            PackSettings, or None if objects should always be pushed individually
+        """
+        return None
+
     def prepare_push(self, dataset, objects: List[PushObject]) -> None:
         """Method to prepare a backend for pushing objects to the remote storage backend
 
@@ -2,51 +2,191 @@ import asyncio
 import aiohttp
 import aiofiles
 import copy
+import json
+import shutil
+import time
 import snappy
 import requests
-import math
 
 from gtmcore.dataset import Dataset
 from gtmcore.dataset.storage.backend import ManagedStorageBackend
-from typing import Optional, List, Dict, Callable, Tuple, NamedTuple
+from typing import Optional, List, Dict, Callable, Tuple, NamedTuple, AsyncIterator, Deque, Set
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
 import os
 
 from gtmcore.dataset.io import PushResult, PushObject, PullResult, PullObject
+from gtmcore.dataset.io.pack import PackCatalog, PackSettings, PACK_DIR_NAME, is_pack_path, unpack
 from gtmcore.logging import LMLogger
 from gtmcore.dataset.manifest.eventloop import get_event_loop
 
 logger = LMLogger.get_logger()
 
 
-# Namedtuples to track parts in a multipart upload
-MultipartPart = NamedTuple("MultipartUploadPart", [('part_number', int), ('start_byte', int), ('end_byte', int)])
+# Namedtuple to track completed parts in a multipart upload
 MultipartPartCompleted = NamedTuple("MultipartUploadPart", [('part_number', int), ('etag', str)])
 
 OBJ_SRV_TIMEOUT = aiohttp.ClientTimeout(total=5 * 60, connect=60, sock_connect=None, sock_read=None)
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=2 * 60, sock_connect=None, sock_read=5 * 60)
+
+# Default number of bytes requested per range request when downloading an object
+DOWNLOAD_RANGE_BYTES = 16 * 1024 * 1024
+
+
+class RangeDownloadError(IOError):
+    """Raised when a range of an object failed to download. The download can be resumed later."""
+    pass
+
+
+# Number of uncompressed bytes compressed as an independent snappy stream by a compression worker. The snappy framing
+# format allows streams to be concatenated, so blocks can be compressed in parallel and uploaded back to back.
+COMPRESSION_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Default number of blocks of a single object that can be compressing at once
+COMPRESSION_WINDOW = 4
+
+
+def _compress_block(object_path: str, offset: int, num_bytes: int) -> bytes:
+    """Method to compress a block of a file as a self-contained snappy framed stream. This is a module level function
+    so it can run in a worker process.
+
+    Args:
+        object_path: absolute path to the file
+        offset: byte offset of the block in the file
+        num_bytes: max number of bytes in the block
+
+    Returns:
+        bytes
+    """
+    with open(object_path, 'rb') as src_file:
+        src_file.seek(offset)
+        data = src_file.read(num_bytes)
+    if not data:
+        return b''
+    return snappy.StreamCompressor().compress(data)
+
+
+# Multipart uploads recorded in a journal older than this (in seconds) are not resumed, since the storage backend may
+# have already cleaned up the incomplete upload
+MULTIPART_RESUME_MAX_AGE = 3 * 24 * 60 * 60
+
+
+class MultipartUploadJournal(object):
+    """Class to record the completed parts of a multipart upload on disk, so an interrupted upload can be resumed
+    from the last completed part instead of starting over.
+
+    The journal is an append-only file of JSON lines. The first line is a header describing the upload and each
+    following line records a completed part. A partially written last line (e.g. if the process was killed) is ignored.
+    """
+    def __init__(self, journal_path: str) -> None:
+        self.journal_path = journal_path
+
+    def load(self, layout: dict) -> Tuple[Optional[str], Dict[int, str]]:
+        """Method to load a previously started upload
+
+        Args:
+            layout: details of how the object is split into parts. The journal is only used if these match the header
+
+        Returns:
+            The upload id (or None if the upload cannot be resumed) and a dict of completed part numbers to ETags
+        """
+        if not os.path.exists(self.journal_path):
+            return None, dict()
+
+        header: Optional[dict] = None
+        parts: Dict[int, str] = dict()
+        with open(self.journal_path, 'rt') as jf:
+            for line in jf:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+
+                if header is None:
+                    header = record
+                else:
+                    parts[int(record['part_number'])] = record['etag']
+
+        if header is None or header.get('layout') != layout or \
+                time.time() - header.get('created', 0) > MULTIPART_RESUME_MAX_AGE:
+            return None, dict()
+
+        return header['upload_id'], parts
+
+    def start(self, upload_id: str, layout: dict) -> None:
+        """Method to start a new journal, replacing any existing journal for the object
+
+        Args:
+            upload_id: the multipart upload id
+            layout: details of how the object is split into parts
+
+        Returns:
+            None
+        """
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        with open(self.journal_path, 'wt') as jf:
+            jf.write(json.dumps({'upload_id': upload_id, 'layout': layout, 'created': time.time()}) + '\n')
+
+    def record_part(self, part_number: int, etag: str) -> None:
+        """Method to record a completed part
+
+        Args:
+            part_number: the part number
+            etag: the ETag returned when the part was uploaded
+
+        Returns:
+            None
+        """
+        with open(self.journal_path, 'at') as jf:
+            jf.write(json.dumps({'part_number': part_number, 'etag': etag}) + '\n')
+            jf.flush()
+            os.fsync(jf.fileno())
+
+    def remove(self) -> None:
+        """Method to remove the journal once the upload has been completed or aborted
+
+        Returns:
+            None
+        """
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
 
 
 class PresignedS3Upload(object):
     def __init__(self, object_service_root: str, object_service_headers: dict,
                  multipart_chunk_size: int, upload_chunk_size: int,
-                 object_details: PushObject) -> None:
+                 object_details: PushObject, compression_executor: Optional[Executor] = None,
+                 compression_window: int = COMPRESSION_WINDOW, max_concurrent_parts: int = 4,
+                 journal_dir: Optional[str] = None) -> None:
         self.service_root = object_service_root
         self.object_service_headers = object_service_headers
         self.upload_chunk_size = upload_chunk_size
 
         self.object_details = object_details
         self.skip_object = False
-        self._compressed_object_path: Optional[str] = None
-        self._compressed_object_size: Optional[int] = None
+        self._object_size: Optional[int] = None
+
+        # Objects are compressed in memory as they are uploaded. If no executor is provided, the event loop's default
+        # (thread) executor is used.
+        self.compression_executor = compression_executor
+        self.compression_window = compression_window
 
         self.presigned_s3_url = ""
         self.s3_headers: Dict = dict()
 
         # Multi-part upload support
         self.multipart_chunk_size = multipart_chunk_size
-        self.multipart_upload_id = None
-        self._multipart_parts: List[MultipartPart] = list()
+        self.max_concurrent_parts = max_concurrent_parts
+        self.multipart_upload_id: Optional[str] = None
         self._multipart_completed_parts: List[MultipartPartCompleted] = list()
 
+        # Completed parts are journaled to disk, if a directory is provided, so uploads can be resumed
+        self.journal: Optional[MultipartUploadJournal] = None
+        if journal_dir:
+            self.journal = MultipartUploadJournal(os.path.join(journal_dir, f"{self.object_id}.journal"))
+        self._resumed_parts: Dict[int, str] = dict()
+        self._num_uploaded_parts = 0
+
     @property
     def is_presigned(self) -> bool:
         """Property to check if this upload request has successfully been presigned
@@ -57,37 +197,27 @@ class PresignedS3Upload(object):
         return self.presigned_s3_url != ""
 
     @property
-    def compressed_object_size(self) -> int:
-        """Property to get the size of the compressed object
+    def object_size(self) -> int:
+        """Property to get the size of the (uncompressed) object
 
         Returns:
-            bool
+            int
         """
-        if not self._compressed_object_size:
-            self._compressed_object_size = os.path.getsize(self.compressed_object_path)
-        return self._compressed_object_size
+        if self._object_size is None:
+            self._object_size = os.path.getsize(self.object_details.object_path)
+        return self._object_size
 
     @property
     def is_multipart(self) -> bool:
         """Property to check if this object is over the multi-part threshold and should be sent via multi-part upload
         process
 
-        Returns:
-            bool
-        """
-        return self.compressed_object_size >= self.multipart_chunk_size
-
-    @property
-    def current_part(self) -> Optional[MultipartPart]:
-        """Property to get the current part to be processed and uploaded
+        Since objects are compressed while they are uploaded, the threshold is checked against the uncompressed size.
 
         Returns:
-            MultipartPart
+            bool
         """
-        if self._multipart_parts:
-            return self._multipart_parts[0]
-        else:
-            return None
+        return self.object_size >= self.multipart_chunk_size
 
     @property
     def object_id(self) -> str:
@@ -101,36 +231,77 @@ class PresignedS3Upload(object):
         return obj_id
 
     @property
-    def compressed_object_path(self) -> str:
-        """Property to get the compressed object path, and if not set, compress the object
+    def multipart_layout(self) -> dict:
+        """Property to get the details that determine the content of each part of a multipart upload. A journaled
+        upload can only be resumed if these have not changed.
 
         Returns:
-            str
+            dict
+        """
+        return {'object_size': self.object_size,
+                'multipart_chunk_size': self.multipart_chunk_size,
+                'compression_block_bytes': COMPRESSION_BLOCK_BYTES}
+
+    @property
+    def can_resume(self) -> bool:
+        """Property indicating if a failed multipart upload should be left in place to be resumed instead of aborted.
+        This is the case if parts were uploaded and journaled during this attempt. A resumed upload that fails
+        without making progress (e.g. because the backend already removed it) is aborted and started over next time.
+
+        Returns:
+            bool
         """
-        if not self._compressed_object_path:
-            self._compressed_object_path = os.path.join('/tmp', self.object_id)
-            with open(self.object_details.object_path, "rb") as src_file:
-                with open(self._compressed_object_path, "wb") as compressed_file:
-                    snappy.stream_compress(src_file, compressed_file)
+        return self.journal is not None and self._num_uploaded_parts > 0
 
-        return self._compressed_object_path
+    async def _compressed_blocks(self) -> AsyncIterator[bytes]:
+        """Method to compress the object in blocks, yielding the compressed blocks in order. Up to
+        `compression_window` blocks are compressed concurrently in the compression executor.
 
-    def remove_compressed_file(self) -> None:
+        Returns:
+            async iterator of bytes
+        """
+        loop = get_event_loop()
+        pending: Deque[asyncio.Future] = deque()
         try:
-            os.remove(self.compressed_object_path)
-        except FileNotFoundError:
-            # Temp file never got created, just move on
-            pass
+            for offset in range(0, self.object_size, COMPRESSION_BLOCK_BYTES):
+                pending.append(loop.run_in_executor(self.compression_executor, _compress_block,
+                                                    self.object_details.object_path, offset,
+                                                    COMPRESSION_BLOCK_BYTES))
+                if len(pending) >= self.compression_window:
+                    yield await pending.popleft()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def compress_object(self) -> bytes:
+        """Method to compress the entire object in memory. Only used for objects below the multipart threshold.
+
+        Returns:
+            bytes
+        """
+        return b''.join([block async for block in self._compressed_blocks()])
 
-    def mark_current_part_complete(self, etag: str) -> None:
-        """Method to mark the current part as successfully uploaded
+    async def _compressed_parts(self) -> AsyncIterator[Tuple[int, bytes]]:
+        """Method to split the compressed object stream into multipart upload parts. Every part except the last is
+        exactly `multipart_chunk_size` bytes.
 
         Returns:
-            None
+            async iterator of (part number, data)
         """
-        current_part: MultipartPart = self._multipart_parts.pop(0)
-        self._multipart_completed_parts.append(MultipartPartCompleted(current_part.part_number, etag))
-        self.presigned_s3_url = ""
+        buffer = bytearray()
+        part_number = 0
+        async for block in self._compressed_blocks():
+            buffer.extend(block)
+            while len(buffer) >= self.multipart_chunk_size:
+                part_number += 1
+                yield part_number, bytes(buffer[:self.multipart_chunk_size])
+                del buffer[:self.multipart_chunk_size]
+
+        if buffer or part_number == 0:
+            yield part_number + 1, bytes(buffer)
 
     def get_completed_parts(self) -> List[dict]:
         """Method to get the etag and part number data required by S3 to complete the multipart upload
@@ -165,24 +336,16 @@ class PresignedS3Upload(object):
                 # Server-side encryption disabled
                 self.s3_headers = dict()
 
-    async def get_presigned_s3_url(self, session: aiohttp.ClientSession) -> None:
-        """Method to make a request to the object service and pre-sign an S3 PUT
+    async def _presign(self, session: aiohttp.ClientSession, url: str) -> str:
+        """Method to make a request to the object service to pre-sign an S3 PUT
 
         Args:
             session: The current aiohttp session
+            url: object service URL to request the pre-signed URL from
 
         Returns:
-            None
+            the pre-signed URL, or an empty string if the object already exists (and `skip_object` has been set)
         """
-        if self.is_multipart:
-            if not self.current_part:
-                raise ValueError("No parts remain to get presigned URL.")
-
-            part_num = self.current_part.part_number
-            url = f"{self.service_root}/{self.object_id}/multipart/{self.multipart_upload_id}/part/{part_num}"
-        else:
-            url = f"{self.service_root}/{self.object_id}"
-
         try_count = 0
         error_status = None
         error_msg = None
@@ -192,14 +355,13 @@ class PresignedS3Upload(object):
                     if response.status == 200:
                         # Successfully signed the request
                         response_data = await response.json()
-                        self.presigned_s3_url = response_data.get("presigned_url")
                         self.set_s3_headers(response_data.get("key_id"))
-                        return
+                        return response_data.get("presigned_url")
                     elif response.status == 403:
                         # Forbidden indicates Object already exists,
                         # don't need to re-push since we deduplicate so mark it skip
                         self.skip_object = True
-                        return
+                        return ""
                     else:
                         # Something when wrong while trying to pre-sign the URL.
                         error_msg = await response.json()
@@ -218,41 +380,55 @@ class PresignedS3Upload(object):
                       f"{self.object_details.dataset_path}:{self.object_id}."
                       f" Status: {error_status}. Response: {error_msg}")
 
-    async def _file_loader(self, filename: str, progress_update_fn: Callable):
-        """Method to provide non-blocking chunked reads of files, useful if large.
+    async def get_presigned_s3_url(self, session: aiohttp.ClientSession) -> None:
+        """Method to make a request to the object service and pre-sign an S3 PUT for a single request upload
+
+        Args:
+            session: The current aiohttp session
+
+        Returns:
+            None
+        """
+        if self.is_multipart:
+            raise ValueError("Multipart uploads are pre-signed per part with `get_presigned_part_url()`")
+
+        self.presigned_s3_url = await self._presign(session, f"{self.service_root}/{self.object_id}")
+
+    async def get_presigned_part_url(self, session: aiohttp.ClientSession, part_number: int) -> str:
+        """Method to make a request to the object service and pre-sign an S3 PUT for a part of a multipart upload
+
+        Args:
+            session: The current aiohttp session
+            part_number: the part number (starting at 1)
+
+        Returns:
+            the pre-signed URL, or an empty string if the object already exists
+        """
+        if not self.multipart_upload_id:
+            raise ValueError("A multipart upload must be created before pre-signing a part.")
+
+        url = f"{self.service_root}/{self.object_id}/multipart/{self.multipart_upload_id}/part/{part_number}"
+        return await self._presign(session, url)
+
+    async def _data_loader(self, data: bytes, progress_update_fn: Callable):
+        """Method to stream data into a request in chunks, so progress can be reported as it is sent
 
         Args:
-            filename: absolute path to the file to upload
+            data: the data to send
             progress_update_fn: A callable with arg "completed_bytes" (int) indicating how many bytes have been
                                 uploaded in since last called
         """
-        async with aiofiles.open(filename, 'rb') as f:
-            if self.is_multipart:
-                if not self.current_part:
-                    raise ValueError("No parts remain to get presigned URL.")
-
-                # if multipart, seek to the proper spot in the file
-                await f.seek(self.current_part.start_byte)
-
-            read_bytes = 0
-            chunk = await f.read(self.upload_chunk_size)
-            while chunk:
-                progress_update_fn(completed_bytes=len(chunk))
-                read_bytes += len(chunk)
-                yield chunk
-
-                if self.is_multipart:
-                    if not self.current_part:
-                        raise ValueError("No parts remain to get presigned URL.")
-                    if self.current_part.start_byte + read_bytes >= self.current_part.end_byte:
-                        # You're done reading for this part
-                        break
-
-                # Keep reading and streaming chunks for this part
-                chunk = await f.read(self.upload_chunk_size)
+        view = memoryview(data)
+        for start in range(0, len(data), self.upload_chunk_size):
+            chunk = bytes(view[start:start + self.upload_chunk_size])
+            progress_update_fn(completed_bytes=len(chunk))
+            yield chunk
 
     async def prepare_multipart_upload(self, session: aiohttp.ClientSession) -> None:
-        """Method to prepare a multipart upload by computing parts and getting an upload ID
+        """Method to prepare a multipart upload by getting an upload ID. Parts are produced as the object is
+        compressed, so the number of parts is not known until the upload completes.
+
+        If a journal of a previous attempt to upload this object exists, that upload is resumed instead.
 
         Args:
             session: The current aiohttp session
@@ -260,21 +436,14 @@ class PresignedS3Upload(object):
         Returns:
             None
         """
-        num_parts = math.floor(float(self.compressed_object_size) / float(self.multipart_chunk_size))
-        start_byte = 0
-        for part in range(1, num_parts + 1):
-            self._multipart_parts.append(MultipartPart(part_number=part, start_byte=start_byte,
-                                                       end_byte=start_byte + self.multipart_chunk_size))
-            start_byte = start_byte + self.multipart_chunk_size
-
-        remainder = self.compressed_object_size - (self.multipart_chunk_size * num_parts)
-        if remainder:
-            # If not perfectly divisible by the chunk size, add one more partial part
-            self._multipart_parts.append(MultipartPart(part_number=len(self._multipart_parts) + 1,
-                                                       start_byte=start_byte,
-                                                       end_byte=start_byte + remainder))
-
-        logger.info(self._multipart_parts)
+        if self.journal:
+            upload_id, parts = self.journal.load(self.multipart_layout)
+            if upload_id:
+                self.multipart_upload_id = upload_id
+                self._resumed_parts = parts
+                logger.info(f"Resuming multipart upload {upload_id} for {self.object_details.dataset_path} with "
+                            f"{len(parts)} completed parts")
+                return
 
         # Make a call and create a multipart upload
         try_count = 0
@@ -288,14 +457,17 @@ class PresignedS3Upload(object):
                     if response.status == 200:
                         data = await response.json()
                         self.multipart_upload_id = data['upload_id']
+                        if self.journal:
+                            self.journal.start(data['upload_id'], self.multipart_layout)
                         logger.info(f"Created multipart upload for {self.object_details.dataset_path} at"
-                                    f" {self.object_details.revision[0:8]}, with {len(self._multipart_parts)} "
-                                    f"parts: {self.multipart_upload_id}")
+                                    f" {self.object_details.revision[0:8]}: {self.multipart_upload_id}")
                         return
                     elif response.status == 403:
                         # Forbidden indicates Object already exists,
                         # don't need to re-push since we deduplicate so mark it skip
                         self.skip_object = True
+                        if self.journal:
+                            self.journal.remove()
                         return
                     else:
                         # An error occurred
@@ -313,8 +485,66 @@ class PresignedS3Upload(object):
         raise IOError(f"Failed to push {self.object_details.dataset_path} to storage backend."
                       f" Status: {error_status}. Response: {error_msg}")
 
+    async def upload_parts(self, session: aiohttp.ClientSession, progress_update_fn: Callable) -> None:
+        """Method to compress the object and upload it as parts of the multipart upload. Up to
+        `max_concurrent_parts` parts are uploaded at once, while the next parts are being compressed.
+
+        Parts completed by a previous attempt (see `prepare_multipart_upload()`) are not uploaded again. They are
+        still compressed, since the part boundaries depend on the compressed stream.
+
+        Args:
+            session: The current aiohttp session
+            progress_update_fn: A callable with arg "completed_bytes" (int) indicating how many bytes have been
+                                uploaded in since last called
+
+        Returns:
+            None
+        """
+        if not self.multipart_upload_id:
+            raise ValueError("A multipart upload must be created before uploading parts.")
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_parts)
+
+        async def upload_part(part_number: int, data: bytes) -> Optional[MultipartPartCompleted]:
+            try:
+                url = await self.get_presigned_part_url(session, part_number)
+                if not url:
+                    return None
+                etag = await self._put_data(session, url, data, progress_update_fn)
+                if self.journal:
+                    self.journal.record_part(part_number, etag)
+                self._num_uploaded_parts += 1
+                return MultipartPartCompleted(part_number, etag)
+            finally:
+                semaphore.release()
+
+        tasks: List[asyncio.Future] = list()
+        resumed: List[MultipartPartCompleted] = list()
+        try:
+            async for part_number, data in self._compressed_parts():
+                if part_number in self._resumed_parts:
+                    resumed.append(MultipartPartCompleted(part_number, self._resumed_parts[part_number]))
+                    progress_update_fn(completed_bytes=len(data))
+                    continue
+
+                # Wait for a free slot, which bounds the number of compressed parts held in memory
+                await semaphore.acquire()
+                if self.skip_object or any([t.done() and t.exception() for t in tasks]):
+                    semaphore.release()
+                    break
+                tasks.append(asyncio.ensure_future(upload_part(part_number, data)))
+
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        self._multipart_completed_parts = sorted([r for r in results if r is not None] + resumed,
+                                                 key=lambda p: p.part_number)
+
     async def complete_multipart_upload(self, session: aiohttp.ClientSession) -> None:
-        """Method to prepare a multipart upload by computing parts and getting an upload ID
+        """Method to complete a multipart upload once all parts have been uploaded
 
         Args:
             session: The current aiohttp session
@@ -322,7 +552,7 @@ class PresignedS3Upload(object):
         Returns:
             None
         """
-        if self.current_part:
+        if not self._multipart_completed_parts:
             raise ValueError("All parts should be complete before calling `complete_multipart_upload()`")
 
         try_count = 0
@@ -346,7 +576,8 @@ class PresignedS3Upload(object):
                         # All good.
                         logger.info(f"Completed multipart upload {self.multipart_upload_id} for "
                                     f"{self.object_details.dataset_path} at {self.object_details.revision[0:8]}.")
-                        self.remove_compressed_file()
+                        if self.journal:
+                            self.journal.remove()
                         return
 
             except asyncio.TimeoutError:
@@ -389,6 +620,8 @@ class PresignedS3Upload(object):
                         # All good.
                         logger.info(f"Aborted multipart upload {self.multipart_upload_id} for "
                                     f"{self.object_details.dataset_path} at {self.object_details.revision[0:8]}.")
+                        if self.journal:
+                            self.journal.remove()
                         return
             except asyncio.TimeoutError:
                 error_msg = "Request Timed Out"
@@ -399,38 +632,33 @@ class PresignedS3Upload(object):
         raise IOError(f"Failed to abort multipart upload for {self.object_details.dataset_path}."
                       f" Status: {error_status}. Response: {error_msg}")
 
-    async def put_object(self, session: aiohttp.ClientSession, progress_update_fn: Callable) -> str:
-        """Method to put the object in S3 after the pre-signed URL has been obtained
+    async def _put_data(self, session: aiohttp.ClientSession, url: str, data: bytes,
+                        progress_update_fn: Callable) -> str:
+        """Method to PUT data to a pre-signed S3 URL
 
         Args:
             session: The current aiohttp session
+            url: the pre-signed URL
+            data: the (compressed) data to upload
             progress_update_fn: A callable with arg "completed_bytes" (int) indicating how many bytes have been
                                 uploaded in since last called
 
         Returns:
-            None
+            the ETag of the uploaded data
         """
         # Set the Content-Length of the PUT explicitly since it won't happen automatically due to streaming IO
         headers = copy.deepcopy(self.s3_headers)
+        headers['Content-Length'] = str(len(data))
 
-        # compress object before upload
-        if self.is_multipart:
-            if not self.current_part:
-                raise ValueError(f"Failed to put_object part. No parts remain for {self.object_id}")
-            headers['Content-Length'] = str(self.current_part.end_byte - self.current_part.start_byte)
-        else:
-            headers['Content-Length'] = str(self.compressed_object_size)
-
-        # Stream the file up to S3
+        # Stream the data up to S3
         try_count = 0
         error_msg = None
         error_status = None
         timeout = aiohttp.ClientTimeout(total=15*60, connect=2*60, sock_connect=None, sock_read=None)
         while try_count < 3:
             try:
-                async with session.put(self.presigned_s3_url, headers=headers, timeout=timeout,
-                                       data=self._file_loader(filename=self.compressed_object_path,
-                                                              progress_update_fn=progress_update_fn)) as response:
+                async with session.put(url, headers=headers, timeout=timeout,
+                                       data=self._data_loader(data, progress_update_fn)) as response:
                     if response.status != 200:
                         # An error occurred, retry
                         error_msg = await response.text()
@@ -449,10 +677,25 @@ class PresignedS3Upload(object):
         raise IOError(f"Failed to push {self.object_details.dataset_path} to storage backend."
                       f" Status: {error_status}. Response: {error_msg}")
 
+    async def put_object(self, session: aiohttp.ClientSession, progress_update_fn: Callable) -> str:
+        """Method to compress the object and put it in S3 after the pre-signed URL has been obtained
+
+        Args:
+            session: The current aiohttp session
+            progress_update_fn: A callable with arg "completed_bytes" (int) indicating how many bytes have been
+                                uploaded in since last called
+
+        Returns:
+            the ETag of the object
+        """
+        data = await self.compress_object()
+        return await self._put_data(session, self.presigned_s3_url, data, progress_update_fn)
+
 
 class PresignedS3Download(object):
     def __init__(self, object_service_root: str, object_service_headers: dict, download_chunk_size: int,
-                 object_details: PullObject) -> None:
+                 object_details: PullObject, download_dir: Optional[str] = None,
+                 range_size: int = DOWNLOAD_RANGE_BYTES, max_concurrent_ranges: int = 4) -> None:
         self.service_root = object_service_root
         self.object_service_headers = object_service_headers
         self.download_chunk_size = download_chunk_size
@@ -461,6 +704,16 @@ class PresignedS3Download(object):
 
         self.presigned_s3_url = ""
 
+        # Objects are downloaded in ranges of `range_size` bytes into a partial file in `download_dir`, and only moved
+        # to the object path once complete and verified.
+        self.range_size = range_size
+        self.max_concurrent_ranges = max_concurrent_ranges
+        self.download_dir = download_dir if download_dir else os.path.dirname(self.object_details.object_path)
+
+        # Other objects in the same pull with identical content. The object is only downloaded once, since the
+        # partial files are named by object ID, and these succeed or fail along with it.
+        self.duplicate_objects: List[PullObject] = list()
+
     @property
     def is_presigned(self) -> bool:
         """Method to check if this upload request has successfully been presigned
@@ -470,6 +723,43 @@ class PresignedS3Download(object):
         """
         return self.presigned_s3_url != ""
 
+    @property
+    def object_id(self) -> str:
+        """Property to get the object ID related to this instance
+
+        Returns:
+            str
+        """
+        _, obj_id = self.object_details.object_path.rsplit('/', 1)
+        return obj_id
+
+    @property
+    def pulled_objects(self) -> List[PullObject]:
+        """Property to get all of the objects pulled by this request, including duplicates
+
+        Returns:
+            list
+        """
+        return [self.object_details] + self.duplicate_objects
+
+    @property
+    def partial_path(self) -> str:
+        """Property to get the path to the file holding the compressed object while it is downloaded
+
+        Returns:
+            str
+        """
+        return os.path.join(self.download_dir, f"{self.object_id}.partial")
+
+    @property
+    def journal_path(self) -> str:
+        """Property to get the path to the journal of completed ranges, used to resume a download
+
+        Returns:
+            str
+        """
+        return f"{self.partial_path}.ranges"
+
     async def get_presigned_s3_url(self, session: aiohttp.ClientSession) -> None:
         """Method to make a request to the object service and pre-sign an S3 GET
 
@@ -479,10 +769,7 @@ class PresignedS3Download(object):
         Returns:
             None
         """
-        # Get the object id from the object path
-        _, obj_id = self.object_details.object_path.rsplit('/', 1)
-
-        async with session.get(f"{self.service_root}/{obj_id}", timeout=OBJ_SRV_TIMEOUT,
+        async with session.get(f"{self.service_root}/{self.object_id}", timeout=OBJ_SRV_TIMEOUT,
                                headers=self.object_service_headers) as response:
             if response.status == 200:
                 # Successfully signed the request
@@ -491,12 +778,210 @@ class PresignedS3Download(object):
             else:
                 # Something when wrong while trying to pre-sign the URL.
                 body = await response.json()
-                raise IOError(f"Failed to get pre-signed URL for GET at {self.object_details.dataset_path}:{obj_id}."
-                              f" Status: {response.status}. Response: {body}")
+                raise IOError(f"Failed to get pre-signed URL for GET at {self.object_details.dataset_path}:"
+                              f"{self.object_id}. Status: {response.status}. Response: {body}")
+
+    def _load_journal(self, object_size: int, etag: str) -> Set[int]:
+        """Method to load the start offsets of ranges completed by a previous attempt to download this object
+
+        Args:
+            object_size: size of the compressed object
+            etag: ETag of the compressed object
+
+        Returns:
+            set of range start offsets. Empty if there is nothing to resume
+        """
+        if not os.path.exists(self.journal_path) or not os.path.exists(self.partial_path):
+            return set()
+
+        header: Optional[dict] = None
+        completed: Set[int] = set()
+        with open(self.journal_path, 'rt') as jf:
+            for line in jf:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A partially written line from an interrupted download
+                    break
+
+                if header is None:
+                    header = record
+                else:
+                    completed.add(int(record['start']))
+
+        if header != {'size': object_size, 'etag': etag, 'range_size': self.range_size}:
+            return set()
+
+        return completed
+
+    def _start_journal(self, object_size: int, etag: str) -> None:
+        """Method to start a new download by preallocating the partial file and writing the journal header
+
+        Args:
+            object_size: size of the compressed object
+            etag: ETag of the compressed object
+
+        Returns:
+            None
+        """
+        with open(self.partial_path, 'wb') as pf:
+            pf.truncate(object_size)
+        with open(self.journal_path, 'wt') as jf:
+            jf.write(json.dumps({'size': object_size, 'etag': etag, 'range_size': self.range_size}) + '\n')
+
+    def _write_range(self, start: int, data: bytes) -> None:
+        """Method to write a downloaded range into the partial file and record it in the journal
+
+        Args:
+            start: byte offset of the range
+            data: the range contents
+
+        Returns:
+            None
+        """
+        with open(self.partial_path, 'r+b') as pf:
+            pf.seek(start)
+            pf.write(data)
+            pf.flush()
+            os.fsync(pf.fileno())
+        with open(self.journal_path, 'at') as jf:
+            jf.write(json.dumps({'start': start}) + '\n')
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        """Method to read a completed range back from the partial file
+
+        Args:
+            start: byte offset of the range
+            end: byte offset of the end of the range (exclusive)
+
+        Returns:
+            bytes
+        """
+        with open(self.partial_path, 'rb') as pf:
+            pf.seek(start)
+            return pf.read(end - start)
+
+    def _remove_partial(self) -> None:
+        """Method to remove the partial file and journal
+
+        Returns:
+            None
+        """
+        for path in [self.partial_path, self.journal_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def _get_range(self, session: aiohttp.ClientSession, start: int, end: int, etag: str) -> bytes:
+        """Method to download a range of the object, retrying on errors
+
+        Args:
+            session: The current aiohttp session
+            start: byte offset of the range
+            end: byte offset of the end of the range (exclusive)
+            etag: ETag of the object, to detect if it changed during the download
+
+        Returns:
+            bytes
+        """
+        try_count = 0
+        error_msg = None
+        while try_count < 3:
+            try:
+                async with session.get(self.presigned_s3_url, headers={'Range': f"bytes={start}-{end - 1}"},
+                                       timeout=DOWNLOAD_TIMEOUT) as response:
+                    if response.status == 206:
+                        if response.headers.get('ETag', '') != etag:
+                            raise IOError(f"{self.object_details.dataset_path} changed while being downloaded")
+                        data = await response.read()
+                        if len(data) == end - start:
+                            return data
+                        error_msg = f"Expected {end - start} bytes, received {len(data)}"
+                    else:
+                        error_msg = f"Status: {response.status}. Response: {await response.text()}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                error_msg = str(err)
+
+            await asyncio.sleep(try_count ** 2)
+            try_count += 1
+
+        raise RangeDownloadError(f"Failed to get bytes {start}-{end - 1} of {self.object_details.dataset_path}."
+                                 f" {error_msg}")
+
+    async def _get_ranges(self, session: aiohttp.ClientSession, ranges: List[Tuple[int, int]], etag: str,
+                          completed: Dict[int, asyncio.Event]) -> None:
+        """Method to download ranges concurrently, setting each range's event once it has been written
+
+        Args:
+            session: The current aiohttp session
+            ranges: list of (start, end) byte offsets to download
+            etag: ETag of the object
+            completed: dict of range start offsets to events
+
+        Returns:
+            None
+        """
+        loop = get_event_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrent_ranges)
+
+        async def get_range(start: int, end: int) -> None:
+            async with semaphore:
+                data = await self._get_range(session, start, end, etag)
+                await loop.run_in_executor(None, self._write_range, start, data)
+                completed[start].set()
+
+        tasks = [asyncio.ensure_future(get_range(start, end)) for start, end in ranges]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _decompress_ranges(self, ranges: List[Tuple[int, int]], completed: Dict[int, asyncio.Event],
+                                 progress_update_fn: Callable) -> str:
+        """Method to decompress the partial file in order, as ranges finish downloading. The snappy framing checksums
+        are verified as the data is decompressed.
+
+        Args:
+            ranges: list of all (start, end) byte offsets in the object
+            completed: dict of range start offsets to events, set once the range is in the partial file
+            progress_update_fn: A callable with arg "completed_bytes" (int) indicating how many bytes have been
+                                downloaded in since last called
+
+        Returns:
+            path to the decompressed file
+        """
+        loop = get_event_loop()
+        decompressor = snappy.StreamDecompressor()
+        output_path = os.path.join(self.download_dir, f"{self.object_id}.decompressed")
+
+        def decompress(start: int, end: int) -> int:
+            decompressed = decompressor.decompress(self._read_range(start, end))
+            out_file.write(decompressed)
+            return len(decompressed)
+
+        with open(output_path, 'wb') as out_file:
+            for start, end in ranges:
+                await completed[start].wait()
+                num_bytes = await loop.run_in_executor(None, decompress, start, end)
+                if num_bytes:
+                    progress_update_fn(completed_bytes=num_bytes)
+
+            # Verify the stream did not end part way through a frame. Older versions of python-snappy raise in flush(),
+            # newer versions keep the incomplete frame in `remains`.
+            decompressor.flush()
+            if getattr(decompressor, 'remains', None):
+                raise snappy.UncompressError(f"{self.object_details.dataset_path} is truncated")
+
+        return output_path
 
     async def get_object(self, session: aiohttp.ClientSession, progress_update_fn: Callable) -> None:
         """Method to get the object from S3 after the pre-signed URL has been obtained
 
+        Large objects are downloaded with concurrent range requests into a preallocated partial file and decompressed
+        in order as ranges complete. Completed ranges are journaled, so if the download fails it is resumed on the
+        next attempt. The decompressed object is only moved to its final location once it is complete and verified.
+
         Args:
             session: The current aiohttp session
             progress_update_fn: A callable with arg "completed_bytes" (int) indicating how many bytes have been
@@ -506,29 +991,84 @@ class PresignedS3Download(object):
             None
         """
         try:
-            decompressor = snappy.StreamDecompressor()
-            timeout = aiohttp.ClientTimeout(total=None, connect=2 * 60, sock_connect=None, sock_read=5*60)
-
-            async with session.get(self.presigned_s3_url, timeout=timeout) as response:
-                if response.status != 200:
+            os.makedirs(self.download_dir, exist_ok=True)
+
+            # The first request gets the first range and the size of the object
+            first_range: Optional[bytes] = None
+            async with session.get(self.presigned_s3_url, headers={'Range': f"bytes=0-{self.range_size - 1}"},
+                                   timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status == 200:
+                    # The storage backend ignored the range, so the whole object is in the response
+                    etag = ''
+                    async with aiofiles.open(self.partial_path, 'wb') as fd:
+                        while True:
+                            chunk = await response.content.read(self.download_chunk_size)
+                            if not chunk:
+                                break
+                            await fd.write(chunk)
+                    object_size = os.path.getsize(self.partial_path)
+                elif response.status == 206:
+                    etag = response.headers.get('ETag', '')
+                    object_size = int(response.headers['Content-Range'].rsplit('/', 1)[1])
+                    first_range = await response.read()
+                elif response.status == 416:
+                    # An empty object cannot satisfy a range request
+                    etag = ''
+                    object_size = 0
+                    with open(self.partial_path, 'wb'):
+                        pass
+                else:
                     # An error occurred
                     body = await response.text()
                     raise IOError(f"Failed to get {self.object_details.dataset_path} to storage backend."
                                   f" Status: {response.status}. Response: {body}")
 
-                async with aiofiles.open(self.object_details.object_path, 'wb') as fd:
-                    while True:
-                        chunk = await response.content.read(self.download_chunk_size)
-                        if not chunk:
-                            fd.write(decompressor.flush())
-                            break
-
-                        decompressed_chunk = decompressor.decompress(chunk)
-                        await fd.write(decompressed_chunk)
-                        progress_update_fn(completed_bytes=len(decompressed_chunk))
+            ranges = [(start, min(start + self.range_size, object_size))
+                      for start in range(0, object_size, self.range_size)]
+            completed = {start: asyncio.Event() for start, _ in ranges}
+            if first_range is None:
+                done = set(completed.keys())
+            else:
+                done = self._load_journal(object_size, etag)
+                if done:
+                    logger.info(f"Resuming download of {self.object_details.dataset_path} with "
+                                f"{len(done)} of {len(ranges)} ranges complete")
+                else:
+                    self._start_journal(object_size, etag)
+
+                if 0 not in done:
+                    await get_event_loop().run_in_executor(None, self._write_range, 0, first_range)
+                    done.add(0)
+            for start in done:
+                completed[start].set()
+
+            # Decompress ranges in order while the remaining ranges are downloaded
+            download_task = asyncio.ensure_future(self._get_ranges(session, [r for r in ranges if r[0] not in done],
+                                                                   etag, completed))
+            decompress_task = asyncio.ensure_future(self._decompress_ranges(ranges, completed, progress_update_fn))
+            try:
+                await asyncio.gather(download_task, decompress_task)
+            finally:
+                download_task.cancel()
+                decompress_task.cancel()
+
+            shutil.move(decompress_task.result(), self.object_details.object_path)
+            self._remove_partial()
+
+            for duplicate in self.duplicate_objects:
+                if duplicate.object_path != self.object_details.object_path:
+                    shutil.copyfile(self.object_details.object_path, duplicate.object_path)
+                progress_update_fn(completed_bytes=os.path.getsize(duplicate.object_path))
         except Exception as err:
             logger.exception(err)
+            if not isinstance(err, RangeDownloadError):
+                # Only interrupted range downloads can be resumed. Anything else (e.g. corrupt data) starts over.
+                self._remove_partial()
             raise IOError(f"Failed to get {self.object_details.dataset_path} from storage backend. {err}")
+        finally:
+            decompressed_path = os.path.join(self.download_dir, f"{self.object_id}.decompressed")
+            if os.path.exists(decompressed_path):
+                os.remove(decompressed_path)
 
 
 class GigantumObjectStore(ManagedStorageBackend):
@@ -567,6 +1107,22 @@ to Gigantum Cloud will count towards your storage quota and include all versions
     def client_should_dedup_on_push(self) -> bool:
         return True
 
+    def object_pack_settings(self, dataset) -> Optional[PackSettings]:
+        """Method to get the settings used to bundle small objects into pack files, enabled with the backend's
+        `pack_objects` configuration
+
+        Args:
+            dataset: The dataset instance
+
+        Returns:
+            PackSettings, or None if objects should always be pushed individually
+        """
+        backend_config = dataset.client_config.config['datasets']['backends']['gigantum_object_v1']
+        if not backend_config.get('pack_objects', False):
+            return None
+        return PackSettings(max_object_size=backend_config.get('pack_max_object_size', 262144),
+                            pack_size=backend_config.get('pack_size', 67108864))
+
     def _required_configuration(self) -> List[Dict[str, str]]:
         """A private method to return a list of keys that must be set for a backend to be fully configured
 
@@ -699,22 +1255,17 @@ to Gigantum Cloud will count towards your storage quota and include all versions
             await presigned_request.get_presigned_s3_url(session)
             queue.put_nowait(presigned_request)
         else:
-            # Process S3 Upload
-            try:
-                await presigned_request.put_object(session, progress_update_fn)
-                self.successful_requests.append(presigned_request)
-                presigned_request.remove_compressed_file()
-            except Exception:
-                presigned_request.remove_compressed_file()
-                raise
+            # Compress and process S3 Upload
+            await presigned_request.put_object(session, progress_update_fn)
+            self.successful_requests.append(presigned_request)
 
     async def _process_multipart_upload(self, queue: asyncio.LifoQueue, session: aiohttp.ClientSession,
                                         presigned_request: PresignedS3Upload, progress_update_fn: Callable) -> None:
         """Method to handle the complex multipart upload workflow.
 
         1. Create a multipart upload and get the ID
-        2. Upload all parts
-        3. Complete the part and mark the PresignedS3Upload object as successful
+        2. Compress the object and upload the parts concurrently as they are produced
+        3. Complete the upload and mark the PresignedS3Upload object as successful
 
         Args:
             queue: The current work queue
@@ -733,24 +1284,13 @@ to Gigantum Cloud will count towards your storage quota and include all versions
             # Requeue for more processing
             queue.put_nowait(presigned_request)
         else:
-            try:
-                if presigned_request.current_part:
-                    if not presigned_request.is_presigned:
-                        # Fetch the signed URL
-                        await presigned_request.get_presigned_s3_url(session)
-                        queue.put_nowait(presigned_request)
-                    else:
-                        # Process S3 Upload, mark the part as done, and requeue it
-                        etag = await presigned_request.put_object(session, progress_update_fn)
-                        presigned_request.mark_current_part_complete(etag)
-                        queue.put_nowait(presigned_request)
-                else:
-                    # If you get here, you are done and should complete the upload
-                    await presigned_request.complete_multipart_upload(session)
-                    self.successful_requests.append(presigned_request)
-            except Exception:
-                presigned_request.remove_compressed_file()
-                raise
+            await presigned_request.upload_parts(session, progress_update_fn)
+            if presigned_request.skip_object:
+                # The object was found to already exist while uploading. Requeue so it is handled as a skip.
+                queue.put_nowait(presigned_request)
+            else:
+                await presigned_request.complete_multipart_upload(session)
+                self.successful_requests.append(presigned_request)
 
     async def _push_object_consumer(self, queue: asyncio.LifoQueue, session: aiohttp.ClientSession,
                                     progress_update_fn: Callable) -> None:
@@ -785,7 +1325,11 @@ to Gigantum Cloud will count towards your storage quota and include all versions
             except Exception as err:
                 logger.exception(err)
                 self.failed_requests.append(presigned_request)
-                if presigned_request.is_multipart and presigned_request.multipart_upload_id is not None:
+                if presigned_request.can_resume:
+                    # Leave the upload in place, so the completed parts are reused on the next push
+                    logger.info(f"Leaving multipart upload {presigned_request.multipart_upload_id} for "
+                                f"{presigned_request.object_id} to be resumed")
+                elif presigned_request.is_multipart and presigned_request.multipart_upload_id is not None:
                     # Make best effort to abort a multipart upload if needed
                     try:
                         await presigned_request.abort_multipart_upload(session)
@@ -793,6 +1337,8 @@ to Gigantum Cloud will count towards your storage quota and include all versions
                         logger.error(f"An error occured while trying to abort multipart upload "
                                      f"{presigned_request.multipart_upload_id} for {presigned_request.object_id}")
                         logger.exception(err)
+                    if presigned_request.journal:
+                        presigned_request.journal.remove()
 
             # Notify the queue that the item has been processed
             queue.task_done()
@@ -800,7 +1346,8 @@ to Gigantum Cloud will count towards your storage quota and include all versions
     @staticmethod
     async def _push_object_producer(queue: asyncio.LifoQueue, object_service_root: str, object_service_headers: dict,
                                     multipart_chunk_size: int, upload_chunk_size: int,
-                                    objects: List[PushObject]) -> None:
+                                    objects: List[PushObject], compression_executor: Optional[Executor] = None,
+                                    max_concurrent_parts: int = 4, journal_dir: Optional[str] = None) -> None:
         """Async method to populate the queue with upload requests
 
         Args:
@@ -810,6 +1357,9 @@ to Gigantum Cloud will count towards your storage quota and include all versions
             multipart_chunk_size: Size in bytes for break a file apart for multi-part uploading
             upload_chunk_size: Size in bytes for streaming IO chunks
             objects: A list of PushObjects to push
+            compression_executor: executor to run compression in, or None to use the loop's default executor
+            max_concurrent_parts: the max number of parts of a single multipart upload to upload at once
+            journal_dir: directory to journal multipart uploads in so they can be resumed, or None to disable
 
         Returns:
             None
@@ -819,13 +1369,17 @@ to Gigantum Cloud will count towards your storage quota and include all versions
                                                   object_service_headers,
                                                   multipart_chunk_size,
                                                   upload_chunk_size,
-                                                  obj)
+                                                  obj,
+                                                  compression_executor=compression_executor,
+                                                  max_concurrent_parts=max_concurrent_parts,
+                                                  journal_dir=journal_dir)
             await queue.put(presigned_request)
 
     async def _run_push_pipeline(self, object_service_root: str, object_service_headers: dict,
                                  objects: List[PushObject], progress_update_fn: Callable,
                                  multipart_chunk_size: int, upload_chunk_size: int = 4194304,
-                                 num_workers: int = 4) -> None:
+                                 num_workers: int = 4, compression_workers: int = 1,
+                                 max_concurrent_parts: int = 4, journal_dir: Optional[str] = None) -> None:
         """Method to run the async upload pipeline
 
         Args:
@@ -837,6 +1391,10 @@ to Gigantum Cloud will count towards your storage quota and include all versions
             multipart_chunk_size: Size in bytes for break a file apart for multi-part uploading
             upload_chunk_size: Size in bytes for streaming IO chunks
             num_workers: the number of consumer workers to start
+            compression_workers: the number of processes to compress objects in. If 1, compression runs in the
+                                 event loop's default thread executor instead
+            max_concurrent_parts: the max number of parts of a single multipart upload to upload at once
+            journal_dir: directory to journal multipart uploads in so they can be resumed, or None to disable
 
         Returns:
 
@@ -845,27 +1403,38 @@ to Gigantum Cloud will count towards your storage quota and include all versions
         # not timeout before they can be used if there are a lot of files.
         queue: asyncio.LifoQueue = asyncio.LifoQueue()
 
-        async with aiohttp.ClientSession() as session:
-            # Start workers
-            workers = []
-            for i in range(num_workers):
-                task = asyncio.ensure_future(self._push_object_consumer(queue, session, progress_update_fn))
-                workers.append(task)
-
-            # Populate the work queue
-            await self._push_object_producer(queue,
-                                             object_service_root,
-                                             object_service_headers,
-                                             multipart_chunk_size,
-                                             upload_chunk_size,
-                                             objects)
-
-            # wait until the consumer has processed all items
-            await queue.join()
+        compression_executor: Optional[Executor] = None
+        if compression_workers > 1:
+            compression_executor = ProcessPoolExecutor(max_workers=compression_workers)
 
-            # the workers are still awaiting for work so close them
-            for worker in workers:
-                worker.cancel()
+        try:
+            async with aiohttp.ClientSession() as session:
+                # Start workers
+                workers = []
+                for i in range(num_workers):
+                    task = asyncio.ensure_future(self._push_object_consumer(queue, session, progress_update_fn))
+                    workers.append(task)
+
+                # Populate the work queue
+                await self._push_object_producer(queue,
+                                                 object_service_root,
+                                                 object_service_headers,
+                                                 multipart_chunk_size,
+                                                 upload_chunk_size,
+                                                 objects,
+                                                 compression_executor=compression_executor,
+                                                 max_concurrent_parts=max_concurrent_parts,
+                                                 journal_dir=journal_dir)
+
+                # wait until the consumer has processed all items
+                await queue.join()
+
+                # the workers are still awaiting for work so close them
+                for worker in workers:
+                    worker.cancel()
+        finally:
+            if compression_executor:
+                compression_executor.shutdown()
 
     def push_objects(self, dataset: Dataset, objects: List[PushObject],
                      progress_update_fn: Callable) -> PushResult:
@@ -889,18 +1458,30 @@ to Gigantum Cloud will count towards your storage quota and include all versions
         upload_chunk_size = backend_config['upload_chunk_size']
         multipart_chunk_size = backend_config['multipart_chunk_size']
         num_workers = backend_config['num_workers']
+        compression_workers = backend_config.get('compression_workers', 1)
+        max_concurrent_parts = backend_config.get('max_concurrent_parts', 4)
 
         object_service = dataset.client_config.get_server_configuration().object_service_url
         object_service_root = f"{object_service}{dataset.namespace}/{dataset.name}"
+        if not dataset.namespace:
+            raise ValueError("Dataset namespace must be set to push objects to Gigantum Cloud")
+        journal_dir = os.path.join(dataset.client_config.upload_journal_dir, dataset.namespace, dataset.name)
 
         loop = get_event_loop()
         loop.run_until_complete(self._run_push_pipeline(object_service_root, self._object_service_headers(), objects,
                                                         progress_update_fn=progress_update_fn,
                                                         multipart_chunk_size=multipart_chunk_size,
                                                         upload_chunk_size=upload_chunk_size,
-                                                        num_workers=num_workers))
+                                                        num_workers=num_workers,
+                                                        compression_workers=compression_workers,
+                                                        max_concurrent_parts=max_concurrent_parts,
+                                                        journal_dir=journal_dir))
 
         successes = [x.object_details for x in self.successful_requests]
+        for obj in successes:
+            if is_pack_path(obj.object_path) and os.path.exists(obj.object_path):
+                # The objects in a pack are still in the file cache, so the pack is no longer needed once pushed
+                os.remove(obj.object_path)
 
         failures = list()
         for f in self.failed_requests:
@@ -946,7 +1527,9 @@ to Gigantum Cloud will count towards your storage quota and include all versions
 
     @staticmethod
     async def _pull_object_producer(queue: asyncio.LifoQueue, object_service_root: str, object_service_headers: dict,
-                                    download_chunk_size: int, objects: List[PullObject]) -> None:
+                                    download_chunk_size: int, objects: List[PullObject],
+                                    download_dir: Optional[str] = None, range_size: int = DOWNLOAD_RANGE_BYTES,
+                                    max_concurrent_ranges: int = 4) -> None:
         """Async method to populate the queue with download requests
 
         Args:
@@ -955,25 +1538,40 @@ to Gigantum Cloud will count towards your storage quota and include all versions
             object_service_headers: The headers to use when requesting signed urls, including auth info
             download_chunk_size: Size in bytes for streaming IO chunks
             objects: A list of PullObjects to push
+            download_dir: directory to hold objects while they are downloaded
+            range_size: Size in bytes of each range request
+            max_concurrent_ranges: the max number of ranges of a single object to download at once
 
         Returns:
             None
         """
+        # Objects with identical content (e.g. duplicate files) are grouped into a single request
+        object_requests: Dict[str, PresignedS3Download] = dict()
         for obj in objects:
             # Create object destination dir if needed
-            obj_dir, _ = obj.object_path.rsplit('/', 1)
+            obj_dir, obj_id = obj.object_path.rsplit('/', 1)
             os.makedirs(obj_dir, exist_ok=True)  # type: ignore
 
-            # Populate queue with item for object
-            presigned_request = PresignedS3Download(object_service_root,
-                                                    object_service_headers,
-                                                    download_chunk_size,
-                                                    obj)
+            if obj_id in object_requests:
+                object_requests[obj_id].duplicate_objects.append(obj)
+            else:
+                object_requests[obj_id] = PresignedS3Download(object_service_root,
+                                                              object_service_headers,
+                                                              download_chunk_size,
+                                                              obj,
+                                                              download_dir=download_dir,
+                                                              range_size=range_size,
+                                                              max_concurrent_ranges=max_concurrent_ranges)
+
+        # Populate queue with item for each object
+        for presigned_request in object_requests.values():
             await queue.put(presigned_request)
 
     async def _run_pull_pipeline(self, object_service_root: str, object_service_headers: dict,
                                  objects: List[PullObject], progress_update_fn: Callable,
-                                 download_chunk_size: int = 4194304, num_workers: int = 4) -> None:
+                                 download_chunk_size: int = 4194304, num_workers: int = 4,
+                                 download_dir: Optional[str] = None, range_size: int = DOWNLOAD_RANGE_BYTES,
+                                 max_concurrent_ranges: int = 4) -> None:
         """Method to run the async download pipeline
 
         Args:
@@ -984,6 +1582,9 @@ to Gigantum Cloud will count towards your storage quota and include all versions
                                 downloaded in since last called
             download_chunk_size: Size in bytes for streaming IO chunks
             num_workers: the number of consumer workers to start
+            download_dir: directory to hold objects while they are downloaded
+            range_size: Size in bytes of each range request
+            max_concurrent_ranges: the max number of ranges of a single object to download at once
 
         Returns:
 
@@ -1006,7 +1607,10 @@ to Gigantum Cloud will count towards your storage quota and include all versions
                                              object_service_root,
                                              object_service_headers,
                                              download_chunk_size,
-                                             objects)
+                                             objects,
+                                             download_dir=download_dir,
+                                             range_size=range_size,
+                                             max_concurrent_ranges=max_concurrent_ranges)
 
             # wait until the consumer has processed all items
             await queue.join()
@@ -1035,26 +1639,125 @@ to Gigantum Cloud will count towards your storage quota and include all versions
         backend_config = dataset.client_config.config['datasets']['backends']['gigantum_object_v1']
         download_chunk_size = backend_config['download_chunk_size']
         num_workers = backend_config['num_workers']
+        range_size = backend_config.get('download_range_size', DOWNLOAD_RANGE_BYTES)
+        max_concurrent_ranges = backend_config.get('max_concurrent_ranges', 4)
 
+        if not dataset.namespace:
+            raise ValueError("Dataset namespace must be set to pull objects from Gigantum Cloud")
         object_service = dataset.client_config.get_server_configuration().object_service_url
         object_service_root = f"{object_service}{dataset.namespace}/{dataset.name}"
+        download_dir = os.path.join(dataset.client_config.download_dir, dataset.namespace, dataset.name)
+
+        successes: List[PullObject] = list()
+        failures: List[PullObject] = list()
+
+        # Objects stored in pack files are pulled by downloading each pack once and unpacking it
+        packed_objects, objects = self._group_packed_objects(dataset, objects)
+        if packed_objects:
+            # Packs are downloaded to a directory for this process, since other jobs may be pulling the same pack
+            pack_dir = os.path.join(download_dir, PACK_DIR_NAME, str(os.getpid()))
+            catalog = PackCatalog(dataset.root_dir)
+            pack_objects = [PullObject(object_path=os.path.join(pack_dir, pack_id), revision=members[0].revision,
+                                       dataset_path=os.path.relpath(os.path.join(catalog.catalog_dir, pack_id),
+                                                                    dataset.root_dir))
+                            for pack_id, members in packed_objects.items()]
+
+            loop = get_event_loop()
+            loop.run_until_complete(self._run_pull_pipeline(object_service_root, self._object_service_headers(),
+                                                            pack_objects,
+                                                            progress_update_fn=progress_update_fn,
+                                                            download_chunk_size=download_chunk_size,
+                                                            num_workers=num_workers,
+                                                            download_dir=pack_dir,
+                                                            range_size=range_size,
+                                                            max_concurrent_ranges=max_concurrent_ranges))
+
+            pack_successes, pack_failures = self._unpack_pulled_packs(packed_objects)
+            successes.extend(pack_successes)
+            failures.extend(pack_failures)
+            self.successful_requests = list()
+            self.failed_requests = list()
+
+        if objects:
+            loop = get_event_loop()
+            loop.run_until_complete(self._run_pull_pipeline(object_service_root, self._object_service_headers(),
+                                                            objects,
+                                                            progress_update_fn=progress_update_fn,
+                                                            download_chunk_size=download_chunk_size,
+                                                            num_workers=num_workers,
+                                                            download_dir=download_dir,
+                                                            range_size=range_size,
+                                                            max_concurrent_ranges=max_concurrent_ranges))
+
+            successes.extend([obj for x in self.successful_requests for obj in x.pulled_objects])
+            for f in self.failed_requests:
+                # An exception was raised during task processing
+                for obj in f.pulled_objects:
+                    logger.error(f"Failed to pull {obj.dataset_path}:{obj.object_path}")
+                    failures.append(obj)
+
+        if failures:
+            message = "Some objects failed to download and will be retried on the next sync operation. Check results."
 
-        loop = get_event_loop()
-        loop.run_until_complete(self._run_pull_pipeline(object_service_root, self._object_service_headers(), objects,
-                                                        progress_update_fn=progress_update_fn,
-                                                        download_chunk_size=download_chunk_size,
-                                                        num_workers=num_workers))
+        return PullResult(success=successes, failure=failures, message=message)
 
-        successes = [x.object_details for x in self.successful_requests]
+    @staticmethod
+    def _group_packed_objects(dataset: Dataset,
+                              objects: List[PullObject]) -> Tuple[Dict[str, List[PullObject]], List[PullObject]]:
+        """Method to find the objects that are stored in pack files
 
-        failures = list()
-        for f in self.failed_requests:
-            # An exception was raised during task processing
-            logger.error(f"Failed to pull {f.object_details.dataset_path}:{f.object_details.object_path}")
-            message = "Some objects failed to download and will be retried on the next sync operation. Check results."
-            failures.append(f.object_details)
+        Args:
+            dataset: The current dataset
+            objects: A list of PullObjects to pull
 
-        return PullResult(success=successes, failure=failures, message=message)
+        Returns:
+            dict of pack ids to the objects to pull from each pack, and the list of objects stored individually
+        """
+        packed: Dict[str, List[PullObject]] = dict()
+        individual: List[PullObject] = list()
+
+        catalog = PackCatalog(dataset.root_dir).packed_objects()
+        for obj in objects:
+            pack_id = catalog.get(os.path.basename(obj.object_path))
+            if pack_id:
+                packed.setdefault(pack_id, list()).append(obj)
+            else:
+                individual.append(obj)
+
+        return packed, individual
+
+    def _unpack_pulled_packs(self,
+                             packed_objects: Dict[str, List[PullObject]]) -> Tuple[List[PullObject], List[PullObject]]:
+        """Method to unpack the objects from the pack files that were just pulled, and remove the pack files
+
+        Args:
+            packed_objects: dict of pack ids to the objects to pull from each pack
+
+        Returns:
+            list of objects successfully pulled, and list of objects that failed
+        """
+        successes: List[PullObject] = list()
+        failures: List[PullObject] = list()
+
+        for request in self.successful_requests:
+            members = packed_objects[request.object_id]
+            pack_path = request.object_details.object_path
+            try:
+                unpack(pack_path, {os.path.basename(obj.object_path): obj.object_path for obj in members})
+                successes.extend(members)
+            except Exception as err:
+                logger.error(f"Failed to unpack {request.object_details.dataset_path}")
+                logger.exception(err)
+                failures.extend(members)
+            finally:
+                if os.path.exists(pack_path):
+                    os.remove(pack_path)
+
+        for request in self.failed_requests:
+            logger.error(f"Failed to pull {request.object_details.dataset_path}:{request.object_details.object_path}")
+            failures.extend(packed_objects[request.object_id])
+
+        return successes, failures
 
     def delete_contents(self, dataset) -> None:
         """Method to remove the contents of a dataset from the storage backend, should only work if managed
@@ -1,15 +1,20 @@
 from gtmcore.dataset import Dataset
 from gtmcore.dataset.storage.backend import UnmanagedStorageBackend
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Set, Tuple
 import os
+import time
 
 from gtmcore.dataset.io import PullResult, PullObject
 from gtmcore.logging import LMLogger
 from gtmcore.configuration import Configuration
 from gtmcore.dataset.manifest.manifest import Manifest, StatusResult
+from gtmcore.dataset.storage.local_index import FileSnapshot, LocalSnapshotIndex, LocalDirectoryWatcher
 
 logger = LMLogger.get_logger()
 
+# Files in the data directory that are never added to the dataset
+IGNORED_FILES = ['.smarthash', '.DS_STORE', '.DS_Store']
+
 
 class LocalFilesystem(UnmanagedStorageBackend):
 
@@ -142,10 +147,115 @@ more, check out the docs here: [https://docs.gigantum.com](https://docs.gigantum
         """
         return True
 
+    @staticmethod
+    def _get_snapshot_index_file(manifest: Manifest) -> str:
+        """Helper to get the snapshot index of the data directory, which is kept in the file cache"""
+        return os.path.join(manifest.cache_mgr.cache_root, '.local_snapshot')
+
+    @staticmethod
+    def _snapshot_file(abs_path: str) -> Optional[FileSnapshot]:
+        """Helper to get the metadata of a file, or None if it doesn't exist"""
+        try:
+            stat_result = os.stat(abs_path)
+        except OSError:
+            return None
+        return FileSnapshot(stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino)
+
+    def _scan_directory(self, local_data_dir: str) -> Dict[str, FileSnapshot]:
+        """Method to get the metadata of everything in the data directory
+
+        Args:
+            local_data_dir: absolute path to the data directory
+
+        Returns:
+            dict of relative path (with a trailing slash for directories) -> FileSnapshot
+        """
+        current: Dict[str, FileSnapshot] = dict()
+        for root, dirs, files in os.walk(local_data_dir):
+            folder = os.path.relpath(root, local_data_dir)
+            if folder == '.':
+                folder = ''
+
+            for d in dirs:
+                # TODO: Check for ignored
+                rel_path = os.path.join(folder, d) + os.path.sep  # All folders are represented with a trailing slash
+                snapshot = self._snapshot_file(os.path.join(root, d))
+                if snapshot:
+                    current[rel_path] = snapshot
+
+            for file in files:
+                # TODO: Check for ignored
+                if file in IGNORED_FILES:
+                    continue
+                snapshot = self._snapshot_file(os.path.join(root, file))
+                if snapshot:
+                    current[os.path.join(folder, file)] = snapshot
+
+        return current
+
+    def _scan_paths(self, local_data_dir: str, relative_paths: Set[str],
+                    manifest: Manifest) -> Tuple[Dict[str, FileSnapshot], Set[str]]:
+        """Method to get the metadata of the paths a watcher recorded as changed
+
+        Args:
+            local_data_dir: absolute path to the data directory
+            relative_paths: relative paths to check
+            manifest: the dataset manifest, to find the contents of removed directories
+
+        Returns:
+            (dict of relative path -> FileSnapshot for paths that exist, set of relative paths that don't exist)
+        """
+        current: Dict[str, FileSnapshot] = dict()
+        missing: Set[str] = set()
+        for rel_path in relative_paths:
+            if os.path.basename(rel_path.rstrip(os.path.sep)) in IGNORED_FILES:
+                continue
+            abs_path = os.path.join(local_data_dir, rel_path)
+            snapshot = self._snapshot_file(abs_path)
+            if snapshot is None:
+                missing.add(rel_path)
+                if rel_path[-1] == os.path.sep:
+                    # Only the directory is reported when it is moved away
+                    missing.update(key for key in manifest.manifest if key.startswith(rel_path))
+            elif os.path.isdir(abs_path):
+                current[rel_path.rstrip(os.path.sep) + os.path.sep] = snapshot
+            else:
+                current[rel_path] = snapshot
+
+        return current, missing
+
+    def start_watcher(self, dataset) -> Optional[LocalDirectoryWatcher]:
+        """Method to start recording changes to the data directory in the background, so updates only have to check
+        the files that changed instead of the entire directory
+
+        The watcher only records changes while the current process runs, so it should be started from a long lived
+        process. Watching is only supported on Linux.
+
+        Args:
+            dataset: Dataset object
+
+        Returns:
+            the running LocalDirectoryWatcher, or None if watching is not supported
+        """
+        if not LocalDirectoryWatcher.is_supported():
+            return None
+        m = Manifest(dataset, self.configuration.get('username'))
+        watcher = LocalDirectoryWatcher(self._get_local_data_dir(), self._get_snapshot_index_file(m))
+        watcher.start()
+        return watcher
+
     def update_from_remote(self, dataset, status_update_fn: Callable) -> None:
         """Optional method that updates the dataset by comparing against the remote. Not all unmanaged dataset backends
         will be able to do this.
 
+        The (size, mtime, inode) of every file is compared with a snapshot saved by the previous update, and only files
+        whose metadata changed are hashed again. Files that were replaced (a new inode) are linked into the revision
+        directory again. If a LocalDirectoryWatcher has been running since the previous update, only the paths it
+        recorded are checked, instead of walking the entire directory.
+
+        Note: A file modified without changing its size or mtime is not detected. Run `update_from_local` with
+        `verify_contents=True` to hash every file.
+
         Args:
             dataset: Dataset object
             status_update_fn: A callable, accepting a string for logging/providing status to the UI
@@ -156,53 +266,69 @@ more, check out the docs here: [https://docs.gigantum.com](https://docs.gigantum
         if 'username' not in self.configuration:
             raise ValueError("Dataset storage backend requires current logged in username to verify contents")
         m = Manifest(dataset, self.configuration.get('username'))
-
-        # walk the local source dir, looking for additions/deletions
-        all_files = list()
-        added_files = list()
         local_data_dir = self._get_local_data_dir()
+        revision_dir = os.path.join(m.cache_mgr.cache_root, m.dataset_revision)
+        os.makedirs(revision_dir, exist_ok=True)
+
+        index = LocalSnapshotIndex(self._get_snapshot_index_file(m))
+        started_ns = time.time_ns()
+        dirty = index.get_dirty()
+        replace_snapshot = not index.is_dirty_set_complete()
+        if replace_snapshot:
+            status_update_fn("Checking data directory for changes.")
+            current = self._scan_directory(local_data_dir)
+            missing = set(m.manifest.keys()).difference(current.keys())
+            previous = index.get_snapshot()
+        else:
+            status_update_fn(f"Checking {len(dirty)} changed paths in data directory.")
+            current, missing = self._scan_paths(local_data_dir, dirty, m)
+            previous = index.get_snapshot_for_paths(list(current.keys()))
 
-        os.makedirs(os.path.join(m.cache_mgr.cache_root, m.dataset_revision), exist_ok=True)
-
-        for root, dirs, files in os.walk(local_data_dir):
-            _, folder = root.split(local_data_dir)
-            if len(folder) > 0:
-                if folder[0] == os.path.sep:
-                    folder = folder[1:]
-
-            for d in dirs:
-                # TODO: Check for ignored
-                rel_path = os.path.join(folder, d) + os.path.sep  # All folders are represented with a trailing slash
-                all_files.append(rel_path)
-                if rel_path not in m.manifest:
-                    added_files.append(rel_path)
+        added_files = list()
+        changed_files = list()
+        for rel_path, snapshot in current.items():
+            if rel_path not in m.manifest:
+                added_files.append(rel_path)
+                if rel_path[-1] == os.path.sep:
                     # Create dir in current revision for linking to work
-                    os.makedirs(os.path.join(m.cache_mgr.cache_root, m.dataset_revision, rel_path), exist_ok=True)
-
-            for file in files:
-                # TODO: Check for ignored
-                if file in ['.smarthash', '.DS_STORE', '.DS_Store']:
+                    os.makedirs(os.path.join(revision_dir, rel_path), exist_ok=True)
+                else:
+                    # Link into current revision for downstream linking to work
+                    os.makedirs(os.path.dirname(os.path.join(revision_dir, rel_path)), exist_ok=True)
+                    if not os.path.exists(os.path.join(revision_dir, rel_path)):
+                        os.link(os.path.join(local_data_dir, rel_path), os.path.join(revision_dir, rel_path))
+            elif rel_path[-1] != os.path.sep and previous.get(rel_path) != snapshot:
+                changed_files.append(rel_path)
+
+        deleted_files = sorted([key for key in missing if key in m.manifest])
+
+        modified_files = list()
+        if changed_files:
+            for rel_path in changed_files:
+                source = os.path.join(local_data_dir, rel_path)
+                destination = os.path.join(revision_dir, rel_path)
+                if os.path.exists(destination) and os.path.samefile(source, destination):
                     continue
+                # The file was replaced (e.g. saved by an editor writing a new file), so link the new file
+                if os.path.lexists(destination):
+                    os.remove(destination)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                os.link(source, destination)
 
-                rel_path = os.path.join(folder, file)
-                all_files.append(rel_path)
-                if rel_path not in m.manifest:
-                    added_files.append(rel_path)
-                    # Symlink into current revision for downstream linking to work
-                    logger.warning(os.path.join(root, file))
-                    if not os.path.exists(os.path.join(m.cache_mgr.cache_root, m.dataset_revision, rel_path)):
-                        os.link(os.path.join(root, file),
-                                os.path.join(m.cache_mgr.cache_root, m.dataset_revision, rel_path))
-
-                    # TODO: THINK ABOUT HERE....DO YOU NEED TO RUN THE MANIFEST LINKING HERE (but manifest not populated yet i'm pretty sure)
-
-        deleted_files = sorted(list(set(m.manifest.keys()).difference(all_files)))
+            status_update_fn(f"Validating contents of {len(changed_files)} changed files. Please wait.")
+            new_hashes = self.hash_file_key_list(dataset, changed_files)
+            modified_files = [key for key, new_hash in zip(changed_files, new_hashes)
+                              if new_hash != m.manifest[key].get('h')]
 
         # Create StatusResult to force modifications
-        status = StatusResult(created=added_files, modified=[], deleted=deleted_files)
+        status = StatusResult(created=added_files, modified=modified_files, deleted=deleted_files)
 
         # Link the revision dir
         m.link_revision()
 
         # Run local update
-        self.update_from_local(dataset, status_update_fn, status_result=status, verify_contents=True)
+        self.update_from_local(dataset, status_update_fn, status_result=status)
+
+        # Only save the snapshot once the changes are in the manifest, so a failed update is retried
+        index.update_snapshot(current, missing, started_ns, processed_dirty=dirty, replace=replace_snapshot)
+        index.close()
@@ -0,0 +1,407 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from gtmcore.logging import LMLogger
+
+logger = LMLogger.get_logger()
+
+# Metadata of a file in a local data directory. If any field changes, the file may have been modified or replaced.
+FileSnapshot = NamedTuple('FileSnapshot', [('size', int), ('mtime_ns', int), ('inode', int)])
+
+# Seconds between watcher heartbeats. A dirty set is only trusted if the watcher's heartbeat is recent.
+WATCH_HEARTBEAT_INTERVAL = 10
+WATCH_HEARTBEAT_TIMEOUT = 3 * WATCH_HEARTBEAT_INTERVAL
+
+# Max number of paths bound to a single query (SQLite limits the number of host parameters to 999 by default)
+MAX_QUERY_PARAMS = 900
+
+
+class LocalSnapshotIndex(object):
+    """Class to store a snapshot of the metadata of every file in a local data directory in a SQLite database
+
+    The snapshot is compared with the directory on the next update, so only files whose size, mtime or inode changed
+    have to be hashed again. The database also holds the set of paths a LocalDirectoryWatcher has seen change since
+    the last update, and the watcher's state, so updates can skip walking the directory while a watcher is running.
+    """
+    def __init__(self, index_file: str) -> None:
+        self.index_file = index_file
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Method to get a connection to the index database, creating it if needed
+
+        Returns:
+            sqlite3.Connection
+        """
+        if self._conn:
+            return self._conn
+
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError as err:
+            # The index is only a cache of file metadata, so if it is corrupt start over and it will be rebuilt
+            logger.warning(f"Local snapshot index {self.index_file} is invalid and will be reset: {err}")
+            os.remove(self.index_file)
+            self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Method to open the database and create the schema if needed
+
+        Returns:
+            sqlite3.Connection
+        """
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        conn = sqlite3.connect(self.index_file, timeout=30)
+        # The watcher and updates write from different processes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS snapshot (path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                     "mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS dirty (path TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER)")
+        conn.commit()
+        return conn
+
+    def close(self) -> None:
+        """Method to close the database connection
+
+        Returns:
+            None
+        """
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def get_snapshot(self) -> Dict[str, FileSnapshot]:
+        """Method to load the snapshot
+
+        Returns:
+            dict of relative path -> FileSnapshot
+        """
+        rows = self._connect().execute("SELECT path, size, mtime_ns, inode FROM snapshot")
+        return {row[0]: FileSnapshot(row[1], row[2], row[3]) for row in rows}
+
+    def get_snapshot_for_paths(self, relative_paths: List[str]) -> Dict[str, FileSnapshot]:
+        """Method to load the snapshot of a list of paths
+
+        Args:
+            relative_paths: relative paths to the files in the data directory
+
+        Returns:
+            dict of relative path -> FileSnapshot, for the paths that are in the snapshot
+        """
+        conn = self._connect()
+        result: Dict[str, FileSnapshot] = dict()
+        for idx in range(0, len(relative_paths), MAX_QUERY_PARAMS):
+            chunk = relative_paths[idx:idx + MAX_QUERY_PARAMS]
+            query = f"SELECT path, size, mtime_ns, inode FROM snapshot WHERE path IN ({','.join('?' * len(chunk))})"
+            result.update({row[0]: FileSnapshot(row[1], row[2], row[3]) for row in conn.execute(query, chunk)})
+        return result
+
+    def update_snapshot(self, records: Dict[str, FileSnapshot], deleted: Iterable[str], started_ns: int,
+                        processed_dirty: Iterable[str], replace: bool = False) -> None:
+        """Method to save the result of an update in a single transaction
+
+        Args:
+            records: dict of relative path -> FileSnapshot to add or update
+            deleted: relative paths to remove
+            started_ns: time (in ns) the update started checking the directory
+            processed_dirty: dirty paths the update checked, which are removed from the dirty set
+            replace: If True, `records` is a snapshot of the entire directory and replaces the current one
+
+        Returns:
+            None
+        """
+        conn = self._connect()
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM snapshot")
+            else:
+                conn.executemany("DELETE FROM snapshot WHERE path = ?", [(p,) for p in deleted])
+            conn.executemany("INSERT OR REPLACE INTO snapshot (path, size, mtime_ns, inode) VALUES (?, ?, ?, ?)",
+                             [(p, r.size, r.mtime_ns, r.inode) for p, r in records.items()])
+            conn.executemany("DELETE FROM dirty WHERE path = ?", [(p,) for p in processed_dirty])
+            self._set_state(conn, 'snapshot_started_ns', started_ns)
+
+    def add_dirty(self, relative_paths: Iterable[str]) -> None:
+        """Method to mark paths as possibly changed since the last update
+
+        Args:
+            relative_paths: relative paths to files or directories (with a trailing slash)
+
+        Returns:
+            None
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO dirty (path) VALUES (?)", [(p,) for p in relative_paths])
+
+    def get_dirty(self) -> Set[str]:
+        """Method to get the paths that changed since the last update
+
+        Returns:
+            set of relative paths
+        """
+        return {row[0] for row in self._connect().execute("SELECT path FROM dirty")}
+
+    def is_dirty_set_complete(self) -> bool:
+        """Method to check if the dirty set can be trusted: a watcher has been running continuously since the last
+        update started checking the directory. Otherwise, the directory must be checked entirely.
+
+        Returns:
+            bool
+        """
+        conn = self._connect()
+        started_ns = self._get_state(conn, 'watch_started_ns')
+        heartbeat_ns = self._get_state(conn, 'watch_heartbeat_ns')
+        snapshot_started_ns = self._get_state(conn, 'snapshot_started_ns')
+
+        if started_ns is None or heartbeat_ns is None or snapshot_started_ns is None:
+            return False
+        if started_ns > snapshot_started_ns:
+            # Changes made before the watcher started were not recorded
+            return False
+        return time.time_ns() - heartbeat_ns <= WATCH_HEARTBEAT_TIMEOUT * 1e9
+
+    def set_watching(self, watching: bool) -> None:
+        """Method to record a watcher starting (once all of its watches are set) or stopping
+
+        Args:
+            watching: True if a watcher is now recording all changes
+
+        Returns:
+            None
+        """
+        conn = self._connect()
+        with conn:
+            now = time.time_ns() if watching else None
+            self._set_state(conn, 'watch_started_ns', now)
+            self._set_state(conn, 'watch_heartbeat_ns', now)
+
+    def heartbeat(self) -> None:
+        """Method to record that a watcher is still running
+
+        Returns:
+            None
+        """
+        conn = self._connect()
+        with conn:
+            self._set_state(conn, 'watch_heartbeat_ns', time.time_ns())
+
+    @staticmethod
+    def _get_state(conn: sqlite3.Connection, key: str) -> Optional[int]:
+        row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_state(conn: sqlite3.Connection, key: str, value: Optional[int]) -> None:
+        conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+
+# inotify constants, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | \
+             IN_DELETE_SELF | IN_MOVE_SELF
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class LocalDirectoryWatcher(object):
+    """Class to record changes to a local data directory in a LocalSnapshotIndex while the process is running
+
+    Uses inotify directly (through ctypes), so it is only available on Linux. Every directory in the tree is watched.
+    If watches can't be added (e.g. the `fs.inotify.max_user_watches` limit is reached) or the kernel's event queue
+    overflows, the watcher stops and updates fall back to checking the entire directory.
+
+    The watcher must run in a long lived process, since changes made while it isn't running are not recorded.
+    """
+    def __init__(self, root_dir: str, index_file: str) -> None:
+        """
+
+        Args:
+            root_dir: absolute path to the local data directory
+            index_file: absolute path to the LocalSnapshotIndex database
+        """
+        self.root_dir = root_dir.rstrip(os.path.sep)
+        self.index_file = index_file
+        self._fd: Optional[int] = None
+        self._watches: Dict[int, str] = dict()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _libc():
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        return libc
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        """Method to check if watching is supported on this platform
+
+        Returns:
+            bool
+        """
+        try:
+            cls._libc()
+            return True
+        except OSError:
+            return False
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _relative_path(self, abs_path: str) -> str:
+        return os.path.relpath(abs_path, self.root_dir)
+
+    def _add_watches(self, libc, directory: str, dirty: Set[str]) -> None:
+        """Method to watch a directory and every directory below it
+
+        Args:
+            libc: the C library
+            directory: absolute path to the directory
+            dirty: set to add paths found in the tree to. Files may be created before the watch is added, so the
+                   contents of a new directory are all marked as changed.
+
+        Returns:
+            None
+        """
+        for root, dirs, files in os.walk(directory):
+            wd = libc.inotify_add_watch(self._fd, root.encode(), WATCH_MASK | IN_ONLYDIR)
+            if wd < 0:
+                err = ctypes.get_errno()
+                raise OSError(err, f"Failed to watch {root}: {os.strerror(err)}")
+            self._watches[wd] = root
+            if root != self.root_dir:
+                dirty.add(self._relative_path(root) + os.path.sep)
+            dirty.update(self._relative_path(os.path.join(root, f)) for f in files)
+
+    def start(self) -> None:
+        """Method to add the watches and start recording changes in a background thread
+
+        Returns:
+            None
+        """
+        libc = self._libc()
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"Failed to initialize inotify: {os.strerror(err)}")
+        try:
+            self._add_watches(libc, self.root_dir, set())
+        except OSError:
+            os.close(self._fd)
+            self._fd = None
+            raise
+
+        # Only trust the dirty set for updates that start after every directory is watched
+        LocalSnapshotIndex(self.index_file).set_watching(True)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(libc,), daemon=True,
+                                        name=f"LocalDirectoryWatcher-{self.root_dir}")
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Method to stop the watcher
+
+        Returns:
+            None
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _parse_events(self, libc, data: bytes) -> Optional[Set[str]]:
+        """Method to convert a buffer of inotify events into changed paths
+
+        Returns:
+            set of relative paths, or None if changes were lost
+        """
+        dirty: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + name_len].rstrip(b'\0').decode()
+            offset += EVENT_HEADER.size + name_len
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning(f"Too many changes in {self.root_dir} to record. Watcher stopping.")
+                return None
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if directory == self.root_dir:
+                    logger.warning(f"{self.root_dir} was removed. Watcher stopping.")
+                    return None
+                continue
+
+            abs_path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                dirty.add(self._relative_path(abs_path) + os.path.sep)
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.isdir(abs_path):
+                    self._add_watches(libc, abs_path, dirty)
+            else:
+                dirty.add(self._relative_path(abs_path))
+        return dirty
+
+    def _run(self, libc) -> None:
+        fd = self._fd
+        assert fd is not None, "The watcher must be started before it is run"
+        index = LocalSnapshotIndex(self.index_file)
+        last_heartbeat = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 1)
+                if ready:
+                    try:
+                        data = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        data = b''
+                    dirty = self._parse_events(libc, data)
+                    if dirty is None:
+                        break
+                    if dirty:
+                        index.add_dirty(dirty)
+
+                if time.monotonic() - last_heartbeat > WATCH_HEARTBEAT_INTERVAL:
+                    index.heartbeat()
+                    last_heartbeat = time.monotonic()
+        except Exception as err:
+            logger.exception(f"Watcher for {self.root_dir} failed: {err}")
+        finally:
+            index.set_watching(False)
+            index.close()
+            os.close(fd)
+            self._fd = None
+            self._watches = dict()
@@ -1,8 +1,10 @@
 from gtmcore.dataset import Dataset
 from gtmcore.dataset.storage.backend import UnmanagedStorageBackend
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
 import os
 import json
+import threading
 
 from gtmcore.dataset.io import PullResult, PullObject
 from gtmcore.logging import LMLogger
@@ -13,9 +15,16 @@ import boto3
 import botocore
 from botocore.client import Config
 from botocore import UNSIGNED
+from boto3.s3.transfer import TransferConfig
 
 logger = LMLogger.get_logger()
 
+# Default number of objects downloaded at once
+DEFAULT_NUM_WORKERS = 8
+
+# Max number of downloads queued per worker while listing the bucket
+MAX_QUEUED_DOWNLOADS_PER_WORKER = 4
+
 
 class PublicS3Bucket(UnmanagedStorageBackend):
 
@@ -91,8 +100,18 @@ Due to the possibility of storing lots of data, when updating you can optionally
 
         return bucket, prefix
 
-    def _get_client(self):
-        return boto3.client('s3', config=Config(signature_version=UNSIGNED))
+    def _get_client(self, max_pool_connections: int = 10):
+        """Method to get an unsigned client. Clients are thread safe, so one client (and its connection pool) is
+        shared by all download workers
+
+        Args:
+            max_pool_connections: the max number of connections to keep open
+
+        Returns:
+            botocore.client.S3
+        """
+        return boto3.client('s3', config=Config(signature_version=UNSIGNED,
+                                                max_pool_connections=max_pool_connections))
 
     def confirm_configuration(self, dataset) -> Optional[str]:
         """Method to verify a configuration and optionally allow the user to confirm before proceeding
@@ -167,9 +186,40 @@ Due to the possibility of storing lots of data, when updating you can optionally
         with open(etag_file, 'wt') as ef:
             json.dump(etag_data, ef)
 
+    def _get_num_workers(self, dataset) -> int:
+        """Helper to get the number of objects to download at once"""
+        backend_config = dataset.client_config.config['datasets']['backends'][self.storage_type]
+        return int(backend_config.get('num_workers', DEFAULT_NUM_WORKERS))
+
+    def _download_object(self, client, bucket: str, key: str, destination: str, chunk_size: int,
+                         progress_update_fn: Optional[Callable] = None) -> None:
+        """Helper to download a single object. Called from the worker threads of the transfer executor
+
+        The object is written to a temporary file next to the destination and renamed into place when complete, so
+        an interrupted download never leaves a partial file behind.
+
+        Args:
+            client: a boto3 S3 client, shared by all workers
+            bucket: name of the bucket
+            key: key of the object
+            destination: absolute path to write the object to
+            chunk_size: number of bytes to read from the stream at a time
+            progress_update_fn: Optional callable with arg "completed_bytes" (int)
+
+        Returns:
+            None
+        """
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        # Concurrency comes from the transfer executor, so each object is downloaded in a single stream
+        transfer_config = TransferConfig(use_threads=False, io_chunksize=chunk_size)
+        client.download_file(bucket, key, destination, Config=transfer_config, Callback=progress_update_fn)
+
     def pull_objects(self, dataset: Dataset, objects: List[PullObject],
                      progress_update_fn: Callable) -> PullResult:
-        """High-level method to simply link files from the source dir to the object directory to the revision directory
+        """High-level method to download objects from the bucket into the object directory and link them through to
+        the revision directory
+
+        Objects are downloaded concurrently by `num_workers` threads sharing a single client (and its connection pool).
 
         Args:
             dataset: The current dataset
@@ -180,8 +230,9 @@ Due to the possibility of storing lots of data, when updating you can optionally
         Returns:
             PullResult
         """
-        client = self._get_client()
         bucket, prefix = self._get_s3_config()
+        num_workers = self._get_num_workers(dataset)
+        client = self._get_client(max_pool_connections=num_workers)
 
         backend_config = dataset.client_config.config['datasets']['backends'][dataset.backend.storage_type]
         chunk_size = backend_config['download_chunk_size']
@@ -189,21 +240,24 @@ Due to the possibility of storing lots of data, when updating you can optionally
         failure = list()
         message = f"Downloaded {len(objects)} objects successfully."
 
-        for obj in objects:
-            # Get object
-            response = client.get_object(Bucket=bucket,
-                                         Key=os.path.join(prefix, obj.dataset_path))
-
-            if response['ResponseMetadata']['HTTPStatusCode'] == 200:
-                # Save file
-                with open(obj.object_path, 'wb') as out_file:
-                    for cnt, chunk in enumerate(response['Body'].iter_chunks(chunk_size=chunk_size)):
-                        out_file.write(chunk)
-                        progress_update_fn(len(chunk))
-
-                success.append(obj)
-            else:
-                failure.append(obj)
+        # Workers report progress from their own threads
+        progress_lock = threading.Lock()
+
+        def update_progress(completed_bytes: int) -> None:
+            with progress_lock:
+                progress_update_fn(completed_bytes)
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = {executor.submit(self._download_object, client, bucket, os.path.join(prefix, obj.dataset_path),
+                                       obj.object_path, chunk_size, update_progress): obj for obj in objects}
+            for future in as_completed(futures):
+                obj = futures[future]
+                try:
+                    future.result()
+                    success.append(obj)
+                except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError, OSError) as err:
+                    logger.error(f"Failed to download {obj.dataset_path} from S3 bucket {bucket}: {err}")
+                    failure.append(obj)
 
         if len(failure) > 0:
             message = f"Downloaded {len(success)} objects successfully, but {len(failure)} failed. Check results."
@@ -224,10 +278,42 @@ Due to the possibility of storing lots of data, when updating you can optionally
         """
         return True
 
+    @staticmethod
+    def _get_etag_journal_file(manifest: Manifest) -> str:
+        """Helper to get the journal of objects downloaded by an update that hasn't completed yet
+
+        The journal is kept in the file cache rather than the dataset, so it is never committed.
+        """
+        return os.path.join(manifest.cache_mgr.cache_root, '.etag_journal.jsonl')
+
+    @staticmethod
+    def _load_etag_journal(journal_file: str) -> Dict[str, str]:
+        """Helper to load the ETags of objects downloaded by an interrupted update
+
+        Returns:
+            dict of key -> ETag
+        """
+        journal = dict()
+        if os.path.exists(journal_file):
+            with open(journal_file, 'rt') as jf:
+                for line in jf:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # The last line may be incomplete if the update was interrupted while writing it
+                        continue
+                    journal[entry['key']] = entry['etag']
+        return journal
+
     def update_from_remote(self, dataset, status_update_fn: Callable) -> None:
         """Optional method that updates the dataset by comparing against the remote. Not all unmanaged dataset backends
         will be able to do this.
 
+        Listing the bucket is pipelined with downloading: objects that are new or have a different ETag are queued on
+        `num_workers` download threads as soon as their page is listed. Each completed download is appended to a
+        journal in the file cache, so an interrupted update skips objects that were already downloaded when it is run
+        again. The journal is removed once the manifest has been updated.
+
         Args:
             dataset: Dataset object
             status_update_fn: A callable, accepting a string for logging/providing status to the UI
@@ -241,60 +327,95 @@ Due to the possibility of storing lots of data, when updating you can optionally
 
         # Walk remote checking etags with cached versions
         etag_data = self._load_etag_data(dataset)
+        journal_file = self._get_etag_journal_file(m)
+        journal = self._load_etag_journal(journal_file)
 
         bucket, prefix = self._get_s3_config()
-        client = self._get_client()
+        num_workers = self._get_num_workers(dataset)
+        client = self._get_client(max_pool_connections=num_workers)
+        chunk_size = dataset.client_config.config['datasets']['backends'][self.storage_type]['download_chunk_size']
 
         paginator = client.get_paginator('list_objects_v2')
         response_iterator = paginator.paginate(Bucket=bucket, Prefix=prefix)
 
-        all_files = list()
+        all_files: List[str] = list()
         added_files = list()
         modified_files = list()
-        print_cnt = 0
+        num_downloaded = 0
 
         revision_dir = os.path.join(m.cache_mgr.cache_root, m.dataset_revision)
-        for x in response_iterator:
-            if print_cnt == 0:
-                status_update_fn("Processing Bucket Contents, please wait.")
-                print_cnt += 1
-            elif print_cnt == 1:
-                status_update_fn("Processing Bucket Contents, please wait..")
-                print_cnt += 1
-            else:
-                status_update_fn("Processing Bucket Contents, please wait...")
-                print_cnt = 0
-
-            for item in x.get("Contents"):
-                key = item['Key']
-                all_files.append(key)
-                if key in m.manifest:
-                    # Object already tracked
-                    if etag_data[key] != item['ETag']:
+        os.makedirs(os.path.dirname(journal_file), exist_ok=True)
+        with open(journal_file, 'at') as jf, ThreadPoolExecutor(max_workers=num_workers) as executor:
+            pending: Dict[Future, Tuple[str, str]] = dict()
+            errors: List[BaseException] = list()
+
+            def complete(done_futures: Iterable[Future]) -> None:
+                nonlocal num_downloaded
+                for future in done_futures:
+                    key, etag = pending.pop(future)
+                    error = future.exception()
+                    if error:
+                        logger.error(f"Failed to download {key} from S3 bucket {bucket}: {error}")
+                        errors.append(error)
+                        continue
+                    jf.write(json.dumps({'key': key, 'etag': etag}) + '\n')
+                    num_downloaded += 1
+                jf.flush()
+
+            for page in response_iterator:
+                if errors:
+                    # Stop queueing downloads. Objects downloaded so far are kept in the journal
+                    break
+
+                status_update_fn(f"Processing Bucket Contents, please wait. {len(all_files)} files listed, "
+                                 f"{num_downloaded} downloaded.")
+
+                for item in page.get("Contents", []):
+                    key = item['Key']
+                    etag = item['ETag']
+                    all_files.append(key)
+                    if key in m.manifest:
+                        if etag_data.get(key) == etag and key not in journal:
+                            # Object already tracked and unchanged. Objects in the journal were downloaded by an
+                            # interrupted update, which may have saved their new ETag without updating the manifest.
+                            continue
                         # Object has been modified since last update
                         modified_files.append(key)
-                        if os.path.exists(os.path.join(revision_dir, key)):
-                            # Delete current version
-                            os.remove(os.path.join(revision_dir, key))
-
-                        if key[-1] == "/":
-                            # is a "directory
-                            os.makedirs(os.path.join(revision_dir, key), exist_ok=True)
-                        else:
-                            client.download_file(bucket, key, os.path.join(revision_dir, key))
-                else:
-                    # New Object
-                    etag_data[key] = item['ETag']
-                    added_files.append(key)
+                    else:
+                        # New Object
+                        added_files.append(key)
+                    etag_data[key] = etag
+
+                    if journal.get(key) == etag and os.path.exists(os.path.join(revision_dir, key)):
+                        # Downloaded by a previous, interrupted update
+                        continue
 
                     if key[-1] == "/":
                         # is a "directory
                         os.makedirs(os.path.join(revision_dir, key), exist_ok=True)
-                    else:
-                        os.makedirs(os.path.dirname(os.path.join(revision_dir, key)), exist_ok=True)
-                        client.download_file(bucket, key, os.path.join(revision_dir, key))
+                        continue
+
+                    destination = os.path.join(revision_dir, key)
+                    if os.path.exists(destination):
+                        # Replace the file instead of writing to it, since it is linked to the object cache
+                        os.remove(destination)
+                    future = executor.submit(self._download_object, client, bucket, key, destination, chunk_size)
+                    pending[future] = (key, etag)
+
+                # Bound the number of queued downloads, so listing doesn't run too far ahead
+                while len(pending) > num_workers * MAX_QUEUED_DOWNLOADS_PER_WORKER:
+                    done, _ = wait(list(pending.keys()), return_when=FIRST_COMPLETED)
+                    complete(done)
+
+            done, _ = wait(list(pending.keys()))
+            complete(done)
+
+        if errors:
+            raise errors[0]
 
         deleted_files = sorted(list(set(m.manifest.keys()).difference(all_files)))
+        for key in deleted_files:
+            etag_data.pop(key, None)
 
         # Create StatusResult to force modifications
         status = StatusResult(created=added_files, modified=modified_files, deleted=deleted_files)
@@ -303,3 +424,4 @@ Due to the possibility of storing lots of data, when updating you can optionally
 
         # Run local update
         self.update_from_local(dataset, status_update_fn, status_result=status)
+        os.remove(journal_file)
@@ -0,0 +1,3 @@
+import os
+BENCHMARK_SKIP_TEST = os.environ.get('RUN_BENCHMARKS') is None
+BENCHMARK_SKIP_MSG = "Skip benchmarks unless `RUN_BENCHMARKS` is set"
@@ -0,0 +1,161 @@
+import os
+import shutil
+
+from gtmcore.dataset.cache.gc import ObjectCacheCollector
+from gtmcore.dataset.manifest import Manifest
+from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir, mock_dataset_with_manifest, helper_append_file
+
+
+def helper_object_path(manifest: Manifest, relative_path: str) -> str:
+    return manifest.dataset_to_object_path(relative_path)
+
+
+def helper_replace_file(manifest: Manifest, relative_path: str, content: str) -> None:
+    """Replace a file instead of writing to it, so the existing object is not modified through the hard link"""
+    os.remove(os.path.join(manifest.current_revision_dir, relative_path))
+    helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, relative_path, content)
+
+
+def helper_clear_push_files(manifest: Manifest) -> None:
+    """Simulate all objects having been pushed"""
+    shutil.rmtree(os.path.join(manifest.cache_mgr.cache_root, 'objects', '.push'))
+
+
+class TestObjectCacheCollector(object):
+    def test_collect_unreferenced_objects(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "first version")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test2.txt", "unchanged")
+        manifest.sweep_all_changes()
+        old_object = helper_object_path(manifest, "test1.txt")
+
+        helper_replace_file(manifest, "test1.txt", "second version")
+        manifest.sweep_all_changes()
+        new_object = helper_object_path(manifest, "test1.txt")
+        assert old_object != new_object
+
+        # A revision that is no longer checked out anywhere
+        stale_revision_dir = os.path.join(manifest.cache_mgr.cache_root, 'a' * 40)
+        os.makedirs(stale_revision_dir)
+
+        collector = ObjectCacheCollector(manifest.cache_mgr.cache_root, [ds], 'tester')
+        # Recently written objects are protected by the grace period
+        result = collector.collect()
+        assert result.objects_removed == 0
+        assert os.path.exists(old_object)
+        assert os.path.isdir(stale_revision_dir)
+
+        collector.grace_period = 0
+        helper_clear_push_files(manifest)
+        result = collector.collect()
+        assert result.objects_removed == 1
+        assert result.bytes_reclaimed == len("first version")
+        assert result.revisions_removed == 1
+        assert not os.path.exists(old_object)
+        assert not os.path.exists(stale_revision_dir)
+
+        assert os.path.exists(new_object)
+        assert os.path.exists(helper_object_path(manifest, "test2.txt"))
+        with open(os.path.join(manifest.current_revision_dir, "test1.txt"), 'rt') as tf:
+            assert tf.read() == "second version"
+
+        status = manifest.status()
+        assert len(status.created) == 0
+        assert len(status.modified) == 0
+        assert len(status.deleted) == 0
+
+    def test_collect_keeps_objects_in_other_branches(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        manifest.sweep_all_changes()
+        object_path = helper_object_path(manifest, "test1.txt")
+        helper_clear_push_files(manifest)
+
+        ds.git.repo.create_head('other-branch')
+        os.remove(os.path.join(manifest.current_revision_dir, "test1.txt"))
+        manifest.sweep_all_changes()
+        assert 'test1.txt' not in manifest.manifest
+
+        collector = ObjectCacheCollector(manifest.cache_mgr.cache_root, [ds], 'tester', grace_period=0)
+        assert collector.collect().objects_removed == 0
+        assert os.path.exists(object_path)
+
+        ds.git.repo.delete_head('other-branch', force=True)
+        assert collector.collect().objects_removed == 1
+        assert not os.path.exists(object_path)
+
+    def test_collect_keeps_objects_to_push(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "first version")
+        manifest.sweep_all_changes()
+        old_object = helper_object_path(manifest, "test1.txt")
+
+        helper_replace_file(manifest, "test1.txt", "second version")
+        manifest.sweep_all_changes()
+
+        collector = ObjectCacheCollector(manifest.cache_mgr.cache_root, [ds], 'tester', grace_period=0)
+        assert collector.collect().objects_removed == 0
+        assert os.path.exists(old_object)
+
+    def test_collect_orphaned_cache(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        manifest.sweep_all_changes()
+        helper_clear_push_files(manifest)
+
+        # A cache without any checkouts is left alone, since the dataset may have just failed to load
+        collector = ObjectCacheCollector(manifest.cache_mgr.cache_root, [], 'tester', grace_period=0)
+        result = collector.collect()
+        assert result.objects_removed == 0
+        assert result.revisions_removed == 0
+        assert collector.cache_size() == len("asdfasdf")
+
+        # The cache of a deleted dataset is entirely unreferenced
+        collector = ObjectCacheCollector(manifest.cache_mgr.cache_root, [], 'tester', grace_period=0,
+                                         dataset_deleted=True)
+        result = collector.collect()
+        assert result.objects_removed == 1
+        assert result.revisions_removed == 1
+        assert collector.cache_size() == 0
+        assert os.listdir(os.path.join(manifest.cache_mgr.cache_root, 'objects')) == []
+
+    def test_evict(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        os.makedirs(os.path.join(manifest.current_revision_dir, "dir1"))
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "dir1/test1.txt", "12345")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test2.txt", "1234567890")
+        manifest.sweep_all_changes()
+
+        collector = ObjectCacheCollector(manifest.cache_mgr.cache_root, [ds], 'tester', grace_period=0)
+        assert collector.cache_size() == 15
+
+        # Unpublished datasets can't download evicted objects again
+        assert collector.eviction_candidates() == []
+
+        ds.git.add_remote('origin', 'https://test.repo.gigantum.com/tester/dataset-1.git')
+        # Objects waiting to be pushed are never evicted
+        assert collector.eviction_candidates() == []
+
+        helper_clear_push_files(manifest)
+        # Mark test2.txt as accessed long ago, keeping its modified time
+        object_path = helper_object_path(manifest, "test2.txt")
+        os.utime(object_path, ns=(1000, os.stat(object_path).st_mtime_ns))
+        candidates = collector.eviction_candidates()
+        assert [c.object_id for c in candidates] == [manifest.manifest['test2.txt']['h'],
+                                                     manifest.manifest['dir1/test1.txt']['h']]
+
+        assert collector.evict({candidates[1].object_id}) == 5
+        assert collector.cache_size() == 10
+        assert not os.path.exists(os.path.join(manifest.current_revision_dir, "dir1", "test1.txt"))
+
+        # Evicted files are not downloaded, instead of deleted
+        manifest = Manifest(ds, 'tester')
+        for changed_dirs_only in [False, True]:
+            status = manifest.status(changed_dirs_only=changed_dirs_only)
+            assert len(status.created) == 0
+            assert len(status.modified) == 0
+            assert len(status.deleted) == 0
+
+        files = {f['key']: f for f in manifest.list()[0]}
+        assert files['dir1/test1.txt']['is_local'] is False
+        assert files['test2.txt']['is_local'] is True
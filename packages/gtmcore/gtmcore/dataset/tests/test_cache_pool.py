@@ -0,0 +1,156 @@
+import os
+import shutil
+
+from gtmcore.dataset.cache.filesystem import HostFilesystemCache
+from gtmcore.dataset.cache.gc import ObjectCacheCollector
+from gtmcore.dataset.cache.pool import SharedObjectPool
+from gtmcore.dataset.io.manager import IOManager
+from gtmcore.dataset.manifest import Manifest
+from gtmcore.fixtures.datasets import mock_dataset_with_object_pool, mock_enable_unmanaged_for_testing, \
+    helper_append_file, USERNAME
+from gtmcore.inventory.inventory import InventoryManager
+
+
+def helper_create_second_dataset() -> Manifest:
+    ds = InventoryManager().create_dataset(USERNAME, USERNAME, 'dataset-2', description="my dataset 2",
+                                           storage_type="gigantum_object_v1")
+    m = Manifest(ds, USERNAME)
+    m.link_revision()
+    return m
+
+
+def helper_remove_local_file(manifest: Manifest, relative_path: str) -> None:
+    """Remove a file from the revision directory and object cache, as if it was never downloaded"""
+    object_path = manifest.dataset_to_object_path(relative_path)
+    os.remove(object_path)
+    os.remove(os.path.join(manifest.current_revision_dir, relative_path))
+    manifest.hasher.delete_fast_hashes([relative_path])
+
+
+class TestSharedObjectPool(object):
+    def test_object_pool_config(self, mock_dataset_with_object_pool):
+        ds, manifest, working_dir = mock_dataset_with_object_pool
+        pool = manifest.cache_mgr.object_pool
+        assert isinstance(pool, SharedObjectPool)
+        assert pool.pool_root == os.path.join(ds.client_config.app_workdir, '.labmanager', 'objects')
+
+        ds.client_config.config['datasets']['shared_object_pool'] = False
+        assert HostFilesystemCache.get_object_pool(ds.client_config) is None
+
+    def test_unmanaged_datasets_not_shared(self, mock_dataset_with_object_pool, mock_enable_unmanaged_for_testing):
+        ds = InventoryManager().create_dataset(USERNAME, USERNAME, 'local-dataset', storage_type="local_filesystem")
+        assert Manifest(ds, USERNAME).cache_mgr.object_pool is None
+
+    def test_ingest_shares_objects(self, mock_dataset_with_object_pool):
+        ds, manifest1, working_dir = mock_dataset_with_object_pool
+        manifest2 = helper_create_second_dataset()
+        pool = manifest1.cache_mgr.object_pool
+
+        helper_append_file(manifest1.cache_mgr.cache_root, manifest1.dataset_revision, "test1.txt", "shared content")
+        manifest1.sweep_all_changes()
+        helper_append_file(manifest2.cache_mgr.cache_root, manifest2.dataset_revision, "other.txt", "shared content")
+        manifest2.sweep_all_changes()
+
+        hash_str = manifest1.manifest['test1.txt']['h']
+        assert manifest2.manifest['other.txt']['h'] == hash_str
+
+        # Both datasets link to the one copy in the pool
+        object1 = manifest1.dataset_to_object_path('test1.txt')
+        object2 = manifest2.dataset_to_object_path('other.txt')
+        assert object1 != object2
+        assert os.path.samefile(object1, pool.object_path(hash_str))
+        assert os.path.samefile(object2, pool.object_path(hash_str))
+        assert os.path.samefile(os.path.join(manifest2.current_revision_dir, "other.txt"), object1)
+        # 2 objects and 2 files in revision directories
+        assert pool.refcount(hash_str) == 4
+
+        # Both datasets still push the object, since they may be published to different remotes
+        assert len(IOManager(manifest2.dataset, manifest2).objects_to_push()) == 1
+
+    def test_pull_links_from_pool(self, mock_dataset_with_object_pool):
+        ds, manifest1, working_dir = mock_dataset_with_object_pool
+        manifest2 = helper_create_second_dataset()
+
+        helper_append_file(manifest1.cache_mgr.cache_root, manifest1.dataset_revision, "test1.txt", "shared content")
+        manifest1.sweep_all_changes()
+        helper_append_file(manifest2.cache_mgr.cache_root, manifest2.dataset_revision, "test1.txt", "shared content")
+        helper_append_file(manifest2.cache_mgr.cache_root, manifest2.dataset_revision, "test2.txt", "more content")
+        manifest2.sweep_all_changes()
+
+        helper_remove_local_file(manifest2, "test1.txt")
+        iom = IOManager(manifest2.dataset, manifest2)
+        assert iom._get_pull_all_keys() == []
+        assert os.path.isfile(os.path.join(manifest2.current_revision_dir, "test1.txt"))
+
+        # Objects in the pool are linked without calling the backend, which isn't configured here
+        helper_remove_local_file(manifest2, "test1.txt")
+        progress = list()
+        result = iom.pull_objects(["test1.txt"], progress_update_fn=lambda num_bytes: progress.append(num_bytes))
+        assert [o.dataset_path for o in result.success] == ["test1.txt"]
+        assert result.failure == []
+        assert progress == [len("shared content")]
+
+        with open(os.path.join(manifest2.current_revision_dir, "test1.txt"), 'rt') as tf:
+            assert tf.read() == "shared content"
+        status = manifest2.status()
+        assert len(status.created) == 0
+        assert len(status.modified) == 0
+        assert len(status.deleted) == 0
+
+    def test_link_size_mismatch(self, mock_dataset_with_object_pool):
+        ds, manifest, working_dir = mock_dataset_with_object_pool
+        pool = manifest.cache_mgr.object_pool
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "content")
+        manifest.sweep_all_changes()
+        hash_str = manifest.manifest['test1.txt']['h']
+
+        destination = os.path.join(working_dir, 'linked')
+        assert pool.link(hash_str, destination, num_bytes=100) is False
+        assert pool.link('0' * 128, destination) is False
+        assert not os.path.exists(destination)
+
+        assert pool.link(hash_str, destination, num_bytes=len("content")) is True
+        assert os.path.samefile(destination, pool.object_path(hash_str))
+
+    def test_collect(self, mock_dataset_with_object_pool):
+        ds, manifest1, working_dir = mock_dataset_with_object_pool
+        manifest2 = helper_create_second_dataset()
+        pool = manifest1.cache_mgr.object_pool
+
+        helper_append_file(manifest1.cache_mgr.cache_root, manifest1.dataset_revision, "test1.txt", "shared content")
+        helper_append_file(manifest1.cache_mgr.cache_root, manifest1.dataset_revision, "test2.txt", "only dataset-1")
+        manifest1.sweep_all_changes()
+        helper_append_file(manifest2.cache_mgr.cache_root, manifest2.dataset_revision, "test1.txt", "shared content")
+        manifest2.sweep_all_changes()
+        shared_hash = manifest1.manifest['test1.txt']['h']
+        other_hash = manifest1.manifest['test2.txt']['h']
+
+        assert pool.collect() == (0, 0)
+
+        # Deleting a dataset's cache releases the objects only it referenced
+        shutil.rmtree(manifest1.cache_mgr.cache_root)
+        assert pool.refcount(shared_hash) == 2
+        assert pool.refcount(other_hash) == 0
+        assert pool.collect() == (1, len("only dataset-1"))
+        assert os.path.exists(pool.object_path(shared_hash))
+        assert not os.path.exists(pool.object_path(other_hash))
+
+        shutil.rmtree(manifest2.cache_mgr.cache_root)
+        assert pool.collect() == (1, len("shared content"))
+        assert os.listdir(pool.pool_root) == []
+
+    def test_collector_releases_pool_objects(self, mock_dataset_with_object_pool):
+        ds, manifest, working_dir = mock_dataset_with_object_pool
+        pool = manifest.cache_mgr.object_pool
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "12345")
+        manifest.sweep_all_changes()
+        hash_str = manifest.manifest['test1.txt']['h']
+        shutil.rmtree(os.path.join(manifest.cache_mgr.cache_root, 'objects', '.push'))
+        ds.git.add_remote('origin', 'https://test.repo.gigantum.com/tester/dataset-1.git')
+
+        # The pool's link doesn't keep an object from being evicted
+        collector = ObjectCacheCollector(manifest.cache_mgr.cache_root, [ds], USERNAME, grace_period=0, pool=pool)
+        assert [c.object_id for c in collector.eviction_candidates()] == [hash_str]
+        assert collector.evict({hash_str}) == 5
+        assert not os.path.exists(pool.object_path(hash_str))
+        assert pool.collect() == (0, 0)
@@ -1,10 +1,12 @@
 import pytest
 import os
 import time
+import pickle
 from pathlib import Path
 from hashlib import blake2b
 
-from gtmcore.dataset.manifest.hash import SmartHash
+import gtmcore.dataset.manifest.hash
+from gtmcore.dataset.manifest.hash import SmartHash, LARGE_FILE_BYTES
 from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir, mock_dataset_with_manifest
 
 
@@ -139,6 +141,70 @@ class TestHashing(object):
         assert hash_results[1] != hash_results[3]
         assert hash_results[2] == hash_results[3]
 
+    @pytest.mark.asyncio
+    async def test_hash_parallel(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        sh = SmartHash(ds.root_dir, manifest.cache_mgr.cache_root, manifest.dataset_revision, num_workers=2)
+        cache_dir = manifest.cache_mgr.cache_root
+        revision = manifest.dataset_revision
+
+        os.makedirs(os.path.join(cache_dir, revision, "test_dir"))
+
+        filenames = [f"test_dir/file{i}.txt" for i in range(2500)]
+        for cnt, f in enumerate(filenames):
+            helper_append_file(cache_dir, revision, f, f"{cnt}-contents")
+        filenames.append('test_dir/')
+        filenames.append('does-not-exist.txt')
+
+        hash_results = await sh.hash(filenames)
+        assert len(hash_results) == 2502
+
+        sh.num_workers = 1
+        serial_hash_results = await sh.hash(filenames)
+        assert hash_results == serial_hash_results
+
+        for f, hr in zip(filenames[:2500], hash_results):
+            h = blake2b()
+            with open(sh.get_abs_path(f), 'rb') as fh:
+                h.update(fh.read())
+            assert hr == h.hexdigest()
+
+        assert len(hash_results[2500]) == 128
+        assert hash_results[2501] is None
+
+    @pytest.mark.asyncio
+    async def test_hash_batches(self, mock_dataset_with_manifest, monkeypatch):
+        monkeypatch.setattr(gtmcore.dataset.manifest.hash, 'MAX_BATCH_FILES', 3)
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        sh = SmartHash(ds.root_dir, manifest.cache_mgr.cache_root, manifest.dataset_revision, num_workers=2)
+        cache_dir = manifest.cache_mgr.cache_root
+        revision = manifest.dataset_revision
+
+        filenames = [f"file{i}.txt" for i in range(10)]
+        for cnt, f in enumerate(filenames):
+            helper_append_file(cache_dir, revision, f, f"{cnt}-contents")
+
+        results = [r async for r in sh.hash_batches(filenames)]
+        assert len(results) == 4
+        assert sorted([idx for batch, _ in results for idx in batch]) == list(range(10))
+
+        expected = await sh.hash(filenames)
+        for batch, batch_result in results:
+            assert batch_result == [expected[idx] for idx in batch]
+
+    def test_batch_paths(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        sh = SmartHash(ds.root_dir, manifest.cache_mgr.cache_root, manifest.dataset_revision, num_workers=2)
+        cache_dir = manifest.cache_mgr.cache_root
+        revision = manifest.dataset_revision
+
+        helper_append_file(cache_dir, revision, 'small1.txt', "asdf")
+        helper_append_file(cache_dir, revision, 'big.txt', "a" * LARGE_FILE_BYTES)
+        helper_append_file(cache_dir, revision, 'small2.txt', "asdf")
+
+        batches = sh._batch_paths([sh.get_abs_path(x) for x in ['small1.txt', 'big.txt', 'small2.txt']])
+        assert batches == [[1], [0, 2]]
+
     def test_fast_hash_save(self, mock_dataset_with_manifest):
         ds, manifest, working_dir = mock_dataset_with_manifest
         sh = SmartHash(ds.root_dir, manifest.cache_mgr.cache_root, manifest.dataset_revision)
@@ -310,3 +376,69 @@ class TestHashing(object):
         assert len(deleted) == 2
         assert deleted[0] == "test2.txt"
         assert deleted[1] == "test3.txt"
+
+    def test_delete_fast_hashes(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        sh = SmartHash(ds.root_dir, manifest.cache_mgr.cache_root, manifest.dataset_revision)
+        cache_dir = manifest.cache_mgr.cache_root
+        revision = manifest.dataset_revision
+
+        filenames = ["test1.txt", "test2.txt", "test3.txt"]
+        for f in filenames:
+            helper_append_file(cache_dir, revision, f, "sdfadfgfdgh")
+
+        sh.fast_hash(filenames)
+        assert len(sh.fast_hash_data) == 3
+
+        sh.delete_fast_hashes(["test2.txt"])
+        assert sh.is_cached("test1.txt") is True
+        assert sh.is_cached("test2.txt") is False
+        assert sh.is_cached("test3.txt") is True
+
+        sh2 = SmartHash(ds.root_dir, cache_dir, revision)
+        assert list(sh2.fast_hash_data) == ["test1.txt", "test3.txt"]
+
+        sh2.clear_fast_hashes()
+        assert sh2.fast_hash_data == {}
+
+    def test_get_records_for_paths(self, mock_dataset_with_manifest, monkeypatch):
+        monkeypatch.setattr(gtmcore.dataset.manifest.hash, 'MAX_QUERY_PARAMS', 2)
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        sh = SmartHash(ds.root_dir, manifest.cache_mgr.cache_root, manifest.dataset_revision)
+        cache_dir = manifest.cache_mgr.cache_root
+        revision = manifest.dataset_revision
+
+        assert sh.fast_hash_data.get_records_for_paths(["test1.txt"]) == {}
+
+        filenames = ["test1.txt", "test2.txt", "test3.txt"]
+        for f in filenames:
+            helper_append_file(cache_dir, revision, f, "sdfadfgfdgh")
+        sh.fast_hash(filenames)
+
+        records = sh.fast_hash_data.get_records_for_paths(["test3.txt", "missing.txt", "test1.txt", "test2.txt"])
+        assert sorted(records.keys()) == filenames
+        assert records["test1.txt"] == sh.fast_hash_data.get_record("test1.txt")
+
+    def test_migrate_legacy_fast_hash_file(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        cache_dir = manifest.cache_mgr.cache_root
+        revision = manifest.dataset_revision
+
+        helper_append_file(cache_dir, revision, "test1.txt", "pupper")
+        helper_append_file(cache_dir, revision, "test2.txt", "dog")
+        file_info = os.stat(os.path.join(cache_dir, revision, "test1.txt"))
+
+        # Write a legacy pickled index, where test2.txt has changed since it was last fast hashed
+        legacy_data = {"test1.txt": f"test1.txt||{file_info.st_size}||{file_info.st_mtime}",
+                       "test2.txt": f"test2.txt||1||{file_info.st_mtime - 10}"}
+        with open(os.path.join(cache_dir, revision, ".smarthash"), 'wb') as mf:
+            pickle.dump(legacy_data, mf, pickle.HIGHEST_PROTOCOL)
+
+        sh = SmartHash(ds.root_dir, cache_dir, revision)
+        assert sh.is_cached("test1.txt") is True
+        assert sh.is_cached("test2.txt") is True
+        assert sh.has_changed_fast("test1.txt") is False
+        assert sh.has_changed_fast("test2.txt") is True
+
+        with open(os.path.join(cache_dir, revision, ".smarthash"), 'rb') as mf:
+            assert mf.read(16) == b"SQLite format 3\x00"
@@ -115,6 +115,57 @@ class TestIOManager(object):
         assert obj_to_push[0].dataset_path == "test1.txt"
         assert obj_to_push[1].dataset_path == "test2.txt"
 
+    def test_push_queue_index(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        iom = IOManager(ds, manifest)
+
+        revision = manifest.dataset_revision
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "test1.txt", "test content 1")
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "test2.txt", "test content 22")
+        manifest.sweep_all_changes()
+
+        assert os.path.isfile(manifest.push_queue.index_file)
+        queued = manifest.push_queue.queued_objects()
+        assert [(obj.dataset_path, num_bytes) for obj, num_bytes in queued] == [("test1.txt", 14), ("test2.txt", 15)]
+        assert queued[0][0].revision == revision
+
+        # Sizes come from the index, so objects aren't stat'd when computing batches
+        for obj, _ in queued:
+            os.remove(obj.object_path)
+        key_batches, total_bytes, num_files = iom.compute_push_batches()
+        assert num_files == 2
+        assert total_bytes == 29
+
+    def test_push_queue_reindex(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        iom = IOManager(ds, manifest)
+
+        revision = manifest.dataset_revision
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "test1.txt", "test content 1")
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "test2.txt", "test content 2")
+        manifest.sweep_all_changes()
+        obj_to_push = iom.objects_to_push()
+        assert len(obj_to_push) == 2
+
+        # Push files removed outside of the queue (e.g. by an older client) are dropped from the index
+        shutil.rmtree(iom.push_dir)
+        assert iom.objects_to_push() == []
+
+        # Push files written without the index (e.g. by an older client) are indexed when read
+        os.makedirs(iom.push_dir)
+        with open(os.path.join(iom.push_dir, obj_to_push[1].revision), 'wt') as pf:
+            pf.write(f"{obj_to_push[1].dataset_path},{obj_to_push[1].object_path}\n")
+        assert iom.objects_to_push() == [obj_to_push[1]]
+        assert manifest.push_queue.queued_objects()[0][1] == 14
+
+        # Appending through the queue after the file was re-created keeps both records
+        manifest.queue_to_push(obj_to_push[0].object_path, obj_to_push[0].dataset_path, obj_to_push[0].revision)
+        assert iom.objects_to_push() == obj_to_push
+
+        manifest.push_queue.clear()
+        assert glob.glob(f'{iom.push_dir}/*') == []
+        assert iom.objects_to_push() == []
+
     def test_push_objects(self, mock_dataset_with_manifest, mock_dataset_head):
         ds, manifest, working_dir = mock_dataset_with_manifest
         iom = IOManager(ds, manifest)
@@ -4,8 +4,13 @@ from collections import OrderedDict
 import time
 import redis
 import glob
+import shutil
+import json
 
+import gtmcore.dataset.manifest.file
+import gtmcore.dataset.manifest.hash
 from gtmcore.dataset import Manifest
+from gtmcore.dataset.manifest.file import get_shard_id
 from gtmcore.inventory.inventory import InventoryManager
 
 from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir, mock_dataset_with_manifest, helper_append_file, \
@@ -86,6 +91,35 @@ class TestManifest(object):
         assert len(status.modified) == 0
         assert len(status.deleted) == 0
 
+    def test_hash_files_pipeline(self, mock_dataset_with_manifest, monkeypatch):
+        monkeypatch.setattr(gtmcore.dataset.manifest.hash, 'MAX_BATCH_FILES', 2)
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        revision_dir = os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision)
+
+        filenames = [f"test{i}.txt" for i in range(9)]
+        for cnt, f in enumerate(filenames):
+            helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, f, f"{cnt % 3}-contents")
+        filenames.append('does-not-exist.txt')
+
+        progress = list()
+        hash_result, fast_hash_result = manifest.hash_files(filenames,
+                                                            progress_callback=lambda *args: progress.append(args))
+
+        assert hash_result[9] is None
+        assert fast_hash_result[9] is None
+        assert ('hash', 10, 10) in progress
+        assert ('ingest', 10, 10) in progress
+        assert [p[1] for p in progress if p[0] == 'ingest'] == sorted([p[1] for p in progress if p[0] == 'ingest'])
+
+        for f, h in zip(filenames[:9], hash_result[:9]):
+            object_path = os.path.join(manifest.cache_mgr.cache_root, 'objects', h[0:8], h[8:16], h)
+            assert os.stat(object_path).st_ino == os.stat(os.path.join(revision_dir, f)).st_ino
+        assert len(set(hash_result[:9])) == 3
+
+        with open(os.path.join(manifest.cache_mgr.cache_root, 'objects', '.push', manifest.dataset_revision)) as pf:
+            lines = pf.readlines()
+        assert sorted([line.split(',')[0] for line in lines]) == sorted(filenames[:9])
+
     def test_update_simple_with_reloading(self, mock_dataset_with_manifest):
         ds, manifest, working_dir = mock_dataset_with_manifest
 
@@ -163,6 +197,55 @@ class TestManifest(object):
         assert 'test1.txt' not in m2.manifest
         assert 'test2.txt' in m2.manifest
 
+    def test_status_changed_dirs_only(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        revision_dir = os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision)
+
+        os.makedirs(os.path.join(revision_dir, "test_dir", "nested"))
+        os.makedirs(os.path.join(revision_dir, "other_dir"))
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir/test2.txt", "dfg")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir/nested/test3.txt",
+                           "565656565")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "other_dir/test4.txt",
+                           "dfasdfhfgjhg")
+
+        status = manifest.status(changed_dirs_only=True)
+        assert len(status.created) == 7
+        manifest.sweep_all_changes()
+        revision_dir = os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision)
+
+        status = manifest.status(changed_dirs_only=True)
+        assert status == ([], [], [])
+
+        # Create a file in a nested directory and delete one in another
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir/nested/new.txt", "a")
+        os.remove(os.path.join(revision_dir, "test_dir", "test2.txt"))
+        status = manifest.status(changed_dirs_only=True)
+        assert status.created == ["test_dir/nested/new.txt"]
+        assert status.modified == []
+        assert status.deleted == ["test_dir/test2.txt"]
+        assert manifest.status() == status
+
+        # Remove a directory tree
+        os.remove(os.path.join(revision_dir, "test_dir", "nested", "new.txt"))
+        shutil.rmtree(os.path.join(revision_dir, "test_dir"))
+        status = manifest.status(changed_dirs_only=True)
+        assert status.created == []
+        assert status.deleted == ["test_dir/", "test_dir/nested/", "test_dir/nested/test3.txt", "test_dir/test2.txt"]
+        assert manifest.status() == status
+
+    def test_status_changed_dirs_only_skips_in_place_edits(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+
+        os.makedirs(os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir"))
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir/test1.txt", "asdf")
+        manifest.sweep_all_changes()
+
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir/test1.txt", "more")
+        assert manifest.status(changed_dirs_only=True) == ([], [], [])
+        assert manifest.status() == ([], ["test_dir/test1.txt"], [])
+
     def test_update_complex(self, mock_dataset_with_manifest):
         ds, manifest, working_dir = mock_dataset_with_manifest
 
@@ -494,6 +577,53 @@ class TestManifest(object):
         assert 'dir1/' in manifest.manifest
         assert 'test2.txt' in manifest.manifest
 
+    def test_sweep_all_changes_incremental_link(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+
+        os.makedirs(os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision, "dir1", "dir2"))
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "dir1/unchanged.txt", "asdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "dir1/dir2/modify.txt", "dfdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "dir1/delete.txt", "1234")
+        manifest.sweep_all_changes()
+
+        first_revision = manifest.dataset_revision
+        revision_dir = os.path.join(manifest.cache_mgr.cache_root, first_revision)
+        unchanged_inode = os.stat(os.path.join(revision_dir, "dir1", "unchanged.txt")).st_ino
+        time.sleep(1.1)
+
+        helper_append_file(manifest.cache_mgr.cache_root, first_revision, "dir1/dir2/modify.txt", "more")
+        helper_append_file(manifest.cache_mgr.cache_root, first_revision, "dir1/dir2/new.txt", "new file")
+        os.remove(os.path.join(revision_dir, "dir1", "delete.txt"))
+        manifest.sweep_all_changes()
+
+        # The previous revision directory is carried forward instead of relinked
+        assert manifest.dataset_revision != first_revision
+        assert not os.path.exists(revision_dir)
+        revision_dir = os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision)
+        assert os.stat(os.path.join(revision_dir, "dir1", "unchanged.txt")).st_ino == unchanged_inode
+        assert not os.path.exists(os.path.join(revision_dir, "dir1", "delete.txt"))
+        for f in ["dir1/dir2/modify.txt", "dir1/dir2/new.txt"]:
+            h = manifest.manifest[f]['h']
+            level1, level2 = manifest._get_object_subdirs(h)
+            assert os.path.samefile(os.path.join(revision_dir, f),
+                                    os.path.join(manifest.cache_mgr.cache_root, 'objects', level1, level2, h))
+
+        for changed_dirs_only in [False, True]:
+            status = manifest.status(changed_dirs_only=changed_dirs_only)
+            assert len(status.created) == 0
+            assert len(status.modified) == 0
+            assert len(status.deleted) == 0
+
+        # The incrementally updated index matches a full recompute
+        incremental_records = manifest.hasher.fast_hash_data.get_records()
+        manifest.link_revision()
+        assert manifest.hasher.fast_hash_data.get_records() == incremental_records
+
+        # Sweeping with no changes keeps the current revision directory
+        manifest.sweep_all_changes()
+        assert os.path.isdir(revision_dir)
+        assert os.stat(os.path.join(revision_dir, "dir1", "unchanged.txt")).st_ino == unchanged_inode
+
     @pytest.mark.skip("Currently writing to files when dups exists causes issues with status due to links")
     def test_sweep_all_changes_with_dup_files(self, mock_dataset_with_manifest):
         ds, manifest, working_dir = mock_dataset_with_manifest
@@ -989,8 +1119,8 @@ class TestManifest(object):
 
         # Remove NEW manifest file
         _, checkout_id = ds.checkout_id.rsplit('-', 1)
-        manifest_file = f'manifest-{checkout_id}.json'
-        os.remove(os.path.join(ds.root_dir, 'manifest', manifest_file))
+        manifest_dir = f'manifest-{checkout_id}'
+        shutil.rmtree(os.path.join(ds.root_dir, 'manifest', manifest_dir))
 
         # Reload classes
         ds = im.load_dataset(USERNAME, USERNAME, 'dataset-1')
@@ -1014,3 +1144,194 @@ class TestManifest(object):
         assert file_info['key'] == "test1.txt"
         file_info = m.get("test2.txt")
         assert file_info['key'] == "test2.txt"
+
+    def test_manifest_segment_files(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        checkout_dir = os.path.join(ds.root_dir, 'manifest', manifest._manifest_io.checkout_manifest_name)
+
+        os.makedirs(os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir"))
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test_dir/test2.txt", "dfg")
+        manifest.update()
+
+        root_segment = os.path.join(checkout_dir, f"{get_shard_id('test1.txt')}.jsonl")
+        nested_segment = os.path.join(checkout_dir, f"{get_shard_id('test_dir/test2.txt')}.jsonl")
+        assert root_segment != nested_segment
+        with open(root_segment, 'rt') as sf:
+            assert len(sf.readlines()) == 2
+        with open(nested_segment, 'rt') as sf:
+            assert len(sf.readlines()) == 1
+
+        # Deletes append a record instead of rewriting the file
+        os.remove(os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt"))
+        manifest.update()
+        with open(root_segment, 'rt') as sf:
+            lines = sf.readlines()
+        assert len(lines) == 3
+        assert json.loads(lines[-1])['p'] == 'test1.txt'
+        assert json.loads(lines[-1])['d'] == 1
+        with open(nested_segment, 'rt') as sf:
+            assert len(sf.readlines()) == 1
+
+        # Cache is stored per shard
+        client = redis.StrictRedis(db=1)
+        shard_key = f"{manifest._manifest_io.manifest_cache_key}|{get_shard_id('test_dir/test2.txt')}"
+        assert client.hexists(shard_key, 'test_dir/test2.txt')
+        assert not client.hexists(f"{manifest._manifest_io.manifest_cache_key}|{get_shard_id('test1.txt')}",
+                                  'test1.txt')
+
+        # Reload from files
+        manifest.force_reload()
+        assert list(manifest.manifest.keys()) == ['test_dir/', 'test_dir/test2.txt']
+
+    def test_manifest_newest_record_wins_across_checkouts(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        im = InventoryManager()
+
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test2.txt", "asdfasdf")
+        manifest.update()
+
+        # Switch to a new checkout context, delete a file that was added in the first one
+        os.remove(os.path.join(ds.root_dir, '.gigantum', '.checkout'))
+        ds = im.load_dataset(USERNAME, USERNAME, ds.name)
+        manifest = Manifest(ds, USERNAME)
+        os.remove(os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt"))
+        manifest.update()
+        assert len(glob.glob(os.path.join(ds.root_dir, 'manifest', 'manifest-*'))) == 2
+
+        manifest.force_reload()
+        assert list(manifest.manifest.keys()) == ['test2.txt']
+
+    def test_manifest_compaction(self, mock_dataset_with_manifest, monkeypatch):
+        monkeypatch.setattr(gtmcore.dataset.manifest.file, 'COMPACTION_MIN_RECORDS', 2)
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        segment = os.path.join(ds.root_dir, 'manifest', manifest._manifest_io.checkout_manifest_name,
+                               f"{get_shard_id('test1.txt')}.jsonl")
+
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "a")
+        manifest.update()
+        for cnt in range(4):
+            helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "a")
+            manifest.update()
+
+        with open(segment, 'rt') as sf:
+            lines = sf.readlines()
+        assert len(lines) < 5
+        assert json.loads(lines[-1])['b'] == '5'
+
+        manifest.force_reload()
+        assert manifest.manifest['test1.txt']['b'] == '5'
+
+    def test_list_page(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+
+        revision_dir = os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision)
+        os.makedirs(os.path.join(revision_dir, "other_dir", "nested"))
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test3.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "other_dir/test4.txt", "asdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "other_dir/nested/test5.txt",
+                           "asdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "other_dir0.txt", "asdf")
+        manifest.update()
+
+        all_keys = [x['key'] for x in manifest.list_page(first=100)]
+        assert all_keys == ['other_dir/', 'other_dir/nested/', 'other_dir/nested/test5.txt', 'other_dir/test4.txt',
+                            'other_dir0.txt', 'test1.txt', 'test3.txt']
+
+        # Page through with cursors
+        page = manifest.list_page(first=3)
+        assert [x['key'] for x in page] == all_keys[:3]
+        assert page[2]['is_local'] is True
+        assert page[2]['size'] == '4'
+        page = manifest.list_page(first=3, after=page[-1]['key'])
+        assert [x['key'] for x in page] == all_keys[3:6]
+
+        # Cursors are stable when files are added before them
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "a.txt", "asdf")
+        manifest.update()
+        page = manifest.list_page(first=3, after='other_dir0.txt')
+        assert [x['key'] for x in page] == ['test1.txt', 'test3.txt']
+
+        # Directory scoped listing only includes direct children
+        assert [x['key'] for x in manifest.list_page(first=100, directory='')] == \
+            ['a.txt', 'other_dir/', 'other_dir0.txt', 'test1.txt', 'test3.txt']
+        assert [x['key'] for x in manifest.list_page(first=1, directory='')] == ['a.txt']
+        assert [x['key'] for x in manifest.list_page(first=2, after='other_dir/', directory='')] == \
+            ['other_dir0.txt', 'test1.txt']
+        assert [x['key'] for x in manifest.list_page(first=100, directory='other_dir')] == \
+            ['other_dir/nested/', 'other_dir/test4.txt']
+        assert [x['key'] for x in manifest.list_page(first=100, directory='other_dir/nested/')] == \
+            ['other_dir/nested/test5.txt']
+
+        with pytest.raises(ValueError):
+            manifest.list_page(first=0)
+
+    def test_list_page_is_local(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test2.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test3.txt", "asdfasdf")
+        manifest.update()
+
+        # Not in the fast hash index, so not materialized
+        manifest.hasher.delete_fast_hashes(['test2.txt'])
+        # In the index, but removed outside of the client
+        os.remove(os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision, 'test3.txt'))
+
+        page = manifest.list_page(first=10)
+        assert [(x['key'], x['is_local']) for x in page] == [('test1.txt', True), ('test2.txt', False),
+                                                             ('test3.txt', False)]
+
+    def test_partial_reads_from_cache(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+
+        os.makedirs(os.path.join(manifest.cache_mgr.cache_root, manifest.dataset_revision, "other_dir"))
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "other_dir/test2.txt", "asdf")
+        manifest.update()
+
+        # A new instance reads directly from the cache, without loading the full manifest
+        manifest2 = Manifest(ds, 'tester')
+        assert manifest2.count() == 3
+        assert manifest2.get('test1.txt')['size'] == '8'
+        assert manifest2._manifest_io.get_entry('missing.txt') is None
+        assert manifest2._manifest_io.list_keys(1) == ['other_dir/test2.txt', 'test1.txt']
+        assert manifest2._manifest_io.list_keys(0, 1) == ['other_dir/']
+        assert manifest2._manifest_io.list_keys(1, 1) == []
+
+        file_info, indexes = manifest2.list(first=1, after_index=0)
+        assert indexes == [0]
+        assert file_info[0]['key'] == 'other_dir/'
+        file_info, indexes = manifest2.list(first=5, after_index=0)
+        assert indexes == [0, 1, 2]
+        file_info, indexes = manifest2.list(first=1, after_index=1)
+        assert indexes == [2]
+        assert file_info[0]['key'] == 'test1.txt'
+        assert file_info[0]['is_local'] is True
+        assert manifest2._manifest_io._manifest == OrderedDict()
+
+        # Changes made by another instance are visible in the cache
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test3.txt", "asdf")
+        manifest.update()
+        manifest.delete(['other_dir/test2.txt'])
+        assert manifest2.count() == 3
+        assert manifest2._manifest_io.list_keys(0) == ['other_dir/', 'test1.txt', 'test3.txt']
+        assert manifest2._manifest_io.get_entries(['test3.txt', 'other_dir/test2.txt'])[1] is None
+
+    def test_partial_reads_reload_evicted_cache(self, mock_dataset_with_manifest):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, "test1.txt", "asdfasdf")
+        manifest.update()
+
+        r = redis.StrictRedis(db=1)
+        r.delete(manifest._manifest_io.manifest_cache_key)
+
+        manifest2 = Manifest(ds, 'tester')
+        assert manifest2.count() == 1
+        assert manifest2.get('test1.txt')['size'] == '8'
+        assert r.hget(manifest._manifest_io.manifest_cache_key, '__version__') is not None
+        assert r.ttl(manifest._manifest_io.manifest_cache_key) <= r.ttl(manifest._manifest_io._keys_cache_key)
@@ -0,0 +1,66 @@
+import pytest
+import json
+import time
+import redis
+from collections import OrderedDict
+
+from gtmcore.dataset.manifest.file import ManifestFileCache
+from gtmcore.dataset.tests import BENCHMARK_SKIP_TEST, BENCHMARK_SKIP_MSG
+
+from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir
+
+NUM_ENTRIES = 500000
+
+
+def helper_build_manifest(num_entries: int) -> OrderedDict:
+    """Helper to build manifest data with `num_entries` files spread across 1000 directories"""
+    data = OrderedDict()
+    for idx in range(num_entries):
+        data[f"dir{idx % 1000:04d}/file{idx:07d}.dat"] = {'h': f"{idx:0128x}", 'm': '1561990012.123456',
+                                                          'b': '1024', 'fn': 'manifest-benchmark'}
+    return OrderedDict(sorted(data.items()))
+
+
+@pytest.mark.skipif(BENCHMARK_SKIP_TEST, reason=BENCHMARK_SKIP_MSG)
+class TestManifestCacheBenchmark(object):
+    def test_partial_load_vs_single_blob(self, mock_dataset_with_cache_dir):
+        """Compares reading a few entries from a 500k file manifest via the per-shard hashes against the previous
+        layout, where the entire manifest was stored as one JSON blob that had to be fetched and parsed"""
+        ds = mock_dataset_with_cache_dir[0]
+        manifest_io = ManifestFileCache(ds, 'tester')
+        data = helper_build_manifest(NUM_ENTRIES)
+        keys = list(data.keys())
+        lookup_keys = keys[::NUM_ENTRIES // 50]
+
+        r = redis.StrictRedis(db=1)
+        blob_key = f"{manifest_io.manifest_cache_key}|benchmark-blob"
+        try:
+            r.set(blob_key, json.dumps(data))
+            manifest_io._cache_manifest_data(data, {})
+
+            start = time.perf_counter()
+            blob = json.loads(r.get(blob_key))
+            blob_results = [blob.get(k) for k in lookup_keys]
+            blob_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            partial_results = manifest_io.get_entries(lookup_keys)
+            count = manifest_io.count()
+            page = manifest_io.list_keys(250000, 250100)
+            partial_time = time.perf_counter() - start
+
+            full_manifest_io = ManifestFileCache(ds, 'tester')
+            start = time.perf_counter()
+            full_manifest_io.get_manifest()
+            full_time = time.perf_counter() - start
+
+            print(f"\n{NUM_ENTRIES} entries: single blob lookup {blob_time:.3f}s, "
+                  f"partial lookup {partial_time:.4f}s, full sharded load {full_time:.3f}s")
+
+            assert [x['h'] for x in partial_results] == [x['h'] for x in blob_results]
+            assert count == NUM_ENTRIES
+            assert page == keys[250000:250100]
+            assert partial_time < blob_time
+        finally:
+            r.delete(blob_key)
+            manifest_io.evict()
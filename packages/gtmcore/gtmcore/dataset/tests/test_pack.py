@@ -0,0 +1,188 @@
+import pytest
+import os
+import shutil
+import uuid
+from hashlib import blake2b
+from aioresponses import aioresponses
+
+from gtmcore.configuration import Configuration
+from gtmcore.dataset.io import PullObject
+from gtmcore.dataset.io.manager import IOManager
+from gtmcore.dataset.io.pack import PackCatalog, PackSettings, read_pack_index, unpack, write_pack
+from gtmcore.dataset.storage import get_storage_backend
+from gtmcore.dataset.storage.gigantum import GigantumObjectStore
+from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir, mock_dataset_with_manifest, helper_append_file, \
+    helper_compress_file
+
+
+def helper_write_object(directory, contents: bytes) -> str:
+    object_path = os.path.join(directory, blake2b(contents).hexdigest())
+    with open(object_path, 'wb') as of:
+        of.write(contents)
+    return object_path
+
+
+@pytest.fixture()
+def temp_pack_dir():
+    pack_dir = f'/tmp/{uuid.uuid4().hex}'
+    os.makedirs(pack_dir)
+    yield pack_dir
+    shutil.rmtree(pack_dir)
+
+
+class TestPack(object):
+    def test_write_pack_and_unpack(self, temp_pack_dir):
+        object_paths = [helper_write_object(temp_pack_dir, f"object {i}".encode() * i) for i in range(3)]
+        pack_path = write_pack(os.path.join(temp_pack_dir, '.packs'), object_paths)
+
+        # Packs are named with the hash of their contents, like any other object
+        with open(pack_path, 'rb') as pf:
+            assert os.path.basename(pack_path) == blake2b(pf.read()).hexdigest()
+
+        object_ids = [os.path.basename(p) for p in object_paths]
+        index = read_pack_index(pack_path)
+        assert set(index.keys()) == set(object_ids)
+        assert index[object_ids[0]][1] == 0
+        assert index[object_ids[2]][1] == 16
+
+        unpack_dir = os.path.join(temp_pack_dir, 'unpacked')
+        unpack(pack_path, {object_ids[1]: os.path.join(unpack_dir, object_ids[1]),
+                           object_ids[2]: os.path.join(unpack_dir, object_ids[2])})
+        assert sorted(os.listdir(unpack_dir)) == sorted(object_ids[1:])
+        with open(os.path.join(unpack_dir, object_ids[2]), 'rb') as of:
+            assert of.read() == b"object 2object 2"
+
+        with pytest.raises(IOError):
+            unpack(pack_path, {"abcd": os.path.join(unpack_dir, "abcd")})
+
+        # Corrupt the last object
+        with open(pack_path, 'r+b') as pf:
+            pf.seek(-1, os.SEEK_END)
+            pf.write(b"X")
+        with pytest.raises(IOError):
+            unpack(pack_path, {object_ids[2]: os.path.join(unpack_dir, object_ids[2])})
+
+    def test_pack_objects_to_push(self, mock_dataset_with_manifest, monkeypatch):
+        ds, manifest, working_dir = mock_dataset_with_manifest
+        iom = IOManager(ds, manifest)
+        assert iom.pack_objects_to_push() == 0
+
+        monkeypatch.setattr(GigantumObjectStore, 'object_pack_settings',
+                            lambda self, dataset: PackSettings(max_object_size=20, pack_size=1000))
+
+        revision = manifest.dataset_revision
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "test1.txt", "test content 1")
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "test2.txt", "test content 2")
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "copy1.txt", "test content 1")
+        helper_append_file(manifest.cache_mgr.cache_root, revision, "big.txt", "test content that is too big to pack")
+        manifest.sweep_all_changes()
+        assert len(iom.objects_to_push()) == 4
+
+        num_commits = ds.git.repo.head.commit.count()
+        assert iom.pack_objects_to_push() == 2
+
+        # The pack replaces the small objects in the push queue, and the catalog is committed
+        objs = iom.objects_to_push()
+        assert len(objs) == 2
+        assert objs[0].dataset_path.startswith(os.path.join('.gigantum', 'packs'))
+        assert objs[1].dataset_path == "big.txt"
+        assert ds.git.repo.head.commit.count() == num_commits + 1
+        assert ds.git.repo.is_dirty(untracked_files=True) is False
+
+        pack_id = os.path.basename(objs[0].object_path)
+        catalog = PackCatalog(ds.root_dir).packed_objects()
+        assert set(catalog.keys()) == {manifest.manifest['test1.txt']['h'], manifest.manifest['test2.txt']['h']}
+        assert set(catalog.values()) == {pack_id}
+        assert set(read_pack_index(objs[0].object_path).keys()) == set(catalog.keys())
+
+        # Objects are only packed once
+        assert iom.pack_objects_to_push() == 0
+
+        # Files in the same pack are pulled by the same worker
+        packed_keys = {"copy1.txt", "test1.txt", "test2.txt"}
+        key_batches, _, num_files = iom.compute_pull_batches(keys=["big.txt", "copy1.txt", "test1.txt", "test2.txt"])
+        assert num_files == 4
+        assert any(set(batch) >= packed_keys for batch in key_batches)
+        assert any(set(chunk) >= packed_keys for chunk in iom.split_pull_batch(["test1.txt", "big.txt", "copy1.txt",
+                                                                                 "test2.txt"]))
+
+    def test_pull_packed_objects(self, mock_dataset_with_cache_dir, temp_pack_dir):
+        with aioresponses() as mocked_responses:
+            sb = get_storage_backend("gigantum_object_v1")
+            ds = mock_dataset_with_cache_dir[0]
+            sb.set_default_configuration(ds.namespace, "abcd", '1234')
+
+            object_service_url = Configuration().get_server_configuration().object_service_url
+            object_service_root = f"{object_service_url}{ds.namespace}/{ds.name}"
+
+            obj1_path = helper_write_object(temp_pack_dir, b"packed contents 1")
+            obj2_path = helper_write_object(temp_pack_dir, b"packed contents 2")
+            pack_path = write_pack(os.path.join(temp_pack_dir, '.packs'), [obj1_path, obj2_path])
+            pack_id = os.path.basename(pack_path)
+            PackCatalog(ds.root_dir).add(pack_id, [os.path.basename(obj1_path), os.path.basename(obj2_path)])
+
+            compressed_path = os.path.join(temp_pack_dir, 'compressed')
+            helper_compress_file(pack_path, compressed_path)
+            os.remove(obj1_path)
+            os.remove(obj2_path)
+
+            # Only the pack is requested, once for both objects
+            mocked_responses.get(f'{object_service_root}/{pack_id}',
+                                 payload={
+                                         "presigned_url": f"https://dummyurl.com/{pack_id}?params=1",
+                                         "namespace": ds.namespace,
+                                         "obj_id": pack_id,
+                                         "dataset": ds.name
+                                 },
+                                 status=200)
+            with open(compressed_path, 'rb') as data:
+                mocked_responses.get(f"https://dummyurl.com/{pack_id}?params=1",
+                                     body=data.read(), status=200,
+                                     content_type='application/octet-stream')
+
+            objects = [PullObject(object_path=obj1_path, revision=ds.git.repo.head.commit.hexsha,
+                                  dataset_path='myfile1.txt'),
+                       PullObject(object_path=obj2_path, revision=ds.git.repo.head.commit.hexsha,
+                                  dataset_path='myfile2.txt')]
+
+            result = sb.pull_objects(ds, objects, lambda completed_bytes: None)
+            assert len(result.success) == 2
+            assert len(result.failure) == 0
+            with open(obj1_path, 'rb') as of:
+                assert of.read() == b"packed contents 1"
+            with open(obj2_path, 'rb') as of:
+                assert of.read() == b"packed contents 2"
+
+            # The pack is removed once it has been unpacked
+            download_pack_dir = os.path.join(ds.client_config.download_dir, ds.namespace, ds.name, '.packs',
+                                             str(os.getpid()))
+            assert not os.path.exists(os.path.join(download_pack_dir, pack_id))
+
+    def test_pull_packed_objects_failure(self, mock_dataset_with_cache_dir, temp_pack_dir):
+        with aioresponses() as mocked_responses:
+            sb = get_storage_backend("gigantum_object_v1")
+            ds = mock_dataset_with_cache_dir[0]
+            sb.set_default_configuration(ds.namespace, "abcd", '1234')
+
+            object_service_url = Configuration().get_server_configuration().object_service_url
+            object_service_root = f"{object_service_url}{ds.namespace}/{ds.name}"
+
+            obj1_path = helper_write_object(temp_pack_dir, b"packed contents 1")
+            obj2_path = helper_write_object(temp_pack_dir, b"packed contents 2")
+            pack_id = "a" * 128
+            PackCatalog(ds.root_dir).add(pack_id, [os.path.basename(obj1_path), os.path.basename(obj2_path)])
+            os.remove(obj1_path)
+            os.remove(obj2_path)
+
+            mocked_responses.get(f'{object_service_root}/{pack_id}', payload={"message": "not found"}, status=404)
+
+            objects = [PullObject(object_path=obj1_path, revision=ds.git.repo.head.commit.hexsha,
+                                  dataset_path='myfile1.txt'),
+                       PullObject(object_path=obj2_path, revision=ds.git.repo.head.commit.hexsha,
+                                  dataset_path='myfile2.txt')]
+
+            # Every object in a pack that failed to download fails
+            result = sb.pull_objects(ds, objects, lambda completed_bytes: None)
+            assert len(result.success) == 0
+            assert sorted([x.dataset_path for x in result.failure]) == ['myfile1.txt', 'myfile2.txt']
+            assert not os.path.exists(obj1_path)
@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+
+from gtmcore.dataset.io.scheduler import pack_batches, split_chunks, object_cost, WorkStealingQueue
+
+
+@pytest.fixture()
+def mock_work_queue():
+    queue = WorkStealingQueue(uuid.uuid4().hex, 3)
+    yield queue
+    queue.delete()
+
+
+class TestScheduler(object):
+    def test_pack_batches(self):
+        sizes = [10, 500, 20, 400, 30, 100]
+        items = [f"file{i}" for i in range(len(sizes))]
+
+        batches, batch_bytes = pack_batches(items, sizes, 2, per_object_cost=0)
+        assert batches == [["file0", "file2", "file3", "file5"], ["file1", "file4"]]
+        assert batch_bytes == [530, 530]
+
+        # Never more batches than items, and no empty batches
+        batches, batch_bytes = pack_batches(items[:2], sizes[:2], 8)
+        assert batches == [["file0"], ["file1"]]
+        assert pack_batches([], [], 4) == ([], [])
+
+    def test_pack_batches_per_object_cost(self):
+        # One big file and many small files. Ignoring the per object cost puts 99 small files in one batch.
+        sizes = [1000] + [10] * 99
+        items = list(range(100))
+
+        batches, _ = pack_batches(items, sizes, 2, per_object_cost=0)
+        assert sorted(len(b) for b in batches) == [1, 99]
+
+        batches, _ = pack_batches(items, sizes, 2, per_object_cost=100)
+        costs = [sum(object_cost(sizes[i], 100) for i in b) for b in batches]
+        assert max(costs) - min(costs) <= object_cost(10, 100)
+        assert sorted(len(b) for b in batches) == [46, 54]
+
+    def test_split_chunks(self):
+        sizes = [40, 40, 40, 200, 10]
+        assert split_chunks(list("abcde"), sizes, max_chunk_cost=100, per_object_cost=0) == \
+            [["a", "b"], ["c"], ["d"], ["e"]]
+        assert split_chunks(list("abcde"), sizes, max_chunk_cost=100, per_object_cost=30) == \
+            [["a"], ["b"], ["c"], ["d"], ["e"]]
+
+    def test_work_stealing(self, mock_work_queue):
+        mock_work_queue.fill([[["a"], ["b"], ["c"]], [], [["d"], ["e"]]])
+
+        # Workers take their own chunks from the head of their list
+        assert mock_work_queue.next_chunk(0) == ["a"]
+        assert mock_work_queue.next_chunk(2) == ["d"]
+
+        # An idle worker steals from the tail of another worker's list
+        assert mock_work_queue.next_chunk(1) == ["e"]
+        assert mock_work_queue.next_chunk(1) == ["c"]
+        assert mock_work_queue.remaining_keys() == ["b"]
+
+        assert mock_work_queue.next_chunk(2) == ["b"]
+        assert mock_work_queue.next_chunk(0) is None
+        assert mock_work_queue.remaining_keys() == []
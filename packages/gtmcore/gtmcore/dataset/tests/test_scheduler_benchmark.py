@@ -0,0 +1,69 @@
+import random
+import time
+from typing import List, Tuple
+
+import pytest
+
+from gtmcore.dataset.io.scheduler import pack_batches, object_cost
+from gtmcore.dataset.tests import BENCHMARK_SKIP_TEST, BENCHMARK_SKIP_MSG
+
+NUM_FILES = 200000
+
+
+def helper_greedy_batches(sizes: List[int], num_batches: int) -> List[List[int]]:
+    """The previous scheduler: each file, in order, goes to the batch with the fewest bytes so far"""
+    batches: List[List[int]] = [list() for _ in range(num_batches)]
+    size_sums = [0] * num_batches
+    for idx, num_bytes in enumerate(sizes):
+        index = size_sums.index(min(size_sums))
+        batches[index].append(idx)
+        size_sums[index] += num_bytes
+    return batches
+
+
+def helper_makespan(batches: List[List[int]], sizes: List[int]) -> int:
+    """The cost of the most expensive batch, which is when the slowest worker finishes"""
+    return max(sum(object_cost(sizes[i]) for i in b) for b in batches)
+
+
+def helper_distributions() -> List[Tuple[str, List[int]]]:
+    rng = random.Random(42)
+    return [
+        ("uniform 0-10MB", [rng.randint(0, 10 * 1024 * 1024) for _ in range(NUM_FILES)]),
+        ("lognormal", [int(rng.lognormvariate(10, 3)) for _ in range(NUM_FILES)]),
+        # A few huge files listed first, followed by a long tail of tiny files
+        ("huge then tiny", [5 * 1024 ** 3] * 8 + [rng.randint(1, 4096) for _ in range(NUM_FILES - 8)]),
+        # Tiny files listed first, so they all land in whichever batches the huge files don't fill
+        ("tiny then huge", [rng.randint(1, 4096) for _ in range(NUM_FILES - 8)] + [5 * 1024 ** 3] * 8),
+    ]
+
+
+@pytest.mark.skipif(BENCHMARK_SKIP_TEST, reason=BENCHMARK_SKIP_MSG)
+class TestSchedulerBenchmark(object):
+    @pytest.mark.parametrize("num_batches", [8, 64])
+    def test_pack_batches_vs_greedy(self, num_batches):
+        """Compares the makespan (modeled as bytes plus a per object cost) and scheduling time of pack_batches against
+        the previous greedy, size only, scheduler over synthetic file size distributions"""
+        for name, sizes in helper_distributions():
+            items = list(range(len(sizes)))
+
+            start = time.perf_counter()
+            greedy_batches = helper_greedy_batches(sizes, num_batches)
+            greedy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            packed_batches, _ = pack_batches(items, sizes, num_batches)
+            packed_time = time.perf_counter() - start
+
+            greedy_makespan = helper_makespan(greedy_batches, sizes)
+            packed_makespan = helper_makespan(packed_batches, sizes)
+            lower_bound = max(sum(object_cost(s) for s in sizes) / num_batches, max(object_cost(s) for s in sizes))
+
+            print(f"\n{NUM_FILES} files, {num_batches} batches, {name}: "
+                  f"greedy {greedy_time:.3f}s makespan {greedy_makespan / lower_bound:.3f}x, "
+                  f"packed {packed_time:.3f}s makespan {packed_makespan / lower_bound:.3f}x of lower bound")
+
+            assert sorted(i for b in packed_batches for i in b) == items
+            assert packed_makespan <= greedy_makespan
+            # Longest processing time scheduling is within 4/3 of optimal
+            assert packed_makespan <= lower_bound * 4 / 3
@@ -9,6 +9,7 @@ import random
 import string
 import os
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 
 from gtmcore.configuration import Configuration
 from gtmcore.dataset.storage import get_storage_backend
@@ -245,34 +246,24 @@ class TestStorageBackendGigantum(object):
                                      status=200)
 
                 with pytest.raises(ValueError):
-                    # can't get the URL for a multipart without first creating the upload
-                    await psu.get_presigned_s3_url(session)
+                    # can't get the URL for a part without first creating the upload
+                    await psu.get_presigned_part_url(session, 1)
 
                 assert psu.multipart_upload_id is None
                 await psu.prepare_multipart_upload(session)
                 assert psu.multipart_upload_id == 'fakeid123'
                 assert psu._multipart_completed_parts == list()
-                assert len(psu._multipart_parts) == 4
-                assert psu._multipart_parts[0].part_number == 1
-                assert psu._multipart_parts[0].start_byte == 0
-                assert psu._multipart_parts[0].end_byte == multipart_chunk_size
-                assert psu._multipart_parts[1].part_number == 2
-                assert psu._multipart_parts[1].start_byte == multipart_chunk_size
-                assert psu._multipart_parts[1].end_byte == multipart_chunk_size * 2
-                assert psu._multipart_parts[2].part_number == 3
-                assert psu._multipart_parts[2].start_byte == multipart_chunk_size * 2
-                assert psu._multipart_parts[2].end_byte == multipart_chunk_size * 3
-                assert psu._multipart_parts[3].part_number == 4
-                assert psu._multipart_parts[3].start_byte == multipart_chunk_size * 3
-                assert psu._multipart_parts[3].end_byte < multipart_chunk_size * 4
-                assert psu._multipart_parts[3].end_byte > multipart_chunk_size * 3
 
-                await psu.get_presigned_s3_url(session)
+                url = await psu.get_presigned_part_url(session, 1)
 
-                assert psu.presigned_s3_url == "https://dummyurl.com?params=1"
+                assert url == "https://dummyurl.com?params=1"
                 assert psu.s3_headers == dict()
                 assert psu.skip_object is False
 
+                with pytest.raises(ValueError):
+                    # multipart uploads are signed per part
+                    await psu.get_presigned_s3_url(session)
+
     @pytest.mark.asyncio
     async def test_presigneds3upload_get_presigned_s3_url_skip(self, event_loop, mock_dataset_with_cache_dir):
         sb = get_storage_backend("gigantum_object_v1")
@@ -1211,7 +1202,7 @@ class TestStorageBackendGigantum(object):
             assert os.path.exists(f'/tmp/{obj2_id}') is False
 
     @pytest.mark.asyncio
-    async def test_presigneds3upload_file_loader(self, event_loop, mock_dataset_with_cache_dir):
+    async def test_presigneds3upload_data_loader(self, event_loop, mock_dataset_with_cache_dir):
         """Test the async generator method used to load data into the request stream"""
         def update_fn(completed_bytes):
             assert completed_bytes > 0
@@ -1242,113 +1233,75 @@ class TestStorageBackendGigantum(object):
 
         assert psu.is_multipart is False
         # the + 12 is because of the string "dummy data: " that's added in the helper function
-        assert os.path.getsize(obj1_src_path) == (3 * upload_chunk_size + 100) + 12
-
-        num_chunks = 0
-        iterator = psu._file_loader(obj1_src_path, update_fn)
-        try:
-            while True:
-                chunk = await iterator.__anext__()
-                num_chunks += 1
-                if num_chunks == 4:
-                    assert len(chunk) == 112
-                else:
-                    assert len(chunk) == upload_chunk_size
-                if num_chunks > 4:
-                    assert "Too many chunks"
-        except StopAsyncIteration:
-            # Raises StopAsyncIteration when no more byte
-            assert num_chunks == 4
-
-    @pytest.mark.asyncio
-    async def test_presigneds3upload_file_loader_multipart(self, event_loop, mock_dataset_with_cache_dir,
-                                                           helper_write_two_part_file):
-        with aioresponses() as mocked_responses:
-            def update_fn(completed_bytes):
-                assert completed_bytes > 0
-
-            sb = get_storage_backend("gigantum_object_v1")
-            sb.set_default_configuration("test-user", "abcd", '1234')
-            ds = mock_dataset_with_cache_dir[0]
+        assert psu.object_size == (3 * upload_chunk_size + 100) + 12
 
-            object_service_url = Configuration().get_server_configuration().object_service_url
-            object_service_root = f"{object_service_url}{ds.namespace}/{ds.name}"
+        with open(obj1_src_path, 'rb') as source:
+            data = source.read()
 
-            headers = sb._object_service_headers()
+        chunks = [chunk async for chunk in psu._data_loader(data, update_fn)]
+        assert len(chunks) == 4
+        assert [len(c) for c in chunks[:3]] == [upload_chunk_size] * 3
+        assert len(chunks[3]) == 112
+        assert b''.join(chunks) == data
 
-            backend_config = ds.client_config.config['datasets']['backends']['gigantum_object_v1']
-            upload_chunk_size = backend_config['upload_chunk_size']
-            multipart_chunk_size = backend_config['multipart_chunk_size']
+    @pytest.mark.asyncio
+    async def test_presigneds3upload_compressed_parts(self, event_loop, mock_dataset_with_cache_dir,
+                                                      helper_write_two_part_file):
+        """Test splitting the compressed stream into multipart upload parts"""
+        sb = get_storage_backend("gigantum_object_v1")
+        sb.set_default_configuration("test-user", "abcd", '1234')
+        ds = mock_dataset_with_cache_dir[0]
 
-            object_details = PushObject(object_path=helper_write_two_part_file,
-                                        revision=ds.git.repo.head.commit.hexsha,
-                                        dataset_path='myfile1.txt')
-            psu = PresignedS3Upload(object_service_root, headers, multipart_chunk_size, upload_chunk_size,
-                                    object_details)
+        object_service_url = Configuration().get_server_configuration().object_service_url
+        object_service_root = f"{object_service_url}{ds.namespace}/{ds.name}"
 
-            assert psu.is_multipart is True
+        backend_config = ds.client_config.config['datasets']['backends']['gigantum_object_v1']
+        upload_chunk_size = backend_config['upload_chunk_size']
+        multipart_chunk_size = backend_config['multipart_chunk_size']
 
-            iterator = psu._file_loader(helper_write_two_part_file, update_fn)
-            with pytest.raises(ValueError):
-                # Multipart upload and you haven't set up the parts yet
-                await iterator.__anext__()
+        object_details = PushObject(object_path=helper_write_two_part_file,
+                                    revision=ds.git.repo.head.commit.hexsha,
+                                    dataset_path='myfile1.txt')
+        psu = PresignedS3Upload(object_service_root, sb._object_service_headers(), multipart_chunk_size,
+                                upload_chunk_size, object_details)
+        assert psu.is_multipart is True
 
-            obj2_id = os.path.basename(helper_write_two_part_file)
-            mocked_responses.post(f'{object_service_root}/{obj2_id}/multipart',
-                                  payload={
-                                      "namespace": ds.namespace,
-                                      "key_id": "hghghg",
-                                      "obj_id": obj2_id,
-                                      "dataset": ds.name,
-                                      "upload_id": 'fakeid123'
-                                  },
-                                  status=200)
+        parts = [part async for part in psu._compressed_parts()]
+        assert [p[0] for p in parts] == [1, 2]
+        assert len(parts[0][1]) == multipart_chunk_size
+        assert 0 < len(parts[1][1]) <= multipart_chunk_size
 
-            # Setup multipart upload
-            async with aiohttp.ClientSession() as session:
-                await psu.prepare_multipart_upload(session)
+        # Parts are compressed in independent blocks, which must decompress as a single stream
+        decompressor = snappy.StreamDecompressor()
+        with open(helper_write_two_part_file, 'rb') as source:
+            assert decompressor.decompress(b''.join([p[1] for p in parts])) == source.read()
+        decompressor.flush()
 
-            num_chunks = 0
-            saved_data = bytes()
-            iterator = psu._file_loader(helper_write_two_part_file, update_fn)
-
-            # Do the first chunk
-            try:
-                while True:
-                    chunk = await iterator.__anext__()
-                    num_chunks += 1
-                    saved_data = saved_data + chunk
-                    assert len(chunk) == upload_chunk_size
-                    if num_chunks > 16:
-                        assert "Too many chunks"
-            except StopAsyncIteration:
-                # Raises StopAsyncIteration when no more byte
-                assert num_chunks == 16
-
-            psu.mark_current_part_complete("fakeetag")
-
-            # Do the second chunk
-            num_chunks = 0
-            iterator = psu._file_loader(helper_write_two_part_file, update_fn)
-            try:
-                while True:
-                    chunk = await iterator.__anext__()
-                    num_chunks += 1
-                    saved_data = saved_data + chunk
-                    if num_chunks == 13:
-                        assert len(chunk) == 639872
-                    else:
-                        assert len(chunk) == upload_chunk_size
-                    if num_chunks > 13:
-                        assert "Too many chunks"
-            except StopAsyncIteration:
-                # Raises StopAsyncIteration when no more byte
-                assert num_chunks == 13
-
-            # Make sure the content is correct
-            with open(helper_write_two_part_file, 'rb') as source:
-                data = source.read()
-                assert data == saved_data
+    @pytest.mark.asyncio
+    async def test_presigneds3upload_compress_object_process_pool(self, event_loop, mock_dataset_with_cache_dir):
+        """Test compressing an object in a process pool, including an empty object"""
+        ds = mock_dataset_with_cache_dir[0]
+        object_dir = ds.client_config.app_workdir
+        obj1_src_path = helper_write_object(object_dir, uuid.uuid4().hex,
+                                            ''.join(random.choices(string.ascii_uppercase, k=10 * (10 ** 6))))
+        obj2_src_path = os.path.join(object_dir, uuid.uuid4().hex)
+        with open(obj2_src_path, 'wb'):
+            pass
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            psu = PresignedS3Upload("http://localhost", {}, 16777216, 4096,
+                                    PushObject(object_path=obj1_src_path, revision='abcd', dataset_path='a.txt'),
+                                    compression_executor=executor)
+            compressed = await psu.compress_object()
+
+            empty_psu = PresignedS3Upload("http://localhost", {}, 16777216, 4096,
+                                          PushObject(object_path=obj2_src_path, revision='abcd',
+                                                     dataset_path='b.txt'),
+                                          compression_executor=executor)
+            assert await empty_psu.compress_object() == b''
+
+        with open(obj1_src_path, 'rb') as source:
+            assert snappy.StreamDecompressor().decompress(compressed) == source.read()
 
     def test_push_objects_multipart_with_skip(self, mock_dataset_with_cache_dir, temp_directories, mock_dataset_head):
         with aioresponses() as mocked_responses:
@@ -0,0 +1,183 @@
+import os
+import uuid
+
+import snappy
+
+from gtmcore.dataset.io import PullObject
+from gtmcore.dataset.storage import get_storage_backend
+from gtmcore.dataset.storage.gigantum import GigantumObjectStore
+from gtmcore.dataset.manifest.eventloop import get_event_loop
+from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir
+from gtmcore.fixtures.object_service import FakeObjectService, fake_object_service
+
+RANGE_SIZE = 256 * 1024
+
+
+def helper_add_remote_object(service: FakeObjectService, num_bytes: int):
+    """Add a compressed object to the fake service, returning the object id and uncompressed contents"""
+    obj_id = uuid.uuid4().hex
+    data = os.urandom(num_bytes // 2) * 2
+    service.objects[obj_id] = snappy.StreamCompressor().compress(data) if data else b''
+    return obj_id, data
+
+
+def helper_pull(service: FakeObjectService, ds, objects, download_dir, max_concurrent_ranges=4):
+    sb = get_storage_backend("gigantum_object_v1")
+    assert isinstance(sb, GigantumObjectStore)
+    sb.successful_requests = list()
+    sb.failed_requests = list()
+    progress = list()
+
+    def update_fn(completed_bytes):
+        progress.append(completed_bytes)
+
+    loop = get_event_loop()
+    loop.run_until_complete(sb._run_pull_pipeline(service.service_root(ds.namespace, ds.name), {}, objects,
+                                                  progress_update_fn=update_fn,
+                                                  download_chunk_size=65536,
+                                                  num_workers=2,
+                                                  download_dir=download_dir,
+                                                  range_size=RANGE_SIZE,
+                                                  max_concurrent_ranges=max_concurrent_ranges))
+    return sb.successful_requests, sb.failed_requests, sum(progress)
+
+
+class TestGigantumRangedDownload(object):
+    def test_ranged_download(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        download_dir = os.path.join(ds.client_config.download_dir, 'test')
+        object_dir = os.path.join(ds.client_config.app_workdir, 'objects')
+
+        # Throttle responses, so concurrent range requests overlap
+        fake_object_service.bytes_per_second = 4 * 1024 * 1024
+        obj_id, data = helper_add_remote_object(fake_object_service, 3 * 1024 * 1024)
+        obj = PullObject(object_path=os.path.join(object_dir, obj_id), revision='abcd', dataset_path='big.bin')
+        os.makedirs(object_dir)
+
+        successes, failures, progress = helper_pull(fake_object_service, ds, [obj], download_dir,
+                                                    max_concurrent_ranges=3)
+        assert len(successes) == 1
+        assert len(failures) == 0
+        assert progress == len(data)
+
+        num_ranges = -(-len(fake_object_service.objects[obj_id]) // RANGE_SIZE)
+        assert sorted(set(fake_object_service.range_requests)) == [i * RANGE_SIZE for i in range(num_ranges)]
+        assert 1 < fake_object_service.max_in_flight <= 3
+
+        with open(obj.object_path, 'rb') as obj_file:
+            assert obj_file.read() == data
+        assert os.listdir(download_dir) == []
+
+    def test_resume_download(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        download_dir = os.path.join(ds.client_config.download_dir, 'test')
+        object_dir = os.path.join(ds.client_config.app_workdir, 'objects')
+        os.makedirs(object_dir)
+
+        obj_id, data = helper_add_remote_object(fake_object_service, 2 * 1024 * 1024)
+        obj = PullObject(object_path=os.path.join(object_dir, obj_id), revision='abcd', dataset_path='big.bin')
+
+        fake_object_service.failing_ranges = {3 * RANGE_SIZE}
+        successes, failures, _ = helper_pull(fake_object_service, ds, [obj], download_dir, max_concurrent_ranges=1)
+        assert len(failures) == 1
+        assert not os.path.exists(obj.object_path)
+        assert os.path.exists(os.path.join(download_dir, f"{obj_id}.partial"))
+        assert os.path.exists(os.path.join(download_dir, f"{obj_id}.partial.ranges"))
+
+        # Resume. Only the first range (which is always requested to get the size) and the missing ranges are fetched.
+        # A range may be requested more than once if a request is retried after a transient connection error
+        fake_object_service.failing_ranges = set()
+        fake_object_service.range_requests = list()
+        successes, failures, progress = helper_pull(fake_object_service, ds, [obj], download_dir)
+        assert len(successes) == 1
+        assert progress == len(data)
+
+        num_ranges = -(-len(fake_object_service.objects[obj_id]) // RANGE_SIZE)
+        assert sorted(set(fake_object_service.range_requests)) == [0] + [i * RANGE_SIZE
+                                                                        for i in range(3, num_ranges)]
+
+        with open(obj.object_path, 'rb') as obj_file:
+            assert obj_file.read() == data
+        assert os.listdir(download_dir) == []
+
+    def test_download_identical_objects(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        download_dir = os.path.join(ds.client_config.download_dir, 'test')
+        object_dir = os.path.join(ds.client_config.app_workdir, 'objects')
+        os.makedirs(object_dir)
+
+        # Two files with the same content share an object, which is only downloaded once
+        fake_object_service.bytes_per_second = 4 * 1024 * 1024
+        obj_id, data = helper_add_remote_object(fake_object_service, 1024 * 1024)
+        objs = [PullObject(object_path=os.path.join(object_dir, obj_id), revision='abcd', dataset_path='a.bin'),
+                PullObject(object_path=os.path.join(object_dir, obj_id), revision='abcd', dataset_path='dir/b.bin')]
+
+        successes, failures, progress = helper_pull(fake_object_service, ds, objs, download_dir)
+        assert len(failures) == 0
+        assert len(successes) == 1
+        assert successes[0].pulled_objects == objs
+        assert progress == 2 * len(data)
+
+        num_ranges = -(-len(fake_object_service.objects[obj_id]) // RANGE_SIZE)
+        assert sorted(set(fake_object_service.range_requests)) == [i * RANGE_SIZE for i in range(num_ranges)]
+        with open(objs[0].object_path, 'rb') as obj_file:
+            assert obj_file.read() == data
+        assert os.listdir(download_dir) == []
+
+        # If the download fails, every path sharing the object fails
+        os.remove(objs[0].object_path)
+        fake_object_service.failing_ranges = {RANGE_SIZE}
+        successes, failures, _ = helper_pull(fake_object_service, ds, objs, download_dir, max_concurrent_ranges=1)
+        assert len(successes) == 0
+        assert len(failures) == 1
+        assert failures[0].pulled_objects == objs
+        assert not os.path.exists(objs[0].object_path)
+
+    def test_download_without_range_support(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        download_dir = os.path.join(ds.client_config.download_dir, 'test')
+        object_dir = os.path.join(ds.client_config.app_workdir, 'objects')
+        os.makedirs(object_dir)
+
+        fake_object_service.supports_ranges = False
+        obj_id, data = helper_add_remote_object(fake_object_service, 1024 * 1024)
+        empty_id, _ = helper_add_remote_object(fake_object_service, 0)
+        objs = [PullObject(object_path=os.path.join(object_dir, obj_id), revision='abcd', dataset_path='a.bin'),
+                PullObject(object_path=os.path.join(object_dir, empty_id), revision='abcd', dataset_path='b.bin')]
+
+        successes, failures, progress = helper_pull(fake_object_service, ds, objs, download_dir)
+        assert len(successes) == 2
+        assert progress == len(data)
+        with open(objs[0].object_path, 'rb') as obj_file:
+            assert obj_file.read() == data
+        assert os.path.getsize(objs[1].object_path) == 0
+
+    def test_download_empty_object(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        download_dir = os.path.join(ds.client_config.download_dir, 'test')
+        object_dir = os.path.join(ds.client_config.app_workdir, 'objects')
+        os.makedirs(object_dir)
+
+        obj_id, _ = helper_add_remote_object(fake_object_service, 0)
+        obj = PullObject(object_path=os.path.join(object_dir, obj_id), revision='abcd', dataset_path='a.bin')
+
+        successes, failures, progress = helper_pull(fake_object_service, ds, [obj], download_dir)
+        assert len(successes) == 1
+        assert os.path.getsize(obj.object_path) == 0
+
+    def test_download_corrupt_object(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        download_dir = os.path.join(ds.client_config.download_dir, 'test')
+        object_dir = os.path.join(ds.client_config.app_workdir, 'objects')
+        os.makedirs(object_dir)
+
+        obj_id, _ = helper_add_remote_object(fake_object_service, 1024 * 1024)
+        # Truncate the object, so the final snappy frame is incomplete
+        fake_object_service.objects[obj_id] = fake_object_service.objects[obj_id][:-100]
+        obj = PullObject(object_path=os.path.join(object_dir, obj_id), revision='abcd', dataset_path='a.bin')
+
+        successes, failures, _ = helper_pull(fake_object_service, ds, [obj], download_dir)
+        assert len(failures) == 1
+        assert not os.path.exists(obj.object_path)
+        # Corrupt downloads are not resumed
+        assert os.listdir(download_dir) == []
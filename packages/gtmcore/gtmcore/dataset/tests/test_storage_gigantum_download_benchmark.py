@@ -0,0 +1,67 @@
+import os
+import time
+import uuid
+
+import pytest
+import snappy
+
+from gtmcore.dataset.io import PullObject
+from gtmcore.dataset.storage import get_storage_backend
+from gtmcore.dataset.manifest.eventloop import get_event_loop
+from gtmcore.dataset.tests import BENCHMARK_SKIP_TEST, BENCHMARK_SKIP_MSG
+from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir
+from gtmcore.fixtures.object_service import FakeObjectService
+
+OBJECT_BYTES = 64 * 1024 * 1024
+RANGE_BYTES = 8 * 1024 * 1024
+# Simulated per-connection throughput of the storage backend
+CONNECTION_BYTES_PER_SECOND = 8 * 1024 * 1024
+
+
+@pytest.fixture()
+def throttled_object_service():
+    service = FakeObjectService(bytes_per_second=CONNECTION_BYTES_PER_SECOND)
+    service.start()
+    yield service
+    service.stop()
+
+
+@pytest.mark.skipif(BENCHMARK_SKIP_TEST, reason=BENCHMARK_SKIP_MSG)
+class TestGigantumDownloadBenchmark(object):
+    def test_ranged_download_throughput(self, mock_dataset_with_cache_dir, throttled_object_service):
+        """Compares downloading a large object over a single connection against concurrent range requests, using a
+        local aiohttp server with a per-connection bandwidth limit in place of the object service and S3"""
+        ds = mock_dataset_with_cache_dir[0]
+        service = throttled_object_service
+        object_dir = os.path.join(ds.client_config.app_workdir, 'objects')
+        os.makedirs(object_dir)
+
+        data = os.urandom(OBJECT_BYTES // 4) * 4
+        obj_id = uuid.uuid4().hex
+        service.objects[obj_id] = snappy.StreamCompressor().compress(data)
+
+        sb = get_storage_backend("gigantum_object_v1")
+        loop = get_event_loop()
+        results = dict()
+        for concurrency in [1, 2, 4, 8]:
+            obj = PullObject(object_path=os.path.join(object_dir, f"{obj_id}"), revision='abcd', dataset_path='a')
+            if os.path.exists(obj.object_path):
+                os.remove(obj.object_path)
+            sb.successful_requests = list()
+            sb.failed_requests = list()
+
+            start = time.perf_counter()
+            loop.run_until_complete(sb._run_pull_pipeline(service.service_root(ds.namespace, ds.name), {}, [obj],
+                                                          progress_update_fn=lambda completed_bytes: None,
+                                                          download_dir=ds.client_config.download_dir,
+                                                          range_size=RANGE_BYTES,
+                                                          max_concurrent_ranges=concurrency))
+            results[concurrency] = time.perf_counter() - start
+            assert len(sb.successful_requests) == 1
+            assert os.path.getsize(obj.object_path) == OBJECT_BYTES
+
+        print(f"\nDownload of {OBJECT_BYTES // (1024 * 1024)} MiB object at "
+              f"{CONNECTION_BYTES_PER_SECOND // (1024 * 1024)} MiB/s per connection: " +
+              ", ".join([f"{c} ranges {t:.2f}s ({OBJECT_BYTES / t / (1024 * 1024):.0f} MiB/s)"
+                         for c, t in results.items()]))
+        assert results[4] < results[1]
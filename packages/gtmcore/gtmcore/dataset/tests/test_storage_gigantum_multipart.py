@@ -0,0 +1,141 @@
+import json
+import os
+import uuid
+
+import snappy
+
+from gtmcore.dataset.io import PushObject
+from gtmcore.dataset.storage import get_storage_backend
+from gtmcore.dataset.storage.gigantum import MultipartUploadJournal, COMPRESSION_BLOCK_BYTES
+from gtmcore.dataset.manifest.eventloop import get_event_loop
+from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir
+from gtmcore.fixtures.object_service import FakeObjectService, fake_object_service
+
+PART_SIZE = 1024 * 1024
+
+
+def helper_write_random_object(directory: str, num_bytes: int) -> str:
+    """Write a poorly compressible object, so the compressed stream spans several parts"""
+    object_path = os.path.join(directory, uuid.uuid4().hex)
+    with open(object_path, 'wb') as obj_file:
+        obj_file.write(os.urandom(num_bytes))
+    return object_path
+
+
+def helper_push(sb, service: FakeObjectService, ds, objects, journal_dir, max_concurrent_parts=4):
+    sb.successful_requests = list()
+    sb.failed_requests = list()
+    loop = get_event_loop()
+    loop.run_until_complete(sb._run_push_pipeline(service.service_root(ds.namespace, ds.name), {}, objects,
+                                                  progress_update_fn=lambda completed_bytes: None,
+                                                  multipart_chunk_size=PART_SIZE,
+                                                  upload_chunk_size=65536,
+                                                  num_workers=2,
+                                                  max_concurrent_parts=max_concurrent_parts,
+                                                  journal_dir=journal_dir))
+    return sb.successful_requests, sb.failed_requests
+
+
+class TestGigantumMultipartUpload(object):
+    def test_concurrent_parts(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        sb = get_storage_backend("gigantum_object_v1")
+        journal_dir = os.path.join(ds.client_config.upload_dir, 'multipart')
+
+        object_path = helper_write_random_object(ds.client_config.app_workdir, 6 * PART_SIZE)
+        obj = PushObject(object_path=object_path, revision='abcd', dataset_path='big.bin')
+
+        successes, failures = helper_push(sb, fake_object_service, ds, [obj], journal_dir, max_concurrent_parts=3)
+        assert len(successes) == 1
+        assert len(failures) == 0
+
+        assert 1 < fake_object_service.max_in_flight <= 3
+        assert len(fake_object_service.part_puts) >= 6
+        assert all([c == 1 for c in fake_object_service.part_puts.values()])
+
+        with open(object_path, 'rb') as src:
+            uploaded = fake_object_service.objects[os.path.basename(object_path)]
+            assert snappy.StreamDecompressor().decompress(uploaded) == src.read()
+
+        # The journal is removed once the upload completes
+        assert os.listdir(journal_dir) == []
+
+    def test_resume_interrupted_upload(self, mock_dataset_with_cache_dir, fake_object_service):
+        ds = mock_dataset_with_cache_dir[0]
+        sb = get_storage_backend("gigantum_object_v1")
+        journal_dir = os.path.join(ds.client_config.upload_dir, 'multipart')
+
+        object_path = helper_write_random_object(ds.client_config.app_workdir, 6 * PART_SIZE)
+        obj_id = os.path.basename(object_path)
+        obj = PushObject(object_path=object_path, revision='abcd', dataset_path='big.bin')
+
+        # Fail part 5, so the first push stops part way through
+        fake_object_service.failing_parts = {5}
+        successes, failures = helper_push(sb, fake_object_service, ds, [obj], journal_dir, max_concurrent_parts=1)
+        assert len(successes) == 0
+        assert len(failures) == 1
+        assert fake_object_service.aborted == []
+
+        journal_path = os.path.join(journal_dir, f"{obj_id}.journal")
+        with open(journal_path, 'rt') as jf:
+            lines = [json.loads(line) for line in jf]
+        assert [r['part_number'] for r in lines[1:]] == [1, 2, 3, 4]
+        assert len(fake_object_service.uploads) == 1
+
+        # Resume, which should only upload the remaining parts
+        fake_object_service.failing_parts = set()
+        successes, failures = helper_push(sb, fake_object_service, ds, [obj], journal_dir)
+        assert len(successes) == 1
+        assert len(failures) == 0
+
+        assert [fake_object_service.part_puts[p] for p in [1, 2, 3, 4]] == [1, 1, 1, 1]
+        assert fake_object_service.part_puts[5] == 1
+        assert not os.path.exists(journal_path)
+
+        with open(object_path, 'rb') as src:
+            assert snappy.StreamDecompressor().decompress(fake_object_service.objects[obj_id]) == src.read()
+
+    def test_resume_stale_upload(self, mock_dataset_with_cache_dir, fake_object_service):
+        """A journaled upload the service no longer knows about is aborted, and the next push starts over"""
+        ds = mock_dataset_with_cache_dir[0]
+        sb = get_storage_backend("gigantum_object_v1")
+        journal_dir = os.path.join(ds.client_config.upload_dir, 'multipart')
+
+        object_path = helper_write_random_object(ds.client_config.app_workdir, 2 * PART_SIZE)
+        obj_id = os.path.basename(object_path)
+        obj = PushObject(object_path=object_path, revision='abcd', dataset_path='big.bin')
+
+        journal = MultipartUploadJournal(os.path.join(journal_dir, f"{obj_id}.journal"))
+        journal.start('expired-upload', {'object_size': 2 * PART_SIZE, 'multipart_chunk_size': PART_SIZE,
+                                         'compression_block_bytes': COMPRESSION_BLOCK_BYTES})
+        journal.record_part(1, 'abcd')
+
+        successes, failures = helper_push(sb, fake_object_service, ds, [obj], journal_dir)
+        assert len(failures) == 1
+        assert fake_object_service.aborted == ['expired-upload']
+        assert not os.path.exists(journal.journal_path)
+
+        successes, failures = helper_push(sb, fake_object_service, ds, [obj], journal_dir)
+        assert len(successes) == 1
+        with open(object_path, 'rb') as src:
+            assert snappy.StreamDecompressor().decompress(fake_object_service.objects[obj_id]) == src.read()
+
+    def test_journal_layout_mismatch(self, mock_dataset_with_cache_dir):
+        ds = mock_dataset_with_cache_dir[0]
+        journal = MultipartUploadJournal(os.path.join(ds.client_config.upload_dir, 'multipart', 'obj.journal'))
+        layout = {'object_size': 100, 'multipart_chunk_size': 10, 'compression_block_bytes': 4}
+
+        assert journal.load(layout) == (None, dict())
+
+        journal.start('upload1', layout)
+        journal.record_part(1, 'etag1')
+        journal.record_part(2, 'etag2')
+        # Simulate a partially written line from an interrupted process
+        with open(journal.journal_path, 'at') as jf:
+            jf.write('{"part_numb')
+
+        assert journal.load(layout) == ('upload1', {1: 'etag1', 2: 'etag2'})
+        assert journal.load(dict(layout, multipart_chunk_size=20)) == (None, dict())
+
+        journal.remove()
+        assert not os.path.exists(journal.journal_path)
@@ -2,10 +2,12 @@ import pytest
 import shutil
 
 import os
+import time
 
 from gtmcore.configuration import Configuration
 from gtmcore.dataset.storage import get_storage_backend
 from gtmcore.dataset.storage.local import LocalFilesystem
+from gtmcore.dataset.storage.local_index import LocalDirectoryWatcher, LocalSnapshotIndex
 from gtmcore.dataset.manifest.manifest import Manifest
 from gtmcore.fixtures.datasets import helper_compress_file, mock_dataset_with_cache_dir_local, USERNAME, \
     mock_enable_unmanaged_for_testing
@@ -224,3 +226,100 @@ class TestStorageBackendLocalFilesystem(object):
         assert os.path.isfile(os.path.join(m.cache_mgr.cache_root, m.dataset_revision, 'subdir', 'test3.txt')) is True
         for key in keys:
             assert os.path.isfile(m.dataset_to_object_path(key)) is True
+
+    def test_update_from_remote_metadata_changes(self, mock_dataset_with_local_dir):
+        ds = mock_dataset_with_local_dir[0]
+        test_dir = os.path.join(ds.client_config.app_workdir, "local_data", "test_dir")
+        ds.backend.update_from_remote(ds, updater)
+        m = Manifest(ds, 'tester')
+        assert len(m.manifest.keys()) == 4
+
+        hash_file_key_list = ds.backend.hash_file_key_list
+        hashed_keys = list()
+
+        def tracking_hash(dataset, keys):
+            hashed_keys.extend(keys)
+            return hash_file_key_list(dataset, keys)
+
+        ds.backend.hash_file_key_list = tracking_hash
+
+        # Unchanged files are not hashed again
+        ds.backend.update_from_remote(ds, updater)
+        assert hashed_keys == []
+
+        # Only files with changed metadata are hashed. Touched files are not modified.
+        with open(os.path.join(test_dir, 'test1.txt'), 'wt') as tf:
+            tf.write("This file got changed in the filesystem")
+        os.utime(os.path.join(test_dir, 'test2.txt'), ns=(1000, 1000))
+        # Replace a file with a new one, instead of writing to it
+        helper_write_object(test_dir, "subdir/test3.txt.tmp", "replaced contents")
+        os.replace(os.path.join(test_dir, "subdir/test3.txt.tmp"), os.path.join(test_dir, "subdir/test3.txt"))
+        os.remove(os.path.join(test_dir, 'test2.txt'))
+        helper_write_object(test_dir, "test2.txt", "temp contents 2")
+        old_hash = m.manifest['subdir/test3.txt']['h']
+
+        ds.backend.update_from_remote(ds, updater)
+        assert sorted(hashed_keys) == ['subdir/test3.txt', 'test1.txt', 'test2.txt']
+
+        m = Manifest(ds, 'tester')
+        assert len(m.manifest.keys()) == 4
+        assert m.manifest['subdir/test3.txt']['h'] != old_hash
+        revision_dir = os.path.join(m.cache_mgr.cache_root, m.dataset_revision)
+        with open(os.path.join(revision_dir, 'subdir', 'test3.txt'), 'rt') as tf:
+            assert tf.read() == "dummy data: replaced contents"
+        with open(os.path.join(revision_dir, 'test1.txt'), 'rt') as tf:
+            assert tf.read() == "This file got changed in the filesystem"
+        assert len(ds.backend.verify_contents(ds, updater)) == 0
+
+        # Additions and deletions are still found by walking the directory
+        hashed_keys.clear()
+        os.remove(os.path.join(test_dir, 'test1.txt'))
+        helper_write_object(test_dir, "test4.txt", "temp contents 4")
+        ds.backend.update_from_remote(ds, updater)
+        assert hashed_keys == []
+        m = Manifest(ds, 'tester')
+        assert sorted(m.manifest.keys()) == ['subdir/', 'subdir/test3.txt', 'test2.txt', 'test4.txt']
+
+    @pytest.mark.skipif(not LocalDirectoryWatcher.is_supported(), reason="Watching requires inotify")
+    def test_update_from_remote_watcher(self, mock_dataset_with_local_dir):
+        ds = mock_dataset_with_local_dir[0]
+        test_dir = os.path.join(ds.client_config.app_workdir, "local_data", "test_dir")
+        m = Manifest(ds, 'tester')
+        index = LocalSnapshotIndex(ds.backend._get_snapshot_index_file(m))
+
+        watcher = ds.backend.start_watcher(ds)
+        try:
+            # The first update after the watcher starts checks the whole directory
+            assert index.is_dirty_set_complete() is False
+            ds.backend.update_from_remote(ds, updater)
+            assert index.is_dirty_set_complete() is True
+
+            with open(os.path.join(test_dir, 'test1.txt'), 'wt') as tf:
+                tf.write("This file got changed in the filesystem")
+            os.makedirs(os.path.join(test_dir, 'newdir'))
+            helper_write_object(test_dir, "newdir/test4.txt", "temp contents 4")
+            shutil.rmtree(os.path.join(test_dir, 'subdir'))
+
+            for _ in range(50):
+                if {'test1.txt', 'newdir/test4.txt', 'subdir/'}.issubset(index.get_dirty()):
+                    break
+                time.sleep(0.1)
+
+            # Only the recorded paths are checked
+            def fail_scan(local_data_dir):
+                assert False, "The data directory should not be walked"
+
+            ds.backend._scan_directory = fail_scan
+            ds.backend.update_from_remote(ds, updater)
+            assert index.get_dirty() == set()
+
+            m = Manifest(ds, 'tester')
+            assert sorted(m.manifest.keys()) == ['newdir/', 'newdir/test4.txt', 'test1.txt', 'test2.txt']
+            with open(os.path.join(m.cache_mgr.cache_root, m.dataset_revision, 'test1.txt'), 'rt') as tf:
+                assert tf.read() == "This file got changed in the filesystem"
+        finally:
+            watcher.stop()
+
+        # Changes are no longer recorded, so the directory must be checked entirely
+        assert index.is_dirty_set_complete() is False
+        index.close()
@@ -4,6 +4,7 @@ import shutil
 import os
 import tempfile
 import boto3
+import botocore
 
 from gtmcore.dataset.storage import get_storage_backend
 from gtmcore.dataset.storage.s3 import PublicS3Bucket
@@ -247,3 +248,79 @@ class TestStorageBackendS3PublicBuckets(object):
                                            'metadata', 'sub', 'test-file-5.bin')) is True
         for key in keys:
             assert os.path.isfile(m.dataset_to_object_path(key)) is True
+
+    def test_update_from_remote_resume(self, mock_config_class, mock_public_bucket):
+        im = mock_config_class[0]
+        ds = im.create_dataset(USERNAME, USERNAME, 'dataset-1', description="my dataset 1",
+                               storage_type="public_s3_bucket")
+        ds.backend.set_default_configuration(USERNAME, 'fakebearertoken', 'fakeidtoken')
+        current_config = ds.backend_config
+        current_config['Bucket Name'] = mock_public_bucket
+        current_config['Prefix'] = ""
+        ds.backend_config = current_config
+
+        download_object = ds.backend._download_object
+        downloaded = list()
+
+        def failing_download(client, bucket, key, destination, chunk_size, progress_update_fn=None):
+            if key == 'metadata/test-file-4.bin':
+                raise botocore.exceptions.ClientError({'Error': {'Code': '500'}}, 'GetObject')
+            download_object(client, bucket, key, destination, chunk_size, progress_update_fn)
+            downloaded.append(key)
+
+        # Interrupt the update with a failed download
+        ds.backend._download_object = failing_download
+        with pytest.raises(botocore.exceptions.ClientError):
+            ds.backend.update_from_remote(ds, updater)
+
+        m = Manifest(ds, USERNAME)
+        assert len(m.manifest.keys()) == 0
+        assert sorted(downloaded) == ['metadata/sub/test-file-5.bin', 'metadata/test-file-3.bin',
+                                      'test-file-1.bin', 'test-file-2.bin']
+        journal_file = ds.backend._get_etag_journal_file(m)
+        assert len(ds.backend._load_etag_journal(journal_file)) == 4
+
+        # Resuming only downloads the remaining object
+        downloaded.clear()
+        ds.backend._download_object = lambda *args: (download_object(*args), downloaded.append(args[2]))
+        ds.backend.update_from_remote(ds, updater)
+        assert downloaded == ['metadata/test-file-4.bin']
+        assert os.path.exists(journal_file) is False
+
+        m = Manifest(ds, USERNAME)
+        assert len(m.manifest.keys()) == 7
+        assert len(ds.backend.verify_contents(ds, updater)) == 0
+        with open(os.path.join(m.cache_mgr.cache_root, m.dataset_revision, 'metadata/test-file-4.bin'), 'rt') as tf:
+            assert tf.read() == "1234" * 100
+
+        # Nothing is downloaded when the bucket hasn't changed
+        downloaded.clear()
+        ds.backend.update_from_remote(ds, updater)
+        assert downloaded == []
+
+    def test_pull_failure(self, mock_config_class, mock_public_bucket):
+        im = mock_config_class[0]
+        ds = im.create_dataset(USERNAME, USERNAME, 'dataset-1', description="my dataset 1",
+                               storage_type="public_s3_bucket")
+        ds.backend.set_default_configuration(USERNAME, 'fakebearertoken', 'fakeidtoken')
+        current_config = ds.backend_config
+        current_config['Bucket Name'] = mock_public_bucket
+        current_config['Prefix'] = ""
+        ds.backend_config = current_config
+
+        ds.backend.update_from_remote(ds, updater)
+        m = Manifest(ds, USERNAME)
+
+        missing_object = os.path.join(m.cache_mgr.cache_root, 'objects', 'missing')
+        pull_objects = [PullObject(object_path=m.dataset_to_object_path('test-file-1.bin'),
+                                   revision=m.dataset_revision, dataset_path='test-file-1.bin'),
+                        PullObject(object_path=missing_object,
+                                   revision=m.dataset_revision, dataset_path='not-in-bucket.bin')]
+        os.remove(m.dataset_to_object_path('test-file-1.bin'))
+
+        result = ds.backend.pull_objects(ds, pull_objects, chunk_update_callback)
+        assert [o.dataset_path for o in result.success] == ['test-file-1.bin']
+        assert [o.dataset_path for o in result.failure] == ['not-in-bucket.bin']
+        assert "1 failed" in result.message
+        assert os.path.isfile(m.dataset_to_object_path('test-file-1.bin')) is True
+        assert os.path.exists(missing_object) is False
@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+
+from gtmcore.dataset.manifest.verify import ContentVerifier, VerificationMode, sample_size
+from gtmcore.fixtures.datasets import mock_dataset_with_cache_dir, mock_dataset_with_manifest, helper_append_file, \
+    USERNAME
+
+
+def helper_modify_file(manifest, relative_path: str, content: str) -> None:
+    """Modify a file in place, with an mtime after any previous verification"""
+    time.sleep(0.01)
+    with open(os.path.join(manifest.current_revision_dir, relative_path), 'wt') as fh:
+        fh.write(content)
+
+
+@pytest.fixture()
+def mock_dataset_with_files(mock_dataset_with_manifest):
+    ds, manifest, working_dir = mock_dataset_with_manifest
+    for idx in range(10):
+        helper_append_file(manifest.cache_mgr.cache_root, manifest.dataset_revision, f"test{idx}.txt", f"content {idx}")
+    manifest.sweep_all_changes()
+    ds.backend.set_default_configuration(USERNAME, 'fakebearertoken', 'fakeidtoken')
+    yield ds, manifest, working_dir
+
+
+class TestContentVerifier(object):
+    def test_sample_size(self):
+        assert sample_size(100000) == 299
+        assert sample_size(100000, confidence=0.99, tolerance=0.001) == 4603
+        assert sample_size(10) == 10
+
+        with pytest.raises(ValueError):
+            sample_size(10, confidence=1)
+        with pytest.raises(ValueError):
+            sample_size(10, tolerance=0)
+
+    def test_verify_full(self, mock_dataset_with_files):
+        ds, manifest, working_dir = mock_dataset_with_files
+        helper_modify_file(manifest, "test3.txt", "changed")
+
+        progress = list()
+        modified = ds.backend.verify_contents(ds, print, progress_update_fn=progress.append)
+        assert modified == ["test3.txt"]
+        assert progress[-1].num_verified == 10
+        assert progress[-1].num_files == 10
+        assert progress[-1].modified_keys == ["test3.txt"]
+
+        assert ContentVerifier(manifest).recorded_mismatches() == ["test3.txt"]
+
+    def test_verify_incremental(self, mock_dataset_with_files):
+        ds, manifest, working_dir = mock_dataset_with_files
+        verifier = ContentVerifier(manifest)
+
+        # Nothing has been verified yet
+        assert len(verifier.select_keys(VerificationMode.INCREMENTAL)) == 10
+        assert ds.backend.verify_contents(ds, print, mode=VerificationMode.INCREMENTAL) == []
+        assert verifier.select_keys(VerificationMode.INCREMENTAL) == []
+
+        # Only files modified since they were verified are checked. Known mismatches are checked again.
+        helper_modify_file(manifest, "test5.txt", "changed")
+        assert verifier.select_keys(VerificationMode.INCREMENTAL) == ["test5.txt"]
+        assert ds.backend.verify_contents(ds, print, mode=VerificationMode.INCREMENTAL) == ["test5.txt"]
+        assert verifier.select_keys(VerificationMode.INCREMENTAL) == ["test5.txt"]
+
+        # Updating the manifest invalidates the record
+        manifest.sweep_all_changes()
+        verifier = ContentVerifier(manifest)
+        assert verifier.recorded_mismatches() == []
+        assert verifier.select_keys(VerificationMode.INCREMENTAL) == ["test5.txt"]
+        assert ds.backend.verify_contents(ds, print, mode=VerificationMode.INCREMENTAL) == []
+        assert verifier.select_keys(VerificationMode.INCREMENTAL) == []
+
+    def test_verify_sample(self, mock_dataset_with_files):
+        ds, manifest, working_dir = mock_dataset_with_files
+        verifier = ContentVerifier(manifest)
+
+        # 10 files with 50% tolerance: 1 - 0.5^5 > 0.95
+        keys = verifier.select_keys(VerificationMode.SAMPLE, confidence=0.95, tolerance=0.5)
+        assert len(keys) == 5
+        assert len(set(keys)) == 5
+
+        for idx in range(10):
+            helper_modify_file(manifest, f"test{idx}.txt", "changed")
+        modified = ds.backend.verify_contents(ds, print, mode=VerificationMode.SAMPLE, tolerance=0.5)
+        assert len(modified) == 5
+        assert sorted(ContentVerifier(manifest).recorded_mismatches()) == modified
@@ -1,14 +1,19 @@
 import copy
 import os
 import time
-from typing import Optional, List
+import uuid
+from contextlib import ExitStack
+from typing import Optional, List, Dict, Set, Tuple
 
 from humanfriendly import format_size
+from natsort import natsorted
 from rq import get_current_job
 
 from gtmcore.configuration import Configuration
-from gtmcore.dataset import Manifest
-from gtmcore.dataset.manifest.job import generate_bg_hash_job_list
+from gtmcore.dataset import Dataset, Manifest
+from gtmcore.dataset.cache.filesystem import HostFilesystemCache
+from gtmcore.dataset.cache.gc import ObjectCacheCollector
+from gtmcore.dataset.manifest.job import BackgroundHashJob, generate_bg_hash_job_list
 from gtmcore.dispatcher import Dispatcher
 from gtmcore.gitlib import GitAuthor, RepoLocation
 from gtmcore.inventory.inventory import InventoryManager, InventoryException
@@ -18,6 +23,11 @@ from gtmcore.workflows.gitlab import GitLabManager
 from gtmcore.dataset.io.manager import IOManager
 from gtmcore.dataset.io.job import BackgroundDownloadJob
 from gtmcore.dataset.io import PushObject
+from gtmcore.dataset.io.scheduler import WorkStealingQueue
+
+# Hosts with fewer hashing CPUs than this hash uploaded files in `hash_dataset_files` background jobs instead of in a
+# process pool owned by the upload job
+MIN_LOCAL_HASHING_CPUS = 2
 
 
 def hash_dataset_files(logged_in_username: str, dataset_owner: str, dataset_name: str,
@@ -43,9 +53,18 @@ def hash_dataset_files(logged_in_username: str, dataset_owner: str, dataset_name
         ds = InventoryManager().load_dataset(logged_in_username, dataset_owner, dataset_name)
         manifest = Manifest(ds, logged_in_username)
 
-        hash_result, fast_hash_result = manifest.hash_files(file_list)
-
         job = get_current_job()
+
+        def progress_callback(stage: str, completed: int, total: int) -> None:
+            """Method to report progress of the hash and ingest stages in the job's metadata"""
+            if job:
+                job.meta[f'{stage}_progress'] = f"{completed}/{total}"
+                job.save_meta()
+
+        # Work has already been split across cores into separate jobs, so hash in a single process here
+        manifest.hasher.num_workers = 1
+        hash_result, fast_hash_result = manifest.hash_files(file_list, progress_callback=progress_callback)
+
         if job:
             job.meta['hash_result'] = ",".join(['None' if v is None else v for v in hash_result])
             job.meta['fast_hash_result'] = ",".join(['None' if v is None else v for v in fast_hash_result])
@@ -90,7 +109,7 @@ def complete_dataset_upload_transaction(logged_in_username: str, logged_in_email
         current_job.meta['feedback'] = msg
         current_job.save_meta()
 
-    def schedule_bg_hash_job():
+    def schedule_bg_hash_job(job_list: List[BackgroundHashJob], job_kwargs: dict, job_metadata: dict) -> None:
         """Method to check if a bg job should get scheduled and do so"""
         num_cores = manifest.get_num_hashing_cpus()
         if sum([x.is_running for x in job_list]) < num_cores:
@@ -119,6 +138,53 @@ def complete_dataset_upload_transaction(logged_in_username: str, logged_in_email
                                 f" {logged_in_username}/{dataset_owner}/{dataset_name}")
                     break
 
+    def hash_in_process() -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """Method to hash files in a local process pool, moving them into the object cache as each batch completes"""
+        def progress_callback(stage: str, completed: int, total: int) -> None:
+            if stage == 'ingest':
+                update_feedback(f"Please wait while file contents are analyzed. "
+                                f"{completed} of {total} files complete...",
+                                percent_complete=(float(completed) / float(total)) * 100)
+
+        logger.info(f"(Job {p}) Starting file hash processing for"
+                    f" {logged_in_username}/{dataset_owner}/{dataset_name} with {manifest.hasher.num_workers} workers")
+        hash_result, fast_hash_result = manifest.hash_files(filenames, progress_callback=progress_callback)
+        return list(zip(filenames, hash_result, fast_hash_result))
+
+    def hash_with_bg_jobs(job_list: List[BackgroundHashJob], job_kwargs: dict,
+                          job_metadata: dict) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """Method to spread hashing across `hash_dataset_files` background jobs, polling them for completion"""
+        logger.info(f"(Job {p}) Starting file hash processing for"
+                    f" {logged_in_username}/{dataset_owner}/{dataset_name} with {len(job_list)} jobs")
+        total_bytes = sum([x.total_bytes for x in job_list])
+
+        while True:
+            # Check if you need to schedule jobs and schedule up to 1 job per iteration
+            schedule_bg_hash_job(job_list, job_kwargs, job_metadata)
+
+            # Refresh all job statuses and update status feedback
+            completed_job_status = [x.refresh_status() for x in job_list]
+            completed_bytes = sum([s.total_bytes for s, c in zip(job_list, completed_job_status) if c is True])
+            update_feedback(f"Please wait while file contents are analyzed. "
+                            f"{format_size(completed_bytes)} of {format_size(total_bytes)} complete...",
+                            percent_complete=(float(completed_bytes)/float(total_bytes)) * 100)
+
+            # Check if you are done
+            completed_or_failed = sum([(x.is_complete or (x.failure_count >= 3)) for x in job_list])
+            if completed_or_failed == len(job_list):
+                break
+
+            # Update once per second
+            time.sleep(1)
+
+        results: List[Tuple[str, Optional[str], Optional[str]]] = list()
+        for job in job_list:
+            if job.is_complete:
+                results.extend(zip(job.file_list, job.get_hash_result(), job.get_fast_hash_result()))
+            else:
+                results.extend([(f, None, None) for f in job.file_list])
+        return results
+
     p = os.getpid()
     try:
         logger.info(f"(Job {p}) Starting complete_dataset_upload_transaction(logged_in_username={logged_in_username},"
@@ -139,55 +205,35 @@ def complete_dataset_upload_transaction(logged_in_username: str, logged_in_email
 
             # If there are new/updated files, spread work across cores while providing reasonable feedback
             if filenames:
-                job_list = generate_bg_hash_job_list(filenames, manifest, dispatcher_obj)
-                total_bytes = sum([x.total_bytes for x in job_list])
-
-                job_kwargs = {
-                    'logged_in_username': logged_in_username,
-                    'dataset_owner': dataset_owner,
-                    'dataset_name': dataset_name,
-                    'file_list': list(),
-                }
-                job_metadata = {'dataset': f"{logged_in_username}|{dataset_owner}|{dataset_name}",
-                                'method': 'hash_dataset_files'}
-
+                revision_dir = manifest.current_revision_dir
+                total_bytes = sum([os.path.getsize(os.path.join(revision_dir, f)) for f in filenames
+                                   if os.path.isfile(os.path.join(revision_dir, f))])
                 update_feedback(f"Please wait while file contents are analyzed. "
                                 f"Processing {format_size(total_bytes)}...", has_failures=False)
-                logger.info(f"(Job {p}) Starting file hash processing for"
-                            f" {logged_in_username}/{dataset_owner}/{dataset_name} with {len(job_list)} jobs")
-
-                while True:
-                    # Check if you need to schedule jobs and schedule up to 1 job per iteration
-                    schedule_bg_hash_job()
-
-                    # Refresh all job statuses and update status feedback
-                    completed_job_status = [x.refresh_status() for x in job_list]
-                    completed_bytes = sum([s.total_bytes for s, c in zip(job_list, completed_job_status) if c is True])
-                    update_feedback(f"Please wait while file contents are analyzed. "
-                                    f"{format_size(completed_bytes)} of {format_size(total_bytes)} complete...",
-                                    percent_complete=(float(completed_bytes)/float(total_bytes)) * 100)
 
-                    # Check if you are done
-                    completed_or_failed = sum([(x.is_complete or (x.failure_count >= 3)) for x in job_list])
-                    if completed_or_failed == len(job_list):
-                        break
-
-                    # Update once per second
-                    time.sleep(1)
+                if manifest.get_num_hashing_cpus() >= MIN_LOCAL_HASHING_CPUS:
+                    hash_results = hash_in_process()
+                else:
+                    job_list = generate_bg_hash_job_list(filenames, manifest, dispatcher_obj)
+                    job_kwargs = {
+                        'logged_in_username': logged_in_username,
+                        'dataset_owner': dataset_owner,
+                        'dataset_name': dataset_name,
+                        'file_list': list(),
+                    }
+                    job_metadata = {'dataset': f"{logged_in_username}|{dataset_owner}|{dataset_name}",
+                                    'method': 'hash_dataset_files'}
+                    hash_results = hash_with_bg_jobs(job_list, job_kwargs, job_metadata)
 
                 # Manually complete update process for updated/created files
                 failed_files = list()
-                for job in job_list:
-                    if job.is_complete:
-                        for f, h, fh in zip(job.file_list, job.get_hash_result(), job.get_fast_hash_result()):
-                            if not fh or not h:
-                                failed_files.append(f)
-                                continue
-
-                            _, file_bytes, mtime = fh.split("||")
-                            manifest._manifest_io.add_or_update(f, h, mtime, file_bytes)
-                    else:
-                        failed_files.extend(job.file_list)
+                for f, h, fh in hash_results:
+                    if not fh or not h:
+                        failed_files.append(f)
+                        continue
+
+                    _, file_bytes, mtime = fh.split("||")
+                    manifest._manifest_io.add_or_update(f, h, mtime, file_bytes)
 
                 # Message for hard failures
                 if failed_files:
@@ -330,13 +376,18 @@ def push_dataset_objects(objs: List[PushObject], logged_in_username: str, access
 
 def pull_objects(keys: List[str], logged_in_username: str, access_token: str, id_token: str,
                  dataset_owner: str, dataset_name: str,
-                 labbook_owner: Optional[str] = None, labbook_name: Optional[str] = None) -> None:
+                 labbook_owner: Optional[str] = None, labbook_name: Optional[str] = None,
+                 work_queue: Optional[str] = None, worker_index: int = 0, num_workers: int = 1) -> None:
     """Method to pull a collection of objects from a dataset's backend.
 
     This runs the IOManager.pull_objects() method with `link_revision=False`. This is because this job can be run in
     parallel multiple times with different sets of keys. You don't want to link until the very end, which is handled
     in the `download_dataset_files` job, which is what scheduled this job.
 
+    If `work_queue` is set, `keys` is ignored and chunks of keys are claimed from the WorkStealingQueue instead,
+    stealing from the other workers once this worker's own chunks are done. The keys of the chunk being downloaded
+    are stored in the job's `in_progress_keys` metadata, so they can be reported if the job fails.
+
     Args:
         keys: List if file keys to download
         logged_in_username: username for the currently logged in user
@@ -346,6 +397,9 @@ def pull_objects(keys: List[str], logged_in_username: str, access_token: str, id
         dataset_name: Name of the dataset containing the files to download
         labbook_owner: Owner of the labbook if this dataset is linked
         labbook_name: Name of the labbook if this dataset is linked
+        work_queue: Optional id of a WorkStealingQueue to claim keys from
+        worker_index: Index of this worker in the WorkStealingQueue
+        num_workers: Number of workers sharing the WorkStealingQueue
 
     Returns:
         str: directory path of imported labbook
@@ -385,13 +439,37 @@ def pull_objects(keys: List[str], logged_in_username: str, access_token: str, id
         m = Manifest(ds, logged_in_username)
         iom = IOManager(ds, m)
 
-        result = iom.pull_objects(keys=keys, progress_update_fn=progress_update_callback, link_revision=False)
-
         job = get_current_job()
-        if job:
-            job.meta['failure_keys'] = ",".join([x.dataset_path for x in result.failure])
-            job.meta['message'] = result.message
-            job.save_meta()
+        if not work_queue:
+            result = iom.pull_objects(keys=keys, progress_update_fn=progress_update_callback, link_revision=False)
+
+            if job:
+                job.meta['failure_keys'] = ",".join([x.dataset_path for x in result.failure])
+                job.meta['message'] = result.message
+                job.save_meta()
+            return
+
+        queue = WorkStealingQueue(work_queue, num_workers)
+        failure_keys: List[str] = list()
+        messages: List[str] = list()
+        chunk = queue.next_chunk(worker_index)
+        while chunk:
+            if job:
+                job.meta['in_progress_keys'] = ",".join(chunk)
+                job.save_meta()
+
+            result = iom.pull_objects(keys=chunk, progress_update_fn=progress_update_callback, link_revision=False)
+            failure_keys.extend([x.dataset_path for x in result.failure])
+            if result.message:
+                messages.append(result.message)
+
+            if job:
+                job.meta['in_progress_keys'] = ""
+                job.meta['failure_keys'] = ",".join(failure_keys)
+                job.meta['message'] = "\n".join(messages)
+                job.save_meta()
+
+            chunk = queue.next_chunk(worker_index)
 
     except Exception as err:
         logger.exception(err)
@@ -466,9 +544,13 @@ def download_dataset_files(logged_in_username: str, access_token: str, id_token:
 
         failure_keys = list()
         if key_batches:
+            # Each job starts on its own batch, split into chunks, and steals chunks from the other jobs when done
+            work_queue = WorkStealingQueue(uuid.uuid4().hex, len(key_batches))
+            work_queue.fill([iom.split_pull_batch(keys) for keys in key_batches])
+
             # Schedule jobs for batches
             bg_jobs = list()
-            for keys in key_batches:
+            for worker_index, keys in enumerate(key_batches):
                 job_kwargs = {
                     'keys': keys,
                     'logged_in_username': logged_in_username,
@@ -477,7 +559,10 @@ def download_dataset_files(logged_in_username: str, access_token: str, id_token:
                     'dataset_owner': dataset_owner,
                     'dataset_name': dataset_name,
                     'labbook_owner': labbook_owner,
-                    'labbook_name': labbook_name
+                    'labbook_name': labbook_name,
+                    'work_queue': work_queue.queue_id,
+                    'worker_index': worker_index,
+                    'num_workers': len(key_batches)
                 }
                 job_metadata = {'dataset': f"{logged_in_username}|{dataset_owner}|{dataset_name}",
                                 'method': 'pull_objects'}
@@ -504,13 +589,21 @@ def download_dataset_files(logged_in_username: str, access_token: str, id_token:
                                 percent_complete=pc)
                 time.sleep(1)
 
-            # Aggregate failures if they exist
+            # Aggregate failures if they exist. Keys may have been downloaded by any job, so a job that failed
+            # outright only accounts for the chunk it was working on.
             for j in bg_jobs:
+                failure_keys.extend(j.get_failed_keys())
                 if j.is_failed:
-                    # Whole job failed...assume entire batch should get re-uploaded for now
-                    failure_keys.extend(j.keys)
-                else:
-                    failure_keys.extend(j.get_failed_keys())
+                    failure_keys.extend(j.get_in_progress_keys())
+
+            # Chunks that were never claimed (every job failed), and anything else that didn't make it
+            failure_keys.extend(work_queue.remaining_keys())
+            work_queue.delete()
+            failed = set(failure_keys)
+            failure_keys.extend([k for keys in key_batches for k in keys
+                                 if k not in failed and k[-1] != os.path.sep
+                                 and not os.path.exists(m.dataset_to_object_path(k))])
+            failure_keys = natsorted(set(failure_keys))
 
         # Set final status for UI
         if len(failure_keys) == 0:
@@ -540,3 +633,153 @@ def download_dataset_files(logged_in_username: str, access_token: str, id_token:
     except Exception as err:
         logger.exception(err)
         raise
+
+
+def _dataset_checkout_dirs(inventory_root: str, username: str, namespace: str, dataset_name: str) -> List[str]:
+    """Function to find the directories of every checkout of a dataset on disk, without loading them, so checkouts
+    that fail to load can be told apart from deleted ones
+
+    Args:
+        inventory_root: root directory of the inventory
+        username: username of the user that owns the checkouts
+        namespace: namespace of the dataset
+        dataset_name: name of the dataset
+
+    Returns:
+        list of absolute paths
+    """
+    user_root = os.path.join(inventory_root, username)
+    checkout_dirs = [os.path.join(user_root, namespace, 'datasets', dataset_name)]
+    if os.path.isdir(user_root):
+        for owner in os.listdir(user_root):
+            labbooks_dir = os.path.join(user_root, owner, 'labbooks')
+            if os.path.isdir(labbooks_dir):
+                checkout_dirs.extend([os.path.join(labbooks_dir, lb, '.gigantum', 'datasets', namespace, dataset_name)
+                                      for lb in os.listdir(labbooks_dir)])
+
+    return [os.path.realpath(d) for d in checkout_dirs if os.path.isdir(d)]
+
+
+def collect_dataset_file_caches(logged_in_username: Optional[str] = None) -> Dict[str, int]:
+    """Job to garbage collect the dataset file caches of a user, or of all users if no username is provided
+
+    Objects that are not referenced by any branch or checkout of a dataset are deleted. If `datasets.cache_quota` is
+    set and a user's caches are larger, objects that can be downloaded again are evicted, least recently accessed
+    first, until the caches fit in the quota. Finally, objects in the shared object pool that no dataset cache links
+    to anymore (e.g. after a dataset was deleted) are removed.
+
+    Args:
+        logged_in_username: username of the user whose caches should be collected
+
+    Returns:
+        dict with the number of bytes reclaimed and evicted
+    """
+    logger = LMLogger.get_logger()
+    p = os.getpid()
+    logger.info(f"(Job {p}) Starting collect_dataset_file_caches(logged_in_username={logged_in_username})")
+
+    job = get_current_job()
+    result = {'objects_removed': 0, 'bytes_reclaimed': 0, 'objects_evicted': 0, 'bytes_evicted': 0}
+    try:
+        config = Configuration()
+        quota = config.config['datasets'].get('cache_quota')
+        pool = HostFilesystemCache.get_object_pool(config)
+
+        if logged_in_username:
+            usernames = [logged_in_username]
+        else:
+            server_cache_dir = HostFilesystemCache.server_cache_dir(config)
+            usernames = sorted(os.listdir(server_cache_dir)) if os.path.isdir(server_cache_dir) else []
+
+        im = InventoryManager()
+        for username in usernames:
+            user_cache_dir = HostFilesystemCache.user_cache_dir(config, username)
+            if not os.path.isdir(user_cache_dir):
+                continue
+
+            # Find every checkout of each dataset, including copies linked into projects, since they share a cache
+            checkouts: Dict[Tuple[str, str], List[Dataset]] = dict()
+            datasets = im.list_datasets(username)
+            for lb in im.list_labbooks(username):
+                datasets.extend(im.get_linked_datasets(lb))
+            for ds in datasets:
+                if ds.namespace:
+                    checkouts.setdefault((ds.namespace, ds.name), list()).append(ds)
+
+            collectors: List[ObjectCacheCollector] = list()
+            for namespace in sorted(os.listdir(user_cache_dir)):
+                for dataset_name in sorted(os.listdir(os.path.join(user_cache_dir, namespace))):
+                    cache_root = os.path.join(user_cache_dir, namespace, dataset_name)
+                    dataset_checkouts = checkouts.get((namespace, dataset_name), list())
+
+                    # A checkout that failed to load may still reference objects, so its cache is left alone
+                    checkout_dirs = _dataset_checkout_dirs(im.inventory_root, username, namespace, dataset_name)
+                    unloaded = set(checkout_dirs) - {os.path.realpath(ds.root_dir) for ds in dataset_checkouts}
+                    if unloaded:
+                        logger.warning(f"(Job {p}) Skipping dataset file cache {cache_root}, failed to load "
+                                       f"checkouts: {', '.join(sorted(unloaded))}")
+                        continue
+
+                    collector = ObjectCacheCollector(cache_root, dataset_checkouts, username, pool=pool,
+                                                     dataset_deleted=not checkout_dirs)
+                    try:
+                        with ExitStack() as stack:
+                            for ds in collector.checkouts:
+                                stack.enter_context(ds.lock())
+                            gc_result = collector.collect()
+                    except Exception as err:
+                        logger.error(f"(Job {p}) Failed to collect dataset file cache {cache_root}")
+                        logger.exception(err)
+                        continue
+
+                    result['objects_removed'] += gc_result.objects_removed
+                    result['bytes_reclaimed'] += gc_result.bytes_reclaimed
+                    collectors.append(collector)
+
+            if not quota:
+                continue
+
+            cache_size = sum([c.cache_size() for c in collectors])
+            if cache_size <= quota:
+                continue
+
+            # Evict least recently accessed objects across all of the user's datasets
+            candidates = sorted([(candidate, idx) for idx, c in enumerate(collectors)
+                                 for candidate in c.eviction_candidates()])
+            to_evict: Dict[int, Set[str]] = dict()
+            for candidate, idx in candidates:
+                if cache_size <= quota:
+                    break
+                to_evict.setdefault(idx, set()).add(candidate.object_id)
+                cache_size -= candidate.num_bytes
+
+            for idx, object_ids in to_evict.items():
+                with ExitStack() as stack:
+                    for ds in collectors[idx].checkouts:
+                        stack.enter_context(ds.lock())
+                    result['bytes_evicted'] += collectors[idx].evict(object_ids)
+                result['objects_evicted'] += len(object_ids)
+
+            if cache_size > quota:
+                logger.warning(f"Dataset file cache for {username} is still over its quota after evicting all objects "
+                               f"that can be downloaded again")
+
+        if pool:
+            objects_removed, bytes_freed = pool.collect()
+            result['objects_removed'] += objects_removed
+            result['bytes_reclaimed'] += bytes_freed
+
+        msg = f"Reclaimed {format_size(result['bytes_reclaimed'])} from {result['objects_removed']} unreferenced " \
+              f"objects and evicted {format_size(result['bytes_evicted'])} from {result['objects_evicted']} objects"
+        logger.info(f"(Job {p}) {msg}")
+        if job:
+            job.meta.update(result)
+            job.meta['feedback'] = msg
+            job.save_meta()
+
+        return result
+
+    except Exception as err:
+        logger.error(f"(Job {p}) Error in collect_dataset_file_caches job")
+        logger.exception(err)
+        raise
@@ -222,7 +222,7 @@ class Dispatcher(object):
     def schedule_task(self, method_reference: Callable, args: Optional[Tuple] = None,
                       kwargs: Optional[Dict[str, Any]] = None,
                       scheduled_time: Optional[datetime] = None, repeat: Optional[int] = 0,
-                      interval: Optional[int] = None) -> JobKey:
+                      interval: Optional[int] = None, job_id: Optional[str] = None) -> JobKey:
         """Schedule at task to run at a particular time in the future, and/or with certain recurrence.
 
         Args:
@@ -232,6 +232,8 @@ class Dispatcher(object):
             scheduled_time(datetime.datetime): UTC timestamp of time to run this task, None indicates now
             repeat(int): Number of times to re-run the task (None indicates repeat forever)
             interval(int): Seconds between invocations of the task (None indicates no recurrence)
+            job_id(str): Optional fixed ID for the task. Scheduling a task with the ID of an existing scheduled task
+                         replaces it, so recurring tasks are only scheduled once
 
         Returns:
             str: unique key of dispatched task
@@ -243,7 +245,8 @@ class Dispatcher(object):
                                               args=job_args,
                                               kwargs=job_kwargs,
                                               interval=interval,
-                                              repeat=repeat)
+                                              repeat=repeat,
+                                              id=job_id)
 
         logger.info(f"Scheduled job `{method_reference.__name__}`, job={str(rq_job_ref)}")
 
@@ -23,6 +23,7 @@ from gtmcore.workflows import ZipExporter, LabbookWorkflow, DatasetWorkflow, Mer
 from gtmcore.configuration import Configuration
 
 from gtmcore.dataset.storage.backend import UnmanagedStorageBackend
+from gtmcore.dataset.manifest.verify import VerificationMode, VerificationProgress, DEFAULT_SAMPLE_CONFIDENCE
 
 
 # PLEASE NOTE -- No global variables!
@@ -409,8 +410,13 @@ def update_unmanaged_dataset_from_remote(logged_in_username: str, access_token:
 
 def verify_dataset_contents(logged_in_username: str, access_token: str, id_token: str,
                             dataset_owner: str, dataset_name: str,
-                            labbook_owner: Optional[str] = None, labbook_name: Optional[str] = None) -> None:
-    """Method to update/populate an unmanaged dataset from it local state
+                            labbook_owner: Optional[str] = None, labbook_name: Optional[str] = None,
+                            mode: str = VerificationMode.FULL.value,
+                            confidence: float = DEFAULT_SAMPLE_CONFIDENCE) -> None:
+    """Method to verify that the local files of a dataset still match the manifest
+
+    Partial results are written to the job metadata after each batch of files is hashed: 'num_verified' and
+    'num_files' indicate progress and 'modified_keys' lists the modified files found so far.
 
     Args:
         logged_in_username: username for the currently logged in user
@@ -420,6 +426,8 @@ def verify_dataset_contents(logged_in_username: str, access_token: str, id_token
         dataset_name: Name of the dataset containing the files to download
         labbook_owner: Owner of the labbook if this dataset is linked
         labbook_name: Name of the labbook if this dataset is linked
+        mode: which files to verify, a VerificationMode value ('full', 'sample' or 'since_last_verified')
+        confidence: for 'sample' mode, the probability of detecting modifications
 
     Returns:
         None
@@ -435,13 +443,21 @@ def verify_dataset_contents(logged_in_username: str, access_token: str, id_token
             job.meta['feedback'] = job.meta['feedback'] + f'\n{msg}'
         job.save_meta()
 
+    def update_progress(progress: VerificationProgress) -> None:
+        if not job:
+            return
+        job.meta['num_verified'] = progress.num_verified
+        job.meta['num_files'] = progress.num_files
+        job.meta['modified_keys'] = progress.modified_keys
+        job.save_meta()
+
     logger = LMLogger.get_logger()
 
     try:
         p = os.getpid()
         logger.info(f"(Job {p}) Starting verify_dataset_contents(logged_in_username={logged_in_username},"
                     f"dataset_owner={dataset_owner}, dataset_name={dataset_name},"
-                    f"labbook_owner={labbook_owner}, labbook_name={labbook_name}")
+                    f"labbook_owner={labbook_owner}, labbook_name={labbook_name}, mode={mode}")
 
         im = InventoryManager()
         if labbook_owner is not None and labbook_name is not None:
@@ -456,8 +472,11 @@ def verify_dataset_contents(logged_in_username: str, access_token: str, id_token
         ds.namespace = dataset_owner
         ds.backend.set_default_configuration(logged_in_username, access_token, id_token)
 
-        result = ds.backend.verify_contents(ds, update_meta)
-        job.meta['modified_keys'] = result
+        result = ds.backend.verify_contents(ds, update_meta, mode=VerificationMode(mode), confidence=confidence,
+                                            progress_update_fn=update_progress)
+        if job:
+            job.meta['modified_keys'] = result
+            job.save_meta()
 
     except Exception as err:
         logger.exception(err)
@@ -1,5 +1,6 @@
 import os
 import pytest
+import shutil
 import time
 
 import uuid
@@ -18,6 +19,7 @@ from gtmcore.dispatcher import jobs
 
 from gtmcore.dataset.tests.test_storage_local import mock_dataset_with_local_dir
 from gtmcore.fixtures import mock_config_file, mock_config_file_background_tests, helper_create_remote_repo
+from gtmcore.fixtures.fixtures import _create_temp_work_dir
 from gtmcore.fixtures.datasets import helper_append_file, helper_compress_file, helper_write_big_file, \
     mock_enable_unmanaged_for_testing, mock_dataset_with_cache_dir_local
 
@@ -36,6 +38,15 @@ def mock_dataset_head():
         yield
 
 
+@pytest.fixture()
+def mock_config_file_cache_quota():
+    """A pytest fixture that creates a temporary working directory with a 12 byte dataset file cache quota"""
+    config_instance, working_dir = _create_temp_work_dir(override_dict={"datasets": {"cache_quota": 12}})
+    yield config_instance, working_dir
+    config_instance.clear_cached_configuration()
+    shutil.rmtree(working_dir)
+
+
 @pytest.mark.skipif(BG_SKIP_TEST, reason=BG_SKIP_MSG)
 class TestDatasetBackgroundJobs(object):
     def test_pull_objects(self, mock_config_file, mock_dataset_head):
@@ -366,8 +377,16 @@ class TestDatasetBackgroundJobs(object):
 
             assert 'modified_keys' in job.meta
             assert job.meta['modified_keys'] == ["test1.txt"]
+            assert job.meta['num_verified'] == 3
+            assert job.meta['num_files'] == 3
             assert 'Validating contents of 3 files.' in job.meta['feedback']
 
+            # Only the modified file hasn't been verified since it changed
+            CURRENT_JOB.meta = dict()
+            jobs.verify_dataset_contents(mode='since_last_verified', **kwargs)
+            assert job.meta['modified_keys'] == ["test1.txt"]
+            assert 'Validating contents of 1 files.' in job.meta['feedback']
+
     def test_verify_contents_linked_dataset(self, mock_dataset_with_local_dir):
         class JobMock():
             def __init__(self):
@@ -632,6 +651,35 @@ class TestDatasetBackgroundJobs(object):
         assert 'An error occurred while processing some files. Check details and re-upload.' == \
                job_status.meta['feedback']
 
+    def test_complete_dataset_upload_transaction_bg_jobs(self, mock_config_file_background_tests):
+        im = InventoryManager()
+        ds = im.create_dataset('default', 'default', "new-ds", storage_type="gigantum_object_v1", description="100")
+        m = Manifest(ds, 'default')
+
+        helper_append_file(m.cache_mgr.cache_root, m.dataset_revision, "test1.txt", "fake content!")
+        helper_append_file(m.cache_mgr.cache_root, m.dataset_revision, "test2.txt", "moar fake content!")
+
+        dl_kwargs = {
+            'dispatcher': Dispatcher,
+            'logged_in_username': "default",
+            'logged_in_email': "default@gigantum.com",
+            'dataset_owner': "default",
+            'dataset_name': "new-ds"
+        }
+
+        # Too few cores to hash in the upload job's process pool, so fall back to hash_dataset_files jobs
+        with patch.object(gtmcore.dispatcher.dataset_jobs, 'MIN_LOCAL_HASHING_CPUS', 3):
+            with patch.object(Manifest, 'hash_files', side_effect=AssertionError("Should hash in background jobs")):
+                gtmcore.dispatcher.dataset_jobs.complete_dataset_upload_transaction(**dl_kwargs)
+
+        m = Manifest(ds, 'default')
+        assert len(m.manifest) == 2
+        assert m.manifest['test1.txt']['b'] == '13'
+        assert len(m.manifest['test1.txt']['h']) == 128
+        assert m.manifest['test2.txt']['b'] == '18'
+        assert m.manifest['test2.txt']['h'] != m.manifest['test1.txt']['h']
+        assert "Uploaded 2 new file(s)." in ds.git.log()[0]['message']
+
     def test_complete_dataset_upload_transaction_prune_job(self, mock_config_file_background_tests):
         im = InventoryManager()
         ds = im.create_dataset('default', 'default', "new-ds", storage_type="gigantum_object_v1", description="100")
@@ -931,3 +979,56 @@ class TestDatasetBackgroundJobs(object):
                 'dataset_name': ds.name
             }
             gtmcore.dispatcher.dataset_jobs.push_dataset_objects(**job_kwargs)
+
+    def test_collect_dataset_file_caches(self, mock_config_file_cache_quota):
+        im = InventoryManager()
+        ds = im.create_dataset('default', 'default', "ds-gc", storage_type="gigantum_object_v1", description="100")
+        m = Manifest(ds, 'default')
+        helper_append_file(m.cache_mgr.cache_root, m.dataset_revision, "test1.txt", "1234567890")
+        helper_append_file(m.cache_mgr.cache_root, m.dataset_revision, "test2.txt", "12345")
+        m.sweep_all_changes()
+
+        # Simulate a published dataset with all objects pushed
+        ds.git.add_remote('origin', 'https://test.repo.gigantum.com/default/ds-gc.git')
+        shutil.rmtree(os.path.join(m.cache_mgr.cache_root, 'objects', '.push'))
+        object_path = m.dataset_to_object_path('test1.txt')
+        os.utime(object_path, ns=(1000, os.stat(object_path).st_mtime_ns))
+
+        result = gtmcore.dispatcher.dataset_jobs.collect_dataset_file_caches('default')
+
+        # Nothing is unreferenced, but the cache is over quota, so the least recently accessed object is evicted
+        assert result['objects_removed'] == 0
+        assert result['objects_evicted'] == 1
+        assert result['bytes_evicted'] == 10
+        assert not os.path.exists(object_path)
+        assert not os.path.exists(os.path.join(m.current_revision_dir, 'test1.txt'))
+        assert os.path.exists(os.path.join(m.current_revision_dir, 'test2.txt'))
+
+    def test_collect_dataset_file_caches_unloadable_dataset(self, mock_config_file):
+        im = InventoryManager()
+        ds = im.create_dataset('default', 'default', "ds-gc", storage_type="gigantum_object_v1", description="100")
+        m = Manifest(ds, 'default')
+        helper_append_file(m.cache_mgr.cache_root, m.dataset_revision, "test1.txt", "1234567890")
+        m.sweep_all_changes()
+        shutil.rmtree(os.path.join(m.cache_mgr.cache_root, 'objects', '.push'))
+        object_path = m.dataset_to_object_path('test1.txt')
+        revision_dir = m.current_revision_dir
+
+        # Corrupt metadata makes the dataset fail to load, but its objects are still referenced
+        with open(os.path.join(ds.root_dir, '.gigantum', 'gigantum.yaml'), 'wt') as gf:
+            gf.write("{corrupt")
+        with pytest.raises(InventoryException):
+            im.load_dataset('default', 'default', 'ds-gc')
+
+        with patch('gtmcore.dataset.cache.gc.ObjectCacheCollector._is_recent', return_value=False):
+            result = gtmcore.dispatcher.dataset_jobs.collect_dataset_file_caches('default')
+            assert result['objects_removed'] == 0
+            assert os.path.exists(object_path)
+            assert os.path.exists(os.path.join(revision_dir, 'test1.txt'))
+
+            # Once the dataset is deleted, the whole cache is unreferenced
+            shutil.rmtree(ds.root_dir)
+            result = gtmcore.dispatcher.dataset_jobs.collect_dataset_file_caches('default')
+            assert result['objects_removed'] == 1
+        assert not os.path.exists(object_path)
+        assert not os.path.exists(revision_dir)
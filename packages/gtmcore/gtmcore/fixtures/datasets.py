@@ -98,6 +98,24 @@ def mock_dataset_with_manifest(mock_dataset_with_cache_dir) -> Iterable[Tuple['D
     yield mock_dataset_with_cache_dir[0], m, mock_dataset_with_cache_dir[1]
 
 
+@pytest.fixture()
+def mock_dataset_with_object_pool() -> Iterable[Tuple['Dataset', Manifest, str]]:
+    """A pytest fixture that creates a dataset in a temp working dir and provides a cache manager, with the shared
+    object pool enabled"""
+    config_instance, working_dir = _create_temp_work_dir(override_dict={"datasets": {"shared_object_pool": True}})
+    im = InventoryManager()
+    ds = im.create_dataset(USERNAME, USERNAME, 'dataset-1', description="my dataset 1",
+                           storage_type="gigantum_object_v1")
+
+    m = Manifest(ds, USERNAME)
+    m.link_revision()
+
+    # yield dataset, manifest, working_dir
+    yield ds, m, working_dir
+    config_instance.clear_cached_configuration()
+    shutil.rmtree(working_dir)
+
+
 @pytest.fixture()
 def mock_dataset_with_manifest_bg_tests(mock_config_file_background_tests) -> Iterable[Tuple['Dataset', Manifest, str]]:
     """A pytest fixture that creates a dataset in a temp working dir and provides a cache manager, configured with
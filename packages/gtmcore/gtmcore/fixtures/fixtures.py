@@ -42,6 +42,11 @@ def _create_temp_work_dir(override_dict: dict = None, lfs_enabled: bool = True):
         'core': {
             'import_demo_on_first_login': False
         },
+        'datasets': {
+            # Tests remove objects from a file cache to simulate them not being downloaded, which the pool would
+            # link back in. Enable with the `mock_dataset_with_object_pool` fixture.
+            'shared_object_pool': False
+        },
         'environment': {
             'repo_url': ["https://github.com/gigantum/base-images-testing.git"]
         },
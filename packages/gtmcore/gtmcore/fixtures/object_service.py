@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import threading
+import uuid
+from collections import defaultdict
+from typing import Optional
+
+import pytest
+from aiohttp import web
+
+
+class FakeObjectService(object):
+    """A minimal local object service and S3 stand in, implementing the endpoints used by GigantumObjectStore
+
+    The service runs an aiohttp server on a random port in a background thread. Objects are stored in memory in
+    `objects`, keyed by object id.
+    """
+    def __init__(self, bytes_per_second: Optional[int] = None) -> None:
+        self.base_url = ""
+        self.uploads: dict = dict()
+        self.objects: dict = dict()
+        self.part_puts: dict = defaultdict(int)
+        self.failing_parts: set = set()
+        self.aborted: list = list()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        # Download support
+        self.range_requests: list = list()
+        self.failing_ranges: set = set()
+        self.supports_ranges = True
+        # If set, each response body is throttled to this rate to simulate per-connection bandwidth limits
+        self.bytes_per_second = bytes_per_second
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._runner: Optional[web.AppRunner] = None
+
+    def _app(self) -> web.Application:
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_put('/object-v1/{namespace}/{dataset}/{obj_id}', self.presign_object)
+        app.router.add_get('/object-v1/{namespace}/{dataset}/{obj_id}', self.presign_get_object)
+        app.router.add_post('/object-v1/{namespace}/{dataset}/{obj_id}/multipart', self.create_upload)
+        app.router.add_put('/object-v1/{namespace}/{dataset}/{obj_id}/multipart/{upload_id}/part/{part}',
+                           self.presign_part)
+        app.router.add_post('/object-v1/{namespace}/{dataset}/{obj_id}/multipart/{upload_id}', self.complete_upload)
+        app.router.add_delete('/object-v1/{namespace}/{dataset}/{obj_id}/multipart/{upload_id}', self.abort_upload)
+        app.router.add_put('/s3/{obj_id}', self.put_object)
+        app.router.add_get('/s3/{obj_id}', self.get_object)
+        app.router.add_put('/s3/{obj_id}/{upload_id}/{part}', self.put_part)
+        return app
+
+    def start(self) -> None:
+        async def run():
+            self._runner = web.AppRunner(self._app())
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.base_url = f"http://127.0.0.1:{port}"
+
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(run(), self._loop).result()
+
+    def stop(self) -> None:
+        if self._runner:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def service_root(self, namespace: str, dataset: str) -> str:
+        return f"{self.base_url}/object-v1/{namespace}/{dataset}"
+
+    @staticmethod
+    def etag(data: bytes) -> str:
+        return f'"{hashlib.md5(data).hexdigest()}"'
+
+    async def presign_object(self, request):
+        obj_id = request.match_info['obj_id']
+        if obj_id in self.objects:
+            return web.json_response({}, status=403)
+        return web.json_response({"presigned_url": f"{self.base_url}/s3/{obj_id}", "key_id": None})
+
+    async def presign_get_object(self, request):
+        obj_id = request.match_info['obj_id']
+        if obj_id not in self.objects:
+            return web.json_response({"error": "NoSuchKey"}, status=404)
+        return web.json_response({"presigned_url": f"{self.base_url}/s3/{obj_id}"})
+
+    async def create_upload(self, request):
+        obj_id = request.match_info['obj_id']
+        if obj_id in self.objects:
+            return web.json_response({}, status=403)
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = dict()
+        return web.json_response({"upload_id": upload_id})
+
+    async def presign_part(self, request):
+        upload_id = request.match_info['upload_id']
+        part = int(request.match_info['part'])
+        if upload_id not in self.uploads:
+            return web.json_response({"error": "NoSuchUpload"}, status=404)
+        if part in self.failing_parts:
+            return web.json_response({"error": "injected failure"}, status=500)
+        return web.json_response({"presigned_url": f"{self.base_url}/s3/{request.match_info['obj_id']}/"
+                                                   f"{upload_id}/{part}"})
+
+    async def complete_upload(self, request):
+        upload_id = request.match_info['upload_id']
+        parts = await request.json()
+        upload = self.uploads.pop(upload_id)
+        data = b''
+        for p in parts:
+            etag, part_data = upload[p['PartNumber']]
+            assert etag == p['ETag']
+            data += part_data
+        self.objects[request.match_info['obj_id']] = data
+        return web.json_response({})
+
+    async def abort_upload(self, request):
+        self.uploads.pop(request.match_info['upload_id'], None)
+        self.aborted.append(request.match_info['upload_id'])
+        return web.Response(status=204)
+
+    async def put_object(self, request):
+        self.objects[request.match_info['obj_id']] = await request.read()
+        return web.Response(status=200, headers={'Etag': 'single'})
+
+    async def put_part(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            data = await request.read()
+            # Hold the request briefly so concurrent part uploads overlap
+            await asyncio.sleep(0.05)
+            part = int(request.match_info['part'])
+            etag = hashlib.md5(data).hexdigest()
+            self.uploads[request.match_info['upload_id']][part] = (etag, data)
+            self.part_puts[part] += 1
+            return web.Response(status=200, headers={'Etag': etag})
+        finally:
+            self.in_flight -= 1
+
+    async def get_object(self, request):
+        data = self.objects[request.match_info['obj_id']]
+        headers = {'ETag': self.etag(data)}
+        status = 200
+
+        range_header = request.headers.get('Range')
+        if range_header and self.supports_ranges:
+            start_str, end_str = range_header.replace('bytes=', '').split('-')
+            start, end = int(start_str), min(int(end_str), len(data) - 1)
+            self.range_requests.append(start)
+            if start >= len(data):
+                return web.Response(status=416)
+            if start in self.failing_ranges:
+                return web.Response(status=500, text="injected failure")
+            headers['Content-Range'] = f"bytes {start}-{end}/{len(data)}"
+            data = data[start:end + 1]
+            status = 206
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            response = web.StreamResponse(status=status, headers=headers)
+            response.content_length = len(data)
+            await response.prepare(request)
+            chunk_size = 65536
+            for idx in range(0, len(data), chunk_size):
+                await response.write(data[idx:idx + chunk_size])
+                if self.bytes_per_second:
+                    await asyncio.sleep(chunk_size / self.bytes_per_second)
+            await response.write_eof()
+            return response
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture()
+def fake_object_service():
+    """A pytest fixture that runs a local fake object service for the duration of a test"""
+    service = FakeObjectService()
+    service.start()
+    yield service
+    service.stop()
@@ -435,6 +435,25 @@ class GitRepoInterface(metaclass=abc.ABCMeta):
         """
         pass
 
+    @abc.abstractmethod
+    def iter_log(self, path_info=None, max_count=None, filename=None, skip=None, since=None, author=None):
+        """Method to iterate over the commit history, without loading it all up front
+
+        Yields dictionaries in the same format as `log()`, most recent commit first
+
+        Args:
+            path_info(str): Optional path info to filter (e.g., hash1, hash2..hash1, master)
+            filename(str): Optional filename to filter on
+            max_count(int): Optional number of commit records to return
+            skip(int): Optional number of commit records to skip (supports building pagination)
+            since(datetime.datetime): Optional *date* to limit on
+            author(str): Optional filter based on author name
+
+        Returns:
+            (iterator(dict))
+        """
+        pass
+
     @abc.abstractmethod
     def log_entry(self, commit):
         """Method to get single commit records
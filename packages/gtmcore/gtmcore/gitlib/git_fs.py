@@ -1,17 +1,27 @@
 from gtmcore.gitlib.git import GitRepoInterface
 from git import Repo, Head, RemoteReference
-from git import InvalidGitRepositoryError, BadName
+from git import InvalidGitRepositoryError
+from git.exc import GitCommandError
+import datetime
 import os
 import re
 import shutil
+import subprocess
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 from gtmcore.logging import LMLogger
 
 logger = LMLogger.get_logger()
 
 
+# Fields read for each commit by `git log`, separated by NUL bytes like the commits themselves (`-z`). The message is
+# last and is the raw commit message, so it can contain anything but a NUL byte.
+LOG_FORMAT_FIELDS = ['%H', '%an', '%ae', '%cn', '%ce', '%cI', '%B']
+LOG_FORMAT = '%x00'.join(LOG_FORMAT_FIELDS)
+LOG_READ_SIZE = 65536
+
+
 class GitFsException(Exception):
     pass
 
@@ -384,39 +394,101 @@ class GitFilesystem(GitRepoInterface):
         Returns:
             list(dict)
         """
-        kwargs = {}
+        return list(self.iter_log(path_info=path_info, max_count=max_count, filename=filename, skip=skip,
+                                  since=since, author=author))
 
-        if max_count:
-            kwargs["max_count"] = max_count
+    def iter_log(self, path_info=None, max_count=None, filename=None, skip=None, since=None,
+                 author=None) -> Iterator[dict]:
+        """Method to iterate over the commit history, in the same format and with the same options as `log()`
 
-        if filename:
-            kwargs["paths"] = [filename]
+        The history is streamed from a single `git log` process, which applies the filtering, skip and max count, and
+        each commit is parsed as it is read. If the iterator is not exhausted, the process is stopped when it is closed
+        or garbage collected.
+
+        Args:
+            path_info(str): Optional path info to filter (e.g., hash1, hash2..hash1, master)
+            filename(str): Optional filename to filter on
+            max_count(int): Optional number of commit records to return
+            skip(int): Optional number of commit records to skip (supports building pagination)
+            since(datetime.datetime): Optional *date* to limit on
+            author(str): Optional filter based on author name
+
+        Returns:
+            iterator of dict
+        """
+        command = ['git', 'log', '-z', f'--format={LOG_FORMAT}']
+
+        if max_count:
+            command.append(f'--max-count={max_count}')
 
         if skip:
-            kwargs["skip"] = skip
+            command.append(f'--skip={skip}')
 
         if since:
-            kwargs["since"] = since.strftime("%B %d %Y")
+            command.append(f'--since={since.strftime("%B %d %Y")}')
 
         if author:
-            kwargs["author"] = author
+            command.append(f'--author={author}')
 
-        if path_info:
-            commits = list(self.repo.iter_commits(path_info, **kwargs))
-        else:
-            commits = list(self.repo.iter_commits(self.get_current_branch_name(), **kwargs))
+        command.append(str(path_info) if path_info else self.get_current_branch_name())
+        command.append('--')
 
-        result = []
-        for c in commits:
-            result.append({
-                            "commit": c.hexsha,
-                            "author":  {"name": c.author.name, "email": c.author.email},
-                            "committer": {"name": c.committer.name, "email": c.committer.email},
-                            "committed_on": c.committed_datetime,
-                            "message": c.message
-                          })
+        if filename:
+            command.append(filename)
 
-        return result
+        return self._read_log(command)
+
+    @staticmethod
+    def _parse_log_fields(fields: List[bytes]) -> dict:
+        """Method to convert the fields of a single commit, as read from `git log`, to a log entry dictionary"""
+        commit, author_name, author_email, committer_name, committer_email, committed_on, message = \
+            [f.decode('utf-8', 'replace') for f in fields]
+        return {"commit": commit,
+                "author": {"name": author_name, "email": author_email},
+                "committer": {"name": committer_name, "email": committer_email},
+                "committed_on": datetime.datetime.fromisoformat(committed_on),
+                "message": message}
+
+    def _read_log(self, command: List[str]) -> Iterator[dict]:
+        """Generator to run a `git log` command formatted with LOG_FORMAT and yield its commits as they are
+        read
+
+        Raises:
+            GitCommandError: if git exits with an error (e.g. the revision does not exist)
+        """
+        num_fields = len(LOG_FORMAT_FIELDS)
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   cwd=self.working_directory)
+        stdout, stderr = process.stdout, process.stderr
+        assert stdout is not None and stderr is not None
+        try:
+            fields: List[bytes] = list()
+            remainder = b''
+            while True:
+                # Read whatever is available on the pipe so commits are yielded as soon as git writes them
+                chunk = os.read(stdout.fileno(), LOG_READ_SIZE)
+                if not chunk:
+                    break
+
+                # Every field, including the last field of each commit, ends with a NUL byte
+                tokens = (remainder + chunk).split(b'\x00')
+                remainder = tokens.pop()
+                fields.extend(tokens)
+
+                num_complete = len(fields) - len(fields) % num_fields
+                for idx in range(0, num_complete, num_fields):
+                    yield self._parse_log_fields(fields[idx:idx + num_fields])
+                del fields[:num_complete]
+
+            error_message = stderr.read().decode('utf-8', 'replace')
+            if process.wait() != 0:
+                raise GitCommandError(command, process.returncode, error_message)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stdout.close()
+            stderr.close()
 
     def log_entry(self, commit):
         """Method to get single commit records
@@ -443,19 +515,16 @@ class GitFilesystem(GitRepoInterface):
         if not commit:
             raise ValueError("commit cannot be None or empty")
 
-        try:
-            entry = self.repo.commit(commit)
-        except BadName:
-            logger.error("Commit hash {} not found: {}".format(commit, BadName))
+        if commit.startswith('-'):
             raise ValueError("Commit {} not found".format(commit))
 
-        return {
-                 "commit": entry.hexsha,
-                 "author":  {"name": entry.author.name, "email": entry.author.email},
-                 "committer": {"name": entry.committer.name, "email": entry.committer.email},
-                 "committed_on": entry.committed_datetime,
-                 "message": entry.message
-               }
+        command = ['git', 'log', '-z', f'--format={LOG_FORMAT}', '--no-walk', '--max-count=1',
+                   commit, '--']
+        try:
+            return next(self._read_log(command))
+        except (GitCommandError, StopIteration) as err:
+            logger.error("Commit hash {} not found: {}".format(commit, err))
+            raise ValueError("Commit {} not found".format(commit))
 
     def blame(self, filename):
         """Method to get the revision and author for each line of a file
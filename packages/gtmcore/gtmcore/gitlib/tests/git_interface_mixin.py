@@ -1006,6 +1006,63 @@ class GitInterfaceMixin(object):
         assert len(log_info) == 1
         log_info[0]["message"] = "commit 5"
 
+    def test_iter_log(self, mock_initialized):
+        """Test streaming commit history, which should match the commits read by GitPython"""
+        git = mock_initialized[0]
+
+        write_file(git, "test1.txt", "File number 1\n", commit_msg="commit 1")
+        write_file(git, "test2.txt", "File number 2\n")
+        git.commit("commit 2\n\nA longer message, with unicode \u00e9\u6f22", author=GitAuthor("U1", "test@gigantum.io"),
+                   committer=GitAuthor("U2", "test2@gigantum.io"))
+        write_file(git, "test1.txt", "File 1 has changed\n", commit_msg="commit 3")
+
+        commits = list(git.repo.iter_commits(git.get_current_branch_name()))
+        log_iter = git.iter_log()
+        assert not isinstance(log_iter, list)
+
+        log_info = list(log_iter)
+        assert len(log_info) == len(commits) == 4
+        for truth, log in zip(commits, log_info):
+            assert log["commit"] == truth.hexsha
+            assert log["author"] == {"name": truth.author.name, "email": truth.author.email}
+            assert log["committer"] == {"name": truth.committer.name, "email": truth.committer.email}
+            assert log["committed_on"] == truth.committed_datetime
+            assert log["committed_on"].utcoffset() == truth.committed_datetime.utcoffset()
+            assert log["message"] == truth.message
+
+        # Skip and max count
+        assert [log["commit"] for log in git.iter_log(skip=1, max_count=2)] == [c.hexsha for c in commits[1:3]]
+        assert [log["commit"] for log in git.iter_log(filename="test1.txt")] == [commits[0].hexsha,
+                                                                                 commits[2].hexsha]
+
+        # Stopping early is fine
+        log_iter = git.iter_log()
+        assert next(log_iter)["commit"] == commits[0].hexsha
+        log_iter.close()
+
+        with pytest.raises(GitCommandError):
+            list(git.iter_log(path_info="not-a-branch"))
+
+    def test_log_entry(self, mock_initialized):
+        """Test getting a single commit record"""
+        git = mock_initialized[0]
+
+        write_file(git, "test1.txt", "File number 1\n", commit_msg="commit 1")
+        write_file(git, "test2.txt", "File number 2\n", commit_msg="commit 2")
+        commit = git.repo.head.commit.parents[0]
+
+        entry = git.log_entry(commit.hexsha)
+        assert entry["commit"] == commit.hexsha
+        assert entry["message"] == commit.message == "commit 1"
+        assert entry["author"] == {"name": commit.author.name, "email": commit.author.email}
+        assert entry["committed_on"] == commit.committed_datetime
+        assert git.log_entry(commit.hexsha[:8]) == entry
+
+        with pytest.raises(ValueError):
+            git.log_entry("a" * 40)
+        with pytest.raises(ValueError):
+            git.log_entry("")
+
     def test_blame(self, mock_initialized):
         """Test getting blame history for a file"""
         git = mock_initialized[0]
@@ -0,0 +1,105 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import uuid
+
+import pytest
+
+from gtmcore.dataset.tests import BENCHMARK_SKIP_TEST, BENCHMARK_SKIP_MSG
+from gtmcore.gitlib import GitFilesystemShimmed
+
+NUM_COMMITS = 50000
+
+
+def helper_gitpython_log(git, path_info=None, max_count=None, skip=None):
+    """The previous implementation of `log()`, which reads each commit through GitPython"""
+    kwargs = {}
+    if max_count:
+        kwargs["max_count"] = max_count
+    if skip:
+        kwargs["skip"] = skip
+
+    result = []
+    for c in git.repo.iter_commits(path_info or git.get_current_branch_name(), **kwargs):
+        result.append({"commit": c.hexsha,
+                       "author": {"name": c.author.name, "email": c.author.email},
+                       "committer": {"name": c.committer.name, "email": c.committer.email},
+                       "committed_on": c.committed_datetime,
+                       "message": c.message})
+    return result
+
+
+@pytest.fixture(scope="module")
+def large_history_repo():
+    """A repository with NUM_COMMITS commits with activity record sized messages, written with fast-import"""
+    working_dir = os.path.join(tempfile.gettempdir(), uuid.uuid4().hex)
+    os.makedirs(working_dir)
+    subprocess.run(['git', 'init', '-q'], cwd=working_dir, check=True)
+
+    lines = list()
+    for i in range(NUM_COMMITS):
+        message = f"_GTM_ACTIVITY_START_**\nmsg:Executed cell {i}\n**\nmetadata:{{}}\n**\n" \
+                  f"details:**\n{'ab' * 16 * (i % 8)}\n_GTM_ACTIVITY_END_".encode()
+        lines.append(b"commit refs/heads/master\n")
+        lines.append(f"committer Test User <test@gigantum.io> {1500000000 + i} +0100\n".encode())
+        lines.append(f"data {len(message)}\n".encode() + message + b"\n")
+        lines.append(f"M 644 inline file{i % 100}.txt\ndata {len(str(i))}\n{i}\n\n".encode())
+    subprocess.run(['git', 'fast-import', '--quiet'], input=b"".join(lines), cwd=working_dir, check=True)
+    subprocess.run(['git', 'checkout', '-q', 'master'], cwd=working_dir, check=True)
+
+    yield GitFilesystemShimmed({"backend": "filesystem-shim", "working_directory": working_dir})
+    shutil.rmtree(working_dir)
+
+
+@pytest.mark.skipif(BENCHMARK_SKIP_TEST, reason=BENCHMARK_SKIP_MSG)
+class TestGitLogBenchmark(object):
+    def test_full_log(self, large_history_repo):
+        """Compares reading the entire history with the `git log` stream against GitPython"""
+        git = large_history_repo
+
+        start = time.perf_counter()
+        gitpython_log = helper_gitpython_log(git)
+        gitpython_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stream_log = git.log()
+        stream_time = time.perf_counter() - start
+
+        print(f"\n{NUM_COMMITS} commits, full log: gitpython {gitpython_time:.2f}s, stream {stream_time:.2f}s "
+              f"({gitpython_time / stream_time:.1f}x)")
+
+        assert stream_log == gitpython_log
+        assert stream_time < gitpython_time
+
+    def test_paged_log(self, large_history_repo):
+        """Compares reading pages of history deep in the log against GitPython, and reading the first page of an
+        unbounded stream"""
+        git = large_history_repo
+        skips = [0, 10000, 25000, 49980]
+
+        start = time.perf_counter()
+        gitpython_pages = [helper_gitpython_log(git, max_count=20, skip=skip) for skip in skips]
+        gitpython_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stream_pages = [git.log(max_count=20, skip=skip) for skip in skips]
+        stream_time = time.perf_counter() - start
+
+        # Only reading the first few records of the stream
+        start = time.perf_counter()
+        log_iter = git.iter_log()
+        first_page = [next(log_iter) for _ in range(20)]
+        log_iter.close()
+        first_page_time = time.perf_counter() - start
+
+        print(f"\n{NUM_COMMITS} commits, {len(skips)} pages of 20: gitpython {gitpython_time:.3f}s, "
+              f"stream {stream_time:.3f}s ({gitpython_time / stream_time:.1f}x), "
+              f"first page from an unbounded stream {first_page_time:.3f}s")
+
+        assert stream_pages == gitpython_pages
+        assert first_page == stream_pages[0]
+        # Both skip commits inside git, so walking the history dominates and only a few commits are parsed
+        assert stream_time < gitpython_time * 1.25
+        assert first_page_time < stream_time / len(skips)
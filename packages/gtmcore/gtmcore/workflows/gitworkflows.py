@@ -1,8 +1,6 @@
 from abc import ABC, abstractmethod
-import os
 import time
 from enum import Enum
-import glob
 from typing import Optional, Callable, cast, List
 from humanfriendly import format_size
 
@@ -339,9 +337,8 @@ class DatasetWorkflow(GitWorkflow):
                     time.sleep(1)
 
                 # if you get here, all jobs are done or failed.
-                # Remove all the push files so they can be regenerated if needed
-                for f in glob.glob(f'{iom.push_dir}/*'):
-                    os.remove(f)
+                # Clear the push queue so it can be regenerated if needed
+                m.push_queue.clear()
 
                 # Aggregate failures if they exist
                 failure_keys: List[str] = list()
@@ -377,15 +374,35 @@ class DatasetWorkflow(GitWorkflow):
             logger.exception(err)
             raise
 
+    def _pack_dataset_objects(self, logged_in_username: str, feedback_callback: Callable) -> None:
+        """Method to bundle small objects waiting to be pushed into pack files, if enabled for the dataset's backend.
+        This commits the pack catalog, so it must run before the dataset repository is pushed.
+
+        Args:
+            logged_in_username: username for the currently logged in user
+            feedback_callback: Used to give periodic feedback
+
+        Returns:
+            None
+        """
+        m = Manifest(self.dataset, logged_in_username)
+        iom = IOManager(self.dataset, m)
+        num_packed = iom.pack_objects_to_push()
+        if num_packed:
+            feedback_callback(f"Packed {num_packed} small files for upload")
+
     def publish(self, username: str, access_token: Optional[str] = None, remote: str = "origin",
                 public: bool = False, feedback_callback: Callable = lambda _ : None,
                 id_token: Optional[str] = None):
+        self._pack_dataset_objects(username, feedback_callback)
         super().publish(username, access_token, remote, public, feedback_callback, id_token)
         self._push_dataset_objects(username, feedback_callback, access_token, id_token)
 
     def sync(self, username: str, remote: str = "origin", override: MergeOverride = MergeOverride.ABORT,
              feedback_callback: Callable = lambda _ : None, pull_only: bool = False,
              access_token: Optional[str] = None, id_token: Optional[str] = None):
+        if not pull_only:
+            self._pack_dataset_objects(username, feedback_callback)
         v = super().sync(username, remote, override, feedback_callback, pull_only,
                          access_token, id_token)
         self._push_dataset_objects(username, feedback_callback, access_token, id_token)